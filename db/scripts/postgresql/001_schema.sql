@@ -71,6 +71,8 @@ CREATE TABLE IF NOT EXISTS composite_tools (
     master_tool          VARCHAR(255)   NOT NULL,
     master_output_key    VARCHAR(100)   DEFAULT 'master',
     record_path          VARCHAR(255)   ,
+    failure_budget       INTEGER        ,
+    memoize              BOOLEAN        NOT NULL DEFAULT TRUE,
     enabled              BOOLEAN        NOT NULL DEFAULT TRUE,
     created_by           VARCHAR(100)   ,
     created_at           TIMESTAMPTZ      DEFAULT CURRENT_TIMESTAMPTZ,
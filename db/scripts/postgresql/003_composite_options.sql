@@ -0,0 +1,9 @@
+-- ============================================================================
+-- SAJHA MCP Server — Composite tool options (PostgreSQL)
+-- Copyright All rights Reserved 2025-2030, Ashutosh Sinha
+-- Adds the per-definition fan-out options to databases created before them.
+-- Idempotent: ADD COLUMN IF NOT EXISTS.
+-- ============================================================================
+
+ALTER TABLE composite_tools ADD COLUMN IF NOT EXISTS failure_budget INTEGER;
+ALTER TABLE composite_tools ADD COLUMN IF NOT EXISTS memoize BOOLEAN NOT NULL DEFAULT TRUE;
@@ -70,6 +70,8 @@ CREATE TABLE IF NOT EXISTS composite_tools (
     master_tool          VARCHAR(255)   NOT NULL,
     master_output_key    VARCHAR(100)   DEFAULT 'master',
     record_path          VARCHAR(255)   ,
+    failure_budget       INTEGER        ,
+    memoize              BOOLEAN        NOT NULL DEFAULT 1,
     enabled              BOOLEAN        NOT NULL DEFAULT 1,
     created_by           VARCHAR(100)   ,
     created_at           TIMESTAMP      DEFAULT CURRENT_TIMESTAMP,
@@ -0,0 +1,9 @@
+-- ============================================================================
+-- SAJHA MCP Server — Composite tool options (SQLite)
+-- Copyright All rights Reserved 2025-2030, Ashutosh Sinha
+-- Adds the per-definition fan-out options to databases created before them.
+-- Idempotent: fails (and is skipped) when the column already exists.
+-- ============================================================================
+
+ALTER TABLE composite_tools ADD COLUMN failure_budget INTEGER;
+ALTER TABLE composite_tools ADD COLUMN memoize BOOLEAN NOT NULL DEFAULT 1;
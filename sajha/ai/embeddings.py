@@ -0,0 +1,243 @@
+"""
+SAJHA MCP Server — Embedding Service
+Copyright All rights Reserved 2025-2030, Ashutosh Sinha
+
+Sits between LLMGateway.embed() and the embedding providers:
+
+- Content-hash cache: a vector is keyed by sha256(provider, model, text), held in
+  an in-memory LRU and, optionally, a SQLite file on disk — so re-embedding the
+  same tool description, query or prompt after a restart or a hot reload costs
+  a lookup, not a provider call.
+- Dedup: identical texts within a request (and across coalesced requests) are
+  embedded once.
+- Micro-batching: concurrent embed() calls for the same provider/model are
+  coalesced for up to batch_wait_ms; the first caller leads, sends the union of
+  the pending misses in chunks of the provider's max_embed_batch, and hands each
+  caller its vectors. A lone caller waits at most batch_wait_ms.
+
+Vectors are stored as float32 blobs (stdlib array), so the cache has no
+dependency beyond sqlite3.
+
+Config (config/application.yml):
+  ai:
+    embeddings:
+      cache_enabled: true
+      memory_entries: 50000
+      disk_path: data/embedding_cache.sqlite   # empty disables the disk tier
+      batch_wait_ms: 5
+"""
+
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from array import array
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from sajha.ai.providers import EmbeddingResponse
+
+logger = logging.getLogger(__name__)
+
+
+def embedding_key(provider: str, model: str, text: str) -> str:
+    return hashlib.sha256(f"{provider}\x00{model}\x00{text}".encode('utf-8')).hexdigest()
+
+
+class EmbeddingCache:
+    """In-memory LRU over an optional SQLite store of float32 vectors."""
+
+    def __init__(self, memory_entries: int = 50000, disk_path: str = ''):
+        self.memory_entries = memory_entries
+        self.disk_path = disk_path
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if disk_path:
+            try:
+                Path(disk_path).parent.mkdir(parents=True, exist_ok=True)
+                self._db = sqlite3.connect(disk_path, check_same_thread=False, isolation_level=None)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute("PRAGMA synchronous=NORMAL")
+                self._db.execute("CREATE TABLE IF NOT EXISTS embeddings "
+                                 "(key TEXT PRIMARY KEY, dim INTEGER, vector BLOB, created REAL)")
+            except sqlite3.Error as e:
+                logger.warning(f"Embedding disk cache unavailable ({disk_path}): {e}")
+                self._db = None
+        self._stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+
+    def _remember(self, key: str, vector: List[float]):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, List[float]]:
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+            self._stats['memory_hits'] += len(found)
+            missing = [k for k in keys if k not in found]
+            if missing and self._db is not None:
+                for start in range(0, len(missing), 500):
+                    chunk = missing[start:start + 500]
+                    rows = self._db.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})",
+                        chunk).fetchall()
+                    for key, blob in rows:
+                        vector = array('f', blob).tolist()
+                        found[key] = vector
+                        self._remember(key, vector)
+                        self._stats['disk_hits'] += 1
+            self._stats['misses'] += sum(1 for k in keys if k not in found)
+        return found
+
+    def put_many(self, items: Dict[str, List[float]]):
+        with self._lock:
+            for key, vector in items.items():
+                self._remember(key, vector)
+            if self._db is not None and items:
+                now = time.time()
+                try:
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)",
+                        [(k, len(v), array('f', v).tobytes(), now) for k, v in items.items()])
+                except sqlite3.Error as e:
+                    logger.warning(f"Embedding disk cache write failed: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM embeddings")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            disk = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0] if self._db else 0
+            return dict(self._stats, memory_entries=len(self._memory), disk_entries=disk,
+                        disk_path=self.disk_path if self._db else '')
+
+
+class _Batcher:
+    """Coalesces concurrent misses for one provider/model into chunked provider calls."""
+
+    def __init__(self, fetch: Callable[[List[str]], EmbeddingResponse], max_batch: int, wait_seconds: float):
+        self.fetch = fetch
+        self.max_batch = max(1, max_batch)
+        self.wait_seconds = wait_seconds
+        self._pending: List[Tuple[List[str], Future]] = []
+        self._leading = False
+        self._cond = threading.Condition()
+
+    def embed(self, texts: List[str]) -> Tuple[Dict[str, List[float]], int, int]:
+        """({text: vector}, provider tokens, texts in the provider batch) for texts.
+
+        Callers queue their texts; whoever finds no leader waits wait_seconds,
+        then sends everything queued so far in one round and wakes the others.
+        Callers queued during that round elect the next leader among themselves.
+        """
+        future: Future = Future()
+        with self._cond:
+            self._pending.append((texts, future))
+            while self._leading and not future.done():
+                self._cond.wait()
+            if future.done():
+                return future.result()
+            self._leading = True
+        try:
+            if self.wait_seconds > 0:
+                time.sleep(self.wait_seconds)
+            with self._cond:
+                batch, self._pending = self._pending, []
+            self._run(batch)
+        finally:
+            with self._cond:
+                self._leading = False
+                self._cond.notify_all()
+        return future.result()
+
+    def _run(self, batch: List[Tuple[List[str], Future]]):
+        unique = list(dict.fromkeys(t for texts, _ in batch for t in texts))
+        vectors: Dict[str, List[float]] = {}
+        tokens = 0
+        try:
+            for start in range(0, len(unique), self.max_batch):
+                chunk = unique[start:start + self.max_batch]
+                response = self.fetch(chunk)
+                if len(response.embeddings) != len(chunk):
+                    raise ValueError(f"Provider returned {len(response.embeddings)} embeddings "
+                                     f"for {len(chunk)} texts")
+                vectors.update(zip(chunk, response.embeddings))
+                tokens += response.total_tokens or 0
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for texts, future in batch:
+            future.set_result(({t: vectors[t] for t in texts}, tokens, len(unique)))
+
+
+class EmbeddingService:
+    """Cached, deduplicated, micro-batched embeddings for the gateway."""
+
+    def __init__(self, cache_enabled: bool = True, memory_entries: int = 50000,
+                 disk_path: str = '', batch_wait_ms: float = 5):
+        self.cache = EmbeddingCache(memory_entries, disk_path) if cache_enabled else None
+        self.batch_wait_seconds = max(0.0, batch_wait_ms / 1000)
+        self._batchers: Dict[Tuple[int, str], _Batcher] = {}
+        self._lock = threading.Lock()
+        self._stats = {'requests': 0, 'texts': 0, 'provider_calls': 0, 'provider_texts': 0}
+
+    def _batcher(self, provider_type: str, provider, model: str) -> _Batcher:
+        key = (id(provider), model)
+        with self._lock:
+            batcher = self._batchers.get(key)
+            if batcher is None:
+                def fetch(chunk, provider=provider, model=model):
+                    with self._lock:
+                        self._stats['provider_calls'] += 1
+                        self._stats['provider_texts'] += len(chunk)
+                    return provider.embed(chunk, model=model)
+                batcher = _Batcher(fetch, getattr(provider, 'max_embed_batch', 64), self.batch_wait_seconds)
+                self._batchers[key] = batcher
+            return batcher
+
+    def embed(self, provider_type: str, provider, model: str, texts: List[str],
+              use_cache: bool = True) -> EmbeddingResponse:
+        """Embeddings for texts (in order), calling the provider only for cache misses."""
+        texts = list(texts)
+        with self._lock:
+            self._stats['requests'] += 1
+            self._stats['texts'] += len(texts)
+        cache = self.cache if use_cache else None
+        keys = {t: embedding_key(provider_type, model, t) for t in dict.fromkeys(texts)}
+        cached = cache.get_many(list(keys.values())) if cache else {}
+        vectors = {t: cached[k] for t, k in keys.items() if k in cached}
+        misses = [t for t in keys if t not in vectors]
+
+        tokens = 0
+        if misses:
+            fetched, batch_tokens, batch_texts = self._batcher(provider_type, provider, model).embed(misses)
+            # A coalesced call's usage is shared pro rata between its callers
+            tokens = round(batch_tokens * len(misses) / max(batch_texts, 1))
+            vectors.update(fetched)
+            if cache:
+                cache.put_many({keys[t]: fetched[t] for t in misses})
+
+        embeddings = [vectors[t] for t in texts]
+        return EmbeddingResponse(embeddings=embeddings, model=model, provider=provider_type,
+                                 total_tokens=tokens,
+                                 dimensions=len(embeddings[0]) if embeddings else 0)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats, batch_wait_ms=round(self.batch_wait_seconds * 1000, 1))
+        stats['cache'] = self.cache.stats() if self.cache else {'enabled': False}
+        return stats
@@ -13,10 +13,11 @@ Usage:
 
 import json
 import time
-import hashlib
+import asyncio
 import logging
 import threading
-from typing import Dict, List, Optional, Any
+from collections import deque
+from typing import AsyncIterator, Dict, List, Optional, Any
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 
@@ -24,6 +25,9 @@ from sajha.ai.providers import (
     LLMProvider, LLMResponse, EmbeddingResponse, ModelInfo,
     ProviderType, create_provider,
 )
+from sajha.ai.embeddings import EmbeddingService
+from sajha.ai.response_cache import ResponseCache
+from sajha.ai.routing import ProviderRouter, ProviderUnavailableError
 
 logger = logging.getLogger(__name__)
 
@@ -39,47 +43,30 @@ class GatewayConfig:
     temperature_default: float = 0.7
     cache_enabled: bool = True
     cache_ttl_seconds: int = 3600
+    cache_max_entries: int = 500
+    cache_max_mb: float = 64
+    cache_disk_path: str = ''
+    cache_disk_max_entries: int = 20000
+    cache_semantic_enabled: bool = False
+    cache_semantic_threshold: float = 0.95
     budget_tracking_enabled: bool = True
-
-
-class ResponseCache:
-    """In-memory LRU cache for LLM responses."""
-
-    def __init__(self, max_size: int = 500, ttl: int = 3600):
-        self._cache: Dict[str, tuple] = {}  # key → (response, timestamp)
-        self._max_size = max_size
-        self._ttl = ttl
-        self._lock = threading.Lock()
-        self._hits = 0
-        self._misses = 0
-
-    def _key(self, messages, model, system='', temperature=0.7):
-        raw = json.dumps({'m': messages, 'model': model, 's': system, 't': temperature}, sort_keys=True)
-        return hashlib.sha256(raw.encode()).hexdigest()
-
-    def get(self, messages, model, system='', temperature=0.7) -> Optional[LLMResponse]:
-        k = self._key(messages, model, system, temperature)
-        with self._lock:
-            if k in self._cache:
-                resp, ts = self._cache[k]
-                if time.time() - ts < self._ttl:
-                    self._hits += 1
-                    return resp
-                del self._cache[k]
-            self._misses += 1
-        return None
-
-    def put(self, messages, model, response: LLMResponse, system='', temperature=0.7):
-        k = self._key(messages, model, system, temperature)
-        with self._lock:
-            if len(self._cache) >= self._max_size:
-                oldest = min(self._cache, key=lambda x: self._cache[x][1])
-                del self._cache[oldest]
-            self._cache[k] = (response, time.time())
-
-    def stats(self) -> Dict:
-        return {'size': len(self._cache), 'hits': self._hits, 'misses': self._misses,
-                'hit_rate': f"{self._hits / max(self._hits + self._misses, 1) * 100:.1f}%"}
+    embedding_cache_enabled: bool = True
+    embedding_memory_entries: int = 50000
+    embedding_disk_path: str = ''
+    embedding_batch_wait_ms: float = 5
+    fallback_chain: List[str] = field(default_factory=list)     # 'provider/model' entries
+    max_concurrency: int = 16
+    provider_concurrency: Dict[str, int] = field(default_factory=dict)
+    rate_limit_cooldown_seconds: float = 30
+    latency_window: int = 200
+    latency_min_samples: int = 20
+    timeout_adaptive: bool = True
+    timeout_multiplier: float = 2.0
+    timeout_min_ms: int = 5000
+    timeout_max_ms: int = 300000
+    timeout_default_ms: int = 120000
+    hedge_enabled: bool = False
+    hedge_min_delay_ms: int = 250
 
 
 class TokenTracker:
@@ -120,6 +107,45 @@ class TokenTracker:
         return total
 
 
+class StreamStats:
+    """Counters and recent time-to-first-token / duration samples for streamed completions."""
+
+    def __init__(self, window: int = 500):
+        self._ttft = deque(maxlen=window)
+        self._duration = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.started = self.completed = self.cancelled = self.failed = self.active = 0
+
+    def start(self):
+        with self._lock:
+            self.started += 1
+            self.active += 1
+
+    def finish(self, outcome: str, ttft_ms: Optional[float], duration_ms: float):
+        with self._lock:
+            self.active -= 1
+            setattr(self, outcome, getattr(self, outcome) + 1)
+            if ttft_ms is not None:
+                self._ttft.append(ttft_ms)
+            if outcome == 'completed':
+                self._duration.append(duration_ms)
+
+    @staticmethod
+    def _pct(samples, q):
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 1)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'started': self.started, 'completed': self.completed, 'cancelled': self.cancelled,
+                    'failed': self.failed, 'active': self.active,
+                    'ttft_ms_p50': self._pct(self._ttft, 0.5), 'ttft_ms_p95': self._pct(self._ttft, 0.95),
+                    'duration_ms_p50': self._pct(self._duration, 0.5),
+                    'duration_ms_p95': self._pct(self._duration, 0.95)}
+
+
 class LLMGateway:
     """
     Central gateway for all LLM interactions in SAJHA.
@@ -128,6 +154,8 @@ class LLMGateway:
     - Multi-provider routing (Anthropic, OpenAI, Bedrock, Together, Ollama, Azure)
     - User-level model overrides (stored in user_ai_preferences DB table)
     - Response caching (same prompt+model → cached response)
+    - Embedding cache + micro-batching (same text → cached vector)
+    - Async completions and token streaming (acomplete / astream) for the event loop
     - Token budget tracking per user
     - System-wide defaults configurable via application.yml
     """
@@ -136,8 +164,37 @@ class LLMGateway:
         self.config = config or GatewayConfig()
         self._providers: Dict[str, LLMProvider] = {}
         self._user_preferences: Dict[str, Dict] = {}  # user_id → {provider, model}
-        self._cache = ResponseCache(ttl=self.config.cache_ttl_seconds)
         self._tracker = TokenTracker()
+        self._streams = StreamStats()
+        self._embeddings = EmbeddingService(
+            cache_enabled=self.config.embedding_cache_enabled,
+            memory_entries=self.config.embedding_memory_entries,
+            disk_path=self.config.embedding_disk_path,
+            batch_wait_ms=self.config.embedding_batch_wait_ms,
+        )
+        self._router = ProviderRouter(
+            max_concurrency=self.config.max_concurrency,
+            provider_concurrency=self.config.provider_concurrency,
+            rate_limit_cooldown_seconds=self.config.rate_limit_cooldown_seconds,
+            latency_window=self.config.latency_window,
+            min_samples=self.config.latency_min_samples,
+            timeout_adaptive=self.config.timeout_adaptive,
+            timeout_multiplier=self.config.timeout_multiplier,
+            timeout_min_ms=self.config.timeout_min_ms,
+            timeout_max_ms=self.config.timeout_max_ms,
+            timeout_default_ms=self.config.timeout_default_ms,
+            hedge_enabled=self.config.hedge_enabled,
+            hedge_min_delay_ms=self.config.hedge_min_delay_ms,
+        )
+        self._cache = ResponseCache(
+            max_size=self.config.cache_max_entries,
+            ttl=self.config.cache_ttl_seconds,
+            max_bytes=int(self.config.cache_max_mb * 1024 * 1024),
+            disk_path=self.config.cache_disk_path,
+            disk_max_entries=self.config.cache_disk_max_entries,
+            semantic_threshold=self.config.cache_semantic_threshold if self.config.cache_semantic_enabled else 0.0,
+            embed=lambda texts: self.embed(texts).embeddings,
+        )
         logger.info(f"LLMGateway initialized: default={self.config.default_provider}/{self.config.default_model}")
 
     def register_provider(self, provider_type: str, **config) -> LLMProvider:
@@ -175,6 +232,12 @@ class LLMGateway:
         m = model or pref.get('model', '') or self.config.default_model
         return p, m
 
+    def _temperature(self, temperature: Optional[float], pref: Dict) -> float:
+        """Explicit temperature (0 included) → user preference → system default."""
+        if temperature is not None:
+            return temperature
+        return pref.get('temperature', 0) or self.config.temperature_default
+
     def complete(
         self,
         prompt: str,
@@ -182,10 +245,11 @@ class LLMGateway:
         provider: str = '',
         model: str = '',
         system: str = '',
-        temperature: float = 0.0,
+        temperature: Optional[float] = None,
         max_tokens: int = 0,
         tools: Optional[List[Dict]] = None,
         use_cache: bool = True,
+        semantic: bool = True,
         **kwargs,
     ) -> LLMResponse:
         """
@@ -195,28 +259,27 @@ class LLMGateway:
         1. Explicit parameters (provider=, model=)
         2. User preferences (set via set_user_preference)
         3. System defaults (from GatewayConfig)
-        """
-        p_type, m = self._resolve_provider_model(user_id, provider, model)
-        pref = self._user_preferences.get(user_id, {})
-        temp = temperature or pref.get('temperature', 0) or self.config.temperature_default
-        max_tok = max_tokens or pref.get('max_tokens', 0) or self.config.max_tokens_default
 
+        If that target errors, is rate limited, times out or is at its
+        concurrency cap, the configured fallback chain is tried in order.
+
+        semantic=False keeps the call to exact cache matches: for prompts where a
+        near-identical one ("price of AAPL" / "price of MSFT") needs another answer.
+        """
+        p_type, _, m, temp, max_tok = self._prepare(user_id, provider, model, temperature, max_tokens)
         messages = [{'role': 'user', 'content': prompt}]
 
         # Cache check
         if use_cache and self.config.cache_enabled and not tools:
-            cached = self._cache.get(messages, m, system, temp)
+            cached = self._cache.get(messages, m, system, temp, semantic=semantic)
             if cached:
                 return cached
 
-        # Get provider
-        prov = self._providers.get(p_type)
-        if not prov:
-            raise ValueError(f"Provider '{p_type}' not registered. Available: {list(self._providers.keys())}")
-
-        # Execute
-        response = prov.complete(messages, m, temperature=temp, max_tokens=max_tok,
-                                  system=system, tools=tools, **kwargs)
+        # Execute: fallback chain, hedging and timeouts per sajha.ai.routing
+        response, _ = self._router.run(
+            self._targets(p_type, m),
+            lambda t: self._providers[t[0]].complete(messages, t[1], temperature=temp, max_tokens=max_tok,
+                                                     system=system, tools=tools, **kwargs))
 
         # Track tokens
         if self.config.budget_tracking_enabled and user_id:
@@ -224,10 +287,138 @@ class LLMGateway:
 
         # Cache response
         if use_cache and self.config.cache_enabled and not tools:
-            self._cache.put(messages, m, response, system, temp)
+            self._cache.put(messages, m, response, system, temp, semantic=semantic)
 
         return response
 
+    def _prepare(self, user_id, provider, model, temperature, max_tokens):
+        p_type, m = self._resolve_provider_model(user_id, provider, model)
+        pref = self._user_preferences.get(user_id, {})
+        temp = self._temperature(temperature, pref)
+        max_tok = max_tokens or pref.get('max_tokens', 0) or self.config.max_tokens_default
+        prov = self._providers.get(p_type)
+        if not prov:
+            raise ValueError(f"Provider '{p_type}' not registered. Available: {list(self._providers.keys())}")
+        return p_type, prov, m, temp, max_tok
+
+    def _targets(self, p_type: str, m: str) -> List[tuple]:
+        """(provider, model) to try: the resolved one, then registered fallback entries."""
+        targets = [(p_type, m)]
+        for entry in self.config.fallback_chain:
+            fb_type, _, fb_model = entry.strip().partition('/')
+            target = (fb_type, fb_model or m)
+            if fb_type in self._providers and target not in targets:
+                targets.append(target)
+        return targets
+
+    async def acomplete(
+        self,
+        prompt: str,
+        user_id: str = '',
+        provider: str = '',
+        model: str = '',
+        system: str = '',
+        temperature: Optional[float] = None,
+        max_tokens: int = 0,
+        tools: Optional[List[Dict]] = None,
+        use_cache: bool = True,
+        semantic: bool = True,
+        **kwargs,
+    ) -> LLMResponse:
+        """complete() for async callers — awaits the provider's async client
+        instead of blocking the event loop for the whole generation."""
+        p_type, prov, m, temp, max_tok = self._prepare(user_id, provider, model, temperature, max_tokens)
+        messages = [{'role': 'user', 'content': prompt}]
+        cacheable = use_cache and self.config.cache_enabled and not tools
+        if cacheable:
+            cached = self._cache.get(messages, m, system, temp, semantic=semantic)
+            if cached:
+                return cached
+
+        response, _ = await self._router.arun(
+            self._targets(p_type, m),
+            lambda t: self._providers[t[0]].acomplete(messages, t[1], temperature=temp, max_tokens=max_tok,
+                                                      system=system, tools=tools, **kwargs))
+        if self.config.budget_tracking_enabled and user_id:
+            self._tracker.record(user_id, response)
+        if cacheable:
+            self._cache.put(messages, m, response, system, temp, semantic=semantic)
+        return response
+
+    async def astream(
+        self,
+        prompt: str,
+        user_id: str = '',
+        provider: str = '',
+        model: str = '',
+        system: str = '',
+        temperature: Optional[float] = None,
+        max_tokens: int = 0,
+        use_cache: bool = True,
+        metrics: Optional[Dict[str, Any]] = None,
+        **kwargs,
+    ) -> AsyncIterator[str]:
+        """
+        Stream a completion as content chunks.
+
+        A cached response is replayed as one chunk. Closing the iterator early
+        (client disconnect, task cancellation) closes the provider stream, which
+        stops upstream generation. `metrics`, if given, is filled with provider,
+        model, ttft_ms, duration_ms, chunks, cached and outcome
+        (completed | cancelled | failed).
+        """
+        p_type, prov, m, temp, max_tok = self._prepare(user_id, provider, model, temperature, max_tokens)
+        messages = [{'role': 'user', 'content': prompt}]
+        metrics = metrics if metrics is not None else {}
+        metrics.update(provider=p_type, model=m, cached=False, chunks=0, ttft_ms=None)
+        cacheable = use_cache and self.config.cache_enabled
+        start = time.perf_counter()
+
+        if cacheable:
+            cached = self._cache.get(messages, m, system, temp)
+            if cached:
+                metrics.update(cached=True, chunks=1, outcome='completed',
+                               ttft_ms=round((time.perf_counter() - start) * 1000, 2), duration_ms=0.0)
+                yield cached.content
+                return
+
+        # A stream holds one of the provider's concurrency slots until it ends
+        limit = self._router.limit(p_type)
+        if not await limit.aacquire(self._router.timeout_for((p_type, m))):
+            raise ProviderUnavailableError(f"Provider '{p_type}' is at its concurrency limit")
+        self._streams.start()
+        parts: List[str] = []
+        outcome = 'cancelled'
+        stream = prov.astream(messages, m, temperature=temp, max_tokens=max_tok, system=system, **kwargs)
+        try:
+            async for chunk in stream:
+                if metrics['ttft_ms'] is None:
+                    metrics['ttft_ms'] = round((time.perf_counter() - start) * 1000, 2)
+                parts.append(chunk)
+                metrics['chunks'] += 1
+                yield chunk
+            outcome = 'completed'
+        except (GeneratorExit, asyncio.CancelledError):
+            raise
+        except Exception:
+            outcome = 'failed'
+            raise
+        finally:
+            await stream.aclose()
+            limit.release()
+            duration_ms = round((time.perf_counter() - start) * 1000, 2)
+            metrics.update(outcome=outcome, duration_ms=duration_ms)
+            self._streams.finish(outcome, metrics['ttft_ms'], duration_ms)
+
+        content = ''.join(parts)
+        # Provider streams carry no usage figures; the request is still counted
+        response = LLMResponse(content=content, model=m, provider=p_type,
+                               latency_ms=int(metrics['duration_ms']))
+        if self.config.budget_tracking_enabled and user_id:
+            self._tracker.record(user_id, response)
+        if cacheable:
+            self._cache.put(messages, m, response, system, temp)
+
     def complete_messages(
         self,
         messages: List[Dict[str, str]],
@@ -235,34 +426,33 @@ class LLMGateway:
         provider: str = '',
         model: str = '',
         system: str = '',
-        temperature: float = 0.0,
+        temperature: Optional[float] = None,
         max_tokens: int = 0,
         **kwargs,
     ) -> LLMResponse:
         """Multi-turn completion with full message history."""
-        p_type, m = self._resolve_provider_model(user_id, provider, model)
-        pref = self._user_preferences.get(user_id, {})
-        temp = temperature or pref.get('temperature', 0) or self.config.temperature_default
-        max_tok = max_tokens or pref.get('max_tokens', 0) or self.config.max_tokens_default
-
-        prov = self._providers.get(p_type)
-        if not prov:
-            raise ValueError(f"Provider '{p_type}' not registered")
-
-        response = prov.complete(messages, m, temperature=temp, max_tokens=max_tok,
-                                  system=system, **kwargs)
+        p_type, _, m, temp, max_tok = self._prepare(user_id, provider, model, temperature, max_tokens)
+        response, _ = self._router.run(
+            self._targets(p_type, m),
+            lambda t: self._providers[t[0]].complete(messages, t[1], temperature=temp, max_tokens=max_tok,
+                                                     system=system, **kwargs))
         if self.config.budget_tracking_enabled and user_id:
             self._tracker.record(user_id, response)
         return response
 
-    def embed(self, texts: List[str], provider: str = '', model: str = '') -> EmbeddingResponse:
-        """Generate embeddings via the configured embedding provider."""
+    def embed(self, texts: List[str], provider: str = '', model: str = '',
+              use_cache: bool = True) -> EmbeddingResponse:
+        """Generate embeddings via the configured embedding provider.
+
+        Cached by content hash; concurrent calls are coalesced into batched,
+        deduplicated provider requests (see sajha.ai.embeddings).
+        """
         p_type = provider or self.config.default_embedding_provider
         m = model or self.config.default_embedding_model
         prov = self._providers.get(p_type)
         if not prov:
             raise ValueError(f"Embedding provider '{p_type}' not registered")
-        return prov.embed(texts, model=m)
+        return self._embeddings.embed(p_type, prov, m, texts, use_cache=use_cache)
 
     def list_all_models(self) -> List[ModelInfo]:
         """List models across all registered providers."""
@@ -291,6 +481,9 @@ class LLMGateway:
             'default_provider': self.config.default_provider,
             'default_model': self.config.default_model,
             'cache': self._cache.stats(),
+            'embeddings': self._embeddings.stats(),
+            'streaming': self._streams.stats(),
+            'routing': self._router.stats(),
             'user_preferences': len(self._user_preferences),
             'total_models': len(self.list_all_models()),
         }
@@ -307,6 +500,14 @@ class LLMGateway:
 _gateway: Optional[LLMGateway] = None
 
 
+def _cfg_bool(config: Dict[str, Any], key: str, default: bool) -> bool:
+    """Boolean from the flattened YAML config, where values arrive as strings."""
+    value = config.get(key, default)
+    if isinstance(value, str):
+        return value.strip().lower() in ('true', '1', 'yes') if value.strip() else default
+    return bool(value)
+
+
 def init_gateway(config: Dict[str, Any], db_session=None) -> LLMGateway:
     """Initialize the LLM gateway from database tables.
 
@@ -321,8 +522,32 @@ def init_gateway(config: Dict[str, Any], db_session=None) -> LLMGateway:
         default_model=config.get('ai.default_model', os.environ.get('SAJHA_AI_DEFAULT_MODEL', 'claude-sonnet-4-20250514')),
         default_embedding_provider=config.get('ai.embedding_provider', 'openai'),
         default_embedding_model=config.get('ai.embedding_model', 'text-embedding-3-small'),
-        cache_enabled=config.get('ai.cache.enabled', True),
+        cache_enabled=_cfg_bool(config, 'ai.cache.enabled', True),
         cache_ttl_seconds=int(config.get('ai.cache.ttl_seconds', 3600) or 3600),
+        cache_max_entries=int(config.get('ai.cache.max_entries', 500) or 500),
+        cache_max_mb=float(config.get('ai.cache.max_mb', 64) or 64),
+        cache_disk_path=config.get('ai.cache.disk_path', '') or '',
+        cache_disk_max_entries=int(config.get('ai.cache.disk_max_entries', 20000) or 20000),
+        cache_semantic_enabled=_cfg_bool(config, 'ai.cache.semantic.enabled', False),
+        cache_semantic_threshold=float(config.get('ai.cache.semantic.threshold', 0.95) or 0.95),
+        embedding_cache_enabled=_cfg_bool(config, 'ai.embeddings.cache_enabled', True),
+        embedding_memory_entries=int(config.get('ai.embeddings.memory_entries', 50000) or 50000),
+        embedding_disk_path=config.get('ai.embeddings.disk_path', 'data/embedding_cache.sqlite') or '',
+        embedding_batch_wait_ms=float(config.get('ai.embeddings.batch_wait_ms', 5) or 0),
+        fallback_chain=[e.strip() for e in str(config.get('ai.routing.fallback', '') or '').split(',') if e.strip()],
+        max_concurrency=int(config.get('ai.routing.max_concurrency', 16) or 16),
+        provider_concurrency={k[len('ai.routing.concurrency.'):]: int(v) for k, v in config.items()
+                              if k.startswith('ai.routing.concurrency.') and str(v).strip()},
+        rate_limit_cooldown_seconds=float(config.get('ai.routing.rate_limit_cooldown_seconds', 30) or 0),
+        latency_window=int(config.get('ai.routing.latency_window', 200) or 200),
+        latency_min_samples=int(config.get('ai.routing.min_samples', 20) or 20),
+        timeout_adaptive=_cfg_bool(config, 'ai.routing.timeout.adaptive', True),
+        timeout_multiplier=float(config.get('ai.routing.timeout.multiplier', 2.0) or 2.0),
+        timeout_min_ms=int(config.get('ai.routing.timeout.min_ms', 5000) or 0),
+        timeout_max_ms=int(config.get('ai.routing.timeout.max_ms', 300000) or 300000),
+        timeout_default_ms=int(config.get('ai.routing.timeout.default_ms', 120000) or 0),
+        hedge_enabled=_cfg_bool(config, 'ai.routing.hedge.enabled', False),
+        hedge_min_delay_ms=int(config.get('ai.routing.hedge.min_delay_ms', 250) or 0),
     )
     _gateway = LLMGateway(gc)
 
@@ -10,13 +10,24 @@ BM25 over the same rich text the embedder uses (name + description + parameters
 literature), with proper tokenization and IDF weighting — so distinctive terms outrank
 common ones, unlike a naive keyword-overlap. Pure Python on purpose: the fallback tier
 must never itself depend on an optional package that might be absent.
+
+The index is inverted: term -> postings {doc id: term frequency}, with IDF, per-document
+length norms and per-term score upper bounds cached between changes. A query only
+touches the postings of its own terms, processed highest-bound first; once the terms
+still to come cannot lift an unseen document into the top k (MaxScore), the remaining
+postings are only probed for documents already in play, and the answer comes off a
+bounded heap. Documents are added, replaced or removed one at a time, and sync() applies
+just the difference to a new set of documents — a hot reload that changes one tool
+re-tokenizes one tool.
 """
 
 import re
 import math
+import heapq
+import hashlib
 import logging
 import threading
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -36,82 +47,191 @@ def tokenize(text: str) -> List[str]:
     return [t for t in _TOKEN_RE.findall(text.lower()) if len(t) > 1 and t not in _STOPWORDS]
 
 
+def _digest(text: str) -> str:
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
 class BM25Index:
     """
-    Okapi BM25 over tool documents. Rebuilt wholesale on each refresh (tokenization over a
-    few hundred short docs is sub-millisecond), so it stays accurate as tools change.
+    Okapi BM25 over tool documents, kept as an inverted index.
+
+    Mutations (add / remove / sync) update the postings in place and mark the
+    corpus-wide statistics stale; the next search recomputes the length norms once
+    and IDF / term bounds on first use, so a burst of changes costs one refresh.
     """
 
     def __init__(self, k1: float = 1.5, b: float = 0.75):
         self.k1 = k1
         self.b = b
-        self._tf: Dict[str, Dict[str, int]] = {}   # name -> {term: frequency}
-        self._len: Dict[str, int] = {}             # name -> document length
-        self._meta: Dict[str, Dict] = {}           # name -> {description, category}
-        self._idf: Dict[str, float] = {}           # term -> inverse document frequency
+        self._postings: Dict[str, Dict[int, int]] = {}   # term -> {doc id: frequency}
+        self._docs: Dict[int, Dict[str, int]] = {}       # doc id -> {term: frequency}
+        self._ids: Dict[str, int] = {}                   # name -> doc id
+        self._names: Dict[int, str] = {}                 # doc id -> name
+        self._len: Dict[int, int] = {}                   # doc id -> document length
+        self._hash: Dict[str, str] = {}                  # name -> digest of the indexed text
+        self._meta: Dict[str, Dict] = {}                 # name -> {description, category}
+        self._next_id = 0
+        self._total_len = 0
+        # Derived, recomputed lazily after a change
         self._avgdl: float = 0.0
+        self._norm: Dict[int, float] = {}                # doc id -> k1 * (1 - b + b * dl / avgdl)
+        self._idf: Dict[str, float] = {}                 # term -> inverse document frequency
+        self._bound: Dict[str, float] = {}               # term -> max single-term score
+        self._stale = False
         self._lock = threading.RLock()
-        self._built = False
 
     @property
     def built(self) -> bool:
-        return self._built
+        return bool(self._ids)
 
-    def build(self, items: Dict[str, Tuple[str, Dict]]) -> int:
-        """Build the index. `items` maps tool name -> (rich_text, meta_dict)."""
-        tf: Dict[str, Dict[str, int]] = {}
-        length: Dict[str, int] = {}
-        meta: Dict[str, Dict] = {}
-        df: Dict[str, int] = {}
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._ids
 
-        for name, (text, md) in items.items():
+    # ── Mutation ────────────────────────────────────────────────────────────
+
+    def add(self, name: str, text: str, meta: Optional[Dict] = None) -> bool:
+        """Index (or re-index) one document. Returns False when its text is unchanged."""
+        digest = _digest(text)
+        with self._lock:
+            self._meta[name] = meta or {}
+            if self._hash.get(name) == digest:
+                return False
+            self._drop(name)
             counts: Dict[str, int] = {}
             for tok in tokenize(text):
                 counts[tok] = counts.get(tok, 0) + 1
-            tf[name] = counts
-            length[name] = sum(counts.values())
-            meta[name] = md or {}
-            for term in counts:
-                df[term] = df.get(term, 0) + 1
-
-        n = len(tf)
-        avgdl = (sum(length.values()) / n) if n else 0.0
-        # BM25 idf with +0.5 smoothing; the outer (1 + ...) keeps idf non-negative.
-        idf = {term: math.log(1 + (n - d + 0.5) / (d + 0.5)) for term, d in df.items()}
-
+            doc = self._next_id
+            self._next_id += 1
+            self._ids[name], self._names[doc], self._hash[name] = doc, name, digest
+            self._docs[doc] = counts
+            self._len[doc] = sum(counts.values())
+            self._total_len += self._len[doc]
+            for term, f in counts.items():
+                self._postings.setdefault(term, {})[doc] = f
+            self._stale = True
+            return True
+
+    def remove(self, name: str) -> bool:
+        """Drop one document. Returns False when it was not indexed."""
         with self._lock:
-            self._tf, self._len, self._meta = tf, length, meta
-            self._idf, self._avgdl = idf, avgdl
-            self._built = n > 0
-        return n
+            if not self._drop(name):
+                return False
+            self._meta.pop(name, None)
+            return True
+
+    def _drop(self, name: str) -> bool:
+        doc = self._ids.pop(name, None)
+        if doc is None:
+            return False
+        del self._names[doc]
+        self._hash.pop(name, None)
+        self._total_len -= self._len.pop(doc)
+        for term in self._docs.pop(doc):
+            postings = self._postings[term]
+            del postings[doc]
+            if not postings:
+                del self._postings[term]
+        self._stale = True
+        return True
+
+    def sync(self, items: Dict[str, Tuple[str, Dict]]) -> Dict[str, int]:
+        """Make the index hold exactly `items` (tool name -> (rich_text, meta_dict)).
+
+        Only new or changed documents are tokenized; documents missing from `items`
+        are removed. Returns {'added', 'removed', 'unchanged', 'total'}.
+        """
+        with self._lock:
+            removed = [name for name in self._ids if name not in items]
+            for name in removed:
+                self.remove(name)
+            added = sum(1 for name, (text, md) in items.items() if self.add(name, text, md))
+            return {'added': added, 'removed': len(removed),
+                    'unchanged': len(items) - added, 'total': len(self._ids)}
+
+    def build(self, items: Dict[str, Tuple[str, Dict]]) -> int:
+        """Build the index. `items` maps tool name -> (rich_text, meta_dict)."""
+        return self.sync(items)['total']
+
+    # ── Corpus statistics ───────────────────────────────────────────────────
+
+    def _refresh(self):
+        """Recompute length norms after a change; IDF and bounds refill on demand."""
+        n = len(self._ids)
+        self._avgdl = (self._total_len / n) if n else 0.0
+        avgdl = self._avgdl or 1.0
+        k1, b = self.k1, self.b
+        self._norm = {doc: k1 * (1.0 - b + b * (dl or 1) / avgdl) for doc, dl in self._len.items()}
+        self._idf.clear()
+        self._bound.clear()
+        self._stale = False
+
+    def _term_idf(self, term: str) -> float:
+        idf = self._idf.get(term)
+        if idf is None:
+            n, d = len(self._ids), len(self._postings[term])
+            # BM25 idf with +0.5 smoothing; the outer (1 + ...) keeps idf non-negative.
+            idf = self._idf[term] = math.log(1 + (n - d + 0.5) / (d + 0.5))
+        return idf
+
+    def _term_bound(self, term: str) -> float:
+        """Highest score this term contributes to any single document."""
+        bound = self._bound.get(term)
+        if bound is None:
+            norm, k1 = self._norm, self.k1
+            best = max(f / (f + norm[doc]) for doc, f in self._postings[term].items())
+            bound = self._bound[term] = self._term_idf(term) * (k1 + 1.0) * best
+        return bound
+
+    # ── Query ───────────────────────────────────────────────────────────────
 
     def search(self, query: str, top_k: int = 5) -> List[Tuple[str, str, float, str]]:
         """Return up to top_k (name, description, confidence, category), best first."""
         with self._lock:
-            if not self._built:
+            if not self._ids or top_k <= 0:
                 return []
-            q_terms = tokenize(query)
-            if not q_terms:
+            weights: Dict[str, int] = {}
+            for term in tokenize(query):
+                if term in self._postings:
+                    weights[term] = weights.get(term, 0) + 1
+            if not weights:
                 return []
-
-            avgdl = self._avgdl or 1.0
-            scored: List[Tuple[str, float]] = []
-            for name, counts in self._tf.items():
-                dl = self._len.get(name, 0) or 1
-                score = 0.0
-                for term in q_terms:
-                    f = counts.get(term, 0)
-                    if not f:
-                        continue
-                    idf = self._idf.get(term, 0.0)
-                    denom = f + self.k1 * (1.0 - self.b + self.b * dl / avgdl)
-                    score += idf * (f * (self.k1 + 1.0)) / denom
-                if score > 0:
-                    scored.append((name, score))
-
-            scored.sort(key=lambda x: x[1], reverse=True)
+            if self._stale:
+                self._refresh()
+
+            # Highest-impact terms first; remaining[i] bounds what terms i.. can still add
+            terms = sorted(weights, key=lambda t: weights[t] * self._term_bound(t), reverse=True)
+            remaining = [0.0] * (len(terms) + 1)
+            for i in range(len(terms) - 1, -1, -1):
+                remaining[i] = remaining[i + 1] + weights[terms[i]] * self._term_bound(terms[i])
+
+            norm, k1p1 = self._norm, self.k1 + 1.0
+            scores: Dict[int, float] = {}
+            threshold = 0.0
+            for i, term in enumerate(terms):
+                postings = self._postings[term]
+                scale = weights[term] * self._term_idf(term) * k1p1
+                if len(scores) >= top_k and remaining[i] < threshold:
+                    # No unseen document can reach the top k: probe only live candidates,
+                    # dropping those that cannot catch up either.
+                    for doc in list(scores):
+                        f = postings.get(doc)
+                        if f:
+                            scores[doc] += scale * f / (f + norm[doc])
+                        elif scores[doc] + remaining[i + 1] < threshold:
+                            del scores[doc]
+                else:
+                    for doc, f in postings.items():
+                        scores[doc] = scores.get(doc, 0.0) + scale * f / (f + norm[doc])
+                if len(scores) >= top_k:
+                    threshold = heapq.nlargest(top_k, scores.values())[-1]
+
+            best = heapq.nlargest(top_k, scores.items(), key=lambda item: (item[1], -item[0]))
             results = []
-            for name, score in scored[:top_k]:
+            for doc, score in best:
+                name = self._names[doc]
                 md = self._meta.get(name, {})
                 # Saturating map to a 0–1 display score (not a probability).
                 confidence = score / (score + 5.0)
@@ -119,9 +239,13 @@ class BM25Index:
             return results
 
     def stats(self) -> Dict:
-        return {
-            'lexical_docs': len(self._tf),
-            'vocab': len(self._idf),
-            'avg_doc_len': round(self._avgdl, 1),
-            'built': self._built,
-        }
+        with self._lock:
+            if self._stale:
+                self._refresh()
+            return {
+                'lexical_docs': len(self._ids),
+                'vocab': len(self._postings),
+                'postings': sum(len(p) for p in self._postings.values()),
+                'avg_doc_len': round(self._avgdl, 1),
+                'built': self.built,
+            }
@@ -9,6 +9,7 @@ Abstract base for all LLM providers. Concrete implementations:
 - TogetherProvider (Together.ai — open-source models)
 - OllamaProvider (Local models via Ollama)
 - AzureOpenAIProvider (Azure-hosted OpenAI models)
+- StubProvider (deterministic offline stub for tests)
 
 Usage:
     from sajha.ai.providers import create_provider
@@ -16,11 +17,14 @@ Usage:
     response = provider.complete([{"role": "user", "content": "Hello"}], model="claude-sonnet-4-20250514")
 """
 
+import asyncio
 import logging
+import threading
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Dict, Iterator, List, Optional
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +38,7 @@ class ProviderType(str, Enum):
     TOGETHER = 'together'
     OLLAMA = 'ollama'
     AZURE_OPENAI = 'azure_openai'
+    STUB = 'stub'
 
 
 @dataclass
@@ -93,6 +98,7 @@ class LLMProvider(ABC):
     """
 
     provider_type: str = 'unknown'
+    max_embed_batch: int = 64      # texts per embed() call the provider accepts
 
     @abstractmethod
     def complete(
@@ -121,6 +127,79 @@ class LLMProvider(ABC):
         """Streaming completion. Yields content chunks."""
         ...
 
+    async def acomplete(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float = 0.7,
+        max_tokens: int = 1024,
+        system: str = '',
+        tools: Optional[List[Dict]] = None,
+        **kwargs,
+    ) -> LLMResponse:
+        """Async completion. Default runs complete() on a worker thread;
+        providers with an async SDK client override this."""
+        return await asyncio.get_running_loop().run_in_executor(
+            _bridge_pool(), lambda: self.complete(messages, model, temperature=temperature,
+                                                  max_tokens=max_tokens, system=system, tools=tools, **kwargs))
+
+    async def astream(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float = 0.7,
+        max_tokens: int = 1024,
+        system: str = '',
+        **kwargs,
+    ) -> AsyncIterator[str]:
+        """Async streaming completion. Yields content chunks.
+
+        Default drains the synchronous stream() on a worker thread. Closing
+        the async iterator (client gone, task cancelled) stops the worker at
+        the next chunk and closes the upstream stream; providers with an
+        async SDK client override this.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+
+        def post(item):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            except RuntimeError:       # event loop already closed
+                stop.set()
+
+        def pump():
+            chunks = None
+            try:
+                # Inside the try: a stream() that raises on call must still post 'end'
+                chunks = self.stream(messages, model, temperature=temperature, max_tokens=max_tokens,
+                                     system=system, **kwargs)
+                for chunk in chunks:
+                    if stop.is_set():
+                        break
+                    post(('chunk', chunk))
+            except BaseException as e:
+                post(('error', e))
+            finally:
+                close = getattr(chunks, 'close', None)
+                if close:
+                    close()
+                post(('end', None))
+
+        loop.run_in_executor(_bridge_pool(), pump)
+        try:
+            while True:
+                kind, value = await queue.get()
+                if kind == 'chunk':
+                    yield value
+                elif kind == 'error':
+                    raise value
+                else:
+                    break
+        finally:
+            stop.set()
+
     def embed(
         self,
         texts: List[str],
@@ -149,6 +228,21 @@ class LLMProvider(ABC):
         return ''
 
 
+# Worker threads for providers without an async client. Kept apart from the event
+# loop's default executor so long-running streams cannot starve other to_thread work.
+_bridge_executor: Optional[ThreadPoolExecutor] = None
+_bridge_lock = threading.Lock()
+
+
+def _bridge_pool() -> ThreadPoolExecutor:
+    global _bridge_executor
+    if _bridge_executor is None:
+        with _bridge_lock:
+            if _bridge_executor is None:
+                _bridge_executor = ThreadPoolExecutor(max_workers=64, thread_name_prefix='llm-bridge')
+    return _bridge_executor
+
+
 # ── Provider Registry (Factory Pattern) ──────────────────────
 #
 # Register provider classes by type. Adding a new provider
@@ -241,6 +335,7 @@ def _auto_register_builtins():
     from sajha.ai.providers.together_provider import TogetherProvider
     from sajha.ai.providers.ollama_provider import OllamaProvider
     from sajha.ai.providers.azure_openai_provider import AzureOpenAIProvider
+    from sajha.ai.providers.stub_provider import StubProvider
 
     register_provider_class(ProviderType.ANTHROPIC, AnthropicProvider)
     register_provider_class(ProviderType.OPENAI, OpenAIProvider)
@@ -248,6 +343,7 @@ def _auto_register_builtins():
     register_provider_class(ProviderType.TOGETHER, TogetherProvider)
     register_provider_class(ProviderType.OLLAMA, OllamaProvider)
     register_provider_class(ProviderType.AZURE_OPENAI, AzureOpenAIProvider)
+    register_provider_class(ProviderType.STUB, StubProvider)
 
 
 try:
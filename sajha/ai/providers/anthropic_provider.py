@@ -1,7 +1,7 @@
 """Anthropic (Claude) — uses the official 'anthropic' Python SDK."""
 import time
 import logging
-from typing import Dict, Iterator, List, Optional
+from typing import AsyncIterator, Dict, Iterator, List, Optional
 from sajha.ai.providers import LLMProvider, LLMResponse, ModelInfo
 
 logger = logging.getLogger(__name__)
@@ -18,10 +18,10 @@ class AnthropicProvider(LLMProvider):
         if base_url:
             client_kwargs['base_url'] = base_url
         self._client = anthropic.Anthropic(**client_kwargs)
+        self._aclient = anthropic.AsyncAnthropic(**client_kwargs)
 
-    def complete(self, messages, model, temperature=0.7, max_tokens=1024,
-                 system='', tools=None, **kwargs) -> LLMResponse:
-        start = time.time()
+    @staticmethod
+    def _call_kwargs(messages, model, temperature, max_tokens, system, tools=None) -> Dict:
         call_kwargs = {
             'model': model,
             'max_tokens': max_tokens,
@@ -32,9 +32,24 @@ class AnthropicProvider(LLMProvider):
             call_kwargs['system'] = system
         if tools:
             call_kwargs['tools'] = tools
+        return call_kwargs
+
+    def complete(self, messages, model, temperature=0.7, max_tokens=1024,
+                 system='', tools=None, **kwargs) -> LLMResponse:
+        start = time.time()
+        response = self._client.messages.create(
+            **self._call_kwargs(messages, model, temperature, max_tokens, system, tools))
+        return self._to_response(response, start)
 
-        response = self._client.messages.create(**call_kwargs)
+    async def acomplete(self, messages, model, temperature=0.7, max_tokens=1024,
+                        system='', tools=None, **kwargs) -> LLMResponse:
+        start = time.time()
+        response = await self._aclient.messages.create(
+            **self._call_kwargs(messages, model, temperature, max_tokens, system, tools))
+        return self._to_response(response, start)
 
+    @staticmethod
+    def _to_response(response, start) -> LLMResponse:
         content = ''.join(
             block.text for block in response.content
             if hasattr(block, 'text')
@@ -55,20 +70,19 @@ class AnthropicProvider(LLMProvider):
 
     def stream(self, messages, model, temperature=0.7, max_tokens=1024,
                system='', **kwargs) -> Iterator[str]:
-        call_kwargs = {
-            'model': model,
-            'max_tokens': max_tokens,
-            'temperature': temperature,
-            'messages': messages,
-            'stream': True,
-        }
-        if system:
-            call_kwargs['system'] = system
-
-        with self._client.messages.stream(**{k: v for k, v in call_kwargs.items() if k != 'stream'}) as stream:
+        with self._client.messages.stream(
+                **self._call_kwargs(messages, model, temperature, max_tokens, system)) as stream:
             for text in stream.text_stream:
                 yield text
 
+    async def astream(self, messages, model, temperature=0.7, max_tokens=1024,
+                      system='', **kwargs) -> AsyncIterator[str]:
+        # Leaving the context (normally or on cancellation) closes the HTTP stream
+        async with self._aclient.messages.stream(
+                **self._call_kwargs(messages, model, temperature, max_tokens, system)) as stream:
+            async for text in stream.text_stream:
+                yield text
+
     def list_models(self) -> List[ModelInfo]:
         # SDK doesn't have a list-models endpoint; return empty
         # Models are managed via the llm_models DB table
@@ -1,7 +1,7 @@
 """Azure OpenAI — uses the official 'openai' SDK with Azure configuration."""
 import time
 import logging
-from typing import Dict, Iterator, List
+from typing import AsyncIterator, Dict, Iterator, List
 from sajha.ai.providers import LLMProvider, LLMResponse, EmbeddingResponse, ModelInfo
 
 logger = logging.getLogger(__name__)
@@ -9,6 +9,7 @@ logger = logging.getLogger(__name__)
 
 class AzureOpenAIProvider(LLMProvider):
     provider_type = 'azure_openai'
+    max_embed_batch = 2048
 
     def __init__(self, api_key: str = '', base_url: str = '',
                  api_version: str = '2024-10-21', **kwargs):
@@ -18,6 +19,11 @@ class AzureOpenAIProvider(LLMProvider):
             azure_endpoint=base_url,
             api_version=api_version,
         )
+        self._aclient = openai.AsyncAzureOpenAI(
+            api_key=api_key,
+            azure_endpoint=base_url,
+            api_version=api_version,
+        )
 
     def complete(self, messages, model, temperature=0.7, max_tokens=1024,
                  system='', tools=None, **kwargs) -> LLMResponse:
@@ -54,6 +60,20 @@ class AzureOpenAIProvider(LLMProvider):
             if chunk.choices and chunk.choices[0].delta.content:
                 yield chunk.choices[0].delta.content
 
+    async def astream(self, messages, model, temperature=0.7, max_tokens=1024,
+                      system='', **kwargs) -> AsyncIterator[str]:
+        msgs = [{'role': 'system', 'content': system}] + list(messages) if system else list(messages)
+        stream = await self._aclient.chat.completions.create(
+            model=model, messages=msgs, temperature=temperature,
+            max_tokens=max_tokens, stream=True,
+        )
+        try:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            await stream.close()
+
     def embed(self, texts, model='text-embedding-3-small') -> EmbeddingResponse:
         response = self._client.embeddings.create(input=texts, model=model)
         embeddings = [d.embedding for d in response.data]
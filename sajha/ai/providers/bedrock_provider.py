@@ -24,6 +24,7 @@ MODELS = [
 
 class BedrockProvider(LLMProvider):
     provider_type = 'bedrock'
+    max_embed_batch = 96
 
     def __init__(self, region: str = 'us-east-1', profile: str = '', **kwargs):
         self.region = region
@@ -81,15 +82,27 @@ class BedrockProvider(LLMProvider):
 
     def embed(self, texts, model='amazon.titan-embed-text-v2:0') -> EmbeddingResponse:
         client = self._get_client()
-        embeddings = []
-        total_tokens = 0
-        for text in texts:
+        if model.startswith('cohere.embed'):
+            # Cohere on Bedrock embeds a whole batch (up to 96 texts) per call
             resp = client.invoke_model(modelId=model,
-                                        body=json.dumps({'inputText': text}),
+                                        body=json.dumps({'texts': list(texts), 'input_type': 'search_document'}),
                                         contentType='application/json')
             data = json.loads(resp['body'].read())
-            embeddings.append(data.get('embedding', []))
-            total_tokens += data.get('inputTextTokenCount', 0)
+            embeddings, total_tokens = data.get('embeddings', []), 0
+        else:
+            # Titan takes one text per call — issue them concurrently instead of one after another
+            from concurrent.futures import ThreadPoolExecutor
+
+            def one(text):
+                resp = client.invoke_model(modelId=model,
+                                            body=json.dumps({'inputText': text}),
+                                            contentType='application/json')
+                return json.loads(resp['body'].read())
+
+            with ThreadPoolExecutor(max_workers=min(8, max(1, len(texts)))) as pool:
+                results = list(pool.map(one, texts))
+            embeddings = [d.get('embedding', []) for d in results]
+            total_tokens = sum(d.get('inputTextTokenCount', 0) for d in results)
         dims = len(embeddings[0]) if embeddings else 0
         return EmbeddingResponse(embeddings=embeddings, model=model, provider='bedrock',
                                  total_tokens=total_tokens, dimensions=dims)
@@ -1,7 +1,7 @@
 """Ollama — uses the official 'ollama' Python SDK. Local models, air-gapped."""
 import time
 import logging
-from typing import Dict, Iterator, List
+from typing import AsyncIterator, Dict, Iterator, List
 from sajha.ai.providers import LLMProvider, LLMResponse, EmbeddingResponse, ModelInfo
 
 logger = logging.getLogger(__name__)
@@ -9,10 +9,12 @@ logger = logging.getLogger(__name__)
 
 class OllamaProvider(LLMProvider):
     provider_type = 'ollama'
+    max_embed_batch = 128
 
     def __init__(self, base_url: str = 'http://localhost:11434', **kwargs):
         import ollama
         self._client = ollama.Client(host=base_url)
+        self._aclient = ollama.AsyncClient(host=base_url)
         self._base_url = base_url
 
     def complete(self, messages, model, temperature=0.7, max_tokens=1024,
@@ -57,11 +59,35 @@ class OllamaProvider(LLMProvider):
             if content:
                 yield content
 
+    async def astream(self, messages, model, temperature=0.7, max_tokens=1024,
+                      system='', **kwargs) -> AsyncIterator[str]:
+        msgs = []
+        if system:
+            msgs.append({'role': 'system', 'content': system})
+        msgs.extend(messages)
+
+        stream = await self._aclient.chat(
+            model=model, messages=msgs, stream=True,
+            options={'temperature': temperature, 'num_predict': max_tokens},
+        )
+        try:
+            async for chunk in stream:
+                content = chunk.get('message', {}).get('content', '')
+                if content:
+                    yield content
+        finally:
+            await stream.aclose()
+
     def embed(self, texts, model='nomic-embed-text') -> EmbeddingResponse:
-        embeddings = []
-        for text in texts:
-            response = self._client.embeddings(model=model, prompt=text)
-            embeddings.append(response.get('embedding', []))
+        if hasattr(self._client, 'embed'):
+            # /api/embed takes the whole batch in one request (ollama >= 0.3)
+            response = self._client.embed(model=model, input=list(texts))
+            embeddings = [list(e) for e in response.get('embeddings', [])]
+        else:
+            embeddings = []
+            for text in texts:
+                response = self._client.embeddings(model=model, prompt=text)
+                embeddings.append(response.get('embedding', []))
         return EmbeddingResponse(
             embeddings=embeddings, model=model, provider='ollama',
             dimensions=len(embeddings[0]) if embeddings else 0,
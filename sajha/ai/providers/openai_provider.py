@@ -1,7 +1,7 @@
 """OpenAI (GPT + Embeddings) — uses the official 'openai' Python SDK."""
 import time
 import logging
-from typing import Dict, Iterator, List, Optional
+from typing import AsyncIterator, Dict, Iterator, List, Optional
 from sajha.ai.providers import LLMProvider, LLMResponse, EmbeddingResponse, ModelInfo
 
 logger = logging.getLogger(__name__)
@@ -9,6 +9,7 @@ logger = logging.getLogger(__name__)
 
 class OpenAIProvider(LLMProvider):
     provider_type = 'openai'
+    max_embed_batch = 2048
 
     def __init__(self, api_key: str = '', base_url: str = '', **kwargs):
         import openai
@@ -18,10 +19,10 @@ class OpenAIProvider(LLMProvider):
         if base_url:
             client_kwargs['base_url'] = base_url
         self._client = openai.OpenAI(**client_kwargs)
+        self._aclient = openai.AsyncOpenAI(**client_kwargs)
 
-    def complete(self, messages, model, temperature=0.7, max_tokens=1024,
-                 system='', tools=None, **kwargs) -> LLMResponse:
-        start = time.time()
+    @staticmethod
+    def _call_kwargs(messages, model, temperature, max_tokens, system, tools=None) -> Dict:
         msgs = []
         if system:
             msgs.append({'role': 'system', 'content': system})
@@ -35,9 +36,24 @@ class OpenAIProvider(LLMProvider):
         }
         if tools:
             call_kwargs['tools'] = tools
+        return call_kwargs
+
+    def complete(self, messages, model, temperature=0.7, max_tokens=1024,
+                 system='', tools=None, **kwargs) -> LLMResponse:
+        start = time.time()
+        response = self._client.chat.completions.create(
+            **self._call_kwargs(messages, model, temperature, max_tokens, system, tools))
+        return self._to_response(response, start)
 
-        response = self._client.chat.completions.create(**call_kwargs)
+    async def acomplete(self, messages, model, temperature=0.7, max_tokens=1024,
+                        system='', tools=None, **kwargs) -> LLMResponse:
+        start = time.time()
+        response = await self._aclient.chat.completions.create(
+            **self._call_kwargs(messages, model, temperature, max_tokens, system, tools))
+        return self._to_response(response, start)
 
+    @staticmethod
+    def _to_response(response, start) -> LLMResponse:
         choice = response.choices[0] if response.choices else None
         content = choice.message.content or '' if choice else ''
 
@@ -55,19 +71,23 @@ class OpenAIProvider(LLMProvider):
 
     def stream(self, messages, model, temperature=0.7, max_tokens=1024,
                system='', **kwargs) -> Iterator[str]:
-        msgs = []
-        if system:
-            msgs.append({'role': 'system', 'content': system})
-        msgs.extend(messages)
-
         stream = self._client.chat.completions.create(
-            model=model, messages=msgs, temperature=temperature,
-            max_tokens=max_tokens, stream=True,
-        )
+            **self._call_kwargs(messages, model, temperature, max_tokens, system), stream=True)
         for chunk in stream:
             if chunk.choices and chunk.choices[0].delta.content:
                 yield chunk.choices[0].delta.content
 
+    async def astream(self, messages, model, temperature=0.7, max_tokens=1024,
+                      system='', **kwargs) -> AsyncIterator[str]:
+        stream = await self._aclient.chat.completions.create(
+            **self._call_kwargs(messages, model, temperature, max_tokens, system), stream=True)
+        try:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            await stream.close()    # stops upstream generation when the consumer goes away
+
     def embed(self, texts, model='text-embedding-3-small') -> EmbeddingResponse:
         response = self._client.embeddings.create(input=texts, model=model)
         embeddings = [d.embedding for d in response.data]
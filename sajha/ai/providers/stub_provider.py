@@ -0,0 +1,105 @@
+"""Stub — deterministic, offline provider for tests and air-gapped development. No SDK, no network."""
+import re
+import math
+import time
+import asyncio
+import hashlib
+import logging
+from typing import AsyncIterator, Iterator, List
+from sajha.ai.providers import LLMProvider, LLMResponse, EmbeddingResponse, ModelInfo
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+class StubProvider(LLMProvider):
+    """
+    Completions echo the last user message; embeddings are feature-hashed bags of
+    words (same text → same vector, shared words → positive cosine). Counts calls so
+    tests can assert on batching and caching.
+    """
+    provider_type = 'stub'
+    max_embed_batch = 64
+
+    def __init__(self, dimension: int = 64, latency_ms: int = 0, **kwargs):
+        self.dimension = int(dimension)
+        self.latency_ms = int(latency_ms)
+        self.embed_calls = 0
+        self.embedded_texts = 0
+        self.complete_calls = 0
+        self.streamed_chunks = 0
+        self.closed_streams = 0
+
+    def _reply(self, messages, model) -> str:
+        last = next((m.get('content', '') for m in reversed(messages) if m.get('role') == 'user'), '')
+        return f"[stub:{model}] {last}"
+
+    def complete(self, messages, model, temperature=0.7, max_tokens=1024,
+                 system='', tools=None, **kwargs) -> LLMResponse:
+        start = time.time()
+        self.complete_calls += 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        content = self._reply(messages, model)
+        inp_tok = sum(len(str(m.get('content', '')).split()) for m in messages)
+        out_tok = len(content.split())
+        return LLMResponse(content=content, model=model, provider='stub',
+                           input_tokens=inp_tok, output_tokens=out_tok, total_tokens=inp_tok + out_tok,
+                           latency_ms=int((time.time() - start) * 1000))
+
+    def stream(self, messages, model, temperature=0.7, max_tokens=1024,
+               system='', **kwargs) -> Iterator[str]:
+        self.complete_calls += 1
+        for i, word in enumerate(self._reply(messages, model).split(' ')):
+            if self.latency_ms:
+                time.sleep(self.latency_ms / 1000)
+            yield word if i == 0 else ' ' + word
+
+    async def acomplete(self, messages, model, temperature=0.7, max_tokens=1024,
+                        system='', tools=None, **kwargs) -> LLMResponse:
+        start = time.time()
+        self.complete_calls += 1
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        content = self._reply(messages, model)
+        return LLMResponse(content=content, model=model, provider='stub', output_tokens=len(content.split()),
+                           total_tokens=len(content.split()), latency_ms=int((time.time() - start) * 1000))
+
+    async def astream(self, messages, model, temperature=0.7, max_tokens=1024,
+                      system='', **kwargs) -> AsyncIterator[str]:
+        self.complete_calls += 1
+        try:
+            for i, word in enumerate(self._reply(messages, model).split(' ')):
+                if self.latency_ms:
+                    await asyncio.sleep(self.latency_ms / 1000)
+                self.streamed_chunks += 1
+                yield word if i == 0 else ' ' + word
+        finally:
+            self.closed_streams += 1
+
+    def _vector(self, text: str) -> List[float]:
+        vec = [0.0] * self.dimension
+        for tok in _TOKEN_RE.findall(text.lower()) or [text]:
+            h = int.from_bytes(hashlib.blake2b(tok.encode('utf-8'), digest_size=8).digest(), 'big')
+            vec[h % self.dimension] += 1.0 if (h >> 63) else -1.0
+        norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+        return [v / norm for v in vec]
+
+    def embed(self, texts, model='stub-embed') -> EmbeddingResponse:
+        self.embed_calls += 1
+        self.embedded_texts += len(texts)
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        return EmbeddingResponse(embeddings=[self._vector(t) for t in texts], model=model, provider='stub',
+                                 total_tokens=sum(len(t.split()) for t in texts), dimensions=self.dimension)
+
+    def list_models(self) -> List[ModelInfo]:
+        return [ModelInfo(id='stub-chat', name='Stub Chat', provider='stub', tags=['local', 'test']),
+                ModelInfo(id='stub-embed', name='Stub Embeddings', provider='stub', tags=['embeddings'])]
+
+    def health_check(self) -> bool:
+        return True
+
+    def get_default_embedding_model(self) -> str:
+        return 'stub-embed'
@@ -9,6 +9,7 @@ logger = logging.getLogger(__name__)
 
 class TogetherProvider(LLMProvider):
     provider_type = 'together'
+    max_embed_batch = 256
 
     def __init__(self, api_key: str = '', base_url: str = '', **kwargs):
         import together
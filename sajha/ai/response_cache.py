@@ -0,0 +1,319 @@
+"""
+SAJHA MCP Server — LLM Response Cache
+Copyright All rights Reserved 2025-2030, Ashutosh Sinha
+
+Completion cache for LLMGateway, in up to three tiers:
+
+- Memory: an ordered-dict LRU keyed by sha256(messages, model, system, temperature),
+  bounded by entry count and by estimated bytes. Hits move to the end, eviction pops
+  from the front — O(1) per insert however full the cache is.
+- Disk (optional): a SQLite file of JSON-serialized responses, read through on a
+  memory miss and written through on insert, so a restart keeps the warm set. Rows
+  past the TTL or beyond disk_max_entries are pruned as inserts go by.
+- Semantic (opt-in): for deterministic requests only (temperature 0), the prompt is
+  embedded and compared with earlier prompts sent to the same model with the same
+  system prompt; a cosine similarity at or above the threshold returns the earlier
+  response. The tier only points into the memory LRU, so it never outlives it.
+
+Config (config/application.yml):
+  ai:
+    cache:
+      enabled: true
+      ttl_seconds: 3600
+      max_entries: 500
+      max_mb: 64                    # estimated memory budget for cached responses
+      disk_path: ''                 # e.g. data/response_cache.sqlite; empty keeps it in memory
+      disk_max_entries: 20000
+      semantic:
+        enabled: false
+        threshold: 0.95             # cosine similarity needed for a semantic hit
+"""
+
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import asdict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sajha.ai.providers import LLMResponse
+
+logger = logging.getLogger(__name__)
+
+_ENTRY_OVERHEAD = 256   # bytes charged per entry for the key, the dataclass and bookkeeping
+
+
+def _response_bytes(response: LLMResponse) -> int:
+    size = _ENTRY_OVERHEAD + len(response.content.encode('utf-8'))
+    if response.raw:
+        try:
+            size += len(json.dumps(response.raw, default=str))
+        except (TypeError, ValueError):
+            size += len(str(response.raw))
+    return size
+
+
+def _prompt_text(messages: List[Dict]) -> str:
+    return '\n'.join(str(m.get('content', '')) for m in messages)
+
+
+class _SemanticIndex:
+    """Unit-normalized prompt vectors per (model, system) scope, pointing at cache keys."""
+
+    def __init__(self, threshold: float):
+        import numpy as np
+        self._np = np
+        self.threshold = threshold
+        self._scopes: Dict[str, Dict] = {}     # scope -> {keys, vectors, pos, matrix}
+        self._scope_of: Dict[str, str] = {}    # cache key -> scope
+
+    def _normalize(self, vector):
+        v = self._np.asarray(vector, dtype=self._np.float32)
+        norm = float(self._np.linalg.norm(v))
+        return v / norm if norm else None
+
+    def add(self, scope: str, key: str, vector):
+        v = self._normalize(vector)
+        if v is None:
+            return
+        self.discard(key)
+        s = self._scopes.setdefault(scope, {'keys': [], 'vectors': [], 'pos': {}, 'matrix': None})
+        s['pos'][key] = len(s['keys'])
+        s['keys'].append(key)
+        s['vectors'].append(v)
+        s['matrix'] = None
+        self._scope_of[key] = scope
+
+    def discard(self, key: str):
+        scope = self._scope_of.pop(key, None)
+        if scope is None:
+            return
+        s = self._scopes[scope]
+        i = s['pos'].pop(key)
+        # Swap-remove: order within a scope carries no meaning
+        last = s['keys'][-1]
+        if last != key:
+            s['keys'][i], s['vectors'][i] = last, s['vectors'][-1]
+            s['pos'][last] = i
+        s['keys'].pop()
+        s['vectors'].pop()
+        s['matrix'] = None
+        if not s['keys']:
+            del self._scopes[scope]
+
+    def match(self, scope: str, vector) -> Optional[Tuple[str, float]]:
+        """(cache key, similarity) of the closest prompt in scope, if above the threshold."""
+        s = self._scopes.get(scope)
+        v = self._normalize(vector)
+        if s is None or v is None:
+            return None
+        if s['matrix'] is None or s['matrix'].shape[1] != v.shape[0]:
+            if any(x.shape != v.shape for x in s['vectors']):
+                return None
+            s['matrix'] = self._np.stack(s['vectors'])
+        sims = s['matrix'] @ v
+        best = int(sims.argmax())
+        similarity = float(sims[best])
+        return (s['keys'][best], similarity) if similarity >= self.threshold else None
+
+    def clear(self):
+        self._scopes.clear()
+        self._scope_of.clear()
+
+    def __len__(self) -> int:
+        return len(self._scope_of)
+
+
+class ResponseCache:
+    """LRU cache for LLM responses, with optional disk and semantic tiers."""
+
+    def __init__(self, max_size: int = 500, ttl: int = 3600, max_bytes: int = 64 * 1024 * 1024,
+                 disk_path: str = '', disk_max_entries: int = 20000,
+                 semantic_threshold: float = 0.0,
+                 embed: Optional[Callable[[List[str]], List[List[float]]]] = None):
+        self._cache: "OrderedDict[str, Tuple[LLMResponse, float, int]]" = OrderedDict()  # key → (response, ts, bytes)
+        self._max_size = max_size
+        self._max_bytes = max_bytes
+        self._ttl = ttl
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._tier_hits = {'memory': 0, 'disk': 0, 'semantic': 0}
+        self._evictions = 0
+
+        self.disk_path = disk_path
+        self._disk_max_entries = disk_max_entries
+        self._disk_puts = 0
+        self._db: Optional[sqlite3.Connection] = None
+        if disk_path:
+            try:
+                Path(disk_path).parent.mkdir(parents=True, exist_ok=True)
+                self._db = sqlite3.connect(disk_path, check_same_thread=False, isolation_level=None)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute("PRAGMA synchronous=NORMAL")
+                self._db.execute("CREATE TABLE IF NOT EXISTS responses "
+                                 "(key TEXT PRIMARY KEY, response TEXT, created REAL)")
+            except sqlite3.Error as e:
+                logger.warning(f"Response disk cache unavailable ({disk_path}): {e}")
+                self._db = None
+
+        self._embed = embed
+        self._semantic: Optional[_SemanticIndex] = None
+        if semantic_threshold > 0 and embed is not None:
+            try:
+                self._semantic = _SemanticIndex(semantic_threshold)
+            except ImportError:
+                logger.warning("Semantic response cache needs numpy; semantic tier disabled")
+
+    def _key(self, messages, model, system='', temperature=0.7):
+        raw = json.dumps({'m': messages, 'model': model, 's': system, 't': temperature}, sort_keys=True)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    @staticmethod
+    def _scope(model, system) -> str:
+        return hashlib.sha256(f"{model}\x00{system}".encode('utf-8')).hexdigest()
+
+    def _semantic_eligible(self, temperature) -> bool:
+        return self._semantic is not None and temperature == 0
+
+    def _vector(self, messages) -> Optional[List[float]]:
+        try:
+            return self._embed([_prompt_text(messages)])[0]
+        except Exception as e:
+            logger.debug(f"Semantic cache embedding failed: {e}")
+            return None
+
+    # ── Memory tier ─────────────────────────────────────────────────────────
+
+    def _drop(self, k: str):
+        _, _, size = self._cache.pop(k)
+        self._bytes -= size
+        if self._semantic is not None:
+            self._semantic.discard(k)
+
+    def _store(self, k: str, response: LLMResponse, ts: float) -> bool:
+        size = _response_bytes(response)
+        if size > self._max_bytes:
+            return False
+        if k in self._cache:
+            self._drop(k)
+        self._cache[k] = (response, ts, size)
+        self._bytes += size
+        while len(self._cache) > self._max_size or self._bytes > self._max_bytes:
+            self._drop(next(iter(self._cache)))
+            self._evictions += 1
+        return True
+
+    def _fresh(self, k: str) -> Optional[LLMResponse]:
+        entry = self._cache.get(k)
+        if entry is None:
+            return None
+        response, ts, _ = entry
+        if time.time() - ts >= self._ttl:
+            self._drop(k)
+            return None
+        self._cache.move_to_end(k)
+        return response
+
+    # ── Disk tier ───────────────────────────────────────────────────────────
+
+    def _disk_get(self, k: str) -> Optional[Tuple[LLMResponse, float]]:
+        try:
+            row = self._db.execute("SELECT response, created FROM responses WHERE key = ?", (k,)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Response disk cache read failed: {e}")
+            return None
+        if row is None or time.time() - row[1] >= self._ttl:
+            return None
+        try:
+            return LLMResponse(**json.loads(row[0])), row[1]
+        except (TypeError, ValueError):
+            return None
+
+    def _disk_put(self, k: str, response: LLMResponse, ts: float):
+        # The provider's raw payload stays in memory only
+        record = dict(asdict(response), raw=None)
+        try:
+            self._db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?)",
+                             (k, json.dumps(record), ts))
+            self._disk_puts += 1
+            if self._disk_puts % 100 == 0:
+                self._db.execute("DELETE FROM responses WHERE created < ?", (ts - self._ttl,))
+                self._db.execute("DELETE FROM responses WHERE key NOT IN "
+                                 "(SELECT key FROM responses ORDER BY created DESC LIMIT ?)",
+                                 (self._disk_max_entries,))
+        except sqlite3.Error as e:
+            logger.warning(f"Response disk cache write failed: {e}")
+
+    # ── Public API ──────────────────────────────────────────────────────────
+
+    def get(self, messages, model, system='', temperature=0.7, semantic=True) -> Optional[LLMResponse]:
+        k = self._key(messages, model, system, temperature)
+        with self._lock:
+            resp = self._fresh(k)
+            if resp is not None:
+                self._hits += 1
+                self._tier_hits['memory'] += 1
+                return resp
+            if self._db is not None:
+                found = self._disk_get(k)
+                if found is not None:
+                    self._store(k, *found)
+                    self._hits += 1
+                    self._tier_hits['disk'] += 1
+                    return found[0]
+
+        if semantic and self._semantic_eligible(temperature):
+            vector = self._vector(messages)
+            if vector is not None:
+                with self._lock:
+                    match = self._semantic.match(self._scope(model, system), vector)
+                    resp = self._fresh(match[0]) if match else None
+                    if resp is not None:
+                        self._hits += 1
+                        self._tier_hits['semantic'] += 1
+                        return resp
+
+        with self._lock:
+            self._misses += 1
+        return None
+
+    def put(self, messages, model, response: LLMResponse, system='', temperature=0.7, semantic=True):
+        k = self._key(messages, model, system, temperature)
+        # Embed before taking the lock: it may call out to a provider
+        vector = self._vector(messages) if semantic and self._semantic_eligible(temperature) else None
+        now = time.time()
+        with self._lock:
+            if not self._store(k, response, now):
+                return
+            if vector is not None:
+                self._semantic.add(self._scope(model, system), k, vector)
+            if self._db is not None:
+                self._disk_put(k, response, now)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._bytes = 0
+            if self._semantic is not None:
+                self._semantic.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            disk = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0] if self._db else 0
+            return {'size': len(self._cache), 'hits': self._hits, 'misses': self._misses,
+                    'hit_rate': f"{self._hits / max(self._hits + self._misses, 1) * 100:.1f}%",
+                    'memory_hits': self._tier_hits['memory'], 'disk_hits': self._tier_hits['disk'],
+                    'semantic_hits': self._tier_hits['semantic'], 'evictions': self._evictions,
+                    'bytes': self._bytes, 'max_bytes': self._max_bytes,
+                    'disk_entries': disk, 'disk_path': self.disk_path if self._db else '',
+                    'semantic': {'enabled': self._semantic is not None,
+                                 'threshold': self._semantic.threshold if self._semantic else None,
+                                 'indexed': len(self._semantic) if self._semantic else 0}}
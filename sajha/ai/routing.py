@@ -0,0 +1,477 @@
+"""
+SAJHA MCP Server — Provider Routing
+Copyright All rights Reserved 2025-2030, Ashutosh Sinha
+
+How LLMGateway spreads one completion over its providers:
+
+- Concurrency budgets: each provider has a cap on in-flight requests. A request
+  that finds its first choice full spills to the next target in the chain, and
+  only waits for a slot when it has nowhere else to go.
+- Adaptive timeouts: per provider/model, a rolling window of successful latencies
+  gives p95 and p99. An attempt is abandoned after multiplier × p99 (clamped to
+  [min_ms, max_ms]), or after default_ms until the window has min_samples entries.
+- Failover: targets are tried in order — the requested provider/model, then the
+  configured fallback chain. An error, a timeout or a rate limit moves on to the
+  next. A rate-limited provider cools down (Retry-After if given) and goes to the
+  back of the chain meanwhile.
+- Hedging (opt-in): if the running attempt has not answered after its p95, the next
+  target is started as well; the first success wins and the other is cancelled.
+  Async attempts are cancelled outright. A synchronous attempt cannot be
+  interrupted, so it is abandoned and keeps its concurrency slot until it returns.
+
+Config (config/application.yml):
+  ai:
+    routing:
+      fallback: openai/gpt-4o-mini, ollama/llama3.1   # provider[/model], tried in order
+      max_concurrency: 16                             # per provider
+      concurrency: {ollama: 4}                        # per-provider overrides
+      rate_limit_cooldown_seconds: 30
+      latency_window: 200
+      min_samples: 20
+      timeout:
+        adaptive: true
+        multiplier: 2.0
+        min_ms: 5000
+        max_ms: 300000
+        default_ms: 120000                            # 0 = no timeout before enough samples
+      hedge:
+        enabled: false
+        min_delay_ms: 250
+"""
+
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Target = Tuple[str, str]     # (provider type, model)
+
+
+class ProviderUnavailableError(RuntimeError):
+    """No target in the chain could be started or none of them answered."""
+
+
+def is_rate_limit(exc: BaseException) -> bool:
+    status = getattr(exc, 'status_code', None) or getattr(getattr(exc, 'response', None), 'status_code', None)
+    if status == 429:
+        return True
+    text = f"{type(exc).__name__} {exc}".lower()
+    return 'ratelimit' in text or 'rate limit' in text or 'too many requests' in text
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    headers = getattr(getattr(exc, 'response', None), 'headers', None) or {}
+    try:
+        value = headers.get('retry-after') or headers.get('Retry-After')
+        return float(value) if value else None
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+class LatencyWindow:
+    """Rolling window of successful call latencies (seconds)."""
+
+    def __init__(self, size: int = 200):
+        self._samples: Deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+class ConcurrencyLimit:
+    """
+    Counting semaphore shared by threads and event loops.
+
+    Waiters queue FIFO; release() hands the slot straight to the next waiter — a
+    threading.Event for blocking callers, a future on its own loop for async ones.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = max(1, int(limit))
+        self.active = 0
+        self._lock = threading.Lock()
+        self._waiters: Deque[Any] = deque()
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self.active < self.limit and not self._waiters:
+                self.active += 1
+                return True
+            return False
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        with self._lock:
+            if self.active < self.limit and not self._waiters:
+                self.active += 1
+                return True
+            event = threading.Event()
+            self._waiters.append(event)
+        if event.wait(timeout):
+            return True
+        with self._lock:
+            if event in self._waiters:
+                self._waiters.remove(event)
+                return False
+        return True     # granted between the timeout and the lock
+
+    async def aacquire(self, timeout: Optional[float] = None) -> bool:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self.active < self.limit and not self._waiters:
+                self.active += 1
+                return True
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter[1]), timeout)
+            return True
+        except asyncio.TimeoutError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    return False
+            return True
+        except asyncio.CancelledError:
+            with self._lock:
+                granted = waiter not in self._waiters
+                if not granted:
+                    self._waiters.remove(waiter)
+            if granted:
+                self.release()
+            raise
+
+    def release(self):
+        with self._lock:
+            if not self._waiters:
+                self.active -= 1
+                return
+            waiter = self._waiters.popleft()
+        # The slot passes to the waiter; active is unchanged
+        if isinstance(waiter, threading.Event):
+            waiter.set()
+        else:
+            loop, future = waiter
+            try:
+                loop.call_soon_threadsafe(lambda: future.done() or future.set_result(True))
+            except RuntimeError:      # that loop has closed: give the slot to the next waiter
+                self.release()
+
+
+@dataclass
+class _ProviderState:
+    limit: ConcurrencyLimit
+    cooldown_until: float = 0.0
+    counters: Dict[str, int] = field(default_factory=lambda: {
+        'attempts': 0, 'errors': 0, 'timeouts': 0, 'rate_limited': 0, 'saturated': 0,
+        'hedges': 0, 'hedge_wins': 0})
+
+
+@dataclass
+class _Attempt:
+    target: Target
+    started: float
+    deadline: Optional[float]
+    hedge_at: Optional[float]
+    hedge: bool = False
+
+
+class ProviderRouter:
+    """Concurrency budgets, adaptive timeouts, failover and hedging over provider targets."""
+
+    def __init__(self, max_concurrency: int = 16, provider_concurrency: Optional[Dict[str, int]] = None,
+                 rate_limit_cooldown_seconds: float = 30, latency_window: int = 200, min_samples: int = 20,
+                 timeout_adaptive: bool = True, timeout_multiplier: float = 2.0,
+                 timeout_min_ms: int = 5000, timeout_max_ms: int = 300000, timeout_default_ms: int = 120000,
+                 hedge_enabled: bool = False, hedge_min_delay_ms: int = 250):
+        self.max_concurrency = max_concurrency
+        self.provider_concurrency = dict(provider_concurrency or {})
+        self.cooldown_seconds = rate_limit_cooldown_seconds
+        self.latency_window = latency_window
+        self.min_samples = min_samples
+        self.timeout_adaptive = timeout_adaptive
+        self.timeout_multiplier = timeout_multiplier
+        self.timeout_min = timeout_min_ms / 1000
+        self.timeout_max = timeout_max_ms / 1000
+        self.timeout_default = timeout_default_ms / 1000
+        self.hedge_enabled = hedge_enabled
+        self.hedge_min_delay = hedge_min_delay_ms / 1000
+        self._providers: Dict[str, _ProviderState] = {}
+        self._latency: Dict[Target, LatencyWindow] = {}
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    # ── Per-target state ────────────────────────────────────────────────────
+
+    def _state(self, provider_type: str) -> _ProviderState:
+        with self._lock:
+            state = self._providers.get(provider_type)
+            if state is None:
+                limit = self.provider_concurrency.get(provider_type, self.max_concurrency)
+                state = self._providers[provider_type] = _ProviderState(ConcurrencyLimit(limit))
+            return state
+
+    def _window(self, target: Target) -> LatencyWindow:
+        with self._lock:
+            window = self._latency.get(target)
+            if window is None:
+                window = self._latency[target] = LatencyWindow(self.latency_window)
+            return window
+
+    def _percentile(self, target: Target, q: float) -> Optional[float]:
+        window = self._window(target)
+        return window.percentile(q) if len(window) >= self.min_samples else None
+
+    def timeout_for(self, target: Target) -> Optional[float]:
+        p99 = self._percentile(target, 99) if self.timeout_adaptive else None
+        if p99 is None:
+            return self.timeout_default or None
+        return min(self.timeout_max, max(self.timeout_min, p99 * self.timeout_multiplier))
+
+    def hedge_delay_for(self, target: Target) -> Optional[float]:
+        """Seconds before a hedge is sent; None until the target has enough history."""
+        if not self.hedge_enabled:
+            return None
+        p95 = self._percentile(target, 95)
+        return None if p95 is None else max(self.hedge_min_delay, p95)
+
+    def _order(self, targets: List[Target]) -> Deque[Target]:
+        """Targets in chain order, with cooling-down providers moved to the back."""
+        now = time.monotonic()
+        ready = [t for t in targets if self._state(t[0]).cooldown_until <= now]
+        return deque(ready + [t for t in targets if t not in ready])
+
+    def _record_success(self, target: Target, seconds: float):
+        self._window(target).record(seconds)
+
+    def _record_failure(self, target: Target, exc: BaseException):
+        state = self._state(target[0])
+        if isinstance(exc, (TimeoutError, asyncio.TimeoutError)):
+            state.counters['timeouts'] += 1
+            return
+        state.counters['errors'] += 1
+        if is_rate_limit(exc):
+            state.counters['rate_limited'] += 1
+            state.cooldown_until = time.monotonic() + (_retry_after(exc) or self.cooldown_seconds)
+        logger.warning(f"LLM call to {target[0]}/{target[1]} failed: {exc}")
+
+    def _attempt(self, target: Target, hedge: bool) -> _Attempt:
+        now = time.monotonic()
+        timeout = self.timeout_for(target)
+        delay = None if hedge else self.hedge_delay_for(target)
+        state = self._state(target[0])
+        state.counters['attempts'] += 1
+        if hedge:
+            state.counters['hedges'] += 1
+        return _Attempt(target, now, now + timeout if timeout else None,
+                        now + delay if delay is not None else None, hedge)
+
+    @staticmethod
+    def _next_wake(pending, can_hedge: bool) -> Optional[float]:
+        """Seconds until the next deadline, or hedge time while a hedge may still be sent."""
+        times = [a.deadline for a in pending.values() if a.deadline is not None]
+        if can_hedge:
+            times += [a.hedge_at for a in pending.values() if a.hedge_at is not None]
+        return min(times) - time.monotonic() if times else None
+
+    def _won(self, attempt: _Attempt):
+        if attempt.hedge:
+            self._state(attempt.target[0]).counters['hedge_wins'] += 1
+
+    # ── Synchronous ─────────────────────────────────────────────────────────
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=64, thread_name_prefix='sajha-llm-route')
+        return self._pool
+
+    def _start(self, queue: Deque[Target], pending: Dict, call: Callable[[Target], Any],
+               hedge: bool = False) -> bool:
+        """Start the next target that has a free slot; wait for one only as a last resort."""
+        while queue:
+            target = queue.popleft()
+            limit = self._state(target[0]).limit
+            if not limit.try_acquire():
+                if queue or pending or not limit.acquire(self.timeout_for(target)):
+                    self._state(target[0]).counters['saturated'] += 1
+                    continue
+            attempt = self._attempt(target, hedge)
+
+            def run(target=target, started=attempt.started):
+                result = call(target)
+                self._record_success(target, time.monotonic() - started)
+                return result
+
+            future = self._executor().submit(run)
+            # A done callback also fires for an attempt cancelled before it ran
+            future.add_done_callback(lambda _, limit=limit: limit.release())
+            pending[future] = attempt
+            return True
+        return False
+
+    def run(self, targets: List[Target], call: Callable[[Target], Any]) -> Tuple[Any, Target]:
+        """call(target) on the first target that answers; returns (result, target)."""
+        if not targets:
+            raise ProviderUnavailableError("No provider targets")
+        if len(targets) == 1 and not self.timeout_for(targets[0]):
+            return self._run_inline(targets[0], call), targets[0]
+
+        queue = self._order(targets)
+        pending: Dict[Future, _Attempt] = {}
+        last_error: Optional[BaseException] = None
+        hedged = False
+        self._start(queue, pending, call)
+        while pending:
+            wake = self._next_wake(pending, not hedged and bool(queue))
+            done, _ = wait(list(pending), timeout=max(0.0, wake) if wake is not None else None,
+                           return_when=FIRST_COMPLETED)
+            for future in done:
+                attempt = pending.pop(future)
+                if future.exception() is None:
+                    self._won(attempt)
+                    for other in pending:
+                        other.cancel()
+                    return future.result(), attempt.target
+                last_error = future.exception()
+                self._record_failure(attempt.target, last_error)
+
+            now = time.monotonic()
+            for future, attempt in list(pending.items()):
+                if attempt.deadline is not None and now >= attempt.deadline:
+                    del pending[future]
+                    future.cancel()
+                    last_error = TimeoutError(f"{attempt.target[0]}/{attempt.target[1]} timed out after "
+                                              f"{attempt.deadline - attempt.started:.1f}s")
+                    self._record_failure(attempt.target, last_error)
+            if not pending:
+                self._start(queue, pending, call)
+            elif (not hedged and len(pending) == 1 and queue
+                  and (a := next(iter(pending.values()))).hedge_at is not None and now >= a.hedge_at):
+                hedged = self._start(queue, pending, call, hedge=True)
+
+        raise last_error or ProviderUnavailableError(
+            f"All providers busy: {', '.join(f'{p}/{m}' for p, m in targets)}")
+
+    def _run_inline(self, target: Target, call: Callable[[Target], Any]) -> Any:
+        """One target, no deadline: call on the caller's thread, still within the provider's budget."""
+        limit = self._state(target[0]).limit
+        limit.acquire()
+        attempt = self._attempt(target, False)
+        try:
+            result = call(target)
+        except Exception as e:
+            self._record_failure(target, e)
+            raise
+        finally:
+            limit.release()
+        self._record_success(target, time.monotonic() - attempt.started)
+        return result
+
+    # ── Asynchronous ────────────────────────────────────────────────────────
+
+    async def _astart(self, queue: Deque[Target], pending: Dict, call: Callable[[Target], Awaitable],
+                      hedge: bool = False) -> bool:
+        while queue:
+            target = queue.popleft()
+            limit = self._state(target[0]).limit
+            if not limit.try_acquire():
+                if queue or pending or not await limit.aacquire(self.timeout_for(target)):
+                    self._state(target[0]).counters['saturated'] += 1
+                    continue
+            attempt = self._attempt(target, hedge)
+
+            async def run(target=target, started=attempt.started):
+                result = await call(target)
+                self._record_success(target, time.monotonic() - started)
+                return result
+
+            task = asyncio.ensure_future(run())
+            task.add_done_callback(lambda _, limit=limit: limit.release())
+            pending[task] = attempt
+            return True
+        return False
+
+    async def arun(self, targets: List[Target], call: Callable[[Target], Awaitable]) -> Tuple[Any, Target]:
+        """Async run(): losers and timed-out attempts are cancelled, not abandoned."""
+        if not targets:
+            raise ProviderUnavailableError("No provider targets")
+        queue = self._order(targets)
+        pending: Dict[asyncio.Future, _Attempt] = {}
+        last_error: Optional[BaseException] = None
+        hedged = False
+        try:
+            await self._astart(queue, pending, call)
+            while pending:
+                wake = self._next_wake(pending, not hedged and bool(queue))
+                done, _ = await asyncio.wait(list(pending), timeout=max(0.0, wake) if wake is not None else None,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    attempt = pending.pop(task)
+                    if task.exception() is None:
+                        self._won(attempt)
+                        return task.result(), attempt.target
+                    last_error = task.exception()
+                    self._record_failure(attempt.target, last_error)
+
+                now = time.monotonic()
+                for task, attempt in list(pending.items()):
+                    if attempt.deadline is not None and now >= attempt.deadline:
+                        del pending[task]
+                        task.cancel()
+                        last_error = asyncio.TimeoutError(f"{attempt.target[0]}/{attempt.target[1]} timed out "
+                                                          f"after {attempt.deadline - attempt.started:.1f}s")
+                        self._record_failure(attempt.target, last_error)
+                if not pending:
+                    await self._astart(queue, pending, call)
+                elif (not hedged and len(pending) == 1 and queue
+                      and (a := next(iter(pending.values()))).hedge_at is not None and now >= a.hedge_at):
+                    hedged = await self._astart(queue, pending, call, hedge=True)
+        finally:
+            for task in pending:
+                task.cancel()
+
+        raise last_error or ProviderUnavailableError(
+            f"All providers busy: {', '.join(f'{p}/{m}' for p, m in targets)}")
+
+    # ── Streaming slots ─────────────────────────────────────────────────────
+
+    def limit(self, provider_type: str) -> ConcurrencyLimit:
+        return self._state(provider_type).limit
+
+    def stats(self) -> Dict:
+        with self._lock:
+            providers = dict(self._providers)
+            latency = dict(self._latency)
+        now = time.monotonic()
+        out = {'providers': {}, 'hedge_enabled': self.hedge_enabled}
+        for p_type, state in providers.items():
+            out['providers'][p_type] = dict(state.counters, in_flight=state.limit.active,
+                                            max_concurrency=state.limit.limit,
+                                            cooling_down_s=round(max(0.0, state.cooldown_until - now), 1))
+        out['latency'] = {}
+        for (p_type, model), window in latency.items():
+            pct = {f'p{q}_ms': (round(v * 1000, 1) if (v := window.percentile(q)) is not None else None)
+                   for q in (50, 95, 99)}
+            timeout = self.timeout_for((p_type, model))
+            out['latency'][f'{p_type}/{model}'] = dict(pct, samples=len(window),
+                                                       timeout_ms=round(timeout * 1000) if timeout else None)
+        return out
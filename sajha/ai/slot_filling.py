@@ -0,0 +1,241 @@
+"""
+SAJHA MCP Server — Schema-driven Slot Filling
+Copyright All rights Reserved 2025-2030, Ashutosh Sinha
+
+A local, regex-only pre-pass for parameter extraction. Given a query and a tool's
+JSON Schema, it fills the parameters that can be read straight off the text:
+
+- tickers        symbol / ticker params: $AAPL, BRK.B, MSFT (upper-case, not a known code)
+- dates          *date*, start/end, as_of, since/until: ISO dates, today, yesterday,
+                 "last N days|weeks|months|years"; year params take a 4-digit year
+- ISO codes      currency params (ISO 4217, pairs such as EUR/USD split into base and
+                 quote) and country params (ISO 3166 alpha-2 / alpha-3, or a common
+                 country name, in the width the schema asks for)
+- enums          any string param with an enum, matched as a whole word
+- patterns       any string param with a selective `pattern`
+
+ToolResolver skips the LLM when every required parameter is filled here. Whatever
+the LLM returns still wins over a slot filled here.
+"""
+
+import re
+import logging
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_CURRENCIES = {
+    'USD', 'EUR', 'GBP', 'JPY', 'CHF', 'CAD', 'AUD', 'NZD', 'CNY', 'CNH', 'HKD', 'SGD', 'SEK',
+    'NOK', 'DKK', 'PLN', 'CZK', 'HUF', 'TRY', 'ZAR', 'MXN', 'BRL', 'ARS', 'CLP', 'COP', 'PEN',
+    'INR', 'IDR', 'KRW', 'TWD', 'THB', 'MYR', 'PHP', 'VND', 'ILS', 'SAR', 'AED', 'QAR', 'KWD',
+    'RUB', 'UAH', 'EGP', 'NGN', 'KES', 'PKR', 'BDT', 'ISK', 'RON', 'BGN', 'XAU', 'XAG',
+}
+
+# alpha-2 -> (alpha-3, common names)
+_COUNTRIES = {
+    'US': ('USA', ('united states', 'usa', 'america')), 'GB': ('GBR', ('united kingdom', 'uk', 'britain')),
+    'DE': ('DEU', ('germany',)), 'FR': ('FRA', ('france',)), 'IT': ('ITA', ('italy',)),
+    'ES': ('ESP', ('spain',)), 'NL': ('NLD', ('netherlands',)), 'BE': ('BEL', ('belgium',)),
+    'CH': ('CHE', ('switzerland',)), 'SE': ('SWE', ('sweden',)), 'NO': ('NOR', ('norway',)),
+    'DK': ('DNK', ('denmark',)), 'FI': ('FIN', ('finland',)), 'IE': ('IRL', ('ireland',)),
+    'AT': ('AUT', ('austria',)), 'PT': ('PRT', ('portugal',)), 'GR': ('GRC', ('greece',)),
+    'PL': ('POL', ('poland',)), 'JP': ('JPN', ('japan',)), 'CN': ('CHN', ('china',)),
+    'IN': ('IND', ('india',)), 'KR': ('KOR', ('south korea', 'korea')), 'CA': ('CAN', ('canada',)),
+    'MX': ('MEX', ('mexico',)), 'BR': ('BRA', ('brazil',)), 'AR': ('ARG', ('argentina',)),
+    'AU': ('AUS', ('australia',)), 'NZ': ('NZL', ('new zealand',)), 'ZA': ('ZAF', ('south africa',)),
+    'RU': ('RUS', ('russia',)), 'TR': ('TUR', ('turkey', 'turkiye')), 'SA': ('SAU', ('saudi arabia',)),
+    'AE': ('ARE', ('united arab emirates', 'uae')), 'SG': ('SGP', ('singapore',)),
+    'HK': ('HKG', ('hong kong',)), 'ID': ('IDN', ('indonesia',)), 'TH': ('THA', ('thailand',)),
+    'IL': ('ISR', ('israel',)), 'EG': ('EGY', ('egypt',)), 'NG': ('NGA', ('nigeria',)),
+}
+_ALPHA3 = {a3: a2 for a2, (a3, _) in _COUNTRIES.items()}
+
+# Upper-case words that are not tickers
+_NOT_TICKERS = {
+    'I', 'A', 'AND', 'OR', 'THE', 'FOR', 'OF', 'TO', 'IN', 'ON', 'VS', 'AT', 'BY', 'IS', 'ME', 'MY',
+    'GDP', 'CPI', 'PPI', 'PMI', 'ETF', 'ETFS', 'IPO', 'CEO', 'CFO', 'EPS', 'PE', 'PB', 'ROE', 'ROA',
+    'EBIT', 'EBITDA', 'FCF', 'SEC', 'FX', 'EU', 'UK', 'API', 'JSON', 'CSV', 'PDF', 'YTD', 'QTD', 'MTD',
+    'YOY', 'QOQ', 'MOM', 'AI', 'ESG', 'NAV', 'AUM', 'OTC', 'NYSE', 'LSE', 'FRED', 'IMF', 'ECB', 'BOE',
+    'BOJ', 'FED', 'FOMC', 'OECD', 'BIS', 'WB', 'CDS', 'OAS', 'DV01', 'VAR', 'IRR', 'NPV', 'TTM', 'Q1',
+    'Q2', 'Q3', 'Q4', 'H1', 'H2', 'FY', 'EOD', 'USA',
+} | _CURRENCIES
+
+_TICKER_RE = re.compile(r"(?<![\w$])(\$)?([A-Z]{1,5}(?:[.\-][A-Z]{1,3})?)(?![\w])")
+_ISO_DATE_RE = re.compile(r"\b((?:19|20)\d{2})-(\d{2})-(\d{2})\b")
+_YEAR_RE = re.compile(r"\b((?:19|20)\d{2})\b")
+_RELATIVE_RE = re.compile(r"\b(?:last|past|previous)\s+(\d+)\s+(day|week|month|year)s?\b", re.I)
+_PAIR_RE = re.compile(r"\b([A-Z]{3})\s*/?\s*([A-Z]{3})\b")
+_WORD_RE = re.compile(r"[\w.\-/]+")
+
+_START_HINTS = {'start', 'from', 'since', 'begin'}
+_END_HINTS = {'end', 'to', 'until', 'through'}
+_GENERIC_WORDS = ('the', 'price', 'data', 'Show', 'x')
+
+
+def _name_tokens(name: str) -> set:
+    """start_date / startDate -> {'start', 'date'}."""
+    return set(re.findall(r"[a-z]+", re.sub(r"([A-Z])", r"_\1", name).lower()))
+
+
+def _is_ticker_param(name: str, spec: Dict) -> bool:
+    n = name.lower()
+    return (n in ('symbol', 'symbols', 'ticker', 'tickers') or n.endswith(('_symbol', '_ticker', '_symbols'))
+            or 'ticker' in str(spec.get('description', '')).lower())
+
+
+def _is_currency_param(name: str) -> bool:
+    n = name.lower()
+    return 'currency' in n or n in ('ccy', 'base', 'quote')
+
+
+def _is_country_param(name: str) -> bool:
+    n = name.lower()
+    return 'country' in n or n in ('iso2', 'iso3', 'ref_area', 'countries')
+
+
+def _is_date_param(name: str, spec: Dict) -> bool:
+    n = name.lower()
+    return (spec.get('format') in ('date', 'date-time') or 'date' in n
+            or n in ('start', 'end', 'as_of', 'asof', 'since', 'until'))
+
+
+def _shift(today: date, n: int, unit: str) -> date:
+    if unit == 'day':
+        return today - timedelta(days=n)
+    if unit == 'week':
+        return today - timedelta(weeks=n)
+    months = n * (12 if unit == 'year' else 1)
+    y, m = divmod(today.year * 12 + today.month - 1 - months, 12)
+    m += 1
+    for day in (today.day, 30, 29, 28):
+        try:
+            return date(y, m, day)
+        except ValueError:
+            continue
+    return date(y, m, 28)
+
+
+def _dates(query: str, today: date) -> List[date]:
+    found = []
+    for m in _ISO_DATE_RE.finditer(query):
+        try:
+            found.append((m.start(), date(int(m.group(1)), int(m.group(2)), int(m.group(3)))))
+        except ValueError:
+            continue
+    lowered = query.lower()
+    for word, value in (('yesterday', today - timedelta(days=1)), ('today', today)):
+        for m in re.finditer(rf"\b{word}\b", lowered):
+            found.append((m.start(), value))
+    return [d for _, d in sorted(found, key=lambda x: x[0])]
+
+
+def _country_codes(query: str, width: int) -> List[str]:
+    codes = []
+    for m in re.finditer(r"\b[A-Z]{2,3}\b", query):
+        token = m.group(0)
+        if token in _COUNTRIES:
+            codes.append((m.start(), token))
+        elif token in _ALPHA3:
+            codes.append((m.start(), _ALPHA3[token]))
+    lowered = query.lower()
+    for a2, (_, names) in _COUNTRIES.items():
+        for name in names:
+            m = re.search(rf"\b{re.escape(name)}\b", lowered)
+            if m:
+                codes.append((m.start(), a2))
+                break
+    ordered = list(dict.fromkeys(code for _, code in sorted(codes)))
+    return [_COUNTRIES[c][0] for c in ordered] if width == 3 else ordered
+
+
+def _country_width(name: str, spec: Dict) -> int:
+    hint = f"{name} {spec.get('description', '')} {spec.get('pattern', '')}".lower()
+    if spec.get('maxLength') == 3 or spec.get('minLength') == 3 or 'alpha-3' in hint or 'iso3' in hint \
+            or '3-letter' in hint or '{3}' in hint:
+        return 3
+    return 2
+
+
+def _selective(pattern: str) -> Optional[re.Pattern]:
+    """Compiled pattern if it rejects ordinary words — '.*' and friends are useless here."""
+    try:
+        compiled = re.compile(pattern)
+    except re.error:
+        return None
+    return None if any(compiled.fullmatch(w) for w in _GENERIC_WORDS) else compiled
+
+
+def _coerce(spec: Dict, values: List[Any]) -> Any:
+    if not values:
+        return None
+    if spec.get('type') == 'array':
+        return values
+    value = values[0]
+    if spec.get('type') == 'integer':
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+    return value
+
+
+def fill_slots(query: str, schema: Dict, today: Optional[date] = None) -> Dict[str, Any]:
+    """Parameters of `schema` that can be read directly off `query`."""
+    props = (schema or {}).get('properties') or {}
+    if not props or not query:
+        return {}
+    today = today or date.today()
+    filled: Dict[str, Any] = {}
+
+    tickers = [m.group(2) for m in _TICKER_RE.finditer(query)
+               if m.group(1) or (len(m.group(2)) > 1 and m.group(2) not in _NOT_TICKERS
+                                 and m.group(2) not in _COUNTRIES)]
+    tickers = list(dict.fromkeys(tickers))
+    currencies = list(dict.fromkeys(t for t in re.findall(r"\b[A-Z]{3}\b", query) if t in _CURRENCIES))
+    pair = next((p for p in _PAIR_RE.findall(query) if p[0] in _CURRENCIES and p[1] in _CURRENCIES), None)
+    dates = _dates(query, today)
+    relative = _RELATIVE_RE.search(query)
+    years = _YEAR_RE.findall(_ISO_DATE_RE.sub(' ', query))
+
+    for name, spec in props.items():
+        if not isinstance(spec, dict):
+            continue
+        n = name.lower()
+        value = None
+        if spec.get('enum'):
+            options = [str(o) for o in spec['enum']]
+            hits = [o for o in options if re.search(rf"(?<![\w]){re.escape(o)}(?![\w])", query, re.I)]
+            if hits:
+                longest = max(hits, key=len)
+                value = _coerce(spec, [spec['enum'][options.index(longest)]])
+        elif _is_ticker_param(name, spec):
+            value = _coerce(spec, tickers)
+        elif _is_currency_param(name):
+            if pair and n in ('base', 'base_currency', 'from_currency'):
+                value = pair[0]
+            elif pair and n in ('quote', 'quote_currency', 'to_currency'):
+                value = pair[1]
+            else:
+                value = _coerce(spec, currencies)
+        elif _is_country_param(name):
+            value = _coerce(spec, _country_codes(query, _country_width(name, spec)))
+        elif n == 'year' or n.endswith('_year'):
+            value = _coerce(spec, years)
+        elif _is_date_param(name, spec):
+            tokens = _name_tokens(name)
+            if tokens & _END_HINTS:
+                picked = dates[1] if len(dates) > 1 else (today if relative else None)
+            elif tokens & _START_HINTS:
+                picked = dates[0] if dates else (_shift(today, int(relative.group(1)), relative.group(2).lower())
+                                                 if relative else None)
+            else:
+                picked = dates[0] if dates else None
+            value = picked.isoformat() if picked else None
+        elif spec.get('type', 'string') == 'string' and spec.get('pattern'):
+            compiled = _selective(spec['pattern'])
+            if compiled:
+                value = next((w for w in _WORD_RE.findall(query) if compiled.fullmatch(w)), None)
+        if value not in (None, [], ''):
+            filled[name] = value
+    return filled
@@ -15,13 +15,17 @@ Usage:
     matches = resolver.resolve("What's Apple's P/E ratio?", top_k=3)
 """
 
+import os
 import json
 import math
 import hashlib
 import logging
+import time
 import threading
+from collections import OrderedDict
+from datetime import date
 from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 
 logger = logging.getLogger(__name__)
 
@@ -45,8 +49,12 @@ class ToolMatch:
         }
 
 
-_INDEX_REL = 'data/tool_search_index.json'
-_INDEX_VERSION = 1
+_INDEX_REL = 'data/tool_search_index'            # + .npy (matrix) and .ids.json (id table)
+_LEGACY_INDEX_REL = 'data/tool_search_index.json'
+_INDEX_VERSION = 2
+_DTYPES = {'float32': 'float32', 'float16': 'float16', 'int8': 'int8'}
+_INITIAL_CAPACITY = 256
+_KMEANS_ITERATIONS = 8
 
 
 def _embedding_text(name, cfg, schema):
@@ -70,80 +78,310 @@ def _embedding_text(name, cfg, schema):
 
 class ToolEmbeddingIndex:
     """
-    In-memory vector index with incremental, hash-based sync and storage persistence.
+    Vector index over a binary, memory-mapped matrix with incremental, hash-based sync.
 
     Each tool's embedding text is hashed (including the embedder name). On sync, only
-    tools whose hash changed are re-embedded; removed tools are dropped; unchanged tools
-    keep their vectors. The index is persisted through the storage backend (local | s3 |
-    azure | gcs) with a header recording the embedder + dimension, so a restart reloads
-    vectors and a changed embedder forces a clean rebuild. Search is a single normalized
-    matrix-vector product (cosine).
+    tools whose hash changed are re-embedded and their rows overwritten in place; new
+    tools take a free row (or are appended), removed tools free theirs. Nothing else
+    is rewritten, and the matrix is never rebuilt.
+
+    On disk the index is two files in the storage backend (local | s3 | azure | gcs):
+
+      <index_rel>.npy       row matrix (float32 | float16 | int8), opened with mmap
+      <index_rel>.ids.json  header (embedder, dimension, dtype) + id table: row -> name,
+                            content hash, metadata, and per-row scales for int8
+
+    A restart maps the matrix instead of parsing it, so cold load is O(1) in the
+    number of vectors; a changed embedder forces a clean rebuild, a changed dtype a
+    requantization. int8 stores each L2-normalized row scaled by its largest component
+    (4x smaller than float32, cosine error ~1e-3).
+
+    Search is a matrix-vector product over the live rows, or — with ann='ivf' and at
+    least ann_min_rows vectors — over the nprobe nearest inverted lists of a spherical
+    k-means partition (trained lazily, retrained when the catalog doubles), so latency
+    stays flat as the catalog grows.
     """
 
-    def __init__(self, persist: bool = True, index_rel: str = _INDEX_REL):
-        self._vectors = {}        # name -> normalized vector (list[float])
+    def __init__(self, persist: bool = True, index_rel: str = _INDEX_REL, dtype: str = 'float32',
+                 ann: str = 'none', ann_min_rows: int = 5000, nprobe: int = 8):
+        if dtype not in _DTYPES:
+            raise ValueError(f"Unsupported index dtype '{dtype}' (expected one of {list(_DTYPES)})")
+        self._rows = {}           # name -> matrix row
+        self._names = []          # row -> name (None for a free row); len = rows in use
+        self._free = []           # freed rows, reused before appending
         self._hashes = {}         # name -> content hash
         self._meta = {}           # name -> {description, category, tags}
-        self._names = []          # ordered names aligned to _matrix rows
-        self._matrix = None       # np.ndarray (N, D), L2-normalized
+        self._matrix = None       # np.ndarray | np.memmap (capacity, D)
+        self._scales = None       # np.ndarray (capacity,) — int8 dequantization factors
+        self._live = None         # np.ndarray (capacity,) bool
         self._dimension = 0
+        self._dtype = dtype
         self._embedder_name = ''
         self._persist = persist
         self._index_rel = index_rel
+        self._mapped = False
+        self._ann = (ann or 'none').lower()
+        self._ann_min_rows = ann_min_rows
+        self._nprobe = nprobe
+        self._centroids = None    # np.ndarray (nlist, D) — IVF partition
+        self._assign = None       # np.ndarray (capacity,) int32 — row -> list, -1 unassigned
+        self._trained_rows = 0
+        self._lists = None        # (rows sorted by list, list boundaries), rebuilt after changes
         self._lock = threading.RLock()
         self._built = False
 
+    # ---- storage layout ----
+    @property
+    def _matrix_rel(self):
+        return f"{self._index_rel}.npy"
+
+    @property
+    def _ids_rel(self):
+        return f"{self._index_rel}.ids.json"
+
+    def _local_matrix_path(self):
+        """Local file backing the matrix mmap. On an object store this is its cache copy,
+        which is only fetched when the key exists; a new matrix is uploaded on persist."""
+        from sajha.core.storage import get_storage, LocalStorageBackend
+        storage = get_storage()
+        if isinstance(storage, LocalStorageBackend) or storage.exists(self._matrix_rel):
+            return storage.get_local_path(self._matrix_rel)
+        return storage.cache_dir / self._matrix_rel
+
+    def _allocate(self, capacity: int, dimension: int):
+        """Fresh (capacity, dimension) matrix — a new mmap file when persisting."""
+        import numpy as np
+        dtype = _DTYPES[self._dtype]
+        if self._persist:
+            path = self._local_matrix_path()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix('.tmp.npy')
+            matrix = np.lib.format.open_memmap(str(tmp), mode='w+', dtype=dtype, shape=(capacity, dimension))
+            if self._matrix is not None:
+                matrix[:len(self._names)] = self._matrix[:len(self._names)]
+            matrix.flush()
+            os.replace(tmp, path)
+            self._mapped = True
+        else:
+            matrix = np.zeros((capacity, dimension), dtype=dtype)
+            if self._matrix is not None:
+                matrix[:len(self._names)] = self._matrix[:len(self._names)]
+        scales, live, assign = (np.ones(capacity, dtype=np.float32), np.zeros(capacity, dtype=bool),
+                                np.full(capacity, -1, dtype=np.int32))
+        if self._matrix is not None:
+            used = len(self._names)
+            scales[:used], live[:used], assign[:used] = \
+                self._scales[:used], self._live[:used], self._assign[:used]
+        self._matrix, self._scales, self._live, self._assign = matrix, scales, live, assign
+        self._dimension = dimension
+
+    def _clear(self):
+        self._rows.clear(); self._names.clear(); self._free.clear()
+        self._hashes.clear(); self._meta.clear()
+        self._matrix = self._scales = self._live = self._assign = None
+        self._centroids, self._trained_rows, self._lists = None, 0, None
+        self._dimension = 0
+        self._built = False
+
     # ---- persistence ----
     def load(self, embedder_name: str) -> bool:
         if not self._persist:
             return False
         try:
+            import numpy as np
             from sajha.core.storage import get_storage
             storage = get_storage()
-            if not storage.exists(self._index_rel):
-                return False
-            data = storage.read_json(self._index_rel)
+            if not storage.exists(self._ids_rel) or not storage.exists(self._matrix_rel):
+                return self._load_legacy(embedder_name)
+            header = storage.read_json(self._ids_rel)
+            matrix = np.load(str(storage.get_local_path(self._matrix_rel)), mmap_mode='r+')
         except Exception as e:
             logger.warning(f"Tool index load failed: {e}")
             return False
-        if data.get('version') != _INDEX_VERSION or data.get('embedder') != embedder_name:
+        if header.get('version') != _INDEX_VERSION or header.get('embedder') != embedder_name \
+                or matrix.ndim != 2 or matrix.shape[1] != header.get('dimension'):
             logger.info("Tool index header mismatch (embedder/version) — will rebuild")
             return False
+        names = header.get('names', [])
+        requantized = False
+        with self._lock:
+            self._clear()
+            self._embedder_name = embedder_name
+            stored_dtype = header.get('dtype', 'float32')
+            if stored_dtype == self._dtype and matrix.shape[0] >= len(names):
+                self._matrix, self._dimension, self._mapped = matrix, matrix.shape[1], True
+                capacity = matrix.shape[0]
+                self._scales = np.ones(capacity, dtype=np.float32)
+                self._scales[:len(names)] = header.get('scales') or 1.0
+                self._live = np.zeros(capacity, dtype=bool)
+                self._assign = np.full(capacity, -1, dtype=np.int32)
+                self._names = list(names)
+                for row, name in enumerate(names):
+                    if name is None:
+                        self._free.append(row)
+                    else:
+                        self._rows[name] = row
+                        self._live[row] = True
+            else:
+                # Stored in another dtype: requantize into a fresh matrix
+                scales = np.asarray(header.get('scales') or [1.0] * len(names), dtype=np.float32)
+                vectors = np.asarray(matrix[:len(names)], dtype=np.float32) * scales[:, None]
+                for row, name in enumerate(names):
+                    if name is not None:
+                        self._put(name, vectors[row])
+                logger.info(f"Tool index requantized {stored_dtype} -> {self._dtype}")
+                requantized = True
+            self._hashes = dict(header.get('hashes', {}))
+            self._meta = dict(header.get('meta', {}))
+            self._built = len(self._rows) > 0
+        if requantized:
+            # The matrix file now holds the new dtype (and compacted rows): the header must follow
+            self._persist_index()
+        logger.info(f"Tool index mapped from storage: {len(self._rows)} vectors "
+                    f"({embedder_name}, {self._dtype})")
+        return True
+
+    def _load_legacy(self, embedder_name: str) -> bool:
+        """Migrate a JSON index written by earlier versions into the binary layout."""
+        from sajha.core.storage import get_storage
+        storage = get_storage()
+        if not storage.exists(_LEGACY_INDEX_REL):
+            return False
+        data = storage.read_json(_LEGACY_INDEX_REL)
+        if data.get('version') != 1 or data.get('embedder') != embedder_name:
+            return False
         tools = data.get('tools', {})
         with self._lock:
-            self._vectors = {n: t['vector'] for n, t in tools.items()}
-            self._hashes = {n: t['hash'] for n, t in tools.items()}
-            self._meta = {n: t.get('meta', {}) for n, t in tools.items()}
+            self._clear()
             self._embedder_name = embedder_name
-            self._dimension = data.get('dimension', 0)
-            self._rebuild_matrix()
-            self._built = len(self._vectors) > 0
-        logger.info(f"Tool index loaded from storage: {len(self._vectors)} vectors ({embedder_name})")
+            for name, t in tools.items():
+                self._put(name, self._normalize(t['vector']))
+                self._hashes[name] = t['hash']
+                self._meta[name] = t.get('meta', {})
+            self._built = len(self._rows) > 0
+        self._persist_index()
+        logger.info(f"Tool index migrated from {_LEGACY_INDEX_REL}: {len(self._rows)} vectors")
         return True
 
     def _persist_index(self):
-        if not self._persist:
+        if not self._persist or self._matrix is None:
             return
         try:
-            from sajha.core.storage import get_storage
-            payload = {
-                'version': _INDEX_VERSION,
-                'embedder': self._embedder_name,
-                'dimension': self._dimension,
-                'tools': {
-                    n: {'hash': self._hashes[n], 'vector': self._vectors[n], 'meta': self._meta.get(n, {})}
-                    for n in self._vectors
-                },
-            }
-            get_storage().write_json(self._index_rel, payload)
+            from sajha.core.storage import get_storage, LocalStorageBackend
+            storage = get_storage()
+            with self._lock:
+                used = len(self._names)
+                header = {
+                    'version': _INDEX_VERSION,
+                    'embedder': self._embedder_name,
+                    'dimension': self._dimension,
+                    'dtype': self._dtype,
+                    'names': list(self._names),
+                    'hashes': {n: self._hashes[n] for n in self._rows if n in self._hashes},
+                    'meta': {n: self._meta.get(n, {}) for n in self._rows},
+                }
+                if self._dtype == 'int8':
+                    header['scales'] = [float(s) for s in self._scales[:used]]
+                self._matrix.flush()
+                if not isinstance(storage, LocalStorageBackend):
+                    # Object stores have no in-place writes: upload the mapped file
+                    storage.write_bytes(self._matrix_rel, self._local_matrix_path().read_bytes())
+            storage.write_json(self._ids_rel, header, indent=None)
         except Exception as e:
             logger.warning(f"Tool index persist failed: {e}")
 
+    # ---- row storage ----
+    def _put(self, name: str, vector):
+        """Write one normalized vector into the tool's row (reusing or appending a row)."""
+        import numpy as np
+        if self._matrix is None:
+            self._allocate(_INITIAL_CAPACITY, len(vector))
+        elif len(vector) != self._dimension:
+            raise ValueError(f"Vector for '{name}' has {len(vector)} dimensions, index has {self._dimension}")
+        row = self._rows.get(name)
+        if row is None:
+            if self._free:
+                row = self._free.pop()
+                self._names[row] = name
+            else:
+                row = len(self._names)
+                if row >= self._matrix.shape[0]:
+                    self._allocate(self._matrix.shape[0] * 2, self._dimension)
+                self._names.append(name)
+            self._rows[name] = row
+        if self._dtype == 'int8':
+            peak = float(np.max(np.abs(vector))) or 1.0
+            self._matrix[row] = np.round(vector * (127.0 / peak)).astype(np.int8)
+            self._scales[row] = peak / 127.0
+        else:
+            self._matrix[row] = vector
+        self._live[row] = True
+        self._assign[row] = self._nearest_list(vector)
+        self._lists = None
+
+    def _drop(self, name: str):
+        row = self._rows.pop(name, None)
+        if row is None:
+            return
+        self._names[row] = None
+        self._free.append(row)
+        self._live[row] = False
+        self._assign[row] = -1
+        self._lists = None
+
+    def _vectors_at(self, rows):
+        """Dequantized float32 vectors for matrix rows."""
+        import numpy as np
+        vectors = np.asarray(self._matrix[rows], dtype=np.float32)
+        if self._dtype == 'int8':
+            vectors *= self._scales[rows, None]
+        return vectors
+
+    # ---- approximate search (IVF) ----
+    def _nearest_list(self, vector) -> int:
+        if self._centroids is None:
+            return -1
+        return int((self._centroids @ vector).argmax())
+
+    def _train(self):
+        """Spherical k-means over the live rows; every row is assigned to its nearest centroid."""
+        import numpy as np
+        rows = np.flatnonzero(self._live[:len(self._names)])
+        vectors = self._vectors_at(rows)
+        nlist = int(min(len(rows), 1024, max(8, math.sqrt(len(rows)))))
+        rng = np.random.default_rng(0)
+        centroids = vectors[rng.choice(len(rows), size=nlist, replace=False)]
+        for _ in range(_KMEANS_ITERATIONS):
+            assign = (vectors @ centroids.T).argmax(axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, vectors)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            centroids = np.where(norms > 0, sums / np.maximum(norms, 1e-12), centroids)
+        self._centroids = centroids.astype(np.float32)
+        self._assign[rows] = (vectors @ self._centroids.T).argmax(axis=1)
+        self._trained_rows = len(rows)
+        self._lists = None
+        logger.info(f"Tool index IVF trained: {len(rows)} vectors in {nlist} lists")
+
+    def _candidates(self):
+        """Rows to score: all rows in use, or the nprobe nearest IVF lists' members."""
+        import numpy as np
+        live = len(self._rows)
+        if self._ann != 'ivf' or live < self._ann_min_rows:
+            return None
+        if self._centroids is None or live > 2 * self._trained_rows:
+            self._train()
+        if self._lists is None:
+            rows = np.flatnonzero(self._live[:len(self._names)])
+            lists = self._assign[rows]
+            order = np.argsort(lists, kind='stable')
+            bounds = np.searchsorted(lists[order], np.arange(len(self._centroids) + 1))
+            self._lists = (rows[order], bounds)
+        return self._lists
+
     # ---- core incremental sync ----
     def sync(self, tools_registry, embedder):
         """Re-embed only changed/new tools; drop removed ones. Returns a small summary dict."""
-        import numpy as np
-
         desired = {}
         for name, tool in tools_registry.tools.items():
             cfg = getattr(tool, 'config', {}) or {}
@@ -163,10 +401,10 @@ class ToolEmbeddingIndex:
         with self._lock:
             if self._embedder_name and self._embedder_name != embedder.name:
                 logger.info(f"Embedder changed {self._embedder_name} -> {embedder.name}; rebuilding index")
-                self._vectors.clear(); self._hashes.clear(); self._meta.clear()
+                self._clear()
             self._embedder_name = embedder.name
             to_embed = [n for n, (t, h, m) in desired.items() if self._hashes.get(n) != h]
-            removed = [n for n in list(self._vectors.keys()) if n not in desired]
+            removed = [n for n in list(self._rows) if n not in desired]
 
         # Embed outside the lock (can be slow / network)
         new_vectors = {}
@@ -176,29 +414,24 @@ class ToolEmbeddingIndex:
                 vecs = embedder.embed(texts)
                 for n, v in zip(to_embed, vecs):
                     new_vectors[n] = self._normalize(v)
-                if embedder.dimension:
-                    self._dimension = embedder.dimension
-                elif vecs:
-                    self._dimension = len(vecs[0])
             except Exception as e:
                 logger.warning(f"Embedding failed for {len(to_embed)} tools; keeping prior vectors: {e}",
                                exc_info=True)
 
         with self._lock:
+            for n in removed:
+                self._drop(n); self._hashes.pop(n, None); self._meta.pop(n, None)
             for n, v in new_vectors.items():
-                self._vectors[n] = v
+                self._put(n, v)
                 self._hashes[n] = desired[n][1]
-                self._meta[n] = desired[n][2]
             for n, (t, h, m) in desired.items():   # keep metadata fresh for unchanged tools
-                if n in self._vectors:
+                if n in self._rows:
                     self._meta[n] = m
-            for n in removed:
-                self._vectors.pop(n, None); self._hashes.pop(n, None); self._meta.pop(n, None)
-            self._rebuild_matrix()
-            self._built = len(self._vectors) > 0
+            self._built = len(self._rows) > 0
 
-        self._persist_index()
-        result = {'embedded': len(new_vectors), 'removed': len(removed), 'total': len(self._vectors)}
+        if new_vectors or removed:
+            self._persist_index()
+        result = {'embedded': len(new_vectors), 'removed': len(removed), 'total': len(self._rows)}
         logger.info(f"Tool index sync: +{result['embedded']} embedded, -{result['removed']} removed, "
                     f"{result['total']} total ({self._embedder_name})")
         return result
@@ -208,27 +441,37 @@ class ToolEmbeddingIndex:
         import numpy as np
         a = np.asarray(v, dtype=np.float32)
         n = float(np.linalg.norm(a))
-        return (a / n).tolist() if n else a.tolist()
-
-    def _rebuild_matrix(self):
-        import numpy as np
-        self._names = list(self._vectors.keys())
-        self._matrix = (np.asarray([self._vectors[n] for n in self._names], dtype=np.float32)
-                        if self._names else None)
+        return a / n if n else a
 
     def search(self, query_vec, top_k: int = 5):
         import numpy as np
         with self._lock:
-            if self._matrix is None or not self._names:
+            if self._matrix is None or not self._rows:
+                return []
+            q = self._normalize(query_vec)
+            if len(q) != self._dimension:
+                return []
+            candidates = self._candidates()
+            if candidates is None:
+                used = len(self._names)
+                rows = np.arange(used)
+                scores = np.asarray(self._matrix[:used] @ q, dtype=np.float32)
+                if self._dtype == 'int8':
+                    scores *= self._scales[:used]
+                scores[~self._live[:used]] = -np.inf
+            else:
+                ordered, bounds = candidates
+                probe = np.argsort(-(self._centroids @ q))[:self._nprobe]
+                rows = np.concatenate([ordered[bounds[c]:bounds[c + 1]] for c in probe])
+                scores = self._vectors_at(rows) @ q
+            k = min(top_k, len(self._rows), len(rows))
+            if k <= 0:
                 return []
-            q = np.asarray(self._normalize(query_vec), dtype=np.float32)
-            scores = self._matrix @ q
-            k = min(top_k, len(self._names))
             idx = np.argpartition(-scores, k - 1)[:k]
             idx = idx[np.argsort(-scores[idx])]
             out = []
             for i in idx:
-                name = self._names[int(i)]
+                name = self._names[int(rows[int(i)])]
                 md = self._meta.get(name, {})
                 out.append(ToolMatch(
                     tool_name=name, description=md.get('description', ''),
@@ -237,28 +480,53 @@ class ToolEmbeddingIndex:
 
     def stats(self):
         return {
-            'indexed_tools': len(self._vectors),
+            'indexed_tools': len(self._rows),
             'dimensions': self._dimension,
             'embedder': self._embedder_name,
             'persisted': self._persist,
             'built': self._built,
+            'dtype': self._dtype,
+            'capacity': int(self._matrix.shape[0]) if self._matrix is not None else 0,
+            'matrix_bytes': int(self._matrix.nbytes) if self._matrix is not None else 0,
+            'memory_mapped': self._mapped,
+            'ann': 'ivf' if self._centroids is not None and self._ann == 'ivf' else 'exact',
         }
 
 
 class ToolResolver:
     """
     High-level resolver: natural language → tool matches.
-    Combines embedding search with optional LLM-based parameter extraction.
+    Combines embedding search with optional parameter extraction: a local
+    slot-filling pass first, the LLM only for what it leaves open.
+
+    Results are cached per normalized query (and top_k / extract_params / day)
+    until the tool index changes — a repeated intent costs one dict lookup.
     """
 
-    def __init__(self, embedder, tools_registry, gateway=None, persist: bool = True):
+    def __init__(self, embedder, tools_registry, gateway=None, persist: bool = True,
+                 index_options: Optional[Dict] = None, query_cache_size: int = 2048,
+                 query_cache_ttl: int = 3600, slot_filling: bool = True):
         from sajha.ai.lexical import BM25Index
         self.embedder = embedder          # None → lexical BM25 only (default)
         self.gateway = gateway            # optional — only for LLM parameter extraction
         self.tools_registry = tools_registry
-        self.index = ToolEmbeddingIndex(persist=persist) if embedder is not None else None
+        self.index = (ToolEmbeddingIndex(persist=persist, **(index_options or {}))
+                      if embedder is not None else None)
         self._bm25 = BM25Index()          # default + always-available lexical tier
         self._built = False               # True only when a vector index is active + built
+        self.slot_filling = slot_filling
+        self._query_cache: "OrderedDict[tuple, tuple]" = OrderedDict()  # key → (monotonic ts, matches)
+        self._generation = 0              # bumped when the index changes; stale results are not stored
+        self._query_cache_size = query_cache_size
+        self._query_cache_ttl = query_cache_ttl
+        self._query_lock = threading.Lock()
+        self._counters = {'query_hits': 0, 'query_misses': 0, 'slot_filled': 0, 'llm_extractions': 0}
+
+    def _invalidate(self):
+        """Forget cached query results — the index they came from has changed."""
+        with self._query_lock:
+            self._generation += 1
+            self._query_cache.clear()
 
     def build_index(self) -> int:
         """Build the search index. BM25 always; vector index too if an embedder is set."""
@@ -269,6 +537,7 @@ class ToolResolver:
         self.index.load(self.embedder.name)
         result = self.index.sync(self.tools_registry, self.embedder)
         self._built = result['total'] > 0
+        self._invalidate()
         return result['total']
 
     def sync(self) -> dict:
@@ -276,12 +545,15 @@ class ToolResolver:
         self.refresh_lexical()
         if self.embedder is None or self.index is None:
             return {'embedded': 0, 'removed': 0, 'total': 0, 'mode': 'bm25'}
+        built = self._built
         result = self.index.sync(self.tools_registry, self.embedder)
         self._built = result['total'] > 0
+        if result['embedded'] or result['removed'] or built != self._built:
+            self._invalidate()
         return result
 
     def refresh_lexical(self) -> int:
-        """(Re)build the BM25 lexical index from the current tools (fast, dependency-free)."""
+        """Sync the BM25 lexical index with the current tools — only changed tools are re-indexed."""
         items = {}
         for name, tool in self.tools_registry.tools.items():
             cfg = getattr(tool, 'config', {}) or {}
@@ -294,7 +566,12 @@ class ToolResolver:
                   'category': (cfg.get('metadata') or {}).get('category', '')}
             items[name] = (text, md)
         try:
-            return self._bm25.build(items)
+            result = self._bm25.sync(items)
+            if result['added'] or result['removed']:
+                self._invalidate()
+                logger.debug(f"Lexical index sync: +{result['added']} indexed, -{result['removed']} removed, "
+                             f"{result['total']} total")
+            return result['total']
         except Exception as e:
             logger.warning(f"Lexical (BM25) index build failed: {e}", exc_info=True)
             return 0
@@ -311,21 +588,59 @@ class ToolResolver:
         Returns:
             List of ToolMatch objects sorted by confidence
         """
+        if self._query_cache_size <= 0:
+            return self._resolve(query, top_k, extract_params)[0]
+        # Extracted dates may be relative ("yesterday"), so those entries last one day. Slot
+        # filling reads tickers and currency / country codes by their case, so only
+        # ranking-only lookups fold it
+        text = ' '.join(query.split()).rstrip('?!. ')
+        key = (text if extract_params else text.casefold(), top_k, bool(extract_params),
+               date.today().isoformat() if extract_params else '')
+        now = time.monotonic()
+        with self._query_lock:
+            entry = self._query_cache.get(key)
+            if entry is not None and now - entry[0] < self._query_cache_ttl:
+                self._query_cache.move_to_end(key)
+                self._counters['query_hits'] += 1
+                return [replace(m, suggested_params=dict(m.suggested_params) if m.suggested_params else None)
+                        for m in entry[1]]
+            self._counters['query_misses'] += 1
+            generation = self._generation
+
+        matches, cacheable = self._resolve(query, top_k, extract_params)
+        if cacheable:
+            stored = [replace(m, suggested_params=dict(m.suggested_params) if m.suggested_params else None)
+                      for m in matches]
+            with self._query_lock:
+                if generation != self._generation:
+                    return matches
+                self._query_cache[key] = (now, stored)
+                self._query_cache.move_to_end(key)
+                while len(self._query_cache) > self._query_cache_size:
+                    self._query_cache.popitem(last=False)
+        return matches
+
+    def _resolve(self, query: str, top_k: int, extract_params: bool) -> Tuple[List[ToolMatch], bool]:
+        """
+        (matches, cacheable). BM25 results are cached when BM25 is the active mode (no
+        vector index); the BM25 fallback taken because embedding the query failed is not.
+        """
         if not self._built:
-            # Lexical BM25 mode (default) or vector index not ready yet.
+            # Lexical BM25 mode (default) or vector index not ready yet: a normal, cacheable
+            # answer — refresh_lexical() / build_index() clear the cache when the index moves
             if self.embedder is not None:
                 logger.debug("Vector index not built yet; using BM25 lexical search")
-            return self._fallback_search(query, top_k)
+            return self._fallback_search(query, top_k), True
 
         # Embed the query
         try:
             vecs = self.embedder.embed([query])
             if not vecs:
-                return self._fallback_search(query, top_k)
+                return self._fallback_search(query, top_k), False
             query_vec = vecs[0]
         except Exception as e:
             logger.warning(f"Embedding failed, falling back to text search: {e}", exc_info=True)
-            return self._fallback_search(query, top_k)
+            return self._fallback_search(query, top_k), False
 
         # Vector search
         matches = self.index.search(query_vec, top_k=top_k)
@@ -339,7 +654,7 @@ class ToolResolver:
             except Exception as e:
                 logger.warning(f"Parameter extraction failed: {e}", exc_info=True)
 
-        return matches
+        return matches, True
 
     def _fallback_search(self, query: str, top_k: int) -> List[ToolMatch]:
         """Lexical BM25 fallback when embeddings are unavailable (no model, no API key).
@@ -354,9 +669,12 @@ class ToolResolver:
                 for (n, d, c, cat) in rows]
 
     def _extract_params(self, query: str, tool_name: str) -> Dict:
-        """Use LLM to extract tool parameters from natural language (needs a gateway)."""
-        if self.gateway is None:
-            return {}
+        """Extract tool parameters from natural language.
+
+        Local slot filling first (see sajha.ai.slot_filling); when it covers every
+        required parameter the LLM is not called. Otherwise the gateway fills the
+        rest, and its values take precedence.
+        """
         tool = self.tools_registry.get_tool(tool_name)
         if not tool:
             return {}
@@ -368,36 +686,57 @@ class ToolResolver:
             logger.error(f"Unexpected error: {e}", exc_info=True)
             return {}
 
+        slots = {}
+        if self.slot_filling:
+            from sajha.ai.slot_filling import fill_slots
+            slots = fill_slots(query, schema)
+            if slots and all(r in slots for r in (schema.get('required') or [])):
+                self._counters['slot_filled'] += 1
+                return slots
+        if self.gateway is None:
+            return slots
+
+        # Everything fixed per tool goes in the system prompt, so the prompt is just the query.
+        # Exact cache hits only: queries that differ by one entity embed almost identically.
         system = (
             "You are a parameter extraction assistant. Given a natural language query and a tool's "
             "JSON Schema, extract the parameter values. Return ONLY a JSON object with the extracted "
-            "parameters. If a parameter can't be determined, omit it."
+            "parameters. If a parameter can't be determined, omit it.\n\n"
+            f"Tool: {tool_name}\nSchema: {json.dumps(schema, indent=2)}"
         )
-        prompt = f"Query: {query}\n\nTool: {tool_name}\nSchema: {json.dumps(schema, indent=2)}\n\nExtracted parameters (JSON only):"
+        prompt = f"Query: {query}\n\nExtracted parameters (JSON only):"
 
         try:
-            resp = self.gateway.complete(prompt, system=system, max_tokens=200, temperature=0.0)
+            self._counters['llm_extractions'] += 1
+            resp = self.gateway.complete(prompt, system=system, max_tokens=200, temperature=0.0,
+                                         semantic=False)
             text = resp.content.strip()
             if text.startswith('{'):
-                return json.loads(text)
+                return {**slots, **json.loads(text)}
         except Exception as e:
             logger.error(f"Unexpected error: {e}", exc_info=True)
             pass
-        return {}
+        return slots
 
     def stats(self) -> Dict:
         mode = 'vector' if self._built else 'bm25'
         vec = self.index.stats() if self.index is not None else {'indexed_tools': 0, 'built': False}
-        return {**vec, 'mode': mode, 'fallback_mode': not self._built, 'lexical': self._bm25.stats()}
+        with self._query_lock:
+            query_cache = dict(self._counters, size=len(self._query_cache), max_entries=self._query_cache_size)
+        return {**vec, 'mode': mode, 'fallback_mode': not self._built, 'lexical': self._bm25.stats(),
+                'query_cache': query_cache}
 
 
 # ── Singleton ────────────────────────────────────────────────
 
 _resolver: Optional[ToolResolver] = None
 
-def init_resolver(embedder, tools_registry, gateway=None, persist: bool = True) -> ToolResolver:
+def init_resolver(embedder, tools_registry, gateway=None, persist: bool = True,
+                  index_options: Optional[Dict] = None, **options) -> ToolResolver:
+    """options: query_cache_size, query_cache_ttl, slot_filling (see ToolResolver)."""
     global _resolver
-    _resolver = ToolResolver(embedder, tools_registry, gateway=gateway, persist=persist)
+    _resolver = ToolResolver(embedder, tools_registry, gateway=gateway, persist=persist,
+                             index_options=index_options, **options)
     return _resolver
 
 def get_resolver() -> Optional[ToolResolver]:
@@ -499,7 +499,19 @@ class SajhaMCPServerWebApp:
                     gw_for_extract = None
                 embedder = get_embedder(_CFG, gateway=gw_for_extract)
                 persist = bool(_CFG.get('ai.tool_search.persist', True))
-                resolver = init_resolver(embedder, tools_registry, gateway=gw_for_extract, persist=persist)
+                index_options = {
+                    'dtype': str(_CFG.get('ai.tool_search.index.dtype', 'float32')),
+                    'ann': str(_CFG.get('ai.tool_search.index.ann', 'none')),
+                    'ann_min_rows': int(_CFG.get('ai.tool_search.index.ann_min_rows', 5000)),
+                    'nprobe': int(_CFG.get('ai.tool_search.index.nprobe', 8)),
+                }
+                resolver = init_resolver(
+                    embedder, tools_registry, gateway=gw_for_extract, persist=persist,
+                    index_options=index_options,
+                    query_cache_size=int(_CFG.get('ai.tool_search.query_cache.max_entries', 2048)),
+                    query_cache_ttl=int(_CFG.get('ai.tool_search.query_cache.ttl_seconds', 3600)),
+                    slot_filling=str(_CFG.get('ai.tool_search.slot_filling', 'true')).lower() in ('true', '1', 'yes'),
+                )
                 # Keep the index accurate as tools change — NEVER block the reload path:
                 # run the re-sync off a background thread. Tool loading is already complete.
                 import threading as _t
@@ -550,6 +562,12 @@ class SajhaMCPServerWebApp:
             tools_registry.stop_monitoring()
         if prompts_registry:
             prompts_registry.stop_auto_refresh()
+        try:
+            # Write out queued audit rows and hand off pending webhook events
+            from sajha.core.event_bus import get_event_bus
+            get_event_bus().stop(timeout=5)
+        except Exception as e:
+            logger.warning(f'Event bus shutdown: {e}')
         logger.info('Shutdown complete')
 
 
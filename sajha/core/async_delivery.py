@@ -0,0 +1,626 @@
+"""
+SAJHA MCP Server — Async Result Delivery
+Copyright All rights Reserved 2025-2030, Ashutosh Sinha
+
+Delivery stage for AsyncExecutor. Executor workers only run tools and hand the
+finished task to DeliveryRouter.submit(), which returns at once:
+
+  submit() ─► per-destination queue ─► delivery workers ─► webhook (pooled keep-alive HTTP)
+                    ▲                        │              kafka   (batched producer)
+                    │  due                   │ failure      file    (one file per task, or
+                    └──── timer wheel ◄──────┘                       appended JSONL with rotation)
+                                             │ out of attempts
+                                             ▼
+                                     on_result(task, False, error)
+
+Each destination (webhook host, Kafka, file directory) has at most
+max_in_flight_per_destination deliveries in progress, so a dead endpoint holds a
+couple of delivery threads at most and never an executor worker. Retries wait on
+a hashed timer wheel — O(1) to schedule, one thread for any number of timers.
+
+Kafka messages are produced without a per-message flush: the producer lingers
+for linger_ms, flushes early once batch_size messages are waiting, and reports
+each message through its delivery callback. Destinations ending in .jsonl/.ndjson
+(or delivery_config mode: append) are appended to a buffered file that is
+flushed every flush_ms or 64 KB and rotated at rotate_mb; completions are
+reported after the flush.
+
+Config (config/application.yml):
+  async:
+    delivery:
+      workers: 4
+      max_in_flight_per_destination: 2
+      retry: {max_attempts: 3, base_ms: 1000, max_ms: 60000}
+      webhook: {timeout: 10, pool_size: 8}
+      kafka: {bootstrap_servers: localhost:9092, linger_ms: 50, batch_size: 500}
+      file: {base_dir: data/async_results, max_size_mb: 50, rotate_mb: 256, flush_ms: 1000}
+"""
+
+import http.client
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+_APPEND_SUFFIXES = ('.jsonl', '.ndjson')
+
+
+# ═══════════════════════════════════════════════════════════════════
+# TIMER WHEEL
+# ═══════════════════════════════════════════════════════════════════
+
+class TimerWheel:
+    """
+    Hashed timer wheel. A timer lands in slot (cursor + ticks) % slots with the
+    number of full revolutions it must wait; each tick fires the due entries of one
+    slot. Resolution is tick_ms, which is plenty for retry backoff.
+    """
+
+    def __init__(self, tick_ms: int = 50, slots: int = 512):
+        self._tick = max(1, tick_ms) / 1000.0
+        self._slots: List[List[list]] = [[] for _ in range(max(2, slots))]
+        self._cursor = 0
+        self._count = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+    def schedule(self, delay: float, callback: Callable[[], None]):
+        ticks = max(1, int(-(-delay // self._tick)))           # ceil: never fire early
+        with self._lock:
+            if self._stopped:
+                return
+            n = len(self._slots)
+            self._slots[(self._cursor + ticks) % n].append([(ticks - 1) // n, callback])
+            self._count += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='async-delivery-wheel', daemon=True)
+                self._thread.start()
+
+    def pending(self) -> int:
+        with self._lock:
+            return self._count
+
+    def stop(self):
+        with self._lock:
+            self._stopped = True
+
+    def _advance(self) -> List[Callable[[], None]]:
+        with self._lock:
+            self._cursor = (self._cursor + 1) % len(self._slots)
+            slot = self._slots[self._cursor]
+            due = [entry[1] for entry in slot if entry[0] == 0]
+            if due:
+                slot[:] = [entry for entry in slot if entry[0] > 0]
+                self._count -= len(due)
+            for entry in slot:
+                entry[0] -= 1
+            return due
+
+    def _run(self):
+        next_tick = time.monotonic() + self._tick
+        while not self._stopped:
+            wait = next_tick - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            next_tick += self._tick
+            for callback in self._advance():
+                try:
+                    callback()
+                except Exception as e:
+                    logger.error(f"Timer callback failed: {e}", exc_info=True)
+
+
+# ═══════════════════════════════════════════════════════════════════
+# TRANSPORTS
+# ═══════════════════════════════════════════════════════════════════
+
+class HTTPConnectionPool:
+    """Keep-alive HTTP(S) connections, pooled per (scheme, host, port)."""
+
+    def __init__(self, max_idle_per_host: int = 8, timeout: float = 10):
+        self._max_idle = max(1, max_idle_per_host)
+        self._timeout = timeout
+        self._idle: Dict[Tuple[str, str, int], List[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+        self._stats = {'created': 0, 'reused': 0}
+
+    def post(self, url: str, body: bytes, headers: Dict[str, str]) -> int:
+        """POST and return the HTTP status. A stale pooled connection is retried once on a fresh one."""
+        parts = urlsplit(url)
+        scheme = parts.scheme or 'http'
+        key = (scheme, parts.hostname or '', parts.port or (443 if scheme == 'https' else 80))
+        path = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+        while True:
+            conn, reused = self._checkout(key)
+            try:
+                conn.request('POST', path, body=body, headers=headers)
+                resp = conn.getresponse()
+                resp.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                conn.close()
+                if reused:
+                    continue
+                raise
+            except Exception:
+                conn.close()
+                raise
+            if resp.will_close:
+                conn.close()
+            else:
+                self._checkin(key, conn)
+            return resp.status
+
+    def _checkout(self, key) -> Tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                self._stats['reused'] += 1
+                return idle.pop(), True
+            self._stats['created'] += 1
+        scheme, host, port = key
+        cls = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+        return cls(host, port, timeout=self._timeout), False
+
+    def _checkin(self, key, conn):
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self._max_idle:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def close(self):
+        with self._lock:
+            conns = [c for idle in self._idle.values() for c in idle]
+            self._idle.clear()
+        for conn in conns:
+            conn.close()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {**self._stats, 'idle': sum(len(v) for v in self._idle.values())}
+
+
+class KafkaBatcher:
+    """
+    One confluent_kafka producer for all async deliveries. produce() only enqueues;
+    a poller thread serves delivery callbacks, and flushes as soon as batch_size
+    messages are waiting rather than after every message.
+    """
+
+    def __init__(self, config: Dict, linger_ms: int = 50, batch_size: int = 500, flush_timeout: float = 10):
+        self._config = dict(config)
+        self._linger = max(1, linger_ms) / 1000.0
+        self._batch_size = max(1, batch_size)
+        self._flush_timeout = flush_timeout
+        self._producer = None
+        self._lock = threading.Lock()
+        self._full = threading.Event()
+        self._stopped = False
+        self._stats = {'produced': 0, 'flushes': 0}
+
+    def _ensure_producer(self):
+        with self._lock:
+            if self._producer is None:
+                from confluent_kafka import Producer
+                self._producer = Producer({'linger.ms': int(self._linger * 1000),
+                                           'batch.num.messages': self._batch_size, **self._config})
+                threading.Thread(target=self._poll_loop, name='async-delivery-kafka', daemon=True).start()
+            return self._producer
+
+    def send(self, topic: str, key: bytes, value: bytes, callback: Callable[[bool, Optional[str]], None]):
+        producer = self._ensure_producer()
+
+        def on_delivery(err, msg):
+            callback(err is None, str(err) if err else None)
+
+        try:
+            producer.produce(topic, key=key, value=value, on_delivery=on_delivery)
+        except BufferError:
+            producer.poll(self._linger)                          # local queue full: drain callbacks once
+            producer.produce(topic, key=key, value=value, on_delivery=on_delivery)
+        with self._lock:
+            self._stats['produced'] += 1
+        if len(producer) >= self._batch_size:
+            self._full.set()
+
+    def _poll_loop(self):
+        while not self._stopped:
+            if self._full.wait(self._linger):
+                self._full.clear()
+                self._producer.flush(self._flush_timeout)
+                with self._lock:
+                    self._stats['flushes'] += 1
+            else:
+                self._producer.poll(0)
+
+    def close(self):
+        self._stopped = True
+        if self._producer is not None:
+            self._producer.flush(self._flush_timeout)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {**self._stats, 'queued': len(self._producer) if self._producer is not None else 0}
+
+
+class AppendFileSink:
+    """Buffered JSONL appends with size-based rotation; completions reported after each flush."""
+
+    def __init__(self, rotate_bytes: int = 256 * 1024 * 1024, flush_bytes: int = 64 * 1024):
+        self._rotate_bytes = rotate_bytes
+        self._flush_bytes = flush_bytes
+        self._files: Dict[Path, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._stats = {'lines': 0, 'flushes': 0, 'rotations': 0}
+
+    def write(self, path: Path, line: str, callback: Callable[[bool, Optional[str]], None]):
+        data = (line + '\n').encode('utf-8')
+        done = []
+        with self._lock:
+            state = self._files.get(path) or self._open(path)
+            if state['size'] + state['buffered'] + len(data) > self._rotate_bytes and state['size'] + state['buffered']:
+                done += self._flush_locked(path, state)
+                state = self._rotate(path, state)
+            state['handle'].write(data)
+            state['buffered'] += len(data)
+            state['callbacks'].append(callback)
+            self._stats['lines'] += 1
+            if state['buffered'] >= self._flush_bytes:
+                done += self._flush_locked(path, state)
+        self._report(done)
+
+    def flush(self):
+        done = []
+        with self._lock:
+            for path, state in list(self._files.items()):
+                done += self._flush_locked(path, state)
+        self._report(done)
+
+    def close(self):
+        done = []
+        with self._lock:
+            for path, state in list(self._files.items()):
+                done += self._flush_locked(path, state)
+                state['handle'].close()
+            self._files.clear()
+        self._report(done)
+
+    @staticmethod
+    def _report(done: List[Tuple[Callable, Optional[str]]]):
+        # Outside the lock: callbacks update task state and may write elsewhere
+        for callback, error in done:
+            callback(error is None, error)
+
+    def _open(self, path: Path) -> Dict[str, Any]:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        handle = open(path, 'ab', buffering=self._flush_bytes * 2)
+        state = {'handle': handle, 'size': handle.tell(), 'buffered': 0, 'callbacks': []}
+        self._files[path] = state
+        return state
+
+    def _rotate(self, path: Path, state: Dict[str, Any]) -> Dict[str, Any]:
+        state['handle'].close()
+        stamp = time.strftime('%Y%m%dT%H%M%S')
+        target, n = path.with_name(f"{path.stem}.{stamp}{path.suffix}"), 1
+        while target.exists():
+            target, n = path.with_name(f"{path.stem}.{stamp}.{n}{path.suffix}"), n + 1
+        os.replace(path, target)
+        self._stats['rotations'] += 1
+        logger.info(f"Async file rotated: {path} → {target.name}")
+        return self._open(path)
+
+    def _flush_locked(self, path: Path, state: Dict[str, Any]) -> List[Tuple[Callable, Optional[str]]]:
+        if not state['callbacks']:
+            return []
+        callbacks, state['callbacks'] = state['callbacks'], []
+        error = None
+        try:
+            state['handle'].flush()
+            state['size'] += state['buffered']
+        except Exception as e:
+            error = f"File append failed: {e}"
+            logger.error(f"{error} ({path})", exc_info=True)
+        state['buffered'] = 0
+        self._stats['flushes'] += 1
+        return [(callback, error) for callback in callbacks]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {**self._stats, 'open_files': len(self._files)}
+
+
+# ═══════════════════════════════════════════════════════════════════
+# DELIVERY ROUTER
+# ═══════════════════════════════════════════════════════════════════
+
+class _Job:
+    """One task result on its way to its destination."""
+    __slots__ = ('task', 'key', 'attempts', 'last_error')
+
+    def __init__(self, task, key: str):
+        self.task = task
+        self.key = key
+        self.attempts = 0
+        self.last_error = ''
+
+
+class DeliveryRouter:
+    """Routes task results to the configured destination, off the executor's worker threads."""
+
+    def __init__(self, webhook_timeout: int = 10, max_attempts: int = 3,
+                 kafka_config: Dict = None, file_base_dir: str = 'data/async_results',
+                 file_max_size_mb: int = 50, workers: int = 4, max_in_flight_per_destination: int = 2,
+                 retry_base_ms: int = 1000, retry_max_ms: int = 60000, http_pool_size: int = 8,
+                 kafka_linger_ms: int = 50, kafka_batch_size: int = 500,
+                 file_rotate_mb: float = 256, file_flush_ms: int = 1000,
+                 on_result: Optional[Callable[[Any, bool, Optional[str]], None]] = None):
+        self._max_attempts = max(1, max_attempts)
+        self._retry_base = retry_base_ms / 1000.0
+        self._retry_max = retry_max_ms / 1000.0
+        self._file_base_dir = Path(file_base_dir)
+        self._file_max_size_mb = file_max_size_mb
+        self._file_flush = max(10, file_flush_ms) / 1000.0
+        self._per_destination = max(1, max_in_flight_per_destination)
+        self.on_result = on_result
+
+        self._http = HTTPConnectionPool(http_pool_size, webhook_timeout)
+        self._kafka = KafkaBatcher(kafka_config or {}, kafka_linger_ms, kafka_batch_size)
+        self._appender = AppendFileSink(int(file_rotate_mb * 1024 * 1024))
+        self._wheel = TimerWheel()
+
+        # Per-destination queues; _ready holds destinations that may start another delivery
+        self._queues: Dict[str, Deque[_Job]] = {}
+        self._active: Dict[str, int] = {}
+        self._ready: Deque[str] = deque()
+        self._in_ready: Set[str] = set()
+        self._outstanding = 0                  # submitted and not yet reported through on_result
+        self._lock = threading.RLock()
+        self._work = threading.Condition(self._lock)        # workers: a destination became ready
+        self._settled = threading.Condition(self._lock)     # flush(): an outstanding task was reported
+        self._workers_count = max(1, workers)
+        self._workers: List[threading.Thread] = []
+        self._flush_scheduled = False
+        self._stopped = False
+        self._stats = {'submitted': 0, 'delivered': 0, 'failed': 0, 'retries': 0}
+
+    # ── Public API ──────────────────────────────────────────────────────────
+
+    def submit(self, task):
+        """Queue a finished task for delivery; never blocks on the destination."""
+        job = _Job(task, self._destination_key(task))
+        with self._work:
+            self._stats['submitted'] += 1
+            self._outstanding += 1
+        self._enqueue(job)
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait until every submitted task has been reported (retries included). For tests and shutdown."""
+        deadline = time.monotonic() + timeout
+        while True:
+            self._appender.flush()
+            with self._work:
+                if not self._outstanding:
+                    return True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._settled.wait(min(remaining, self._file_flush))
+
+    def close(self, timeout: float = 10.0):
+        self.flush(timeout)
+        with self._work:
+            self._stopped = True
+            self._work.notify_all()
+        self._wheel.stop()
+        self._kafka.close()
+        self._appender.close()
+        self._http.close()
+
+    def stats(self) -> Dict:
+        with self._work:
+            stats = {
+                **self._stats,
+                'pending': sum(len(q) for q in self._queues.values()),
+                'in_flight': sum(self._active.values()),
+                'outstanding': self._outstanding,
+                'workers': len(self._workers),
+            }
+        stats['awaiting_retry'] = self._wheel.pending()
+        stats['http'] = self._http.stats()
+        stats['kafka'] = self._kafka.stats()
+        stats['file'] = self._appender.stats()
+        return stats
+
+    # ── Scheduling ──────────────────────────────────────────────────────────
+
+    def _destination_key(self, task) -> str:
+        if task.delivery_type == 'webhook':
+            parts = urlsplit(task.delivery_destination)
+            return f"webhook:{parts.scheme}://{parts.netloc}"
+        if task.delivery_type == 'file':
+            return f"file:{self._file_path(task).parent}"
+        return task.delivery_type
+
+    def _enqueue(self, job: _Job):
+        with self._work:
+            if self._stopped:
+                return
+            self._queues.setdefault(job.key, deque()).append(job)
+            self._mark_ready(job.key)
+            self._ensure_workers()
+
+    def _mark_ready(self, key: str):
+        # Called with self._work held
+        if key not in self._in_ready and self._queues.get(key) and self._active.get(key, 0) < self._per_destination:
+            self._in_ready.add(key)
+            self._ready.append(key)
+            self._work.notify()
+
+    def _ensure_workers(self):
+        # Called with self._work held
+        self._workers = [t for t in self._workers if t.is_alive()]
+        while len(self._workers) < self._workers_count:
+            t = threading.Thread(target=self._worker, name=f'async-delivery-{len(self._workers)}', daemon=True)
+            t.start()
+            self._workers.append(t)
+
+    def _worker(self):
+        while True:
+            with self._work:
+                while not self._ready and not self._stopped:
+                    self._work.wait()
+                if self._stopped:
+                    return
+                key = self._ready.popleft()
+                self._in_ready.discard(key)
+                job = self._queues[key].popleft()
+                self._active[key] = self._active.get(key, 0) + 1
+                self._mark_ready(key)
+            try:
+                self._attempt(job)
+            except Exception as e:
+                logger.error(f"Delivery worker error for {job.task.task_id}: {e}", exc_info=True)
+                self._complete(job, False, str(e))
+            finally:
+                with self._work:
+                    self._active[key] -= 1
+                    if not self._active[key] and not self._queues.get(key):
+                        self._active.pop(key, None)
+                        self._queues.pop(key, None)
+                    else:
+                        self._mark_ready(key)
+
+    def _complete(self, job: _Job, success: bool, error: Optional[str] = None, retryable: bool = True):
+        """Record the outcome of one attempt: report it, or schedule the next attempt on the wheel."""
+        if not success and retryable and job.attempts < self._max_attempts and not self._stopped:
+            job.last_error = error or ''
+            delay = min(self._retry_max, self._retry_base * (2 ** (job.attempts - 1))) * random.uniform(0.5, 1.5)
+            logger.warning(f"Async delivery attempt {job.attempts}/{self._max_attempts} failed for "
+                           f"{job.task.task_id} ({job.key}): {error}; retrying in {delay:.1f}s")
+            with self._work:
+                self._stats['retries'] += 1
+            self._wheel.schedule(delay, lambda: self._enqueue(job))
+            return
+        if success:
+            logger.info(f"Async delivered: {job.task.task_id} → {job.task.delivery_destination}")
+        else:
+            logger.error(f"Async delivery failed for {job.task.task_id} after {job.attempts} attempt(s): {error}")
+        try:
+            if self.on_result:
+                self.on_result(job.task, success, error)
+        finally:
+            with self._work:
+                self._stats['delivered' if success else 'failed'] += 1
+                self._outstanding -= 1
+                self._settled.notify_all()
+
+    # ── Channels ────────────────────────────────────────────────────────────
+
+    def _build_payload(self, task) -> Dict:
+        return {
+            'task_id': task.task_id,
+            'tool_name': task.tool_name,
+            'status': task.status.value,
+            'result': task.result,
+            'error': task.error,
+            'arguments': task.arguments,
+            'duration_ms': task.duration_ms,
+            'timestamp': time.time(),
+        }
+
+    def _attempt(self, job: _Job):
+        job.attempts += 1
+        task = job.task
+        if task.delivery_type == 'webhook':
+            self._deliver_webhook(job)
+        elif task.delivery_type == 'kafka':
+            self._deliver_kafka(job)
+        elif task.delivery_type == 'file':
+            self._deliver_file(job)
+        else:
+            self._complete(job, False, f"Unknown delivery type: {task.delivery_type}", retryable=False)
+
+    def _deliver_webhook(self, job: _Job):
+        """POST the result over a pooled keep-alive connection."""
+        task = job.task
+        body = json.dumps(self._build_payload(task), default=str).encode('utf-8')
+        headers = {
+            'Content-Type': 'application/json',
+            'User-Agent': 'sajha-async/5.3.0',
+            'X-Sajha-Task-Id': task.task_id,
+        }
+        # Merge custom headers from delivery config
+        headers.update(task.delivery_config.get('headers', {}))
+        try:
+            status = self._http.post(task.delivery_destination, body, headers)
+        except Exception as e:
+            self._complete(job, False, str(e))
+            return
+        if 200 <= status < 300:
+            self._complete(job, True)
+        else:
+            # Client errors other than timeout / rate limit will not succeed on retry
+            self._complete(job, False, f"HTTP {status}", retryable=status >= 500 or status in (408, 429))
+
+    def _deliver_kafka(self, job: _Job):
+        """Hand the message to the batching producer; the outcome arrives on its delivery callback."""
+        task = job.task
+        key = str(task.delivery_config.get('kafka_key', task.task_id))
+        value = json.dumps(self._build_payload(task), default=str).encode('utf-8')
+        try:
+            self._kafka.send(task.delivery_destination, key.encode('utf-8'), value,
+                             lambda ok, error: self._complete(job, ok, error))
+        except ImportError:
+            self._complete(job, False, "confluent_kafka not installed. pip install confluent-kafka", retryable=False)
+        except Exception as e:
+            self._complete(job, False, f"Kafka delivery failed: {e}")
+
+    def _file_path(self, task) -> Path:
+        dest = Path(task.delivery_destination)
+        return dest if dest.is_absolute() else self._file_base_dir / dest
+
+    def _deliver_file(self, job: _Job):
+        """Append to a rotating JSONL file, or write one file per task (atomic temp file + rename)."""
+        task = job.task
+        dest = self._file_path(task)
+        payload = json.dumps(self._build_payload(task), default=str)
+        if len(payload) > self._file_max_size_mb * 1024 * 1024:
+            self._complete(job, False, f"File delivery skipped: result too large ({len(payload)} bytes)",
+                           retryable=False)
+            return
+        if dest.suffix in _APPEND_SUFFIXES or task.delivery_config.get('mode') == 'append':
+            self._appender.write(dest, payload, lambda ok, error: self._complete(job, ok, error))
+            self._schedule_file_flush()
+            return
+        try:
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            tmp = dest.with_name(dest.name + '.tmp')
+            tmp.write_text(payload)
+            os.replace(tmp, dest)  # Atomic on same filesystem
+        except Exception as e:
+            self._complete(job, False, f"File delivery failed: {e}")
+            return
+        self._complete(job, True)
+
+    def _schedule_file_flush(self):
+        with self._work:
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+
+        def tick():
+            with self._work:
+                self._flush_scheduled = False
+            self._appender.flush()
+
+        self._wheel.schedule(self._file_flush, tick)
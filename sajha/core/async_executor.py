@@ -6,8 +6,12 @@ Background execution engine for long-running tool calls.
 Client gets task_id immediately; result delivered via webhook, Kafka, or file.
 
 Architecture:
-  API → AsyncTask(DB) → WorkQueue(bounded) → DaemonWorkerPool(N threads)
-    → execute_with_tracking() → DeliveryRouter → webhook|kafka|file
+  API → TaskStore(SQLite WAL | PostgreSQL) → DaemonWorkerPool(N threads, leased claims)
+    → execute_with_tracking() → DeliveryRouter (own threads, see async_delivery.py) → webhook|kafka|file
+
+The router's queue and retry timers live in memory; a handed-off delivery keeps a
+lease in the store, so one lost with its process is re-sent by whichever executor
+sees the lease lapse (including this one on restart).
 
 Config: config/application.yml → async: section
 """
@@ -18,17 +22,19 @@ import queue
 import threading
 import time
 import traceback
-import urllib.request
-import urllib.error
 import uuid
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from enum import Enum
-from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sajha.core.async_delivery import DeliveryRouter
+from sajha.core.task_store import ANY_USER, TaskStore, SQLiteTaskStore, create_task_store, worker_identity
 
 logger = logging.getLogger(__name__)
 
+DELIVERY_NONE = 'none'      # Result is only kept in the task store, for polling (MCP tasks/result)
+
 
 # ═══════════════════════════════════════════════════════════════════
 # TASK MODEL
@@ -62,6 +68,23 @@ class AsyncTask:
     delivered_at: Optional[float] = None
     duration_ms: Optional[float] = None
     delivery_status: Optional[str] = None  # success | failed | pending
+    attempts: int = 0
+    result_bytes: int = 0
+    result_truncated: bool = False         # result exceeded async.max_result_mb and was not stored
+
+    @classmethod
+    def from_row(cls, row: Dict) -> 'AsyncTask':
+        """Build a task from a TaskStore row."""
+        return cls(
+            task_id=row['task_id'], tool_name=row['tool_name'], arguments=row.get('arguments') or {},
+            delivery_type=row.get('delivery_type') or '', delivery_destination=row.get('delivery_destination') or '',
+            delivery_config=row.get('delivery_config') or {}, status=AsyncTaskStatus(row['status']),
+            result=row.get('result'), error=row.get('error'), user_id=row.get('user_id'),
+            created_at=row['created_at'], started_at=row.get('started_at'), completed_at=row.get('completed_at'),
+            delivered_at=row.get('delivered_at'), duration_ms=row.get('duration_ms'),
+            delivery_status=row.get('delivery_status'), attempts=row.get('attempts') or 0,
+            result_bytes=row.get('result_bytes') or 0, result_truncated=bool(row.get('result_truncated')),
+        )
 
     def to_dict(self) -> Dict:
         d = {
@@ -76,7 +99,11 @@ class AsyncTask:
             'completed_at': self.completed_at,
             'duration_ms': self.duration_ms,
             'delivery_status': self.delivery_status,
+            'attempts': self.attempts,
         }
+        if self.result_truncated:
+            d['result_truncated'] = True
+            d['result_bytes'] = self.result_bytes
         if self.status == AsyncTaskStatus.COMPLETED or self.status == AsyncTaskStatus.DELIVERED:
             d['result_preview'] = self._preview(self.result)
         if self.error:
@@ -101,156 +128,66 @@ class AsyncTask:
 
 
 # ═══════════════════════════════════════════════════════════════════
-# DELIVERY ROUTER
-# ═══════════════════════════════════════════════════════════════════
-
-class DeliveryRouter:
-    """Routes task results to the configured destination."""
-
-    def __init__(self, webhook_timeout: int = 10, webhook_retries: int = 3,
-                 kafka_config: Dict = None, file_base_dir: str = 'data/async_results',
-                 file_max_size_mb: int = 50):
-        self._webhook_timeout = webhook_timeout
-        self._webhook_retries = webhook_retries
-        self._kafka_config = kafka_config or {}
-        self._kafka_producer = None
-        self._file_base_dir = Path(file_base_dir)
-        self._file_max_size_mb = file_max_size_mb
-
-    def deliver(self, task: AsyncTask) -> bool:
-        """Deliver task result to destination. Returns True on success."""
-        try:
-            if task.delivery_type == 'webhook':
-                return self._deliver_webhook(task)
-            elif task.delivery_type == 'kafka':
-                return self._deliver_kafka(task)
-            elif task.delivery_type == 'file':
-                return self._deliver_file(task)
-            else:
-                logger.error(f"Unknown delivery type: {task.delivery_type}")
-                return False
-        except Exception as e:
-            logger.error(f"Delivery failed for task {task.task_id}: {e}", exc_info=True)
-            return False
-
-    def _build_payload(self, task: AsyncTask) -> Dict:
-        return {
-            'task_id': task.task_id,
-            'tool_name': task.tool_name,
-            'status': task.status.value,
-            'result': task.result,
-            'error': task.error,
-            'arguments': task.arguments,
-            'duration_ms': task.duration_ms,
-            'timestamp': time.time(),
-        }
-
-    def _deliver_webhook(self, task: AsyncTask) -> bool:
-        """POST result to webhook URL with retries."""
-        url = task.delivery_destination
-        body = json.dumps(self._build_payload(task), default=str).encode('utf-8')
-        headers = {
-            'Content-Type': 'application/json',
-            'User-Agent': 'sajha-async/5.3.0',
-            'X-Sajha-Task-Id': task.task_id,
-        }
-        # Merge custom headers from delivery config
-        headers.update(task.delivery_config.get('headers', {}))
-
-        for attempt in range(1, self._webhook_retries + 1):
-            try:
-                req = urllib.request.Request(url, data=body, headers=headers, method='POST')
-                with urllib.request.urlopen(req, timeout=self._webhook_timeout) as resp:
-                    if 200 <= resp.status < 300:
-                        logger.info(f"Async webhook delivered: {task.task_id} → {url} (HTTP {resp.status})")
-                        return True
-            except Exception as e:
-                logger.warning(f"Webhook attempt {attempt}/{self._webhook_retries}: {url} — {e}", exc_info=True)
-                if attempt < self._webhook_retries:
-                    time.sleep(2 ** attempt)
-        return False
-
-    def _deliver_kafka(self, task: AsyncTask) -> bool:
-        """Produce message to Kafka topic."""
-        try:
-            if self._kafka_producer is None:
-                from confluent_kafka import Producer
-                self._kafka_producer = Producer(self._kafka_config)
-
-            topic = task.delivery_destination
-            key = task.delivery_config.get('kafka_key', task.task_id)
-            value = json.dumps(self._build_payload(task), default=str).encode('utf-8')
-
-            self._kafka_producer.produce(topic, key=key.encode('utf-8'), value=value)
-            self._kafka_producer.flush(timeout=10)
-            logger.info(f"Async Kafka delivered: {task.task_id} → {topic}:{key}")
-            return True
-        except ImportError:
-            logger.error("confluent_kafka not installed. pip install confluent-kafka", exc_info=True)
-            return False
-        except Exception as e:
-            logger.error(f"Kafka delivery failed: {e}", exc_info=True)
-            return False
-
-    def _deliver_file(self, task: AsyncTask) -> bool:
-        """Write result to filesystem (atomic write via temp file + rename)."""
-        try:
-            dest = Path(task.delivery_destination)
-            if not dest.is_absolute():
-                dest = self._file_base_dir / dest
-
-            # Size check
-            payload = json.dumps(self._build_payload(task), default=str, indent=2)
-            if len(payload) > self._file_max_size_mb * 1024 * 1024:
-                logger.error(f"File delivery skipped: result too large ({len(payload)} bytes)")
-                return False
-
-            dest.parent.mkdir(parents=True, exist_ok=True)
-            tmp = dest.with_suffix('.tmp')
-            tmp.write_text(payload)
-            tmp.rename(dest)  # Atomic on same filesystem
-            logger.info(f"Async file delivered: {task.task_id} → {dest}")
-            return True
-        except Exception as e:
-            logger.error(f"File delivery failed: {e}", exc_info=True)
-            return False
-
-
-# ═══════════════════════════════════════════════════════════════════
-# ASYNC EXECUTOR (Worker Pool + Queue)
+# ASYNC EXECUTOR (Worker Pool + Durable Queue)
 # ═══════════════════════════════════════════════════════════════════
 
 class AsyncExecutor:
     """
-    Background execution engine with bounded work queue and daemon worker pool.
+    Background execution engine: daemon worker pool over a durable TaskStore.
 
-    Backpressure: rejects with queue.Full when queue_size exceeded.
+    Tasks survive restarts and can be shared by several processes pointing at the
+    same store. A worker leases a task, renews the lease while it runs, and writes
+    the result fenced on that lease; a task whose worker died is re-claimed once
+    the lease expires (up to max_attempts).
+
+    Backpressure: rejects with queue.Full when queue_size tasks are already queued.
     Workers reuse execute_with_tracking() for cache/circuit/replay integration.
     """
 
     def __init__(self, num_workers: int = 8, queue_size: int = 1000,
-                 task_ttl_hours: int = 24, delivery_config: Dict = None):
-        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
-        self._tasks: Dict[str, AsyncTask] = {}
+                 task_ttl_hours: int = 24, delivery_config: Dict = None,
+                 store: Optional[TaskStore] = None, lease_seconds: float = 300,
+                 poll_interval_ms: int = 500, tool_lookup: Optional[Callable[[str], Any]] = None):
+        self._store = store or SQLiteTaskStore()
+        self.queue_size = queue_size
         self._lock = threading.Lock()
         self._num_workers = num_workers
         self._task_ttl_hours = task_ttl_hours
+        self._lease_seconds = lease_seconds
+        self._poll_interval = poll_interval_ms / 1000.0
+        self._tool_lookup = tool_lookup
+        self._owner = f"{worker_identity()}:{uuid.uuid4().hex[:8]}"
+        self._leased: Dict[str, float] = {}      # task_id → started_at, for leases this process holds
+        self._delivering: set = set()             # task_ids handed to the router, delivery lease held here
+        self._wake = threading.Event()
         self._workers: List[threading.Thread] = []
         self._running = False
-        self._stats = {'submitted': 0, 'completed': 0, 'failed': 0, 'delivered': 0, 'cancelled': 0}
+        self._stats = {'submitted': 0, 'completed': 0, 'failed': 0, 'delivered': 0, 'cancelled': 0,
+                       'recovered': 0, 'lease_lost': 0, 'purged': 0, 'deliveries_recovered': 0}
 
-        # Delivery router
+        # Delivery stage: its own threads, so a slow destination never holds a worker
         dc = delivery_config or {}
+        webhook, kafka, file, retry = (dc.get(k, {}) for k in ('webhook', 'kafka', 'file', 'retry'))
         self._router = DeliveryRouter(
-            webhook_timeout=dc.get('webhook', {}).get('timeout', 10),
-            webhook_retries=dc.get('webhook', {}).get('max_retries', 3),
-            kafka_config={'bootstrap.servers': dc.get('kafka', {}).get('bootstrap_servers', 'localhost:9092')},
-            file_base_dir=dc.get('file', {}).get('base_dir', 'data/async_results'),
-            file_max_size_mb=dc.get('file', {}).get('max_size_mb', 50),
+            webhook_timeout=webhook.get('timeout', 10),
+            max_attempts=retry.get('max_attempts', webhook.get('max_retries', 3)),
+            kafka_config={'bootstrap.servers': kafka.get('bootstrap_servers', 'localhost:9092')},
+            file_base_dir=file.get('base_dir', 'data/async_results'),
+            file_max_size_mb=file.get('max_size_mb', 50),
+            workers=dc.get('workers', 4),
+            max_in_flight_per_destination=dc.get('max_in_flight_per_destination', 2),
+            retry_base_ms=retry.get('base_ms', 1000),
+            retry_max_ms=retry.get('max_ms', 60000),
+            http_pool_size=webhook.get('pool_size', 8),
+            kafka_linger_ms=kafka.get('linger_ms', 50),
+            kafka_batch_size=kafka.get('batch_size', 500),
+            file_rotate_mb=file.get('rotate_mb', 256),
+            file_flush_ms=file.get('flush_ms', 1000),
+            on_result=self._on_delivered,
         )
 
     def start(self):
-        """Start the worker pool."""
+        """Start the worker pool and the lease/retention maintenance thread."""
         if self._running:
             return
         self._running = True
@@ -258,17 +195,18 @@ class AsyncExecutor:
             t = threading.Thread(target=self._worker_loop, name=f"async-worker-{i}", daemon=True)
             t.start()
             self._workers.append(t)
-        logger.info(f"Async executor started: {self._num_workers} workers, queue={self._queue.maxsize}")
+        t = threading.Thread(target=self._maintenance_loop, name="async-maintenance", daemon=True)
+        t.start()
+        self._workers.append(t)
+        self._recover_deliveries()
+        logger.info(f"Async executor started: {self._num_workers} workers, queue={self.queue_size}, "
+                    f"store={self._store.describe()}")
 
     def stop(self):
-        """Signal workers to stop (graceful shutdown)."""
+        """Signal workers to stop (graceful shutdown). Unfinished leases expire and are re-claimed."""
         self._running = False
-        # Send poison pills
-        for _ in self._workers:
-            try:
-                self._queue.put_nowait(None)
-            except queue.Full:
-                pass
+        self._wake.set()
+        self._router.close()
 
     def submit(self, tool_name: str, arguments: Dict, delivery_type: str,
                delivery_destination: str, delivery_config: Dict = None,
@@ -287,131 +225,196 @@ class AsyncExecutor:
             delivery_config=delivery_config or {},
             user_id=user_id,
         )
-
+        row = {k: getattr(task, k) for k in ('task_id', 'tool_name', 'arguments', 'delivery_type',
+                                              'delivery_destination', 'delivery_config', 'user_id', 'created_at')}
+        if not self._store.enqueue(row, max_queued=self.queue_size):
+            raise queue.Full()
         with self._lock:
-            self._tasks[task.task_id] = task
             self._stats['submitted'] += 1
-
-        # Submit to bounded queue (raises queue.Full on backpressure)
-        self._queue.put_nowait(task)
+        self._wake.set()
         logger.info(f"Async task queued: {task.task_id} ({tool_name})")
         return task
 
     def get_task(self, task_id: str) -> Optional[AsyncTask]:
-        with self._lock:
-            return self._tasks.get(task_id)
+        row = self._store.get(task_id)
+        return AsyncTask.from_row(row) if row else None
 
-    def list_tasks(self, status: str = None, limit: int = 100) -> List[Dict]:
-        with self._lock:
-            self._cleanup_old_tasks()
-            tasks = list(self._tasks.values())
-        if status:
-            tasks = [t for t in tasks if t.status.value == status]
-        tasks.sort(key=lambda t: t.created_at, reverse=True)
-        return [t.to_dict() for t in tasks[:limit]]
-
-    def cancel_task(self, task_id: str) -> bool:
-        with self._lock:
-            task = self._tasks.get(task_id)
-            if task and task.status == AsyncTaskStatus.QUEUED:
-                task.status = AsyncTaskStatus.CANCELLED
+    def list_tasks(self, status: str = None, limit: int = 100, cursor: str = None) -> List[Dict]:
+        return self.list_page(status, limit, cursor)[0]
+
+    def list_page(self, status: str = None, limit: int = 100, cursor: str = None,
+                  delivery_type: str = None, user_id: Any = ANY_USER) -> Tuple[List[Dict], Optional[str]]:
+        """
+        One page of tasks, newest first, plus the cursor for the next page (None at the end).
+        user_id: ANY_USER (default) for every user, None for tasks submitted without a user.
+        """
+        rows, next_cursor = self._store.list(status=status, limit=limit, cursor=cursor,
+                                             delivery_type=delivery_type, user_id=user_id)
+        return [AsyncTask.from_row(r).to_dict() for r in rows], next_cursor
+
+    def cancel_task(self, task_id: str, include_running: bool = False) -> bool:
+        """Cancel a queued task; with include_running, a running task's result is discarded when it finishes."""
+        if self._store.cancel(task_id, include_running=include_running):
+            with self._lock:
                 self._stats['cancelled'] += 1
-                return True
+            return True
         return False
 
     def retry_task(self, task_id: str) -> Optional[AsyncTask]:
         """Re-submit a failed task."""
-        with self._lock:
-            old = self._tasks.get(task_id)
-            if not old or old.status not in (AsyncTaskStatus.FAILED, AsyncTaskStatus.CANCELLED):
-                return None
+        old = self.get_task(task_id)
+        if not old or old.status not in (AsyncTaskStatus.FAILED, AsyncTaskStatus.CANCELLED):
+            return None
         return self.submit(old.tool_name, old.arguments, old.delivery_type,
                           old.delivery_destination, old.delivery_config, old.user_id)
 
     def stats(self) -> Dict:
+        counts = self._store.counts()
         with self._lock:
             return {
                 'workers': self._num_workers,
-                'queue_size': self._queue.qsize(),
-                'queue_max': self._queue.maxsize,
-                'total_tasks': len(self._tasks),
+                'queue_size': counts.get('queued', 0),
+                'queue_max': self.queue_size,
+                'running': counts.get('running', 0),
+                'leased_here': len(self._leased),
+                'total_tasks': sum(counts.values()),
+                'by_status': counts,
+                'store': self._store.describe(),
+                'owner': self._owner,
                 **self._stats,
+                'delivery': self._router.stats(),
             }
 
     def _worker_loop(self):
-        """Worker thread main loop."""
+        """Worker thread main loop: claim, run, repeat; sleep until woken or the poll interval."""
         while self._running:
             try:
-                task = self._queue.get(timeout=1)
-                if task is None:  # Poison pill
-                    break
-                self._execute_task(task)
-            except queue.Empty:
-                continue
+                row = self._store.claim(self._owner, self._lease_seconds)
+                if row is None:
+                    self._wake.wait(self._poll_interval)
+                    self._wake.clear()
+                    continue
+                if row.get('attempts', 1) > 1:
+                    with self._lock:
+                        self._stats['recovered'] += 1
+                self._execute_task(AsyncTask.from_row(row))
             except Exception as e:
                 logger.error(f"Worker error: {e}", exc_info=True)
+                time.sleep(self._poll_interval)
 
-    def _execute_task(self, task: AsyncTask):
-        """Execute a single task: run tool + deliver result."""
-        # Check if cancelled while queued
-        if task.status == AsyncTaskStatus.CANCELLED:
-            return
+    def _maintenance_loop(self):
+        """Renew leases held by this process, pick up orphaned deliveries and purge tasks past their TTL."""
+        renew_every = max(0.05, self._lease_seconds / 3)
+        last_purge = 0.0
+        while self._running:
+            time.sleep(renew_every)
+            try:
+                with self._lock:
+                    held = list(self._leased) + list(self._delivering)
+                self._store.renew(held, self._owner, self._lease_seconds)
+                self._recover_deliveries()
+                if time.time() - last_purge > 60:
+                    last_purge = time.time()
+                    self._cleanup_old_tasks()
+            except Exception as e:
+                logger.warning(f"Async maintenance error: {e}", exc_info=True)
+
+    def _lookup_tool(self, tool_name: str):
+        if self._tool_lookup:
+            return self._tool_lookup(tool_name)
+        from sajha.app import tools_registry
+        return tools_registry.get_tool(tool_name) if tools_registry else None
 
+    def _execute_task(self, task: AsyncTask):
+        """Execute a single leased task: run tool, record the outcome, deliver the result."""
         task.status = AsyncTaskStatus.RUNNING
-        task.started_at = time.time()
+        task.started_at = task.started_at or time.time()
+        with self._lock:
+            self._leased[task.task_id] = task.started_at
 
         try:
-            # Get tool from registry
-            from sajha.app import tools_registry
-            tool = tools_registry.get_tool(task.tool_name) if tools_registry else None
-            if not tool:
-                raise ValueError(f"Tool not found: {task.tool_name}")
-
-            # Execute (reuses cache, circuit breaker, replay)
-            result = tool.execute_with_tracking(task.arguments)
-            task.result = result
-            task.status = AsyncTaskStatus.COMPLETED
+            try:
+                tool = self._lookup_tool(task.tool_name)
+                if not tool:
+                    raise ValueError(f"Tool not found: {task.tool_name}")
+
+                # Execute (reuses cache, circuit breaker, replay), charged to the submitting user
+                from sajha.core.duckdb_guard import tenant_scope
+                with tenant_scope(task.user_id):
+                    task.result = tool.execute_with_tracking(task.arguments)
+                task.status = AsyncTaskStatus.COMPLETED
+            except Exception as e:
+                task.error = str(e)
+                task.status = AsyncTaskStatus.FAILED
+                logger.error(f"Async task failed: {task.task_id} — {e}", exc_info=True)
+
             task.completed_at = time.time()
             task.duration_ms = round((task.completed_at - task.started_at) * 1000, 1)
-
+            if not self._store.finish(task.task_id, self._owner, task.status.value, result=task.result,
+                                      error=task.error, started_at=task.started_at):
+                # Cancelled while running, or our lease expired and another worker owns the task now
+                with self._lock:
+                    self._stats['lease_lost'] += 1
+                logger.warning(f"Async task {task.task_id}: cancelled or lease lost, discarding this attempt")
+                return
+        finally:
             with self._lock:
-                self._stats['completed'] += 1
+                self._leased.pop(task.task_id, None)
 
+        with self._lock:
+            self._stats['completed' if task.status == AsyncTaskStatus.COMPLETED else 'failed'] += 1
+        if task.status == AsyncTaskStatus.COMPLETED:
             logger.info(f"Async task completed: {task.task_id} ({task.duration_ms}ms)")
 
-        except Exception as e:
-            task.error = str(e)
-            task.status = AsyncTaskStatus.FAILED
-            task.completed_at = time.time()
-            task.duration_ms = round((task.completed_at - task.started_at) * 1000, 1)
+        if task.delivery_type == DELIVERY_NONE:
+            return                              # Poll-only (MCP tasks): the stored row is the result
 
-            with self._lock:
-                self._stats['failed'] += 1
-
-            logger.error(f"Async task failed: {task.task_id} — {e}", exc_info=True)
+        # Hand off to the delivery stage under a delivery lease; the worker is free for the next task
+        task.delivery_status = 'pending'
+        with self._lock:
+            self._delivering.add(task.task_id)
+        self._store.update(task.task_id, delivery_status='pending', lease_owner=self._owner,
+                           lease_expires=time.time() + self._lease_seconds)
+        self._router.submit(task)
 
-        # Deliver result
+    def _recover_deliveries(self):
+        """Re-submit deliveries whose lease lapsed: their process died with them queued or awaiting retry."""
         try:
-            success = self._router.deliver(task)
-            task.delivery_status = 'success' if success else 'failed'
-            task.delivered_at = time.time() if success else None
-            if success:
-                task.status = AsyncTaskStatus.DELIVERED
-                with self._lock:
-                    self._stats['delivered'] += 1
+            rows = self._store.claim_deliveries(self._owner, self._lease_seconds)
         except Exception as e:
-            task.delivery_status = 'failed'
-            logger.error(f"Delivery failed for {task.task_id}: {e}", exc_info=True)
+            logger.warning(f"Could not recover pending deliveries: {e}", exc_info=True)
+            return
+        for row in rows:
+            task = AsyncTask.from_row(row)
+            with self._lock:
+                self._delivering.add(task.task_id)
+                self._stats['deliveries_recovered'] += 1
+            logger.info(f"Async delivery recovered: {task.task_id} → {task.delivery_destination}")
+            self._router.submit(task)
+
+    def _on_delivered(self, task: AsyncTask, success: bool, error: Optional[str] = None):
+        """Delivery stage callback: record the final delivery outcome."""
+        task.delivery_status = 'success' if success else 'failed'
+        task.delivered_at = time.time() if success else None
+        if success:
+            task.status = AsyncTaskStatus.DELIVERED
+            with self._lock:
+                self._stats['delivered'] += 1
+        try:
+            self._store.update(task.task_id, status=task.status.value, delivery_status=task.delivery_status,
+                               delivered_at=task.delivered_at, lease_owner=None, lease_expires=None)
+        except Exception as e:
+            logger.error(f"Could not record delivery for {task.task_id}: {e}", exc_info=True)
+        finally:
+            with self._lock:
+                self._delivering.discard(task.task_id)
 
     def _cleanup_old_tasks(self):
-        """Remove tasks older than TTL."""
-        cutoff = time.time() - (self._task_ttl_hours * 3600)
-        to_remove = [tid for tid, t in self._tasks.items()
-                     if t.created_at < cutoff and t.status in
-                     (AsyncTaskStatus.COMPLETED, AsyncTaskStatus.DELIVERED,
-                      AsyncTaskStatus.FAILED, AsyncTaskStatus.CANCELLED)]
-        for tid in to_remove:
-            del self._tasks[tid]
+        """Remove finished tasks older than TTL."""
+        purged = self._store.purge(time.time() - (self._task_ttl_hours * 3600))
+        if purged:
+            with self._lock:
+                self._stats['purged'] += purged
 
 
 # ═══════════════════════════════════════════════════════════════════
@@ -428,6 +431,9 @@ def get_async_executor() -> AsyncExecutor:
         workers = 8
         queue_size = 1000
         task_ttl = 24
+        lease_seconds = 300
+        poll_interval_ms = 500
+        store_options = {}
         delivery_config = {}
         try:
             from sajha.core.config import get_settings
@@ -435,6 +441,39 @@ def get_async_executor() -> AsyncExecutor:
             workers = getattr(s, 'async_workers', 8)
             queue_size = getattr(s, 'async_queue_size', 1000)
             task_ttl = getattr(s, 'async_task_ttl_hours', 24)
+            lease_seconds = getattr(s, 'async_lease_seconds', 300) or 300
+            poll_interval_ms = getattr(s, 'async_poll_interval_ms', 500) or 500
+            store_options = {
+                'store_type': getattr(s, 'async_store_type', 'sqlite') or 'sqlite',
+                'path': getattr(s, 'async_store_path', 'data/async_tasks.db') or 'data/async_tasks.db',
+                'dsn': getattr(s, 'async_store_dsn', ''),
+                'max_attempts': getattr(s, 'async_max_attempts', 3),
+                'max_result_bytes': int((getattr(s, 'async_max_result_mb', 16) or 16) * 1024 * 1024),
+            }
+            delivery_config = {
+                'workers': getattr(s, 'async_delivery_workers', 4),
+                'max_in_flight_per_destination': getattr(s, 'async_delivery_max_in_flight_per_destination', 2),
+                'retry': {
+                    'max_attempts': getattr(s, 'async_delivery_max_attempts', 3),
+                    'base_ms': getattr(s, 'async_delivery_retry_base_ms', 1000),
+                    'max_ms': getattr(s, 'async_delivery_retry_max_ms', 60000),
+                },
+                'webhook': {
+                    'timeout': getattr(s, 'async_webhook_timeout', 10),
+                    'pool_size': getattr(s, 'async_webhook_pool_size', 8),
+                },
+                'kafka': {
+                    'bootstrap_servers': getattr(s, 'async_kafka_bootstrap_servers', 'localhost:9092'),
+                    'linger_ms': getattr(s, 'async_kafka_linger_ms', 50),
+                    'batch_size': getattr(s, 'async_kafka_batch_size', 500),
+                },
+                'file': {
+                    'base_dir': getattr(s, 'async_file_base_dir', 'data/async_results'),
+                    'max_size_mb': getattr(s, 'async_file_max_size_mb', 50),
+                    'rotate_mb': getattr(s, 'async_file_rotate_mb', 256),
+                    'flush_ms': getattr(s, 'async_file_flush_ms', 1000),
+                },
+            }
         except Exception:
             pass
         _executor = AsyncExecutor(
@@ -442,6 +481,9 @@ def get_async_executor() -> AsyncExecutor:
             queue_size=queue_size,
             task_ttl_hours=task_ttl,
             delivery_config=delivery_config,
+            store=create_task_store(**store_options),
+            lease_seconds=lease_seconds,
+            poll_interval_ms=poll_interval_ms,
         )
         _executor.start()
     return _executor
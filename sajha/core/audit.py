@@ -6,42 +6,139 @@ Records security-sensitive events to the audit_log DB table.
 Events: login, logout, login_failed, user_create, user_delete,
 apikey_create, apikey_revoke, tool_enable, tool_disable,
 permission_change, config_change.
+
+Writes are asynchronous: log() publishes the row to the event bus
+(sajha.core.event_bus) and returns immediately. The bus thread hands
+accumulated rows to _write_batch(), which inserts them with a single
+multi-row INSERT and one commit, so request handlers never wait on the DB.
+
+A batch the DB rejects is appended to a JSONL spill file
+(audit.spill_file) instead of being dropped; the next batch that commits
+replays the spilled rows, and the file is removed once they are all in.
 """
+import json
 import logging
+import os
+import threading
 import uuid
 from datetime import datetime, timezone
-from typing import Optional
+from pathlib import Path
+from typing import Dict, List, Optional
 
 logger = logging.getLogger(__name__)
 
+AUDIT_TOPIC = 'audit'
+
 
 class AuditLogger:
     """Writes structured audit events to the audit_log table."""
 
+    def __init__(self, bus=None, spill_file: str = 'data/audit/spill.jsonl'):
+        if bus is None:
+            from sajha.core.event_bus import get_event_bus
+            bus = get_event_bus()
+        self._bus = bus
+        self._spill_path = Path(spill_file)
+        self._spill_lock = threading.Lock()
+        self._written = 0
+        self._failed = 0
+        self._spilled = 0
+        if self._spill_path.exists():       # left over from a previous run; replayed after the next commit
+            with open(self._spill_path, encoding='utf-8') as f:
+                self._spilled = sum(1 for line in f if line.strip())
+        self._bus.register(AUDIT_TOPIC, self._write_batch)
+
     def log(self, action: str, user_id: str = None, resource_type: str = None,
             resource_id: str = None, details: str = None, ip_address: str = None):
-        """Record an audit event."""
+        """Record an audit event (queued; written in the next batch)."""
+        row = {
+            'id': str(uuid.uuid4()),
+            'action': action,
+            'user_id': user_id,
+            'resource_type': resource_type,
+            'resource_id': resource_id,
+            'details': details,
+            'ip_address': ip_address,
+            'created_at': datetime.now(timezone.utc),
+        }
+        if self._bus.publish(AUDIT_TOPIC, row):
+            logger.info(f"Audit: {action} by {user_id or 'system'} on {resource_type}:{resource_id}")
+        else:
+            logger.error(f"Audit event dropped (event bus full): {action} by {user_id or 'system'} "
+                         f"on {resource_type}:{resource_id}")
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Block until queued audit rows are written. For shutdown and tests."""
+        return self._bus.flush(timeout)
+
+    def _write_batch(self, rows: List[Dict]):
+        """Insert a batch of audit rows in one statement and one commit; spill it if that fails."""
+        if not self._insert(rows):
+            self._spill(rows)
+            return
+        self._written += len(rows)
+        logger.debug(f"Audit batch written: {len(rows)} row(s)")
+        if self._spill_path.exists():
+            self._replay_spill()
+
+    def _insert(self, rows: List[Dict]) -> bool:
         try:
+            from sqlalchemy import insert
             from sajha.db.engine import get_db_session
             from sajha.db.models import AuditLog
             db = get_db_session()
-            entry = AuditLog(
-                id=str(uuid.uuid4()),
-                action=action,
-                user_id=user_id,
-                resource_type=resource_type,
-                resource_id=resource_id,
-                details=details,
-                ip_address=ip_address,
-                created_at=datetime.now(timezone.utc),
-            )
-            db.add(entry)
-            db.commit()
-            db.close()
-            logger.info(f"Audit: {action} by {user_id or 'system'} on {resource_type}:{resource_id}")
+            try:
+                db.execute(insert(AuditLog), rows)
+                db.commit()
+            finally:
+                db.close()
+            return True
         except Exception as e:
             # Audit logging must never crash the application
-            logger.error(f"Audit log write failed: {e}", exc_info=True)
+            self._failed += len(rows)
+            logger.error(f"Audit log write failed for {len(rows)} row(s): {e}", exc_info=True)
+            return False
+
+    def _spill(self, rows: List[Dict]):
+        try:
+            with self._spill_lock:
+                self._spill_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self._spill_path, 'a', encoding='utf-8') as f:
+                    for row in rows:
+                        f.write(json.dumps({**row, 'created_at': row['created_at'].isoformat()}) + '\n')
+                self._spilled += len(rows)
+            logger.warning(f"Audit batch of {len(rows)} row(s) spilled to {self._spill_path}")
+        except Exception as e:
+            logger.error(f"Audit spill write failed; {len(rows)} row(s) lost: {e}", exc_info=True)
+
+    def _replay_spill(self, chunk: int = 500):
+        """Re-insert spilled rows in chunks. Rows still failing stay in the file for the next batch."""
+        with self._spill_lock:
+            try:
+                lines = self._spill_path.read_text(encoding='utf-8').splitlines()
+            except FileNotFoundError:
+                return
+            lines = [line for line in lines if line.strip()]
+            rows = []
+            for line in lines:
+                row = json.loads(line)
+                row['created_at'] = datetime.fromisoformat(row['created_at'])
+                rows.append(row)
+            done = 0
+            while done < len(rows) and self._insert(rows[done:done + chunk]):
+                done += len(rows[done:done + chunk])
+            self._written += done
+            self._spilled = max(0, self._spilled - done)
+            if done == len(rows):
+                self._spill_path.unlink()
+                logger.info(f"Audit spill replayed: {done} row(s)")
+            elif done:
+                tmp = self._spill_path.with_suffix('.tmp')
+                tmp.write_text(''.join(line + '\n' for line in lines[done:]), encoding='utf-8')
+                os.replace(tmp, self._spill_path)
+
+    def stats(self) -> Dict:
+        return {'written': self._written, 'failed': self._failed, 'spilled': self._spilled}
 
     # Convenience methods
     def login_success(self, user_id: str, ip: str = None):
@@ -88,5 +185,11 @@ _audit: Optional[AuditLogger] = None
 def get_audit_logger() -> AuditLogger:
     global _audit
     if _audit is None:
-        _audit = AuditLogger()
+        spill_file = 'data/audit/spill.jsonl'
+        try:
+            from sajha.core.config import get_settings
+            spill_file = getattr(get_settings(), 'audit_spill_file', spill_file)
+        except Exception:
+            pass
+        _audit = AuditLogger(spill_file=spill_file)
     return _audit
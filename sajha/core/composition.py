@@ -8,6 +8,9 @@ Implements practical patterns from Category Theory for tool composition:
                        Error short-circuits, traces accumulate, duration tracks.
   Pillar 3 (Lenses):  ParamLens — surgical projection of parent output into child input.
   Pillar 4 (Giry):    EntropyGuard — cumulative confidence tracking with threshold.
+  Scheduling:         CompositeDAG — step dependencies read off the lenses, so
+                       independent steps run together; StepMemo — one call per
+                       distinct (tool, arguments) within an execution.
 
 Usage in CompositeToolEngine:
     guard = EntropyGuard(max_entropy_bits=2.0)
@@ -17,10 +20,12 @@ Usage in CompositeToolEngine:
 """
 
 from __future__ import annotations
+import json
 import math
 import time
 import copy
 import logging
+import threading
 from dataclasses import dataclass, field
 from typing import Any, Callable, Dict, List, Optional
 
@@ -105,6 +110,7 @@ class PipelineResult:
     step_results: List[StepResult] = field(default_factory=list)
     guard_passed: bool = True
     guard_message: str = ""
+    timing: Dict[str, Any] = field(default_factory=dict)     # per-node offsets + critical path
 
     @property
     def is_success(self) -> bool:
@@ -126,6 +132,8 @@ class PipelineResult:
             d['error'] = self.error
         if self.guard_message:
             d['_composition']['guard_message'] = self.guard_message
+        if self.timing:
+            d['_composition']['timing'] = self.timing
         return d
 
 
@@ -150,10 +158,12 @@ class ParamLens:
     static_params: Dict[str, Any] = field(default_factory=dict)
     output_key: str = ""
 
-    def view(self, parent_output: Dict, master_input: Dict = None, record: Dict = None) -> Dict:
+    def view(self, parent_output: Dict, master_input: Dict = None, record: Dict = None,
+             steps: Dict = None) -> Dict:
         """
         Extract child params from parent context.
         This is the 'get' half of the lens — projects only what the child needs.
+        `steps` holds the outputs of earlier steps by output_key ("$.steps.<key>.<path>").
         """
         params = dict(self.static_params)
         for target_key, source_expr in self.mapping.items():
@@ -161,6 +171,9 @@ class ParamLens:
                 field_name = source_expr[2:]
                 if field_name.startswith('input.'):
                     params[target_key] = (master_input or {}).get(field_name[6:], '')
+                elif field_name.startswith('steps.'):
+                    key, _, path = field_name[6:].partition('.')
+                    params[target_key] = _walk((steps or {}).get(key), path)
                 else:
                     params[target_key] = (record or {}).get(field_name, '')
             else:
@@ -176,6 +189,16 @@ class ParamLens:
         updated[self.output_key] = child_result
         return updated
 
+    def references(self) -> List[str]:
+        """Output keys of the steps this lens reads ("$.steps.<key>..."), in mapping order."""
+        refs = []
+        for source_expr in self.mapping.values():
+            if isinstance(source_expr, str) and source_expr.startswith('$.steps.'):
+                key = source_expr[8:].split('.', 1)[0]
+                if key and key not in refs:
+                    refs.append(key)
+        return refs
+
     @staticmethod
     def from_step_definition(step: Dict) -> ParamLens:
         """Build a ParamLens from a composite step DB definition."""
@@ -186,6 +209,18 @@ class ParamLens:
         )
 
 
+def _walk(data: Any, path: str) -> Any:
+    """Resolve 'a.b.0' into nested dicts/lists; '' when a segment is missing."""
+    for part in path.split('.') if path else ():
+        if isinstance(data, dict):
+            data = data.get(part, '')
+        elif isinstance(data, list) and part.isdigit() and int(part) < len(data):
+            data = data[int(part)]
+        else:
+            return ''
+    return '' if data is None else data
+
+
 # ═══════════════════════════════════════════════════════════════
 # PILLAR 4: Giry — Entropy Guard
 # ═══════════════════════════════════════════════════════════════
@@ -446,3 +481,139 @@ def execute_step(tool, arguments: Dict, step_name: str = "") -> StepResult:
             confidence=0.0,
             step_name=name,
         )
+
+
+# ═══════════════════════════════════════════════════════════════
+# SCHEDULING — Dependency DAG, memoized steps, critical path
+# ═══════════════════════════════════════════════════════════════
+
+class CompositeDAG:
+    """
+    A composite definition compiled into a dependency graph.
+
+    Edges come from the step lenses: a step whose param_mapping reads
+    "$.steps.<key>..." depends on the step with that output_key (the master
+    is a step too, under master_output_key). Everything else is independent
+    and may run at the same time.
+
+        quotes      = fmp_quote($input.symbol)
+        fundamentals= fmp_ratios($input.symbol)                 ← runs with quotes
+        valuation   = calc_dcf($.steps.fundamentals.fcf)        ← waits for fundamentals
+    """
+
+    def __init__(self, deps: Dict[str, List[str]], master_key: Optional[str] = None):
+        self.deps = deps                     # output_key → output_keys it reads, in topological order
+        self.master_key = master_key
+        self.levels = self._levels()
+
+    @staticmethod
+    def compile(steps: List[Dict], master_key: Optional[str] = None, resolved: tuple = ()) -> CompositeDAG:
+        """
+        Build the graph for `steps`. With master_key the master is a node of the
+        graph; keys in `resolved` (the master, for parent-child) are readable but
+        already computed, so they add no edge.
+        Raises ValueError on duplicate keys, unknown references or cycles.
+        """
+        deps: Dict[str, List[str]] = {}
+        if master_key:
+            deps[master_key] = []
+        for step in steps:
+            key = step.get('output_key', 'result')
+            if key in deps or key in resolved:
+                raise ValueError(f"Duplicate output_key '{key}'")
+            deps[key] = []
+        for step in steps:
+            key = step.get('output_key', 'result')
+            for ref in ParamLens.from_step_definition(step).references():
+                if ref in resolved:
+                    continue
+                if ref not in deps:
+                    raise ValueError(f"Step '{key}' reads unknown step '{ref}'")
+                deps[key].append(ref)
+
+        ordered, state = {}, {}
+        def visit(key, path):
+            if state.get(key) == 'done':
+                return
+            if state.get(key) == 'visiting':
+                raise ValueError('Dependency cycle: ' + ' → '.join(path + [key]))
+            state[key] = 'visiting'
+            for dep in deps[key]:
+                visit(dep, path + [key])
+            state[key] = 'done'
+            ordered[key] = deps[key]
+        for key in deps:
+            visit(key, [])
+        return CompositeDAG(ordered, master_key)
+
+    def _levels(self) -> Dict[str, int]:
+        """
+        Longest chain of step dependencies ending at each node (roots are level 0).
+        Edges to the master are ignored: the guard always records it first.
+        """
+        levels: Dict[str, int] = {}
+        for key, deps in self.deps.items():
+            levels[key] = 1 + max((levels[d] for d in deps if d != self.master_key), default=-1)
+        return levels
+
+    def critical_path(self, timings: Dict[Any, Dict[str, float]],
+                      deps_of: Callable[[Any], List[Any]] = None) -> List[Any]:
+        """
+        Walk back from the node that finished last, always through the dependency
+        that finished last. timings: node → {'start_ms', 'end_ms'}.
+        """
+        deps_of = deps_of or (lambda node: self.deps.get(node, []))
+        if not timings:
+            return []
+        node = max(timings, key=lambda n: timings[n]['end_ms'])
+        path = [node]
+        while True:
+            ran = [d for d in deps_of(node) if d in timings]
+            if not ran:
+                return path[::-1]
+            node = max(ran, key=lambda d: timings[d]['end_ms'])
+            path.append(node)
+
+
+class StepMemo:
+    """
+    Memo of step calls for one composite execution. Identical calls — same tool,
+    same arguments — from several branches or records run once; callers that
+    arrive while it is in flight wait for it instead of calling again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[tuple, list] = {}
+        self.hits = 0
+
+    def execute(self, tool, arguments: Dict, step_name: str = "") -> StepResult:
+        try:
+            key = (step_name, json.dumps(arguments, sort_keys=True, default=str))
+        except (TypeError, ValueError):
+            return execute_step(tool, arguments, step_name)
+
+        with self._lock:
+            entry = self._calls.get(key)
+            owner = entry is None
+            if owner:
+                entry = self._calls[key] = [threading.Event(), None]
+            else:
+                self.hits += 1
+
+        if owner:
+            try:
+                entry[1] = execute_step(tool, arguments, step_name)
+            finally:
+                entry[0].set()
+            return entry[1]
+
+        entry[0].wait()
+        first = entry[1]
+        if first is None:
+            return execute_step(tool, arguments, step_name)
+        return StepResult(
+            value=first.value, error=first.error, duration_ms=0.0,
+            trace=[f"↺ {first.step_name}: memoized"],
+            confidence=first.confidence, step_name=first.step_name,
+        )
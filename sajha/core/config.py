@@ -209,6 +209,88 @@ class Settings(BaseSettings):
     cache_max_files: int = Field(default_factory=lambda: _int('cache.max_files', 50000))
     cache_max_file_size_kb: int = Field(default_factory=lambda: _int('cache.max_file_size_kb', 512))
     cache_cleanup_interval: int = Field(default_factory=lambda: _int('cache.cleanup_interval_seconds', 300))
+
+    # MS Office parsed-document cache (sajha.tools.document_cache)
+    msdoc_cache_enabled: bool = Field(default_factory=lambda: _bool('msdoc.cache.enabled', True))
+    msdoc_cache_max_documents: int = Field(default_factory=lambda: _int('msdoc.cache.max_documents', 64))
+    msdoc_cache_max_mb: int = Field(default_factory=lambda: _int('msdoc.cache.max_mb', 256))
+    msdoc_cache_streaming_threshold_mb: int = Field(default_factory=lambda: _int('msdoc.cache.streaming_threshold_mb', 10))
+    msdoc_cache_search_index: bool = Field(default_factory=lambda: _bool('msdoc.cache.search_index', True))
+
+    # Shared REST client for Studio-generated tools (sajha.tools.rest_client)
+    rest_client_max_hosts: int = Field(default_factory=lambda: _int('rest.client.max_hosts', 256))
+    rest_client_pool_maxsize: int = Field(default_factory=lambda: _int('rest.client.pool_maxsize', 16))
+    rest_client_page_workers: int = Field(default_factory=lambda: _int('rest.client.page_workers', 16))
+
+    # Event bus, batched audit writer and webhook dispatcher
+    events_queue_size: int = Field(default_factory=lambda: _int('events.queue_size', 10000))
+    events_batch_size: int = Field(default_factory=lambda: _int('events.batch_size', 200))
+    audit_spill_file: str = Field(default_factory=lambda: _get('audit.spill_file', 'data/audit/spill.jsonl'))
+    webhooks_workers: int = Field(default_factory=lambda: _int('webhooks.workers', 4))
+    webhooks_max_retries: int = Field(default_factory=lambda: _int('webhooks.max_retries', 3))
+    webhooks_timeout: int = Field(default_factory=lambda: _int('webhooks.timeout', 10))
+    webhooks_backoff_seconds: float = Field(default_factory=lambda: float(_get('webhooks.backoff_seconds', 2.0)))
+    webhooks_max_pending_per_endpoint: int = Field(default_factory=lambda: _int('webhooks.max_pending_per_endpoint', 1000))
+    webhooks_dead_letter_file: str = Field(default_factory=lambda: _get('webhooks.dead_letter_file', 'data/webhooks/dead_letter.jsonl'))
+    duckdb_engine_path: str = Field(default_factory=lambda: _get('duckdb.engine.path', ''))
+    duckdb_engine_memory_limit: str = Field(default_factory=lambda: _get('duckdb.engine.memory_limit', '1GB'))
+    duckdb_engine_threads: int = Field(default_factory=lambda: _int('duckdb.engine.threads', 0))
+    duckdb_engine_watch_interval: int = Field(default_factory=lambda: _int('duckdb.engine.watch_interval', 600))
+    duckdb_engine_temp_directory: str = Field(default_factory=lambda: _get('duckdb.engine.temp_directory', ''))
+    duckdb_engine_max_temp_directory_size: str = Field(default_factory=lambda: _get('duckdb.engine.max_temp_directory_size', ''))
+    duckdb_materialize_enabled: bool = Field(default_factory=lambda: _bool('duckdb.materialize.enabled', True))
+    duckdb_materialize_mode: str = Field(default_factory=lambda: _get('duckdb.materialize.mode', 'parquet'))
+    duckdb_materialize_cache_dir: str = Field(default_factory=lambda: _get('duckdb.materialize.cache_dir', ''))
+    duckdb_materialize_min_size_mb: float = Field(default_factory=lambda: float(_get('duckdb.materialize.min_size_mb', 0) or 0))
+    duckdb_materialize_row_group_size: int = Field(default_factory=lambda: _int('duckdb.materialize.row_group_size', 122880))
+    duckdb_guard_enabled: bool = Field(default_factory=lambda: _bool('duckdb.guard.enabled', True))
+    duckdb_guard_max_estimated_rows: int = Field(default_factory=lambda: _int('duckdb.guard.max_estimated_rows', 200000000))
+    duckdb_guard_timeout_seconds: float = Field(default_factory=lambda: float(_get('duckdb.guard.timeout_seconds', 30) or 0))
+    duckdb_guard_max_concurrent: int = Field(default_factory=lambda: _int('duckdb.guard.max_concurrent', 4))
+    duckdb_guard_slots_per_tenant: int = Field(default_factory=lambda: _int('duckdb.guard.slots_per_tenant', 2))
+    duckdb_guard_slot_wait_seconds: float = Field(default_factory=lambda: float(_get('duckdb.guard.slot_wait_seconds', 5) or 0))
+    olap_schema: str = Field(default_factory=lambda: _get('olap.schema', 'olap'))
+    olap_query_timeout_seconds: float = Field(default_factory=lambda: float(_get('olap.query_timeout_seconds', 120) or 0))
+    olap_cache_enabled: bool = Field(default_factory=lambda: _bool('olap.cache.enabled', True))
+    olap_cache_plan_max_mb: float = Field(default_factory=lambda: float(_get('olap.cache.plan_max_mb', 16) or 0))
+    olap_cache_result_max_mb: float = Field(default_factory=lambda: float(_get('olap.cache.result_max_mb', 256) or 0))
+    olap_cache_max_entry_mb: float = Field(default_factory=lambda: float(_get('olap.cache.max_entry_mb', 32) or 0))
+    timeseries_store_enabled: bool = Field(default_factory=lambda: _bool('timeseries.store.enabled', True))
+    timeseries_store_schema: str = Field(default_factory=lambda: _get('timeseries.store.schema', 'timeseries'))
+    timeseries_store_refresh_seconds: float = Field(default_factory=lambda: float(_get('timeseries.store.refresh_seconds', 21600) or 0))
+    timeseries_store_revision_window: int = Field(default_factory=lambda: _int('timeseries.store.revision_window', 3))
+    async_enabled: bool = Field(default_factory=lambda: _bool('async.enabled', True))
+    async_workers: int = Field(default_factory=lambda: _int('async.workers', 8))
+    async_queue_size: int = Field(default_factory=lambda: _int('async.queue_size', 1000))
+    async_task_ttl_hours: int = Field(default_factory=lambda: _int('async.task_ttl_hours', 24))
+    async_store_type: str = Field(default_factory=lambda: _get('async.store.type', 'sqlite'))
+    async_store_path: str = Field(default_factory=lambda: _get('async.store.path', 'data/async_tasks.db'))
+    async_store_dsn: str = Field(default_factory=lambda: _get('async.store.dsn', ''))
+    async_lease_seconds: float = Field(default_factory=lambda: float(_get('async.lease_seconds', 300) or 0))
+    async_max_attempts: int = Field(default_factory=lambda: _int('async.max_attempts', 3))
+    async_max_result_mb: float = Field(default_factory=lambda: float(_get('async.max_result_mb', 16) or 0))
+    async_poll_interval_ms: int = Field(default_factory=lambda: _int('async.poll_interval_ms', 500))
+    async_delivery_workers: int = Field(default_factory=lambda: _int('async.delivery.workers', 4))
+    async_delivery_max_in_flight_per_destination: int = Field(default_factory=lambda: _int('async.delivery.max_in_flight_per_destination', 2))
+    async_delivery_max_attempts: int = Field(default_factory=lambda: _int('async.delivery.retry.max_attempts', _int('async.delivery.webhook.max_retries', 3)))
+    async_delivery_retry_base_ms: int = Field(default_factory=lambda: _int('async.delivery.retry.base_ms', 1000))
+    async_delivery_retry_max_ms: int = Field(default_factory=lambda: _int('async.delivery.retry.max_ms', 60000))
+    async_webhook_timeout: int = Field(default_factory=lambda: _int('async.delivery.webhook.timeout', 10))
+    async_webhook_pool_size: int = Field(default_factory=lambda: _int('async.delivery.webhook.pool_size', 8))
+    async_kafka_bootstrap_servers: str = Field(default_factory=lambda: _get('async.delivery.kafka.bootstrap_servers', 'localhost:9092'))
+    async_kafka_linger_ms: int = Field(default_factory=lambda: _int('async.delivery.kafka.linger_ms', 50))
+    async_kafka_batch_size: int = Field(default_factory=lambda: _int('async.delivery.kafka.batch_size', 500))
+    async_file_base_dir: str = Field(default_factory=lambda: _get('async.delivery.file.base_dir', 'data/async_results'))
+    async_file_max_size_mb: float = Field(default_factory=lambda: float(_get('async.delivery.file.max_size_mb', 50) or 0))
+    async_file_rotate_mb: float = Field(default_factory=lambda: float(_get('async.delivery.file.rotate_mb', 256) or 0))
+    async_file_flush_ms: int = Field(default_factory=lambda: _int('async.delivery.file.flush_ms', 1000))
+    async_mcp_tasks_enabled: bool = Field(default_factory=lambda: _bool('async.mcp_tasks.enabled', True))
+    async_mcp_result_wait_seconds: float = Field(default_factory=lambda: float(_get('async.mcp_tasks.result_wait_seconds', 30) or 0))
+    async_mcp_poll_interval_ms: int = Field(default_factory=lambda: _int('async.mcp_tasks.poll_interval_ms', 1000))
+    composite_fanout_max_workers: int = Field(default_factory=lambda: _int('composite.fanout.max_workers', 32))
+    composite_fanout_per_provider: int = Field(default_factory=lambda: _int('composite.fanout.per_provider', 8))
+    composite_fanout_provider_limits: str = Field(default_factory=lambda: _get('composite.fanout.provider_limits', ''))
+    composite_fanout_failure_budget: int = Field(default_factory=lambda: _int('composite.fanout.failure_budget', -1))
     config_plugins_dir: str = Field(default_factory=lambda: _get('config.plugins.dir', 'config/plugins'))
     log_level: str = Field(default_factory=lambda: _get('logging.level', 'INFO'))
     log_dir: str = Field(default_factory=lambda: _get('logging.dir', './logs'))
@@ -247,12 +329,6 @@ class Settings(BaseSettings):
 def get_settings() -> Settings:
     return Settings()
 
-    # Async execution settings
-    async_enabled: bool = Field(default_factory=lambda: _bool('async.enabled', True))
-    async_workers: int = Field(default_factory=lambda: _int('async.workers', 8))
-    async_queue_size: int = Field(default_factory=lambda: _int('async.queue_size', 1000))
-    async_task_ttl_hours: int = Field(default_factory=lambda: _int('async.task_ttl_hours', 24))
-
     # Shell execution settings
     shell_enabled: bool = Field(default_factory=lambda: _bool('shell.enabled', False))
     shell_mode: str = Field(default_factory=lambda: _get('shell.mode', 'sandbox'))
@@ -3,7 +3,7 @@ import time
 import threading
 import queue
 from queue import Queue, Empty, Full
-from typing import Dict, Optional, Any, List, Tuple, Union, Callable
+from typing import Dict, Optional, Any, List, Set, Tuple, Union, Callable
 from dataclasses import dataclass, field
 from enum import Enum
 from contextlib import contextmanager
@@ -41,6 +41,13 @@ try:
 except ImportError:
     HAS_SQLITE = False
 
+try:
+    import duckdb
+
+    HAS_DUCKDB = True
+except ImportError:
+    HAS_DUCKDB = False
+
 try:
     import cx_Oracle
 
@@ -58,6 +65,7 @@ class DatabaseType(Enum):
     SQLSERVER = "sqlserver"
     SQLITE = "sqlite"
     ORACLE = "oracle"
+    DUCKDB = "duckdb"
 
 
 class ConnectionState(Enum):
@@ -91,6 +99,8 @@ class ConnectionWrapper:
     in_transaction: bool = False
     test_query: str = "SELECT 1"
     borrowed_by: Optional[threading.Thread] = None
+    # Server-side prepared statement names live as long as the session does
+    prepared_statements: Set[str] = field(default_factory=set)
 
     def update_last_used(self):
         """Update last used timestamp."""
@@ -172,7 +182,8 @@ class PoolStatistics:
         self.wait_time_total = 0.0
         self.wait_count = 0
         self.max_wait_time = 0.0
-        self._lock = threading.Lock()
+        # Reentrant: get_stats() calls get_average_wait_time() under the lock
+        self._lock = threading.RLock()
 
     def record_creation(self):
         with self._lock:
@@ -228,7 +239,7 @@ class DatabaseConnectionPool:
     Enterprise-grade database connection pool similar to Apache DBCP.
 
     Features:
-    - Multiple database support (PostgreSQL, MySQL, SQLite, Oracle, SQL Server)
+    - Multiple database support (PostgreSQL, MySQL, SQLite, Oracle, SQL Server, DuckDB)
     - Connection validation and health checking
     - Automatic eviction of bad/idle connections
     - Connection lifecycle management
@@ -295,6 +306,8 @@ class DatabaseConnectionPool:
             raise ImportError("SQLite support should be built-in")
         elif self.db_type == DatabaseType.ORACLE and not HAS_ORACLE:
             raise ImportError("Oracle support requires 'cx_Oracle' package")
+        elif self.db_type == DatabaseType.DUCKDB and not HAS_DUCKDB:
+            raise ImportError("DuckDB support requires 'duckdb' package")
 
     def _initialize_pool(self):
         """Initialize the connection pool with minimum connections."""
@@ -346,6 +359,10 @@ class DatabaseConnectionPool:
                 conn = cx_Oracle.connect(**self.connection_kwargs)
                 test_query = "SELECT 1 FROM DUAL"
 
+            elif self.db_type == DatabaseType.DUCKDB:
+                conn = duckdb.connect(**self.connection_kwargs)
+                test_query = "SELECT 1"
+
             else:
                 raise ValueError(f"Unsupported database type: {self.db_type}")
 
@@ -642,12 +659,10 @@ class DatabaseConnectionPool:
                     raise TimeoutError("Timeout waiting for connection")
 
                 try:
-                    wrapper = self._idle_connections.get(
-                        block=self.config.block_when_exhausted,
-                        timeout=remaining_timeout if self.config.block_when_exhausted else 0
-                    )
+                    wrapper = self._idle_connections.get_nowait()
                 except Empty:
-                    # Try to create a new connection if under max_total
+                    # Grow the pool before waiting so a burst does not sit out
+                    # the full timeout while capacity is still available
                     with self._lock:
                         if self._total_connections < self.config.max_total:
                             wrapper = self._create_connection()
@@ -655,7 +670,10 @@ class DatabaseConnectionPool:
                     if wrapper is None:
                         if not self.config.block_when_exhausted:
                             raise RuntimeError("No connections available")
-                        continue
+                        try:
+                            wrapper = self._idle_connections.get(timeout=remaining_timeout)
+                        except Empty:
+                            continue
 
                 # Validate connection if required
                 if wrapper and self.config.test_on_borrow:
@@ -41,6 +41,9 @@ class ConnectionConfig:
     connection_timeout: int = 10
     socket_timeout: int = 0
     application_name: Optional[str] = None
+    # PostgreSQL: a libpq connection string / URL passed to the driver as-is;
+    # when set it is the whole connection spec and the fields above are informational
+    dsn: Optional[str] = None
 
     def to_key(self) -> str:
         """Generate a unique key for this configuration."""
@@ -60,7 +63,9 @@ class ConnectionConfig:
             'ssl_key': self.ssl_key,
             'connection_timeout': self.connection_timeout,
             'socket_timeout': self.socket_timeout,
-            'application_name': self.application_name
+            'application_name': self.application_name,
+            # The DSN may carry a password: only its digest goes into the key
+            'dsn': hashlib.sha256(self.dsn.encode()).hexdigest() if self.dsn else None,
         }
 
         # Create a stable JSON representation
@@ -73,7 +78,10 @@ class ConnectionConfig:
         """Convert to kwargs suitable for database connection."""
         kwargs = {}
 
-        if self.db_type == DatabaseType.POSTGRESQL:
+        if self.db_type == DatabaseType.POSTGRESQL and self.dsn:
+            kwargs['dsn'] = self.dsn
+
+        elif self.db_type == DatabaseType.POSTGRESQL:
             if self.host:
                 kwargs['host'] = self.host
             if self.port:
@@ -123,6 +131,11 @@ class ConnectionConfig:
         elif self.db_type == DatabaseType.SQLITE:
             kwargs['database'] = self.database or ':memory:'
             kwargs['timeout'] = self.connection_timeout
+            # Pooled connections are handed to whichever thread borrows them
+            kwargs['check_same_thread'] = False
+
+        elif self.db_type == DatabaseType.DUCKDB:
+            kwargs['database'] = self.database or ':memory:'
 
         elif self.db_type == DatabaseType.SQLSERVER:
             # Build connection string for SQL Server
@@ -0,0 +1,407 @@
+"""
+SAJHA MCP Server v5.3.0 — Pooled, Parameter-Bound Query Execution
+Copyright All rights Reserved 2025-2030, Ashutosh Sinha
+
+Runtime used by the DB Query tools that MCP Studio generates. A query
+template such as
+
+    SELECT * FROM trades WHERE book = {{book}} AND trade_date >= '{{start}}'
+
+is compiled once into driver SQL with real bind markers (a quoted
+placeholder like '{{start}}' becomes a bind too), and every call borrows a
+connection from a named pool held by DBConnectionPoolManager instead of
+connecting and disconnecting around each query.
+
+Per backend:
+  postgresql — PREPARE once per pooled session, then EXECUTE with binds;
+               SELECT/WITH results are bounded server-side by max_rows
+  mysql      — unbuffered (server-side) cursor, driver-side binding
+  sqlite     — driver statement cache, rows stepped lazily via fetchmany
+  duckdb     — bound execute, rows pulled in fetch_size batches
+"""
+
+import hashlib
+import logging
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlparse, unquote
+
+from .db_connection_pool import DatabaseType, PoolConfig
+from .db_connection_pool_manager import ConnectionConfig, get_pool_manager
+
+logger = logging.getLogger(__name__)
+
+_PLACEHOLDER = re.compile(r"\{\{(\w+)\}\}")
+_QUOTED_PLACEHOLDER = re.compile(r"'\{\{(\w+)\}\}'")
+_DOLLAR_QUOTE = re.compile(r"\$(?:[A-Za-z_]\w*)?\$")
+_SELECT_HEAD = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class CompiledQuery:
+    """A query template split into literal SQL text and bind names."""
+    segments: Tuple[str, ...]     # len(names) + 1 literal pieces
+    names: Tuple[str, ...]        # placeholder name per bind position
+
+    @property
+    def distinct_names(self) -> Tuple[str, ...]:
+        return tuple(dict.fromkeys(self.names))
+
+    def render(self, paramstyle: str) -> str:
+        """
+        Render driver SQL. paramstyle is 'qmark' (?), 'format' (%s, with
+        literal % doubled) or 'numeric' ($1.. numbered by distinct name,
+        as PostgreSQL PREPARE expects).
+        """
+        if paramstyle == 'qmark':
+            markers = ['?'] * len(self.names)
+            segments = self.segments
+        elif paramstyle == 'format':
+            markers = ['%s'] * len(self.names)
+            segments = tuple(s.replace('%', '%%') for s in self.segments)
+        elif paramstyle == 'numeric':
+            position = {n: i + 1 for i, n in enumerate(self.distinct_names)}
+            markers = [f'${position[n]}' for n in self.names]
+            segments = self.segments
+        else:
+            raise ValueError(f"Unsupported paramstyle: {paramstyle}")
+
+        parts = [segments[0]]
+        for marker, segment in zip(markers, segments[1:]):
+            parts.append(marker)
+            parts.append(segment)
+        return ''.join(parts)
+
+    def bind(self, arguments: Dict[str, Any], paramstyle: str) -> List[Any]:
+        """Ordered bind values for the given paramstyle."""
+        names = self.distinct_names if paramstyle == 'numeric' else self.names
+        return [arguments.get(n) for n in names]
+
+
+def _opaque_span(sql: str, i: int) -> Tuple[int, str]:
+    """
+    (end, kind) of the comment, dollar-quoted string or quoted identifier
+    starting at i, or (i, '') when none does. Quotes inside these do not
+    open or close a string literal.
+    """
+    if sql.startswith('--', i):
+        end = sql.find('\n', i)
+        return (len(sql) if end < 0 else end), 'comment'
+    if sql.startswith('/*', i):
+        depth, j = 0, i                          # PostgreSQL block comments nest
+        while j < len(sql):
+            if sql.startswith('/*', j):
+                depth, j = depth + 1, j + 2
+            elif sql.startswith('*/', j):
+                depth, j = depth - 1, j + 2
+                if not depth:
+                    return j, 'comment'
+            else:
+                j += 1
+        return len(sql), 'comment'
+    if sql[i] == '"':
+        end = sql.find('"', i + 1)
+        return (len(sql) if end < 0 else end + 1), 'identifier'
+    if sql[i] == '$' and not (i and (sql[i - 1].isalnum() or sql[i - 1] == '_')):
+        tag = _DOLLAR_QUOTE.match(sql, i)
+        if tag:
+            end = sql.find(tag.group(), tag.end())
+            return (len(sql) if end < 0 else end + len(tag.group())), 'literal'
+    return i, ''
+
+
+def compile_query_template(template: str) -> CompiledQuery:
+    """
+    Compile a {{param}} template into bind positions.
+
+    '{{name}}' (a placeholder that is the whole of a quoted literal) is
+    treated as a bind. A placeholder embedded inside a longer literal such as
+    '%{{name}}%' (or in a $$dollar-quoted$$ string) cannot be bound and raises
+    ValueError; write it as '%' || {{name}} || '%' instead. Comments and
+    quoted identifiers are copied as they are: placeholders in a comment are
+    not bound, and an apostrophe in one (-- don't) does not start a literal.
+    """
+    segments: List[str] = []
+    names: List[str] = []
+    buf: List[str] = []
+    in_literal = False
+    i = 0
+    while i < len(template):
+        ch = template[i]
+        if ch == "'":
+            quoted = None if in_literal else _QUOTED_PLACEHOLDER.match(template, i)
+            if quoted:
+                segments.append(''.join(buf))
+                names.append(quoted.group(1))
+                buf = []
+                i = quoted.end()
+                continue
+            in_literal = not in_literal
+            buf.append(ch)
+            i += 1
+            continue
+        if not in_literal and ch in '-/"$':
+            end, kind = _opaque_span(template, i)
+            if end > i:
+                span = template[i:end]
+                embedded = _PLACEHOLDER.search(span) if kind == 'literal' else None
+                if embedded:
+                    raise ValueError(
+                        f"Placeholder '{{{{{embedded.group(1)}}}}}' is embedded in a dollar-quoted string; "
+                        f"use string concatenation so it can be bound")
+                buf.append(span)
+                i = end
+                continue
+        match = _PLACEHOLDER.match(template, i) if ch == '{' else None
+        if match:
+            if in_literal:
+                raise ValueError(
+                    f"Placeholder '{{{{{match.group(1)}}}}}' is embedded in a string literal; "
+                    f"use string concatenation so it can be bound")
+            segments.append(''.join(buf))
+            names.append(match.group(1))
+            buf = []
+            i = match.end()
+            continue
+        buf.append(ch)
+        i += 1
+    segments.append(''.join(buf))
+    return CompiledQuery(segments=tuple(segments), names=tuple(names))
+
+
+_LIBPQ_PAIR = re.compile(r"\s*(\w+)\s*=\s*(?:'((?:[^'\\]|\\.)*)'|((?:[^\s'\\]|\\.)*))")
+
+
+def parse_libpq_dsn(dsn: str) -> Dict[str, str]:
+    """
+    Every key of a libpq connection string — 'key=value' pairs (values may be
+    single-quoted, with backslash escapes) or a postgresql:// URL whose query
+    parameters are keys too. Uses psycopg2's own parser when it is installed.
+    """
+    try:
+        from psycopg2.extensions import parse_dsn
+        return parse_dsn(dsn)
+    except ImportError:
+        pass
+    if '://' in dsn:
+        url = urlparse(dsn)
+        params = {'host': url.hostname, 'port': str(url.port) if url.port else None,
+                  'dbname': unquote(url.path.lstrip('/')) or None,
+                  'user': unquote(url.username) if url.username else None,
+                  'password': unquote(url.password) if url.password else None}
+        params.update(parse_qsl(url.query))
+        return {k: v for k, v in params.items() if v is not None}
+    params, i = {}, 0
+    while dsn[i:].strip():
+        pair = _LIBPQ_PAIR.match(dsn, i)
+        if not pair or pair.end() == i:
+            raise ValueError(f"Invalid connection string near: {dsn[i:i + 20]!r}")
+        value = pair.group(2) if pair.group(2) is not None else pair.group(3)
+        params[pair.group(1)] = re.sub(r'\\(.)', r'\1', value)
+        i = pair.end()
+    return params
+
+
+def parse_connection_string(db_type: str, connection_string: str) -> ConnectionConfig:
+    """
+    Build a ConnectionConfig from the connection strings Studio accepts:
+    file paths for sqlite/duckdb, a URL or libpq 'key=value' DSN for
+    postgresql, and a URL or 'host=..;database=..' list for mysql.
+
+    A PostgreSQL DSN is handed to the driver whole (ConnectionConfig.dsn), so
+    quoting, options, connect_timeout, sslrootcert and URL query parameters
+    all reach libpq; the other fields are filled in for display and pool keys.
+    """
+    kind = DatabaseType(db_type)
+    if kind in (DatabaseType.SQLITE, DatabaseType.DUCKDB):
+        path = connection_string
+        for prefix in ('sqlite:///', 'duckdb:///'):
+            if path.startswith(prefix):
+                path = path[len(prefix):]
+        return ConnectionConfig(db_type=kind, database=path or ':memory:')
+
+    if kind == DatabaseType.POSTGRESQL:
+        params = parse_libpq_dsn(connection_string)
+        return ConnectionConfig(
+            db_type=kind,
+            dsn=connection_string,
+            host=params.get('host') or 'localhost',
+            port=int(params['port']) if str(params.get('port') or '').isdigit() else None,
+            database=params.get('dbname'),
+            user=params.get('user'),
+            ssl=params.get('sslmode') in ('require', 'verify-ca', 'verify-full'),
+            application_name=params.get('application_name'),
+        )
+
+    if '://' in connection_string:
+        url = urlparse(connection_string)
+        params = {
+            'host': url.hostname,
+            'port': url.port,
+            'database': url.path.lstrip('/') or None,
+            'user': unquote(url.username) if url.username else None,
+            'password': unquote(url.password) if url.password else None,
+        }
+    else:
+        params = {}
+        for item in connection_string.split(';'):
+            if '=' in item:
+                key, value = item.split('=', 1)
+                params[key.strip().lower()] = value.strip()
+        if 'dbname' in params:
+            params['database'] = params.pop('dbname')
+
+    return ConnectionConfig(
+        db_type=kind,
+        host=params.get('host') or 'localhost',
+        port=int(params['port']) if params.get('port') else None,
+        database=params.get('database'),
+        user=params.get('user'),
+        password=params.get('password'),
+        ssl=params.get('sslmode') in ('require', 'verify-ca', 'verify-full'),
+        application_name=params.get('application_name'),
+    )
+
+
+class PooledQueryExecutor:
+    """
+    Executes one compiled query template against a named connection pool.
+
+    Instances are created once per generated tool and are safe to share
+    between threads; each call borrows its own pooled connection.
+    """
+
+    def __init__(self,
+                 db_type: str,
+                 connection_string: str,
+                 query_template: str,
+                 pool_name: Optional[str] = None,
+                 max_rows: int = 1000,
+                 fetch_size: int = 500,
+                 timeout: int = 30,
+                 pool_size: int = 10):
+        self.db_type = DatabaseType(db_type)
+        self.connection_config = parse_connection_string(db_type, connection_string)
+        self.compiled = compile_query_template(query_template)
+        self.max_rows = max(1, int(max_rows))
+        self.fetch_size = max(1, int(fetch_size))
+        self.timeout = timeout
+        self.pool_name = pool_name or (
+            f"dbquery_{db_type}_" + hashlib.sha1(connection_string.encode()).hexdigest()[:12])
+        self.pool_config = PoolConfig(
+            min_idle=1,
+            max_idle=pool_size,
+            max_total=pool_size,
+            # Broken connections are invalidated on error instead of paying
+            # a validation round trip on every borrow
+            test_on_borrow=False,
+            test_while_idle=True,
+            max_wait_time=timeout,
+            time_between_eviction_runs=60,
+        )
+
+        if self.db_type == DatabaseType.POSTGRESQL:
+            sql = self.compiled.render('numeric').strip().rstrip(';')
+            if _SELECT_HEAD.match(sql):
+                sql = f"SELECT * FROM ({sql}) AS _sajha_q LIMIT {self.max_rows + 1}"
+            self._sql = sql
+            self._statement = 'sajha_' + hashlib.sha1(sql.encode()).hexdigest()[:16]
+            self._paramstyle = 'numeric'
+        elif self.db_type == DatabaseType.MYSQL:
+            self._sql = self.compiled.render('format')
+            self._paramstyle = 'format'
+        else:
+            self._sql = self.compiled.render('qmark')
+            self._paramstyle = 'qmark'
+
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def _get_pool(self):
+        pool = self._pool
+        if pool is None or getattr(pool, '_closed', False):
+            with self._pool_lock:
+                pool = self._pool
+                if pool is None or getattr(pool, '_closed', False):
+                    pool = get_pool_manager().get_pool_by_name(
+                        self.pool_name, self.connection_config, self.pool_config)
+                    self._pool = pool
+        return pool
+
+    def execute(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run the query with the given arguments bound.
+
+        Returns:
+            Dict with 'columns', 'rows' (list of dicts, at most max_rows)
+            and 'truncated'
+        """
+        params = self.compiled.bind(arguments, self._paramstyle)
+        pool = self._get_pool()
+        wrapper = pool.borrow_connection(self.timeout)
+        try:
+            columns, rows, reusable = self._run(wrapper, params)
+        except Exception:
+            pool.invalidate_connection(wrapper)
+            raise
+
+        if reusable:
+            pool.return_connection(wrapper)
+        else:
+            # An unbuffered MySQL cursor would have to drain the rest of the
+            # result before the session is reusable; dropping it is cheaper
+            pool.invalidate_connection(wrapper)
+
+        truncated = len(rows) > self.max_rows
+        return {
+            'columns': columns,
+            'rows': rows[:self.max_rows],
+            'truncated': truncated,
+        }
+
+    def _run(self, wrapper, params: List[Any]) -> Tuple[List[str], List[Dict[str, Any]], bool]:
+        """Execute on a borrowed connection; the flag says whether it can be reused."""
+        conn = wrapper.connection
+
+        if self.db_type == DatabaseType.POSTGRESQL:
+            cursor = conn.cursor()
+            if self._statement not in wrapper.prepared_statements:
+                cursor.execute(f"PREPARE {self._statement} AS {self._sql}")
+                wrapper.prepared_statements.add(self._statement)
+            args = f" ({', '.join(['%s'] * len(params))})" if params else ""
+            cursor.execute(
+                f"SET LOCAL statement_timeout = {int(self.timeout * 1000)}; "
+                f"EXECUTE {self._statement}{args}", params)
+        elif self.db_type == DatabaseType.MYSQL:
+            import pymysql.cursors
+            cursor = conn.cursor(pymysql.cursors.SSCursor)
+            cursor.execute(self._sql, params)
+        else:
+            cursor = conn.cursor()
+            cursor.execute(self._sql, params)
+
+        columns = [d[0] for d in cursor.description] if cursor.description else []
+        rows: List[Dict[str, Any]] = []
+        exhausted = not columns
+        limit = self.max_rows + 1
+        while not exhausted and len(rows) < limit:
+            batch = cursor.fetchmany(min(self.fetch_size, limit - len(rows)))
+            if not batch:
+                exhausted = True
+                break
+            rows.extend(dict(zip(columns, row)) for row in batch)
+
+        reusable = True
+        if self.db_type == DatabaseType.MYSQL:
+            reusable = exhausted
+            if exhausted:
+                cursor.close()
+                conn.rollback()
+        else:
+            cursor.close()
+            if self.db_type == DatabaseType.POSTGRESQL:
+                # End the read snapshot; prepared statements outlive it
+                conn.rollback()
+        return columns, rows, reusable
@@ -0,0 +1,490 @@
+"""
+SAJHA MCP Server v5.3.0 — Shared DuckDB Engine
+Copyright All rights Reserved 2025-2030, Ashutosh Sinha
+
+One process-wide DuckDB database for every DuckDB-backed tool. Before this,
+each DuckDbBaseTool opened its own connection and started its own refresh
+thread, and each SqlSelect tool created a private ':memory:' database with
+the same CSV views registered again — one catalog, thread and buffer pool
+per tool instance.
+
+The engine owns:
+  - the database (memory_limit / threads applied once, so memory stays
+    bounded no matter how many tools are registered)
+  - a single view catalog, keyed by (schema, view) — registering the same
+    file under the same name again is a no-op, so N tools cost one view
+  - cheap per-thread cursors (conn.cursor()) for query execution
+  - one watcher thread that rescans every registered data directory
+  - columnar copies of CSV/TSV sources (sajha.core.duckdb_materialize),
+    which the views read instead of re-parsing the text on every query
+
+Config (config/application.yml):
+  duckdb:
+    engine:
+      path: ""                # Database file ("" = <data.duckdb.dir>/duckdb_analytics.db)
+      memory_limit: 1GB       # DuckDB buffer pool cap ("" = DuckDB default)
+      threads: 0              # DuckDB worker threads (0 = DuckDB default)
+      watch_interval: 600     # Seconds between data-directory rescans
+      temp_directory: ""      # Spill directory ("" = <data.duckdb.dir>/.spill)
+      max_temp_directory_size: ""   # Spill cap ("" = DuckDB default, 90% of free disk)
+"""
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import duckdb
+
+from sajha.core.duckdb_materialize import ColumnarMaterializer
+
+logger = logging.getLogger(__name__)
+
+# read_csv_auto options for views over data-directory CSV/TSV files
+DEFAULT_CSV_OPTIONS = "header=true, auto_detect=true, sample_size=-1"
+
+SUPPORTED_EXTENSIONS = {
+    'csv': ['.csv'],
+    'parquet': ['.parquet', '.pq'],
+    'json': ['.json', '.jsonl'],
+    'tsv': ['.tsv'],
+}
+
+
+def view_name_for(filename: str) -> str:
+    """View name for a data file: extension dropped, non-identifier chars → '_'."""
+    stem = os.path.splitext(filename)[0]
+    return ''.join(c if c.isalnum() or c == '_' else '_' for c in stem)
+
+
+def scan_directory(directory: str, file_type: str = 'all') -> List[Dict]:
+    """List supported data files in a directory as {filename, file_type, file_path}."""
+    if file_type != 'all':
+        wanted = {file_type: SUPPORTED_EXTENSIONS.get(file_type, [])}
+    else:
+        wanted = SUPPORTED_EXTENSIONS
+
+    files = []
+    if not os.path.isdir(directory):
+        return files
+    for filename in sorted(os.listdir(directory)):
+        if filename.startswith('.') or filename.endswith('.db'):
+            continue
+        ext = os.path.splitext(filename)[1].lower()
+        ftype = next((t for t, exts in wanted.items() if ext in exts), None)
+        if ftype:
+            files.append({
+                'filename': filename,
+                'file_type': ftype,
+                'file_path': os.path.join(directory, filename),
+            })
+    return files
+
+
+def _source_sql(file_path: str, file_type: str, options: str = '') -> str:
+    """Table function reading a data file (options are appended verbatim)."""
+    path = file_path.replace("'", "''")
+    extra = f", {options}" if options else ''
+    if file_type == 'csv':
+        return f"read_csv_auto('{path}'{extra})"
+    if file_type == 'tsv':
+        return f"read_csv_auto('{path}', delim='\\t'{extra})"
+    if file_type == 'parquet':
+        return f"read_parquet('{path}'{extra})"
+    if file_type == 'json':
+        return f"read_json_auto('{path}'{extra})"
+    raise ValueError(f"Unsupported file type: {file_type}")
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+class DuckDBEngine:
+    """Process-wide DuckDB database with a shared view catalog and per-thread cursors."""
+
+    def __init__(self, database: str = ':memory:', memory_limit: str = '',
+                 threads: int = 0, watch_interval: int = 600,
+                 materializer: Optional[ColumnarMaterializer] = None,
+                 temp_directory: str = '', max_temp_directory_size: str = ''):
+        self.database = database
+        self.materializer = materializer
+        self.memory_limit = memory_limit
+        self.threads = threads
+        # Blocking operators that outgrow memory_limit spill here instead of failing
+        self.temp_directory = temp_directory
+        self.max_temp_directory_size = max_temp_directory_size
+        self.watch_interval = max(1, int(watch_interval or 600))
+
+        self._conn: Optional[duckdb.DuckDBPyConnection] = None
+        self._generation = 0
+        self._local = threading.local()
+        self._lock = threading.RLock()
+
+        # (schema, view) → {'file_path', 'file_type', 'options', 'sort_keys', 'source', 'mtime', 'size'}
+        self._views: Dict[tuple, Dict[str, Any]] = {}
+        # directory → {'schema', 'csv_options', 'sort_keys', 'interval', 'next_scan', 'files': {filename: view}}
+        self._directories: Dict[str, Dict[str, Any]] = {}
+
+        self._sync_lock = threading.Lock()   # one directory sync at a time; not held by queries
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._cursors_opened = 0
+        self._registrations_skipped = 0
+
+    # ── Connections ─────────────────────────────────────────────────────────
+
+    def _root(self) -> duckdb.DuckDBPyConnection:
+        if self._conn is None:
+            with self._lock:
+                if self._conn is None:
+                    if self.database != ':memory:':
+                        os.makedirs(os.path.dirname(os.path.abspath(self.database)), exist_ok=True)
+                    conn = duckdb.connect(self.database)
+                    conn.execute("SET enable_object_cache=true")
+                    if self.memory_limit:
+                        conn.execute(f"SET memory_limit='{self.memory_limit}'")
+                    if self.threads and self.threads > 0:
+                        conn.execute(f"SET threads={int(self.threads)}")
+                    if self.temp_directory:
+                        os.makedirs(self.temp_directory, exist_ok=True)
+                        conn.execute(f"SET temp_directory='{self.temp_directory}'")
+                    if self.max_temp_directory_size:
+                        conn.execute(f"SET max_temp_directory_size='{self.max_temp_directory_size}'")
+                    self._conn = conn
+                    self._generation += 1
+                    logger.info(f"DuckDB engine opened {self.database} "
+                                f"(memory_limit={self.memory_limit or 'default'}, "
+                                f"threads={self.threads or 'default'})")
+        return self._conn
+
+    def cursor(self, schema: str = 'main') -> duckdb.DuckDBPyConnection:
+        """Cursor for the calling thread, with `schema` as its default schema.
+
+        Cursors share the database and catalog with every other cursor; they
+        are created once per (thread, schema) and reused for later calls.
+        """
+        root = self._root()
+        cursors = getattr(self._local, 'cursors', None)
+        if cursors is None or getattr(self._local, 'generation', None) != self._generation:
+            cursors = self._local.cursors = {}
+            self._local.generation = self._generation
+        cur = cursors.get(schema)
+        if cur is None:
+            with self._lock:
+                self._ensure_schema(schema)
+                cur = root.cursor()
+                self._cursors_opened += 1
+            if schema != 'main':
+                cur.execute(f"SET schema={_quote(schema)}")
+            cursors[schema] = cur
+        return cur
+
+    def connection(self, schema: str = 'main') -> 'ThreadCursor':
+        """Connection-like handle for objects that keep a `conn` attribute (see ThreadCursor)."""
+        return ThreadCursor(self, schema)
+
+    def execute(self, sql: str, params: Optional[list] = None, schema: str = 'main'):
+        """Run a statement on the calling thread's cursor."""
+        cur = self.cursor(schema)
+        return cur.execute(sql, params) if params is not None else cur.execute(sql)
+
+    def _ensure_schema(self, schema: str):
+        if schema != 'main':
+            self._root().execute(f"CREATE SCHEMA IF NOT EXISTS {_quote(schema)}")
+
+    # ── View catalog ────────────────────────────────────────────────────────
+
+    def register_view(self, view_name: str, file_path: str, file_type: str,
+                      schema: str = 'main', options: str = '',
+                      sort_keys: Optional[List[str]] = None) -> bool:
+        """Create or replace a view over a data file.
+
+        CSV/TSV sources are served from their columnar copy when
+        materialization is enabled (sort_keys order that copy). Returns False
+        (and does nothing) when the same file is already registered under
+        this name and has not changed on disk.
+        """
+        file_path = os.path.abspath(file_path)
+        sort_keys = list(sort_keys or [])
+        stat = os.stat(file_path)
+        key = (schema, view_name)
+        with self._lock:
+            current = self._views.get(key)
+            if (current and current['file_path'] == file_path and current['file_type'] == file_type
+                    and current['options'] == options and current['sort_keys'] == sort_keys
+                    and current['mtime'] == stat.st_mtime and current['size'] == stat.st_size):
+                self._registrations_skipped += 1
+                return False
+            if current and current['file_path'] != file_path:
+                logger.warning(f"DuckDB view {schema}.{view_name} re-pointed from "
+                               f"{current['file_path']} to {file_path}")
+            self._ensure_schema(schema)
+        # The columnar copy is built without the lock; only the view swap takes it
+        source = self.source_for(file_path, file_type, options, sort_keys)
+        with self._lock:
+            self._root().execute(
+                f"CREATE OR REPLACE VIEW {_quote(schema)}.{_quote(view_name)} AS SELECT * FROM {source}")
+            self._views[key] = {
+                'file_path': file_path, 'file_type': file_type, 'options': options,
+                'sort_keys': sort_keys, 'source': source,
+                'mtime': stat.st_mtime, 'size': stat.st_size,
+            }
+        return True
+
+    def source_for(self, file_path: str, file_type: str = 'csv', options: str = '',
+                   sort_keys: Optional[List[str]] = None) -> str:
+        """FROM-clause expression for a data file — its columnar copy when there is one.
+
+        Falls back to reading the raw file if materialization is disabled,
+        not applicable, or fails.
+        """
+        raw = _source_sql(os.path.abspath(file_path), file_type, options)
+        if self.materializer is None or not self.materializer.applies_to(file_path, file_type):
+            return raw
+        # Converted on a cursor of its own, outside the engine lock: parsing a large CSV
+        # must not hold up queries, new cursors or other registrations
+        with self._lock:
+            cur = self._root().cursor()
+        try:
+            return self.materializer.materialize(cur, file_path, raw, sort_keys)
+        except Exception as e:
+            logger.error(f"Columnar materialization failed for {file_path}, "
+                         f"querying the raw file: {e}", exc_info=True)
+            return raw
+        finally:
+            cur.close()
+
+    def drop_view(self, view_name: str, schema: str = 'main'):
+        with self._lock:
+            self._root().execute(f"DROP VIEW IF EXISTS {_quote(schema)}.{_quote(view_name)}")
+            dropped = self._views.pop((schema, view_name), None)
+            if dropped and self.materializer is not None and not os.path.exists(dropped['file_path']) \
+                    and all(v['file_path'] != dropped['file_path'] for v in self._views.values()):
+                self.materializer.evict(self._root(), dropped['file_path'])
+
+    def views(self, schema: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Registered views as {'schema.view': source info}."""
+        with self._lock:
+            return {f"{s}.{v}": dict(info) for (s, v), info in self._views.items()
+                    if schema is None or s == schema}
+
+    # ── Data directories ────────────────────────────────────────────────────
+
+    def register_directory(self, directory: str, schema: str = 'main', csv_options: str = '',
+                           interval: Optional[int] = None, watch: bool = True,
+                           sort_keys: Optional[Dict[str, List[str]]] = None) -> Dict[str, List[str]]:
+        """Expose every data file in `directory` as a view and keep it in sync.
+
+        sort_keys maps view names to the columns their columnar copy is
+        ordered by. Registering a directory that is already known with the
+        same schema, csv_options and sort_keys only lowers its scan interval
+        if a shorter one is requested; the initial sync runs once. Different
+        ones replace the old: the views move to the new schema, or are
+        rebuilt with the new options.
+        """
+        directory = os.path.abspath(directory)
+        interval = max(1, int(interval or self.watch_interval))
+        sort_keys = dict(sort_keys or {})
+        with self._lock:
+            entry = self._directories.get(directory)
+            if entry is None:
+                self._directories[directory] = {
+                    'schema': schema, 'csv_options': csv_options, 'interval': interval, 'watch': watch,
+                    'sort_keys': sort_keys, 'next_scan': time.monotonic() + interval, 'files': {},
+                }
+            else:
+                if watch:
+                    entry['watch'] = True
+                    entry['interval'] = min(entry['interval'], interval)
+                if (entry['schema'], entry['csv_options'], entry['sort_keys']) == (schema, csv_options, sort_keys):
+                    return {'added': [], 'removed': [], 'reloaded': []}
+        removed = []
+        if entry is not None:
+            logger.warning(f"DuckDB directory {directory} re-registered with a different schema, "
+                           f"csv_options or sort_keys; its views are rebuilt")
+            with self._sync_lock:                       # not while a scan is using the old settings
+                with self._lock:
+                    old_schema, moved = entry['schema'], {}
+                    if old_schema != schema:
+                        moved, entry['files'] = entry['files'], {}
+                    entry.update(schema=schema, csv_options=csv_options, sort_keys=sort_keys)
+                for view in moved.values():
+                    self.drop_view(view, old_schema)
+                    removed.append(f"{old_schema}.{view}")
+        changes = self.sync_directory(directory)
+        changes['removed'].extend(removed)
+        if watch:
+            self._ensure_watcher()
+        return changes
+
+    def sync_directory(self, directory: str) -> Dict[str, List[str]]:
+        """Add views for new files, drop views for deleted ones, reload modified ones.
+
+        The engine lock is taken per view swap, not for the whole scan, so
+        queries keep running while new or changed CSVs are materialized.
+        """
+        directory = os.path.abspath(directory)
+        changes = {'added': [], 'removed': [], 'reloaded': []}
+        with self._sync_lock:
+            with self._lock:
+                entry = self._directories.get(directory)
+                if entry is None:
+                    return changes
+                schema, csv_options, tracked = entry['schema'], entry['csv_options'], entry['files']
+                sort_keys = entry['sort_keys']
+            current = {f['filename']: f for f in scan_directory(directory)}
+
+            for filename in set(tracked) - set(current):
+                view = tracked.pop(filename)
+                try:
+                    self.drop_view(view, schema)
+                    changes['removed'].append(view)
+                except Exception as e:
+                    logger.error(f"Failed to remove view for {filename}: {e}", exc_info=True)
+
+            for filename, info in current.items():
+                view = tracked.get(filename) or view_name_for(filename)
+                existed = filename in tracked
+                options = csv_options if info['file_type'] in ('csv', 'tsv') else ''
+                try:
+                    if self.register_view(view, info['file_path'], info['file_type'], schema, options,
+                                          sort_keys.get(view)):
+                        changes['reloaded' if existed else 'added'].append(view)
+                    tracked[filename] = view
+                except Exception as e:
+                    logger.error(f"Failed to create view for {filename}: {e}", exc_info=True)
+            with self._lock:
+                entry['next_scan'] = time.monotonic() + entry['interval']
+
+        if any(changes.values()):
+            logger.info(f"DuckDB catalog sync {directory}: +{len(changes['added'])} "
+                        f"-{len(changes['removed'])} ~{len(changes['reloaded'])}")
+        return changes
+
+    def sync_all(self) -> Dict[str, Dict[str, List[str]]]:
+        with self._lock:
+            directories = list(self._directories)
+        return {d: self.sync_directory(d) for d in directories}
+
+    def _ensure_watcher(self):
+        with self._lock:
+            if self._watcher is not None and self._watcher.is_alive():
+                return
+            self._stop.clear()
+            self._watcher = threading.Thread(target=self._watch, name='duckdb-watcher', daemon=True)
+            self._watcher.start()
+
+    def _watch(self):
+        while not self._stop.is_set():
+            with self._lock:
+                due = [d for d, e in self._directories.items()
+                       if e['watch'] and e['next_scan'] <= time.monotonic()]
+                upcoming = [e['next_scan'] for e in self._directories.values() if e['watch']]
+            for directory in due:
+                try:
+                    self.sync_directory(directory)
+                except Exception as e:
+                    logger.error(f"DuckDB watcher failed on {directory}: {e}", exc_info=True)
+            wait = min(upcoming, default=time.monotonic() + self.watch_interval) - time.monotonic()
+            self._stop.wait(min(max(wait, 0.05), self.watch_interval))
+
+    # ── Lifecycle ───────────────────────────────────────────────────────────
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'database': self.database,
+                'memory_limit': self.memory_limit or None,
+                'threads': self.threads or None,
+                'temp_directory': self.temp_directory or None,
+                'max_temp_directory_size': self.max_temp_directory_size or None,
+                'views': len(self._views),
+                'directories': len(self._directories),
+                'cursors_opened': self._cursors_opened,
+                'registrations_skipped': self._registrations_skipped,
+                'watcher_alive': bool(self._watcher and self._watcher.is_alive()),
+                'materialization': self.materializer.stats() if self.materializer else None,
+            }
+
+    def close(self):
+        """Stop the watcher and close the database. Cursors are reopened lazily."""
+        self._stop.set()
+        if self._watcher:
+            self._watcher.join(timeout=5)
+            self._watcher = None
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._conn.close()
+                except Exception as e:
+                    logger.warning(f"DuckDB engine close failed: {e}")
+                self._conn = None
+            self._views.clear()
+            self._directories.clear()
+
+
+class ThreadCursor:
+    """Stands in for a DuckDB connection; every call runs on the calling thread's engine cursor.
+
+    Long-lived helpers built around a single `conn` (the OLAP engines, the
+    sample data generator) can be shared across request threads without
+    two threads ever driving the same DuckDB connection.
+    """
+
+    def __init__(self, engine: DuckDBEngine, schema: str = 'main'):
+        self.engine = engine
+        self.schema = schema
+
+    def current(self) -> duckdb.DuckDBPyConnection:
+        """The calling thread's cursor (e.g. to interrupt() it from another thread)."""
+        return self.engine.cursor(self.schema)
+
+    def __getattr__(self, name):
+        return getattr(self.engine.cursor(self.schema), name)
+
+
+# Module singleton
+_engine: Optional[DuckDBEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_duckdb_engine() -> DuckDBEngine:
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                path, memory_limit, threads, interval = '', '1GB', 0, 600
+                temp_directory, max_temp_directory_size = '', ''
+                data_dir = './data/duckdb'
+                materialize, mode, cache_dir, min_size_mb, row_group_size = True, 'parquet', '', 0, 122880
+                try:
+                    from sajha.core.config import get_settings
+                    s = get_settings()
+                    data_dir = getattr(s, 'data_duckdb_dir', data_dir)
+                    path = getattr(s, 'duckdb_engine_path', path)
+                    memory_limit = getattr(s, 'duckdb_engine_memory_limit', memory_limit)
+                    threads = getattr(s, 'duckdb_engine_threads', threads)
+                    interval = getattr(s, 'duckdb_engine_watch_interval', interval)
+                    temp_directory = getattr(s, 'duckdb_engine_temp_directory', temp_directory)
+                    max_temp_directory_size = getattr(s, 'duckdb_engine_max_temp_directory_size',
+                                                      max_temp_directory_size)
+                    materialize = getattr(s, 'duckdb_materialize_enabled', materialize)
+                    mode = getattr(s, 'duckdb_materialize_mode', mode)
+                    cache_dir = getattr(s, 'duckdb_materialize_cache_dir', cache_dir)
+                    min_size_mb = getattr(s, 'duckdb_materialize_min_size_mb', min_size_mb)
+                    row_group_size = getattr(s, 'duckdb_materialize_row_group_size', row_group_size)
+                except Exception:
+                    pass
+                materializer = None
+                if materialize:
+                    materializer = ColumnarMaterializer(
+                        cache_dir or os.path.join(data_dir, '.columnar'), mode=mode,
+                        min_size_mb=min_size_mb, row_group_size=row_group_size)
+                _engine = DuckDBEngine(
+                    database=path or os.path.join(data_dir, 'duckdb_analytics.db'),
+                    memory_limit=memory_limit, threads=threads, watch_interval=interval,
+                    materializer=materializer,
+                    temp_directory=temp_directory or os.path.join(data_dir, '.spill'),
+                    max_temp_directory_size=max_temp_directory_size)
+    return _engine
@@ -0,0 +1,437 @@
+"""
+SAJHA MCP Server v5.3.0 — DuckDB Query Guard
+Copyright All rights Reserved 2025-2030, Ashutosh Sinha
+
+Admission control for agent-written SQL on the shared DuckDB engine
+(sajha.core.duckdb_engine). Appending a LIMIT does not stop a cross join or
+a wide GROUP BY from filling the buffer pool or running for minutes, and
+every tool shares that one database. Before a raw-SQL tool runs a query
+the guard:
+
+  1. rewrites it to `SELECT * FROM (<sql>) LIMIT n`, which caps the result
+     even when the text already contains a LIMIT somewhere in a subquery,
+     and lets DuckDB turn ORDER BY + LIMIT into a top-N
+  2. runs EXPLAIN on the rewritten query and walks the physical plan for
+     the largest intermediate cardinality. Operators that stream into the
+     final LIMIT are capped by it; blocking operators (aggregates, sorts,
+     join build sides) count in full. CROSS_PRODUCT nodes carry no
+     estimate and are costed as the product of their inputs
+  3. rejects the query when that estimate exceeds max_estimated_rows
+  4. takes a slot — at most slots_per_tenant queries per tenant and
+     max_concurrent overall — waiting up to slot_wait_seconds. The tenant
+     is the authenticated user of the call, set server-side by whoever
+     runs the tool (see tenant_scope); tool arguments cannot choose it
+  5. runs it with a deadline; at timeout_seconds the cursor is
+     interrupted, which aborts the query and frees its memory
+
+DuckDB's memory_limit is database-wide, not per query, so per-query
+memory is bounded by the slots instead: at most max_concurrent queries
+share the buffer pool, and blocking operators that outgrow their share
+spill to the engine's temp_directory (capped by max_temp_directory_size)
+rather than failing or evicting other queries' data.
+
+Each result carries a `resources` block: elapsed and slot-wait time, the
+plan estimate, and — when DuckDB exposes profiling — peak buffer memory,
+spilled bytes, CPU time and rows scanned.
+
+Config (config/application.yml):
+  duckdb:
+    guard:
+      enabled: true
+      max_estimated_rows: 200000000   # Reject plans with a larger intermediate (0 = no limit)
+      timeout_seconds: 30             # Interrupt after this long (0 = no deadline)
+      max_concurrent: 4               # Guarded queries running at once
+      slots_per_tenant: 2             # ... of which one tenant may hold
+      slot_wait_seconds: 5            # Queue this long for a slot, then reject
+"""
+import json
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import duckdb
+
+logger = logging.getLogger(__name__)
+
+# Operators whose output is produced as their (first) input streams through;
+# under a LIMIT they stop as soon as the limit is satisfied
+STREAMING_OPERATORS = {
+    'PROJECTION', 'FILTER', 'STREAMING_LIMIT', 'LIMIT', 'STREAMING_WINDOW', 'UNNEST',
+    'CROSS_PRODUCT', 'HASH_JOIN', 'NESTED_LOOP_JOIN', 'PIECEWISE_MERGE_JOIN',
+    'BLOCKWISE_NL_JOIN', 'POSITIONAL_JOIN', 'UNION', 'TABLE_SCAN', 'SEQ_SCAN',
+    'READ_CSV_AUTO', 'READ_PARQUET', 'READ_JSON', 'COLUMN_DATA_SCAN', 'DUMMY_SCAN',
+    'EMPTY_RESULT', 'CHUNK_SCAN', 'DELIM_SCAN', 'CTE_SCAN',
+}
+# TOP_N is not one of them: it keeps n rows but has to consume its whole input
+LIMIT_OPERATORS = {'LIMIT', 'STREAMING_LIMIT', 'LIMIT_PERCENT'}
+# Operators that pass their input through; DuckDB reports 0 or nothing for them
+PASS_THROUGH_OPERATORS = {'PROJECTION'} | LIMIT_OPERATORS
+CROSS_OPERATORS = {'CROSS_PRODUCT', 'BLOCKWISE_NL_JOIN', 'NESTED_LOOP_JOIN'}
+
+# Statements that return rows and can be wrapped in SELECT * FROM (...)
+_WRAPPABLE = ('SELECT', 'WITH', 'FROM', 'VALUES', 'TABLE')
+
+_COMMENTS_RE = re.compile(r'/\*.*?\*/|--[^\n]*', re.DOTALL)
+
+# Profiling metrics copied into the resources block (DuckDB name → reported name)
+_PROFILE_METRICS = {
+    'system_peak_buffer_memory': 'peak_buffer_memory_bytes',
+    'system_peak_temp_dir_size': 'spilled_bytes',
+    'cpu_time': 'cpu_time_ms',
+    'cumulative_rows_scanned': 'rows_scanned',
+    'result_set_size': 'result_bytes',
+}
+
+
+class QueryRejected(Exception):
+    """A query the guard refused to run (or stopped).
+
+    reason is one of 'over_budget', 'busy', 'timeout'.
+    """
+
+    def __init__(self, reason: str, message: str, estimate: Optional['PlanEstimate'] = None):
+        super().__init__(message)
+        self.reason = reason
+        self.estimate = estimate
+
+
+@dataclass
+class PlanEstimate:
+    """Cardinality estimate of a physical plan."""
+    result_rows: int = 0
+    peak_rows: int = 0
+    peak_operator: str = ''
+    cross_products: int = 0
+    operators: List[str] = field(default_factory=list)
+
+
+def _strip_comments(sql: str) -> str:
+    return _COMMENTS_RE.sub(' ', sql).strip()
+
+
+def first_keyword(sql: str) -> str:
+    """Leading keyword of sql, ignoring comments."""
+    words = _strip_comments(sql).split(None, 1)
+    return words[0].upper().lstrip('(') if words else ''
+
+
+# Tenant of the tool call running on this thread / task; set by the server, never by the client
+_current_tenant: ContextVar[Optional[str]] = ContextVar('duckdb_guard_tenant', default=None)
+
+
+@contextmanager
+def tenant_scope(tenant: Optional[str]) -> Iterator[None]:
+    """Charge guarded queries run inside the block to tenant (None → 'default')."""
+    token = _current_tenant.set(tenant)
+    try:
+        yield
+    finally:
+        _current_tenant.reset(token)
+
+
+def tenant_of() -> str:
+    """Tenant the current tool call's query slots are charged to (the caller's user, else 'default')."""
+    return str(_current_tenant.get() or 'default')
+
+
+def limit_query(sql: str, limit: int) -> str:
+    """Wrap a row-returning query so at most `limit` rows come back."""
+    body = sql.strip().rstrip(';').rstrip()
+    if first_keyword(body) not in _WRAPPABLE or not limit or limit <= 0:
+        return body
+    # Newlines keep a trailing -- comment from swallowing the closing parenthesis
+    return f"SELECT * FROM (\n{body}\n) AS _guarded LIMIT {int(limit)}"
+
+
+def _cardinality(node: Dict[str, Any]) -> Optional[int]:
+    value = (node.get('extra_info') or {}).get('Estimated Cardinality')
+    if value in (None, ''):
+        return None
+    try:
+        return int(str(value).replace(',', '').lstrip('~'))
+    except ValueError:
+        return None
+
+
+def _walk(node: Dict[str, Any], cap: Optional[int], estimate: PlanEstimate) -> int:
+    """Estimated output rows of node; records the peak into estimate.
+
+    cap is the row limit the node's output streams into (None when a
+    blocking operator sits between the node and the nearest LIMIT).
+    """
+    name = str(node.get('name', '')).strip().upper()
+    estimate.operators.append(name)
+    children = node.get('children') or []
+
+    own_limit = cap
+    if name in LIMIT_OPERATORS:
+        n = _cardinality(node)
+        if n and (cap is None or n < cap):
+            own_limit = n
+        elif cap is None:
+            # DuckDB does not report the count of an inner LIMIT; the pipeline
+            # feeding it still stops early, so only its build sides are costed
+            own_limit = 0
+    streams = name in STREAMING_OPERATORS or name in LIMIT_OPERATORS
+
+    child_rows = []
+    for i, child in enumerate(children):
+        # Probe side (first input) streams; build sides are materialized in full
+        child_cap = own_limit if streams and i == 0 else None
+        child_rows.append(_walk(child, child_cap, estimate))
+
+    rows = _cardinality(node)
+    if name == 'TOP_N':
+        top = (node.get('extra_info') or {}).get('Top')
+        rows = int(top) if str(top or '').isdigit() else rows
+    if name in CROSS_OPERATORS:
+        estimate.cross_products += 1
+        if rows is None and child_rows:
+            rows = 1
+            for r in child_rows:
+                rows *= max(r, 1)
+    if rows is None or (not rows and name in PASS_THROUGH_OPERATORS):
+        rows = max(child_rows) if child_rows else 0
+
+    counted = min(rows, cap) if cap is not None and streams else rows
+    if counted > estimate.peak_rows:
+        estimate.peak_rows = counted
+        estimate.peak_operator = name
+    return counted
+
+
+def estimate_plan(plan: Any, limit: Optional[int] = None) -> PlanEstimate:
+    """PlanEstimate for the JSON physical plan EXPLAIN (FORMAT json) returns.
+
+    limit is the row cap the query was wrapped in (see limit_query); DuckDB
+    does not report it on STREAMING_LIMIT nodes.
+    """
+    nodes = json.loads(plan) if isinstance(plan, str) else plan
+    if isinstance(nodes, dict):
+        nodes = [nodes]
+    estimate = PlanEstimate()
+    for root in nodes or []:
+        estimate.result_rows = max(estimate.result_rows, _walk(root, limit or None, estimate))
+    return estimate
+
+
+class QueryGuard:
+    """Plan-estimate admission, per-tenant slots and deadlines for raw SQL."""
+
+    def __init__(self, enabled: bool = True, max_estimated_rows: int = 200_000_000,
+                 timeout_seconds: float = 30, max_concurrent: int = 4,
+                 slots_per_tenant: int = 2, slot_wait_seconds: float = 5):
+        self.enabled = enabled
+        self.max_estimated_rows = int(max_estimated_rows or 0)
+        self.timeout_seconds = float(timeout_seconds or 0)
+        self.max_concurrent = max(1, int(max_concurrent or 1))
+        self.slots_per_tenant = max(1, min(int(slots_per_tenant or 1), self.max_concurrent))
+        self.slot_wait_seconds = max(0.0, float(slot_wait_seconds or 0))
+        self._global = threading.BoundedSemaphore(self.max_concurrent)
+        self._tenants: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+        self._running: Dict[str, int] = {}
+        self._stats = {'admitted': 0, 'rejected_over_budget': 0, 'rejected_busy': 0,
+                       'timed_out': 0, 'failed': 0}
+
+    # ── Analysis ────────────────────────────────────────────────────────────
+
+    def analyze(self, cursor, sql: str, limit: Optional[int] = None) -> Optional[PlanEstimate]:
+        """Plan estimate for sql (None for statements EXPLAIN cannot cost).
+
+        limit is the cap sql was wrapped in by limit_query, if any.
+        """
+        if first_keyword(sql) not in _WRAPPABLE:
+            return None
+        rows = cursor.execute(f"EXPLAIN (FORMAT json) {sql}").fetchall()
+        plans = [row[1] for row in rows if len(row) > 1 and row[0] == 'physical_plan']
+        if not plans:
+            return None
+        return estimate_plan(plans[0], limit)
+
+    def check(self, estimate: Optional[PlanEstimate]):
+        """Raise QueryRejected('over_budget') when the estimate exceeds the budget."""
+        if estimate is None or not self.max_estimated_rows:
+            return
+        if estimate.peak_rows > self.max_estimated_rows:
+            hint = (" The plan contains a cross product — add a join condition."
+                    if estimate.cross_products else
+                    " Filter the input or aggregate to fewer groups.")
+            raise QueryRejected(
+                'over_budget',
+                f"Query rejected: estimated {estimate.peak_rows:,} rows at {estimate.peak_operator} "
+                f"exceeds the budget of {self.max_estimated_rows:,}.{hint}", estimate)
+
+    # ── Slots ───────────────────────────────────────────────────────────────
+
+    def _tenant_semaphore(self, tenant: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            sem = self._tenants.get(tenant)
+            if sem is None:
+                sem = self._tenants[tenant] = threading.BoundedSemaphore(self.slots_per_tenant)
+            return sem
+
+    def acquire(self, tenant: str) -> float:
+        """Take a tenant slot and a global slot; returns seconds waited."""
+        started = time.monotonic()
+        tenant_sem = self._tenant_semaphore(tenant)
+        if not tenant_sem.acquire(timeout=self.slot_wait_seconds):
+            raise QueryRejected('busy', f"Query rejected: tenant '{tenant}' already has "
+                                        f"{self.slots_per_tenant} queries running")
+        remaining = max(0.0, self.slot_wait_seconds - (time.monotonic() - started))
+        if not self._global.acquire(timeout=remaining):
+            tenant_sem.release()
+            raise QueryRejected('busy', f"Query rejected: all {self.max_concurrent} "
+                                        f"query slots are busy")
+        with self._lock:
+            self._running[tenant] = self._running.get(tenant, 0) + 1
+        return time.monotonic() - started
+
+    def release(self, tenant: str):
+        with self._lock:
+            self._running[tenant] = self._running.get(tenant, 1) - 1
+            if not self._running[tenant]:
+                del self._running[tenant]
+        self._global.release()
+        self._tenant_semaphore(tenant).release()
+
+    # ── Execution ───────────────────────────────────────────────────────────
+
+    def run(self, cursor, sql: str, fetch: Callable[[Any], Any], limit: Optional[int] = None,
+            tenant: str = 'default', timeout: Optional[float] = None) -> Tuple[Any, Dict[str, Any]]:
+        """Run sql on cursor under the guard; returns (fetch(result), resources).
+
+        fetch receives the executed cursor and pulls the rows in whatever
+        shape the calling tool returns. Raises QueryRejected when the query
+        is over budget, no slot frees up in time, or the deadline passes.
+        """
+        if limit:
+            wrapped = limit_query(sql, limit)
+            limit, sql = (limit if wrapped != sql.strip().rstrip(';').rstrip() else None), wrapped
+        if not self.enabled:
+            started = time.monotonic()
+            data = fetch(cursor.execute(sql))
+            return data, {'sql': sql, 'elapsed_ms': round((time.monotonic() - started) * 1000, 2)}
+
+        estimate = self.analyze(cursor, sql, limit)
+        try:
+            self.check(estimate)
+        except QueryRejected:
+            self._count('rejected_over_budget')
+            raise
+
+        try:
+            waited = self.acquire(tenant)
+        except QueryRejected:
+            self._count('rejected_busy')
+            raise
+
+        timeout = self.timeout_seconds if timeout is None else timeout
+        timed_out = threading.Event()
+
+        def _interrupt():
+            timed_out.set()
+            cursor.interrupt()
+
+        timer = threading.Timer(timeout, _interrupt) if timeout and timeout > 0 else None
+        profiled = _enable_profiling(cursor)
+        started = time.monotonic()
+        try:
+            if timer is not None:
+                timer.daemon = True
+                timer.start()
+            data = fetch(cursor.execute(sql))
+        except Exception as e:
+            if timed_out.is_set() or isinstance(e, duckdb.InterruptException):
+                self._count('timed_out')
+                raise QueryRejected('timeout', f"Query interrupted after {timeout:g}s deadline",
+                                    estimate) from e
+            self._count('failed')
+            raise
+        finally:
+            if timer is not None:
+                timer.cancel()
+            elapsed = time.monotonic() - started
+            self.release(tenant)
+        self._count('admitted')
+
+        resources = {
+            'sql': sql,
+            'tenant': tenant,
+            'elapsed_ms': round(elapsed * 1000, 2),
+            'slot_wait_ms': round(waited * 1000, 2),
+            'timeout_seconds': timeout or None,
+        }
+        if estimate is not None:
+            resources.update(estimated_result_rows=estimate.result_rows,
+                             estimated_peak_rows=estimate.peak_rows,
+                             estimated_peak_operator=estimate.peak_operator)
+        if profiled:
+            resources.update(_profile(cursor))
+        return data, resources
+
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats, enabled=self.enabled, running=dict(self._running),
+                        max_concurrent=self.max_concurrent, slots_per_tenant=self.slots_per_tenant,
+                        max_estimated_rows=self.max_estimated_rows,
+                        timeout_seconds=self.timeout_seconds)
+
+
+def _enable_profiling(cursor) -> bool:
+    # get_profiling_information() appeared in DuckDB 1.1; older engines just skip the metrics
+    if not hasattr(cursor, 'get_profiling_information'):
+        return False
+    try:
+        cursor.execute("SET enable_profiling='no_output'")
+        return True
+    except Exception:
+        return False
+
+
+def _profile(cursor) -> Dict[str, Any]:
+    try:
+        info = json.loads(cursor.get_profiling_information())
+    except Exception as e:
+        logger.debug(f"Profiling information unavailable: {e}")
+        return {}
+    metrics = {}
+    for source, name in _PROFILE_METRICS.items():
+        if source in info:
+            value = info[source]
+            metrics[name] = round(value * 1000, 2) if name == 'cpu_time_ms' else value
+    return metrics
+
+
+# Module singleton
+_guard: Optional[QueryGuard] = None
+_guard_lock = threading.Lock()
+
+
+def get_query_guard() -> QueryGuard:
+    global _guard
+    if _guard is None:
+        with _guard_lock:
+            if _guard is None:
+                kwargs: Dict[str, Any] = {}
+                try:
+                    from sajha.core.config import get_settings
+                    s = get_settings()
+                    for name in ('enabled', 'max_estimated_rows', 'timeout_seconds',
+                                 'max_concurrent', 'slots_per_tenant', 'slot_wait_seconds'):
+                        value = getattr(s, f'duckdb_guard_{name}', None)
+                        if value is not None:
+                            kwargs[name] = value
+                except Exception:
+                    pass
+                _guard = QueryGuard(**kwargs)
+    return _guard
@@ -0,0 +1,253 @@
+"""
+SAJHA MCP Server v5.3.0 — Columnar Materialization of CSV Sources
+Copyright All rights Reserved 2025-2030, Ashutosh Sinha
+
+A view over read_csv_auto() makes DuckDB sniff and parse the raw text on
+every query. The materializer converts each CSV/TSV source to a columnar
+copy once, and again only when the file's fingerprint changes, so the
+views registered by the shared engine (sajha.core.duckdb_engine) scan
+compressed column chunks instead.
+
+Fingerprint = (mtime_ns, size, blake2b of the content). The content hash
+is only computed when mtime or size moved, so an unchanged file costs one
+stat(); a file that was merely touched keeps its copy. A change in how the
+file is read (the read_csv_auto options: delimiter, header, types) also
+rebuilds the copy.
+
+Modes:
+  parquet  <cache_dir>/<stem>-<path hash>.parquet, ZSTD, row groups carry
+           min/max statistics (zone maps) for every column
+  table    persistent DuckDB table in the "_columnar" schema of the engine
+           database (row groups get the same min/max zone maps)
+
+Optional sort keys order the rows before they are written, which keeps each
+row group's min/max range on those columns narrow — filters on them can
+then skip most row groups entirely.
+
+Config (config/application.yml):
+  duckdb:
+    materialize:
+      enabled: true
+      mode: parquet            # parquet | table
+      cache_dir: ""            # "" = <data.duckdb.dir>/.columnar
+      min_size_mb: 0           # Smaller CSVs are queried in place
+      row_group_size: 122880
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MATERIALIZE_MODES = ('parquet', 'table')
+MATERIALIZED_TYPES = ('csv', 'tsv')
+TABLE_SCHEMA = '_columnar'
+
+_HASH_CHUNK = 8 * 1024 * 1024
+
+
+def content_hash(file_path: str) -> str:
+    """blake2b digest of the whole file, streamed in 8 MB chunks."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _options_hash(raw_source: str) -> str:
+    return hashlib.blake2b(raw_source.encode(), digest_size=8).hexdigest()
+
+
+def _literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+class ColumnarMaterializer:
+    """Keeps one columnar copy per CSV source, rebuilt when its fingerprint changes."""
+
+    def __init__(self, cache_dir: str, mode: str = 'parquet', min_size_mb: float = 0,
+                 row_group_size: int = 122880, compression: str = 'zstd'):
+        if mode not in MATERIALIZE_MODES:
+            raise ValueError(f"Unsupported materialize mode '{mode}' (expected one of {MATERIALIZE_MODES})")
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.mode = mode
+        self.min_bytes = int(float(min_size_mb or 0) * 1024 * 1024)
+        self.row_group_size = max(1024, int(row_group_size))
+        self.compression = compression
+        self._lock = threading.RLock()                 # manifest and stats only, never held over a build
+        self._building: Dict[str, threading.Lock] = {}  # one conversion per source at a time
+        self._manifest_path = os.path.join(self.cache_dir, 'manifest.json')
+        self._manifest: Dict[str, Dict[str, Any]] = self._load_manifest()
+        self._stats = {'built': 0, 'reused': 0, 'rehashed': 0, 'failed': 0,
+                       'source_bytes': 0, 'columnar_bytes': 0}
+
+    # ── Public API ──────────────────────────────────────────────────────────
+
+    def applies_to(self, file_path: str, file_type: str) -> bool:
+        if file_type not in MATERIALIZED_TYPES:
+            return False
+        try:
+            return os.path.getsize(file_path) >= self.min_bytes
+        except OSError:
+            return False
+
+    def materialize(self, conn, file_path: str, raw_source: str,
+                    sort_keys: Optional[List[str]] = None) -> str:
+        """Return a FROM-clause expression for the columnar copy of file_path.
+
+        conn is the connection (or cursor) that runs the conversion and is
+        used by this call alone; raw_source is the read_csv_auto(...)
+        expression for the original file. Hashing and conversion run outside
+        the materializer's lock, so one large CSV does not hold up others.
+        """
+        file_path = os.path.abspath(file_path)
+        sort_keys = list(sort_keys or [])
+        with self._lock:
+            building = self._building.setdefault(file_path, threading.Lock())
+        with building:
+            stat = os.stat(file_path)
+            with self._lock:
+                entry = dict(self._manifest.get(file_path) or {}) or None
+            if entry and entry['sort_keys'] == sort_keys and entry['mode'] == self.mode \
+                    and entry.get('source') == _options_hash(raw_source) and self._artifact_exists(conn, entry):
+                if entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+                    with self._lock:
+                        self._stats['reused'] += 1
+                    return self._source_expr(entry)
+                digest = content_hash(file_path)
+                if digest == entry['hash']:
+                    # Touched but not changed — keep the copy, remember the new mtime
+                    entry.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+                    with self._lock:
+                        self._manifest[file_path] = entry
+                        self._save_manifest()
+                        self._stats['rehashed'] += 1
+                    return self._source_expr(entry)
+            else:
+                digest = content_hash(file_path)
+
+            try:
+                entry = self._build(conn, file_path, raw_source, sort_keys, stat, digest)
+            except Exception:
+                with self._lock:
+                    self._stats['failed'] += 1
+                raise
+            with self._lock:
+                self._manifest[file_path] = entry
+                self._save_manifest()
+            return self._source_expr(entry)
+
+    def evict(self, conn, file_path: str):
+        """Forget a source and delete its columnar copy (the source file went away)."""
+        file_path = os.path.abspath(file_path)
+        with self._lock:
+            entry = self._manifest.pop(file_path, None)
+            if entry is None:
+                return
+            try:
+                if entry['mode'] == 'parquet':
+                    os.remove(entry['artifact'])
+                else:
+                    conn.execute(f"DROP TABLE IF EXISTS {entry['artifact']}")
+            except OSError:
+                pass
+            except Exception as e:
+                logger.warning(f"Could not drop columnar copy of {file_path}: {e}")
+            self._save_manifest()
+
+    def entries(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {path: dict(entry) for path, entry in self._manifest.items()}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats, mode=self.mode, cache_dir=self.cache_dir,
+                        sources=len(self._manifest))
+
+    # ── Internals ───────────────────────────────────────────────────────────
+
+    def _artifact_name(self, file_path: str) -> str:
+        stem = os.path.splitext(os.path.basename(file_path))[0]
+        stem = ''.join(c if c.isalnum() or c == '_' else '_' for c in stem)
+        path_hash = hashlib.blake2b(file_path.encode(), digest_size=4).hexdigest()
+        return f"{stem}_{path_hash}"
+
+    def _build(self, conn, file_path: str, raw_source: str, sort_keys: List[str],
+               stat: os.stat_result, digest: str) -> Dict[str, Any]:
+        started = time.monotonic()
+        order_by = f" ORDER BY {', '.join(_quote(k) for k in sort_keys)}" if sort_keys else ''
+        select = f"SELECT * FROM {raw_source}{order_by}"
+        name = self._artifact_name(file_path)
+
+        if self.mode == 'parquet':
+            os.makedirs(self.cache_dir, exist_ok=True)
+            artifact = os.path.join(self.cache_dir, f"{name}.parquet")
+            tmp = f"{artifact}.{os.getpid()}.tmp"
+            conn.execute(
+                f"COPY ({select}) TO {_literal(tmp)} (FORMAT parquet, "
+                f"COMPRESSION {self.compression}, ROW_GROUP_SIZE {self.row_group_size})")
+            os.replace(tmp, artifact)
+            columnar_bytes = os.path.getsize(artifact)
+        else:
+            artifact = f"{_quote(TABLE_SCHEMA)}.{_quote(name)}"
+            conn.execute(f"CREATE SCHEMA IF NOT EXISTS {_quote(TABLE_SCHEMA)}")
+            conn.execute(f"CREATE OR REPLACE TABLE {artifact} AS {select}")
+            columnar_bytes = None
+
+        elapsed = time.monotonic() - started
+        with self._lock:
+            self._stats['built'] += 1
+            self._stats['source_bytes'] += stat.st_size
+            if columnar_bytes is not None:
+                self._stats['columnar_bytes'] += columnar_bytes
+        logger.info(f"Materialized {file_path} → {artifact} ({self.mode}, "
+                    f"{stat.st_size:,} → {columnar_bytes if columnar_bytes is not None else '?'} bytes, "
+                    f"{elapsed:.2f}s{', sorted by ' + ','.join(sort_keys) if sort_keys else ''})")
+        return {
+            'mode': self.mode, 'artifact': artifact, 'sort_keys': sort_keys,
+            'source': _options_hash(raw_source), 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'hash': digest,
+            'columnar_bytes': columnar_bytes, 'built_at': time.time(),
+        }
+
+    def _artifact_exists(self, conn, entry: Dict[str, Any]) -> bool:
+        if entry['mode'] == 'parquet':
+            return os.path.exists(entry['artifact'])
+        try:
+            conn.execute(f"SELECT 1 FROM {entry['artifact']} LIMIT 0")
+            return True
+        except Exception:
+            return False
+
+    def _source_expr(self, entry: Dict[str, Any]) -> str:
+        if entry['mode'] == 'parquet':
+            return f"read_parquet({_literal(entry['artifact'])})"
+        return entry['artifact']
+
+    def _load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self._manifest_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable materialization manifest {self._manifest_path}: {e}")
+            return {}
+
+    def _save_manifest(self):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp = f"{self._manifest_path}.tmp"
+            with open(tmp, 'w') as f:
+                json.dump(self._manifest, f, indent=1)
+            os.replace(tmp, self._manifest_path)
+        except OSError as e:
+            logger.warning(f"Could not write materialization manifest: {e}")
@@ -0,0 +1,168 @@
+"""
+SAJHA MCP Server v5.3.0 — Bounded Event Bus
+Copyright All rights Reserved 2025-2030, Ashutosh Sinha
+
+Single in-process queue that decouples request handlers from audit writes
+and webhook delivery. publish() never blocks: when the queue is full the
+event is dropped and counted. One daemon thread drains the queue and hands
+each topic's events to its handler as a batch, so a burst of audit events
+becomes a few multi-row INSERTs instead of one transaction per event.
+
+Topics in use:
+  audit    → AuditLogger batch writer (sajha.core.audit)
+  webhook  → WebhookManager fan-out to per-endpoint queues (sajha.core.webhooks)
+
+Config (config/application.yml):
+  events:
+    queue_size: 10000     # Max buffered events before publish() drops
+    batch_size: 200       # Max events handed to a handler at once
+"""
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+BatchHandler = Callable[[List[Any]], None]
+
+
+class EventBus:
+    """Bounded, batching publish/dispatch queue with a single consumer thread."""
+
+    def __init__(self, queue_size: int = 10000, batch_size: int = 200):
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+        self._batch_size = max(1, batch_size)
+        self._handlers: Dict[str, BatchHandler] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._published = 0
+        self._dropped = 0
+        self._dispatched = 0
+        self._handler_errors = 0
+
+    def register(self, topic: str, handler: BatchHandler):
+        """Route events published on topic to handler(list_of_events)."""
+        with self._lock:
+            self._handlers[topic] = handler
+        self._ensure_started()
+
+    def publish(self, topic: str, event: Any) -> bool:
+        """Queue an event without blocking. Returns False if it was dropped."""
+        try:
+            self._queue.put_nowait((topic, event))
+        except queue.Full:
+            with self._lock:
+                self._dropped += 1
+                dropped = self._dropped
+            if dropped == 1 or dropped % 1000 == 0:
+                logger.error(f"Event bus full — dropped {dropped} event(s) so far (latest topic={topic})")
+            return False
+        with self._lock:
+            self._published += 1
+        self._ensure_started()
+        return True
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until every queued event has been handled. For shutdown and tests."""
+        deadline = time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def stop(self, timeout: float = 5.0):
+        """Drain what is queued, then stop the consumer thread."""
+        self.flush(timeout)
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'queued': self._queue.qsize(),
+                'capacity': self._queue.maxsize,
+                'published': self._published,
+                'dropped': self._dropped,
+                'dispatched': self._dispatched,
+                'handler_errors': self._handler_errors,
+                'topics': sorted(self._handlers),
+            }
+
+    # ── Consumer ────────────────────────────────────────────────────────────
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='event-bus', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            batch = [first]
+            while len(batch) < self._batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._dispatch(batch)
+            for _ in batch:
+                self._queue.task_done()
+
+    def _dispatch(self, batch: List):
+        by_topic: Dict[str, List[Any]] = {}
+        for topic, event in batch:
+            by_topic.setdefault(topic, []).append(event)
+
+        for topic, events in by_topic.items():
+            with self._lock:
+                handler = self._handlers.get(topic)
+            if handler is None:
+                logger.warning(f"Event bus: no handler for topic '{topic}' ({len(events)} event(s) discarded)")
+                continue
+            try:
+                handler(events)
+                with self._lock:
+                    self._dispatched += len(events)
+            except Exception as e:
+                with self._lock:
+                    self._handler_errors += 1
+                logger.error(f"Event bus handler for '{topic}' failed on {len(events)} event(s): {e}",
+                             exc_info=True)
+
+
+# Module singleton
+_bus: Optional[EventBus] = None
+_bus_lock = threading.Lock()
+
+
+def get_event_bus() -> EventBus:
+    global _bus
+    if _bus is None:
+        with _bus_lock:
+            if _bus is None:
+                queue_size, batch_size = 10000, 200
+                try:
+                    from sajha.core.config import get_settings
+                    s = get_settings()
+                    queue_size = getattr(s, 'events_queue_size', 10000)
+                    batch_size = getattr(s, 'events_batch_size', 200)
+                except Exception:
+                    pass
+                _bus = EventBus(queue_size=queue_size, batch_size=batch_size)
+    return _bus
@@ -0,0 +1,297 @@
+"""
+SAJHA MCP Server — Composite Fan-out Scheduler
+Copyright All rights Reserved 2025-2030, Ashutosh Sinha
+
+One long-lived worker pool for composite tool sub-calls. A composite submits all of
+its child calls at once; the scheduler dispatches them as slots free up under a
+global limit and a per-provider limit (fmp, fred, yf, ... — a tool's
+metadata.provider, else its name prefix), so 100 tickers × 3 child tools run as one
+wave bounded by the slowest provider rather than 100 sequential waves.
+
+Results stream back in submission order. An optional failure budget stops
+dispatching once that many calls have failed; calls not yet started are skipped.
+run_graph() does the same for a dependency graph: each node is dispatched the
+moment its dependencies have succeeded, so a run takes as long as its longest
+dependency chain.
+
+Limits are shared by every composite in the process. A composite nested inside
+another composite's sub-call runs its own sub-calls inline, so pool threads never
+wait on the pool. An inline call is charged to its provider's count while it
+runs, so top-level dispatch backs off for it, but it never waits for a slot
+itself: nesting can take a provider over its limit by one call per pool thread
+that is running a nested composite.
+
+Config (config/application.yml):
+  composite:
+    fanout:
+      max_workers: 32            # Global cap on concurrent sub-calls
+      per_provider: 8            # Default cap per provider
+      provider_limits: 'fmp=4,edgar=2'
+"""
+
+import contextvars
+import logging
+import queue
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Deque, Dict, Hashable, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+_worker_context = threading.local()
+
+
+def tool_provider(tool: Any, tool_name: str) -> str:
+    """Provider key for concurrency limits: metadata.provider, else the tool name prefix."""
+    config = getattr(tool, 'config', None) or {}
+    provider = (config.get('metadata') or {}).get('provider') if isinstance(config, dict) else None
+    return provider or tool_name.split('_', 1)[0]
+
+
+class FanOutSkipped(Exception):
+    """Outcome of a call never started: the failure budget ran out, or a dependency failed."""
+
+    def __init__(self, message: str, dependency: Any = None):
+        super().__init__(message)
+        self.dependency = dependency
+
+
+class FanOutScheduler:
+    """Shared pool plus global and per-provider in-flight limits."""
+
+    def __init__(self, max_workers: int = 32, per_provider: int = 8, provider_limits: Dict[str, int] = None):
+        self._max_workers = max(1, max_workers)
+        self._per_provider = max(1, per_provider)
+        self._provider_limits = dict(provider_limits or {})
+        self._pool = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix='composite-fanout')
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._by_provider: Dict[str, int] = {}
+        self._stats = {'submitted': 0, 'completed': 0, 'failed': 0, 'skipped': 0, 'inline': 0}
+
+    # ── Slots ───────────────────────────────────────────────────────────────
+
+    def _try_acquire(self, provider: str) -> bool:
+        with self._cond:
+            limit = self._provider_limits.get(provider, self._per_provider)
+            if self._in_flight >= self._max_workers or self._by_provider.get(provider, 0) >= limit:
+                return False
+            self._in_flight += 1
+            self._by_provider[provider] = self._by_provider.get(provider, 0) + 1
+            return True
+
+    def _release(self, provider: str):
+        with self._cond:
+            self._in_flight -= 1
+            self._by_provider[provider] -= 1
+            if not self._by_provider[provider]:
+                del self._by_provider[provider]
+            self._cond.notify_all()
+
+    # ── Execution ───────────────────────────────────────────────────────────
+
+    def run(self, calls: List[Tuple[str, Callable[[], Any]]],
+            is_failure: Callable[[Any], bool] = lambda r: False,
+            failure_budget: Optional[int] = None) -> Iterator[Tuple[int, Any]]:
+        """
+        Run independent (provider, fn) calls; yield (index, outcome) in index order as
+        soon as each prefix is complete. The outcome is fn's return value, the exception
+        it raised, or FanOutSkipped once more than failure_budget outcomes were failures.
+        """
+        graph = {index: (provider, (), lambda _deps, fn=fn: fn()) for index, (provider, fn) in enumerate(calls)}
+        outcomes: Dict[int, Any] = {}
+        next_index = 0
+        for index, outcome in self.run_graph(graph, is_failure, failure_budget):
+            outcomes[index] = outcome
+            while next_index in outcomes:
+                yield next_index, outcomes.pop(next_index)
+                next_index += 1
+
+    def run_graph(self, nodes: Dict[Hashable, Tuple[str, Sequence[Hashable], Callable[[Dict], Any]]],
+                  is_failure: Callable[[Any], bool] = lambda r: False,
+                  failure_budget: Optional[int] = None) -> Iterator[Tuple[Hashable, Any]]:
+        """
+        Run a dependency graph: nodes maps key → (provider, deps, fn). A node is
+        dispatched as soon as all of its deps have succeeded, and fn is called with
+        {dep: outcome}. Yields (key, outcome) in completion order. A node whose
+        dependency failed, or that had not started when the failure budget ran out,
+        settles as FanOutSkipped.
+        """
+        dependents: Dict[Hashable, List[Hashable]] = {}
+        waiting: Dict[Hashable, set] = {}
+        for key, (_, deps, _) in nodes.items():
+            waiting[key] = set(deps)
+            for dep in waiting[key]:
+                if dep not in nodes:
+                    raise ValueError(f'{key!r} depends on unknown node {dep!r}')
+                dependents.setdefault(dep, []).append(key)
+
+        inline = getattr(_worker_context, 'active', False)
+        calls: Dict[Hashable, Tuple[str, Callable[[], Any]]] = {}
+        pending: 'OrderedDict[str, Deque[Hashable]]' = OrderedDict()
+        done: queue.Queue = queue.Queue()
+        outcomes: Dict[Hashable, Any] = {}
+        settling: Deque[Tuple[Hashable, Any]] = deque()
+        closed = set()                                   # settled, or queued to settle without running
+        in_flight, failures, aborted = 0, 0, False
+
+        def ready(key):
+            if aborted:
+                skip(key, None)
+                return
+            provider, deps, fn = nodes[key]
+            calls[key] = (provider, partial(fn, {dep: outcomes[dep] for dep in deps}))
+            pending.setdefault(provider, deque()).append(key)
+
+        def skip(key, dependency):
+            if key not in closed:
+                closed.add(key)
+                reason = f'dependency {dependency!r} failed' if dependency is not None else 'failure budget exhausted'
+                settling.append((key, FanOutSkipped(reason, dependency)))
+                with self._cond:
+                    self._stats['skipped'] += 1
+
+        for key, deps in waiting.items():
+            if not deps:
+                ready(key)
+
+        while len(outcomes) < len(nodes):
+            if pending:
+                in_flight += self._run_next(calls, pending, done) if inline else self._dispatch(calls, pending, done)
+            if in_flight:
+                key, outcome = done.get()
+                in_flight -= 1
+                closed.add(key)
+                settling.append((key, outcome))
+            elif pending:
+                with self._cond:                         # every slot is held by other composites
+                    self._cond.wait(0.05)
+            elif not settling:
+                raise ValueError('dependency cycle among ' + ', '.join(repr(k) for k in nodes if k not in outcomes))
+
+            while settling:
+                key, outcome = settling.popleft()
+                outcomes[key] = outcome
+                yield key, outcome
+                skipped = isinstance(outcome, FanOutSkipped)
+                failed = skipped or isinstance(outcome, BaseException) or is_failure(outcome)
+                if failed and not skipped:
+                    failures += 1
+                    if failure_budget is not None and failures > failure_budget and not aborted:
+                        aborted = True
+                        for keys in pending.values():
+                            for queued in keys:
+                                skip(queued, None)
+                        pending.clear()
+                for child in dependents.get(key, ()):
+                    waiting[child].discard(key)
+                    if failed:
+                        skip(child, key)
+                    elif not waiting[child] and child not in closed:
+                        ready(child)
+
+    def _dispatch(self, calls, pending: 'OrderedDict[str, Deque]', done: queue.Queue) -> int:
+        """Submit every call whose provider has a free slot, oldest first. Returns how many."""
+        submitted = 0
+        for provider in list(pending):
+            keys = pending[provider]
+            while keys and self._try_acquire(provider):
+                key = keys.popleft()
+                # Run under a copy of the caller's context: the guard tenant and the like follow the call
+                self._pool.submit(contextvars.copy_context().run, self._invoke, provider, key, calls.pop(key)[1], done)
+                submitted += 1
+            if not keys:
+                del pending[provider]
+        if submitted:
+            with self._cond:
+                self._stats['submitted'] += submitted
+        return submitted
+
+    def _invoke(self, provider: str, key, fn: Callable[[], Any], done: queue.Queue):
+        _worker_context.active = True
+        try:
+            outcome = fn()
+            ok = True
+        except Exception as e:
+            outcome, ok = e, False
+        finally:
+            _worker_context.active = False
+            self._release(provider)
+        with self._cond:
+            self._stats['completed' if ok else 'failed'] += 1
+        done.put((key, outcome))
+
+    def _run_next(self, calls, pending: 'OrderedDict[str, Deque]', done: queue.Queue) -> int:
+        """
+        Nested in a pool worker: run the oldest ready call on this thread. The thread
+        already holds a global slot; the call is counted against its provider without
+        waiting, since the slots it would wait on may be held by its own callers.
+        """
+        provider = next(iter(pending))
+        key = pending[provider].popleft()
+        if not pending[provider]:
+            del pending[provider]
+        with self._cond:
+            self._by_provider[provider] = self._by_provider.get(provider, 0) + 1
+            self._stats['inline'] += 1
+        try:
+            outcome = calls.pop(key)[1]()
+        except Exception as e:
+            outcome = e
+        finally:
+            with self._cond:
+                self._by_provider[provider] -= 1
+                if not self._by_provider[provider]:
+                    del self._by_provider[provider]
+                self._cond.notify_all()
+        done.put((key, outcome))
+        return 1
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {
+                **self._stats,
+                'in_flight': self._in_flight,
+                'by_provider': dict(self._by_provider),
+                'max_workers': self._max_workers,
+                'per_provider': self._per_provider,
+                'provider_limits': dict(self._provider_limits),
+            }
+
+
+def _parse_limits(spec: str) -> Dict[str, int]:
+    """'fmp=4,edgar=2' → {'fmp': 4, 'edgar': 2}"""
+    limits = {}
+    for item in (spec or '').split(','):
+        name, _, value = item.partition('=')
+        if name.strip() and value.strip().isdigit():
+            limits[name.strip()] = int(value)
+    return limits
+
+
+# ── Module singleton ────────────────────────────────────────────────────────
+
+_scheduler: Optional[FanOutScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_fanout_scheduler() -> FanOutScheduler:
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                kwargs = {}
+                try:
+                    from sajha.core.config import get_settings
+                    s = get_settings()
+                    kwargs = dict(
+                        max_workers=getattr(s, 'composite_fanout_max_workers', 32),
+                        per_provider=getattr(s, 'composite_fanout_per_provider', 8),
+                        provider_limits=_parse_limits(getattr(s, 'composite_fanout_provider_limits', '')),
+                    )
+                except Exception:
+                    pass
+                _scheduler = FanOutScheduler(**kwargs)
+    return _scheduler
@@ -4,11 +4,15 @@ SAJHA MCP Server v5.3.0
 Copyright © 2025–2030, Ashutosh Sinha. All rights reserved.
 
 Implements the new primitives from MCP spec 2025-11-25:
-  - Tasks: async tracking for long-running requests (SEP-1686)
+  - Tasks: async tracking for long-running requests (SEP-1686). A tools/call
+    carrying a "task" hint returns a task handle at once; the call runs on the
+    shared AsyncExecutor and its result waits in the durable task store (bounded
+    by async.max_result_mb and async.task_ttl_hours) for tasks/result.
   - Elicitation: server-initiated user input requests (SEP-1330, SEP-1036)
   - Sampling with tools: server-initiated LLM calls with tool use (SEP-1577)
 """
 import logging
+import threading
 import time
 import uuid
 from dataclasses import dataclass, field
@@ -63,13 +67,52 @@ class MCPTask:
         return d
 
 
+# AsyncExecutor status → MCP task state
+_EXECUTOR_STATES = {
+    'queued': TaskState.WORKING,
+    'running': TaskState.WORKING,
+    'completed': TaskState.COMPLETED,
+    'delivered': TaskState.COMPLETED,
+    'failed': TaskState.FAILED,
+    'cancelled': TaskState.CANCELLED,
+}
+_TERMINAL_STATES = (TaskState.COMPLETED, TaskState.FAILED, TaskState.CANCELLED)
+RELATED_TASK_META = "io.modelcontextprotocol/related-task"
+
+
+def format_tool_content(result: Any) -> List[Dict]:
+    """Tool return value → MCP content blocks."""
+    if isinstance(result, str):
+        return [{"type": "text", "text": result}]
+    if not isinstance(result, list):
+        return [{"type": "text", "text": str(result)}]
+    return result
+
+
 class TaskManager:
-    """Manages async MCP tasks with state tracking and polling."""
+    """
+    Manages async MCP tasks with state tracking and polling.
+
+    Two kinds of task share the tasks/* methods: in-process MCPTask records created
+    with create_task(), and task-augmented tools/call requests, which live in the
+    AsyncExecutor's task store and are scoped to the user who created them.
+    """
 
-    def __init__(self, default_ttl: int = 3600):
+    def __init__(self, default_ttl: int = 3600, executor=None, result_wait_seconds: float = 30.0,
+                 poll_interval_ms: int = 1000):
         self._tasks: Dict[str, MCPTask] = {}
         self._default_ttl = default_ttl
-        self._lock = __import__('threading').Lock()
+        self._lock = threading.Lock()
+        self._executor = executor
+        self._result_wait = result_wait_seconds
+        self._poll_interval_ms = poll_interval_ms
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            from sajha.core.async_executor import get_async_executor
+            self._executor = get_async_executor()
+        return self._executor
 
     def create_task(self, method: str, params: Dict) -> MCPTask:
         task = MCPTask(
@@ -128,27 +171,126 @@ class TaskManager:
         for tid in expired:
             del self._tasks[tid]
 
-    def handle_tasks_get(self, params: Dict) -> Dict:
+    # ── Task-augmented tools/call ─────────────────────
+
+    def submit_tool_call(self, tool_name: str, arguments: Dict, user_id: Optional[str] = None) -> Dict:
+        """Queue a tools/call on the shared executor and return the CreateTaskResult.
+        Raises queue.Full when the executor is at its backpressure limit."""
+        from sajha.core.async_executor import DELIVERY_NONE
+        task = self.executor.submit(tool_name, arguments, DELIVERY_NONE, '', user_id=user_id)
+        logger.info(f"Task created: {task.task_id} for tools/call {tool_name}")
+        return {"task": self._tool_task_dict(task.to_dict())}
+
+    def _get_tool_task(self, task_id: str, user_id: Optional[str]):
+        from sajha.core.async_executor import DELIVERY_NONE
+        task = self.executor.get_task(task_id)
+        if task is None or task.delivery_type != DELIVERY_NONE:
+            return None
+        if task.user_id != user_id:
+            return None                      # Other users' (or, for anonymous callers, any user's) tasks look missing
+        return task
+
+    def _tool_task_dict(self, task: Dict) -> Dict:
+        """AsyncTask.to_dict() → MCP task."""
+        state = _EXECUTOR_STATES.get(task['status'], TaskState.WORKING)
+        d = {
+            "taskId": task['task_id'],
+            "state": state.value,
+            "status": state.value,
+            "createdAt": task['created_at'],
+            "updatedAt": task.get('completed_at') or task.get('started_at') or task['created_at'],
+            "ttl": self._default_ttl * 1000,
+            "pollInterval": self._poll_interval_ms,
+        }
+        if state == TaskState.FAILED and task.get('error'):
+            d["error"] = task['error']
+        return d
+
+    def _tool_call_result(self, task) -> Dict:
+        """Stored outcome → CallToolResult, as tools/call would have returned it."""
+        state = _EXECUTOR_STATES.get(task.status.value, TaskState.WORKING)
+        meta = {RELATED_TASK_META: {"taskId": task.task_id}}
+        if state == TaskState.FAILED:
+            return {"content": [{"type": "text", "text": f"Tool execution failed: {task.error}"}],
+                    "isError": True, "_meta": meta}
+        if task.result_truncated:
+            return {"content": [{"type": "text", "text": f"Tool result ({task.result_bytes} bytes) exceeded the "
+                                                         f"task store's size limit and was not retained"}],
+                    "isError": True, "_meta": meta}
+        return {"content": format_tool_content(task.result), "_meta": meta}
+
+    # ── MCP method handlers ───────────────────────────
+
+    def handle_tasks_get(self, params: Dict, user_id: Optional[str] = None) -> Dict:
         """Handle tasks/get MCP method."""
         task_id = params.get("taskId")
         if not task_id:
             return {"error": {"code": -32602, "message": "taskId required"}}
         task = self.get_task(task_id)
-        if not task:
-            return {"error": {"code": -32602, "message": f"Task {task_id} not found"}}
-        return task.to_dict()
-
-    def handle_tasks_list(self, params: Dict) -> Dict:
+        if task:
+            return task.to_dict()
+        tool_task = self._get_tool_task(task_id, user_id)
+        if tool_task:
+            return self._tool_task_dict(tool_task.to_dict())
+        return {"error": {"code": -32602, "message": f"Task {task_id} not found"}}
+
+    def handle_tasks_result(self, params: Dict, user_id: Optional[str] = None) -> Dict:
+        """Handle tasks/result MCP method: wait (bounded) for a terminal state, then return the result."""
+        task_id = params.get("taskId")
+        if not task_id:
+            return {"error": {"code": -32602, "message": "taskId required"}}
+        wait = self._result_wait
+        if params.get("timeout") is not None:
+            wait = max(0.0, min(float(params["timeout"]), self._result_wait))
+        deadline = time.monotonic() + wait
+        while True:
+            local = self.get_task(task_id)
+            if local:
+                if local.state == TaskState.CANCELLED:
+                    return {"error": {"code": -32602, "message": f"Task {task_id} was cancelled"}}
+                if local.state == TaskState.COMPLETED:
+                    return {"result": local.result, "_meta": {RELATED_TASK_META: {"taskId": task_id}}}
+                if local.state == TaskState.FAILED:
+                    return {"error": {"code": -32603, "message": local.error or "Task failed"}}
+            else:
+                tool_task = self._get_tool_task(task_id, user_id)
+                if tool_task is None:
+                    return {"error": {"code": -32602, "message": f"Task {task_id} not found"}}
+                state = _EXECUTOR_STATES.get(tool_task.status.value, TaskState.WORKING)
+                if state == TaskState.CANCELLED:
+                    return {"error": {"code": -32602, "message": f"Task {task_id} was cancelled"}}
+                if state in _TERMINAL_STATES:
+                    return self._tool_call_result(tool_task)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return {"error": {"code": -32602, "message": f"Task {task_id} is still working",
+                                  "data": {"taskId": task_id, "pollInterval": self._poll_interval_ms}}}
+            time.sleep(min(remaining, self._poll_interval_ms / 1000.0))
+
+    def handle_tasks_list(self, params: Dict, user_id: Optional[str] = None) -> Dict:
         """Handle tasks/list MCP method."""
-        return {"tasks": self.list_tasks()}
-
-    def handle_tasks_cancel(self, params: Dict) -> Dict:
+        from sajha.core.async_executor import DELIVERY_NONE
+        cursor = params.get("cursor")
+        tasks = [] if cursor else self.list_tasks()
+        # user_id None (no session) lists only tasks submitted without a user — never everyone's
+        rows, next_cursor = self.executor.list_page(limit=int(params.get("limit", 100)), cursor=cursor,
+                                                    delivery_type=DELIVERY_NONE, user_id=user_id)
+        tasks += [self._tool_task_dict(r) for r in rows]
+        result = {"tasks": tasks}
+        if next_cursor:
+            result["nextCursor"] = next_cursor
+        return result
+
+    def handle_tasks_cancel(self, params: Dict, user_id: Optional[str] = None) -> Dict:
         """Handle tasks/cancel MCP method."""
         task_id = params.get("taskId")
         if not task_id:
             return {"error": {"code": -32602, "message": "taskId required"}}
         if self.cancel_task(task_id):
             return {"cancelled": True, "taskId": task_id}
+        if self.get_task(task_id) is None and self._get_tool_task(task_id, user_id) is not None:
+            if self.executor.cancel_task(task_id, include_running=True):
+                return {"cancelled": True, "taskId": task_id}
         return {"error": {"code": -32602, "message": "Task not found or not cancellable"}}
 
 
@@ -354,12 +496,15 @@ class SamplingManager:
 # ═══════════════════════════════════════════════════
 
 def add_tool_icon(tool_dict: Dict, tool_config: Dict) -> Dict:
-    """Add icon metadata to a tool's MCP format if configured."""
+    """Add icon metadata to a tool's MCP format if configured. Returns a new dict when it adds any."""
     icon = tool_config.get('icon')
+    annotations = tool_config.get('annotations')
+    if not icon and not annotations:
+        return tool_dict                 # shared read-only listing entry, untouched
+    tool_dict = dict(tool_dict)
     if icon:
         tool_dict['icon'] = icon  # e.g., {"type": "url", "url": "https://..."} or {"type": "emoji", "emoji": "📊"}
     # Annotations (from 2025-06-18, carried forward)
-    annotations = tool_config.get('annotations')
     if annotations:
         tool_dict['annotations'] = annotations
     return tool_dict
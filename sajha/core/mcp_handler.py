@@ -5,6 +5,7 @@ MCP Protocol Handler - JSON-RPC 2.0 Implementation
 
 import json
 import logging
+import queue
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 
@@ -23,6 +24,7 @@ class MCPHandler:
     # Custom error codes
     UNAUTHORIZED = -32001
     FORBIDDEN = -32002
+    SERVER_BUSY = -32003
     
     def __init__(self, tools_registry=None, auth_manager=None, prompts_registry=None):
         """
@@ -41,7 +43,12 @@ class MCPHandler:
 
         # MCP 2025-11-25 features
         from sajha.core.mcp_2025_11_25 import TaskManager, ElicitationManager, SamplingManager
-        self.task_manager = TaskManager()
+        self.task_manager = TaskManager(
+            default_ttl=int(getattr(_s, 'async_task_ttl_hours', 24) * 3600),
+            result_wait_seconds=getattr(_s, 'async_mcp_result_wait_seconds', 30.0),
+            poll_interval_ms=getattr(_s, 'async_mcp_poll_interval_ms', 1000),
+        )
+        self.tool_tasks_enabled = bool(getattr(_s, 'async_mcp_tasks_enabled', True))
         self.elicitation_manager = ElicitationManager()
         self.sampling_manager = SamplingManager()
 
@@ -73,7 +80,10 @@ class MCPHandler:
                     "tools": True
                 },
                 "tasks": {
-                    "experimental": True
+                    "experimental": True,
+                    "list": {},
+                    "cancel": {},
+                    "requests": {"tools": {"call": {}}} if self.tool_tasks_enabled else {}
                 },
                 "jsonSchema": {
                     "dialect": "https://json-schema.org/draft/2020-12/schema"
@@ -85,6 +95,16 @@ class MCPHandler:
             }
         }
     
+    async def ahandle_request(self, request_data: Dict, session: Optional[Dict] = None) -> Dict:
+        """
+        handle_request for async routes: tasks/result may wait for a task to finish,
+        so it runs on a worker thread instead of the event loop.
+        """
+        if isinstance(request_data, dict) and request_data.get('method') == 'tasks/result':
+            import asyncio
+            return await asyncio.to_thread(self.handle_request, request_data, session)
+        return self.handle_request(request_data, session)
+
     def handle_request(self, request_data: Dict, session: Optional[Dict] = None) -> Dict:
         """
         Handle a JSON-RPC 2.0 request
@@ -159,11 +179,13 @@ class MCPHandler:
 
             # ── MCP 2025-11-25: Tasks (SEP-1686) ────────────────
             elif method == 'tasks/get':
-                result = self.task_manager.handle_tasks_get(params)
+                result = self.task_manager.handle_tasks_get(params, self._session_user(session))
+            elif method == 'tasks/result':
+                result = self.task_manager.handle_tasks_result(params, self._session_user(session))
             elif method == 'tasks/list':
-                result = self.task_manager.handle_tasks_list(params)
+                result = self.task_manager.handle_tasks_list(params, self._session_user(session))
             elif method == 'tasks/cancel':
-                result = self.task_manager.handle_tasks_cancel(params)
+                result = self.task_manager.handle_tasks_cancel(params, self._session_user(session))
 
             # ── MCP 2025-11-25: Elicitation (SEP-1330, SEP-1036) ─
             elif method == 'elicitation/respond':
@@ -188,6 +210,12 @@ class MCPHandler:
                 self.FORBIDDEN,
                 str(e)
             )
+        except queue.Full:
+            return self._create_error_response(
+                request_id,
+                self.SERVER_BUSY,
+                "Task queue full — try again later"
+            )
         except ValueError as e:
             return self._create_error_response(
                 request_id,
@@ -476,20 +504,23 @@ class MCPHandler:
         if not tool:
             raise ValueError(f"Tool not found: {tool_name}")
         
-        # Execute the tool
         arguments = params.get('arguments', {})
+
+        # Task-augmented call (MCP 2025-11-25): return a handle now, run on the shared executor
+        if params.get('task') is not None and self.tool_tasks_enabled:
+            return self.task_manager.submit_tool_call(tool_name, arguments, user_id=self._session_user(session))
+
+        # Execute the tool
         self.logger.info(f"Executing tool: {tool_name} (User: {session.get('user_id', 'anonymous')})")
         
         try:
-            result = tool.execute(arguments)
+            from sajha.core.duckdb_guard import tenant_scope
+            with tenant_scope(self._session_user(session)):
+                result = tool.execute(arguments)
             
             # Format result according to MCP spec
-            if isinstance(result, str):
-                result = [{"type": "text", "text": result}]
-            elif not isinstance(result, list):
-                result = [{"type": "text", "text": str(result)}]
-            
-            return {"content": result}
+            from sajha.core.mcp_2025_11_25 import format_tool_content
+            return {"content": format_tool_content(result)}
             
         except Exception as e:
             # MCP 2025-11-25 Minor 5: Return as Tool Execution Error (isError: true)
@@ -500,6 +531,10 @@ class MCPHandler:
                 "isError": True
             }
     
+    @staticmethod
+    def _session_user(session: Optional[Dict]) -> Optional[str]:
+        return session.get('user_id') if session else None
+
     def _handle_notification_cancelled(self, params: Dict) -> Dict:
         """Handle notifications/cancelled — client cancels a pending request."""
         request_id = params.get("requestId")
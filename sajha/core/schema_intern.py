@@ -0,0 +1,117 @@
+"""
+SAJHA MCP Server — Interned Schemas
+Copyright All rights Reserved 2025-2030, Ashutosh Sinha
+
+Immutable, interned JSON-schema values shared between tools.
+
+intern_schema() turns a schema into FrozenDict / FrozenList nodes and returns
+the one canonical instance of each distinct sub-tree, so the same property
+definition ({"type": "string", "description": "Ticker symbol"}) is held once
+no matter how many tools — or composites built from them — use it. Frozen
+nodes are ordinary dict / list subclasses: json.dumps, .get(), iteration and
+templates work unchanged; in-place mutation raises TypeError.
+
+Callers that need to edit a schema take thaw(schema) (or copy.deepcopy, which
+thaws) and edit the copy.
+"""
+
+import sys
+import threading
+import weakref
+from typing import Any, Dict
+
+_READ_ONLY = 'schema is interned and read-only; edit thaw(schema) instead'
+
+
+def _read_only(self, *args, **kwargs):
+    raise TypeError(_READ_ONLY)
+
+
+class FrozenDict(dict):
+    """Read-only dict node of an interned schema."""
+
+    __setitem__ = __delitem__ = _read_only
+    clear = pop = popitem = setdefault = update = __ior__ = _read_only
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+    def __reduce__(self):
+        return intern_schema, (thaw(self),)
+
+
+class FrozenList(list):
+    """Read-only list node of an interned schema."""
+
+    __setitem__ = __delitem__ = _read_only
+    append = extend = insert = pop = remove = clear = sort = reverse = _read_only
+    __iadd__ = __imul__ = _read_only
+
+    def __copy__(self):
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+    def __reduce__(self):
+        return intern_schema, (thaw(self),)
+
+
+# Canonical nodes by structural key. A key names its children by id(), which is
+# stable because the parent node holds them; entries go when the last user does.
+_table: 'weakref.WeakValueDictionary[tuple, Any]' = weakref.WeakValueDictionary()
+_lock = threading.Lock()
+_stats = {'lookups': 0, 'hits': 0}
+
+
+def _key(value: Any) -> Any:
+    if isinstance(value, (FrozenDict, FrozenList)):
+        return id(value)
+    try:
+        hash(value)
+    except TypeError:
+        return ('id', id(value))
+    return (type(value), value)
+
+
+def _canonical(node, key: tuple):
+    with _lock:
+        _stats['lookups'] += 1
+        existing = _table.get(key)
+        if existing is not None:
+            _stats['hits'] += 1
+            return existing
+        _table[key] = node
+        return node
+
+
+def intern_schema(value: Any) -> Any:
+    """Frozen, canonical form of a schema value. Already-frozen nodes are returned as-is."""
+    if isinstance(value, (FrozenDict, FrozenList)):
+        return value
+    if isinstance(value, dict):
+        items = [(sys.intern(k) if isinstance(k, str) else k, intern_schema(v)) for k, v in value.items()]
+        node = FrozenDict(items)
+        return _canonical(node, ('d',) + tuple((k, _key(v)) for k, v in items))
+    if isinstance(value, (list, tuple)):
+        items = [intern_schema(v) for v in value]
+        node = FrozenList(items)
+        return _canonical(node, ('l',) + tuple(_key(v) for v in items))
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Plain, mutable deep copy of a (possibly frozen) schema."""
+    if isinstance(value, dict):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [thaw(v) for v in value]
+    return value
+
+
+def stats() -> Dict[str, int]:
+    with _lock:
+        return {'nodes': len(_table), **_stats}
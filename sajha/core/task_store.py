@@ -0,0 +1,406 @@
+"""
+SAJHA MCP Server — Durable Async Task Store
+Copyright All rights Reserved 2025-2030, Ashutosh Sinha
+
+The queue behind AsyncExecutor. Every task is a row; the queue is the set of rows
+with status 'queued', read in created_at order through an index.
+
+- Leases: a worker claims a task by setting status 'running', lease_owner and
+  lease_expires in one transaction. While it runs, the owner renews the lease. If
+  the process dies, the lease lapses and the next claim picks the task up again —
+  until max_attempts, after which it is failed.
+- Completion writes are fenced on lease_owner, so a worker whose lease was taken
+  over cannot overwrite the new owner's result.
+- Deliveries are leased the same way: a finished task handed to the delivery
+  stage keeps delivery_status 'pending' under a renewed lease until its outcome
+  is recorded. If the process dies with the delivery queued or waiting to
+  retry, the lease lapses and claim_deliveries() hands the task to another
+  executor (or the restarted one).
+- Results are stored as JSON up to max_result_bytes; larger ones are dropped from
+  the row (result_truncated = 1, result_bytes kept) but still delivered.
+- Listing is keyset-paginated on (created_at, task_id) — no sort of the whole table
+  — and retention is one indexed DELETE.
+
+Any number of processes can share one store: SQLite in WAL mode serializes claims
+with BEGIN IMMEDIATE, PostgreSQL with SELECT ... FOR UPDATE SKIP LOCKED.
+
+Config (config/application.yml):
+  async:
+    store:
+      type: sqlite                 # sqlite | postgresql
+      path: data/async_tasks.db    # sqlite
+      dsn: ''                      # postgresql, e.g. postgresql://user:pw@host/db
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import logging
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, ContextManager, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ('completed', 'failed', 'cancelled', 'delivered')
+
+
+class _AnyUser:
+    def __repr__(self):
+        return 'ANY_USER'
+
+
+# list(user_id=ANY_USER) spans every user; user_id=None means tasks submitted without one
+ANY_USER = _AnyUser()
+
+_COLUMNS = ('task_id', 'tool_name', 'arguments', 'delivery_type', 'delivery_destination', 'delivery_config',
+            'status', 'result', 'result_bytes', 'result_truncated', 'error', 'user_id', 'created_at',
+            'started_at', 'completed_at', 'delivered_at', 'duration_ms', 'delivery_status', 'attempts',
+            'lease_owner', 'lease_expires')
+_JSON_COLUMNS = ('arguments', 'delivery_config')
+
+_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS async_tasks (
+        task_id TEXT PRIMARY KEY,
+        tool_name TEXT NOT NULL,
+        arguments TEXT,
+        delivery_type TEXT,
+        delivery_destination TEXT,
+        delivery_config TEXT,
+        status TEXT NOT NULL,
+        result TEXT,
+        result_bytes INTEGER DEFAULT 0,
+        result_truncated INTEGER DEFAULT 0,
+        error TEXT,
+        user_id TEXT,
+        created_at DOUBLE PRECISION NOT NULL,
+        started_at DOUBLE PRECISION,
+        completed_at DOUBLE PRECISION,
+        delivered_at DOUBLE PRECISION,
+        duration_ms DOUBLE PRECISION,
+        delivery_status TEXT,
+        attempts INTEGER DEFAULT 0,
+        lease_owner TEXT,
+        lease_expires DOUBLE PRECISION)""",
+    "CREATE INDEX IF NOT EXISTS ix_async_tasks_status_created ON async_tasks (status, created_at)",
+    "CREATE INDEX IF NOT EXISTS ix_async_tasks_created ON async_tasks (created_at, task_id)",
+    "CREATE INDEX IF NOT EXISTS ix_async_tasks_lease ON async_tasks (status, lease_expires)",
+    "CREATE INDEX IF NOT EXISTS ix_async_tasks_delivery ON async_tasks (delivery_status, lease_expires)",
+]
+
+
+def encode_cursor(row: Dict) -> str:
+    return f"{row['created_at']!r}:{row['task_id']}"
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[float, str]]:
+    try:
+        created, _, task_id = cursor.partition(':')
+        return float(created), task_id
+    except (AttributeError, ValueError):
+        return None
+
+
+class TaskStore(ABC):
+    """
+    SQL task store. Subclasses supply connections, the transaction that makes a
+    claim exclusive, and the dialect bits (placeholder, row locking).
+    """
+
+    placeholder = '?'
+    lock_clause = ''
+
+    def __init__(self, max_result_bytes: int = 16 * 1024 * 1024, max_attempts: int = 3):
+        self.max_result_bytes = max_result_bytes
+        self.max_attempts = max(1, max_attempts)
+        self._local = threading.local()
+
+    # ── Dialect hooks ───────────────────────────────────────────────────────
+
+    @abstractmethod
+    def _connect(self):
+        """Open a connection for the calling thread."""
+        ...
+
+    @abstractmethod
+    def _transaction(self, write: bool = True) -> ContextManager[Any]:
+        """Context manager yielding a cursor inside a transaction; write=True makes a claim exclusive."""
+        ...
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def _sql(self, sql: str) -> str:
+        return sql if self.placeholder == '?' else sql.replace('?', self.placeholder)
+
+    def _execute(self, cur, sql: str, params: tuple = ()):
+        cur.execute(self._sql(sql), params)
+        return cur
+
+    def init_schema(self):
+        with self._transaction() as cur:
+            for statement in _SCHEMA:
+                self._execute(cur, statement)
+
+    @staticmethod
+    def _row(cur, values) -> Dict:
+        row = dict(zip([d[0] for d in cur.description], values))
+        for col in _JSON_COLUMNS:
+            if row.get(col):
+                row[col] = json.loads(row[col])
+        if row.get('result') is not None:
+            row['result'] = json.loads(row['result'])
+        return row
+
+    # ── Queue ───────────────────────────────────────────────────────────────
+
+    def enqueue(self, task: Dict, max_queued: int = 0) -> bool:
+        """Insert a queued task; False when max_queued tasks are already waiting."""
+        with self._transaction() as cur:
+            if max_queued:
+                queued = self._execute(cur, "SELECT COUNT(*) FROM async_tasks WHERE status = 'queued'").fetchone()[0]
+                if queued >= max_queued:
+                    return False
+            row = dict(task, status='queued', attempts=0)
+            for col in _JSON_COLUMNS:
+                row[col] = json.dumps(row.get(col) or {}, default=str)
+            cols = [c for c in _COLUMNS if c in row]
+            self._execute(cur, f"INSERT INTO async_tasks ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})",
+                          tuple(row[c] for c in cols))
+        return True
+
+    def claim(self, owner: str, lease_seconds: float) -> Optional[Dict]:
+        """Lease the next runnable task: an expired lease first, else the oldest queued task."""
+        now = time.time()
+        with self._transaction() as cur:
+            while True:
+                found = self._execute(
+                    cur, "SELECT task_id, attempts FROM async_tasks WHERE status = 'running' AND lease_expires < ? "
+                         f"ORDER BY lease_expires LIMIT 1{self.lock_clause}", (now,)).fetchone()
+                if found and found[1] >= self.max_attempts:
+                    self._execute(cur, "UPDATE async_tasks SET status = 'failed', completed_at = ?, lease_owner = NULL, "
+                                       "error = ? WHERE task_id = ?",
+                                  (now, f"Lease expired after {found[1]} attempts", found[0]))
+                    continue
+                if found is None:
+                    found = self._execute(
+                        cur, "SELECT task_id, attempts FROM async_tasks WHERE status = 'queued' "
+                             f"ORDER BY created_at LIMIT 1{self.lock_clause}").fetchone()
+                if found is None:
+                    return None
+                self._execute(cur, "UPDATE async_tasks SET status = 'running', lease_owner = ?, lease_expires = ?, "
+                                   "started_at = ?, attempts = attempts + 1 WHERE task_id = ?",
+                              (owner, now + lease_seconds, now, found[0]))
+                row = self._execute(cur, "SELECT * FROM async_tasks WHERE task_id = ?", (found[0],))
+                return self._row(row, row.fetchone())
+
+    def renew(self, task_ids: List[str], owner: str, lease_seconds: float) -> int:
+        """Extend owner's leases on running tasks and on deliveries still pending."""
+        if not task_ids:
+            return 0
+        with self._transaction() as cur:
+            marks = ', '.join('?' * len(task_ids))
+            return self._execute(cur, f"UPDATE async_tasks SET lease_expires = ? "
+                                      f"WHERE (status = 'running' OR delivery_status = 'pending') "
+                                      f"AND lease_owner = ? AND task_id IN ({marks})",
+                                 (time.time() + lease_seconds, owner, *task_ids)).rowcount
+
+    def claim_deliveries(self, owner: str, lease_seconds: float, limit: int = 100) -> List[Dict]:
+        """Lease finished tasks whose delivery was handed off but whose lease lapsed (its process died)."""
+        now = time.time()
+        with self._transaction() as cur:
+            found = self._execute(
+                cur, "SELECT task_id FROM async_tasks WHERE delivery_status = 'pending' "
+                     "AND (lease_expires IS NULL OR lease_expires < ?) "
+                     f"ORDER BY completed_at LIMIT ?{self.lock_clause}", (now, limit)).fetchall()
+            if not found:
+                return []
+            task_ids = [r[0] for r in found]
+            marks = ', '.join('?' * len(task_ids))
+            self._execute(cur, f"UPDATE async_tasks SET lease_owner = ?, lease_expires = ? WHERE task_id IN ({marks})",
+                          (owner, now + lease_seconds, *task_ids))
+            rows = self._execute(cur, f"SELECT * FROM async_tasks WHERE task_id IN ({marks}) ORDER BY completed_at",
+                                 tuple(task_ids))
+            return [self._row(rows, values) for values in rows.fetchall()]
+
+    def finish(self, task_id: str, owner: str, status: str, result: Any = None, error: Optional[str] = None,
+               started_at: Optional[float] = None) -> bool:
+        """Record the outcome of a leased task. False if the lease now belongs to someone else."""
+        now = time.time()
+        encoded, size, truncated = None, 0, 0
+        if result is not None:
+            encoded = json.dumps(result, default=str)
+            size = len(encoded.encode('utf-8'))
+            if size > self.max_result_bytes:
+                encoded, truncated = None, 1
+        duration = round((now - started_at) * 1000, 1) if started_at else None
+        with self._transaction() as cur:
+            return self._execute(
+                cur, "UPDATE async_tasks SET status = ?, result = ?, result_bytes = ?, result_truncated = ?, "
+                     "error = ?, completed_at = ?, duration_ms = ?, lease_owner = NULL, lease_expires = NULL "
+                     "WHERE task_id = ? AND status = 'running' AND lease_owner = ?",
+                (status, encoded, size, truncated, error, now, duration, task_id, owner)).rowcount == 1
+
+    def update(self, task_id: str, **fields) -> bool:
+        cols = [c for c in fields if c in _COLUMNS and c != 'task_id']
+        if not cols:
+            return False
+        with self._transaction() as cur:
+            return self._execute(cur, f"UPDATE async_tasks SET {', '.join(f'{c} = ?' for c in cols)} "
+                                      "WHERE task_id = ?", (*[fields[c] for c in cols], task_id)).rowcount == 1
+
+    def cancel(self, task_id: str, include_running: bool = False) -> bool:
+        """Cancel a queued task, or also a running one: its worker's finish() is then fenced off."""
+        statuses = "('queued', 'running')" if include_running else "('queued')"
+        with self._transaction() as cur:
+            return self._execute(cur, "UPDATE async_tasks SET status = 'cancelled', completed_at = ?, "
+                                      "lease_owner = NULL, lease_expires = NULL "
+                                      f"WHERE task_id = ? AND status IN {statuses}", (time.time(), task_id)).rowcount == 1
+
+    # ── Reads ───────────────────────────────────────────────────────────────
+
+    def get(self, task_id: str) -> Optional[Dict]:
+        with self._transaction(write=False) as cur:
+            self._execute(cur, "SELECT * FROM async_tasks WHERE task_id = ?", (task_id,))
+            values = cur.fetchone()
+            return self._row(cur, values) if values else None
+
+    def list(self, status: Optional[str] = None, limit: int = 100, cursor: Optional[str] = None,
+             delivery_type: Optional[str] = None, user_id: Any = ANY_USER) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Newest first, one page: (rows, cursor for the next page or None).
+        user_id: ANY_USER for every user, None for tasks without a user, else that user's.
+        """
+        where, params = [], []
+        for column, value in (('status', status), ('delivery_type', delivery_type)):
+            if value:
+                where.append(f"{column} = ?")
+                params.append(value)
+        if user_id is None:
+            where.append("user_id IS NULL")
+        elif user_id is not ANY_USER:
+            where.append("user_id = ?")
+            params.append(user_id)
+        after = decode_cursor(cursor) if cursor else None
+        if after:
+            where.append("(created_at < ? OR (created_at = ? AND task_id < ?))")
+            params += [after[0], after[0], after[1]]
+        sql = ("SELECT * FROM async_tasks" + (f" WHERE {' AND '.join(where)}" if where else '')
+               + " ORDER BY created_at DESC, task_id DESC LIMIT ?")
+        with self._transaction(write=False) as cur:
+            self._execute(cur, sql, (*params, limit + 1))
+            rows = [self._row(cur, v) for v in cur.fetchall()]
+        more = len(rows) > limit
+        rows = rows[:limit]
+        return rows, (encode_cursor(rows[-1]) if more and rows else None)
+
+    def counts(self) -> Dict[str, int]:
+        with self._transaction(write=False) as cur:
+            return dict(self._execute(cur, "SELECT status, COUNT(*) FROM async_tasks GROUP BY status").fetchall())
+
+    def purge(self, older_than: float) -> int:
+        """Delete finished tasks created before `older_than` (epoch seconds)."""
+        marks = ', '.join('?' * len(TERMINAL_STATUSES))
+        with self._transaction() as cur:
+            return self._execute(cur, f"DELETE FROM async_tasks WHERE status IN ({marks}) AND created_at < ?",
+                                 (*TERMINAL_STATUSES, older_than)).rowcount
+
+    def describe(self) -> Dict:
+        return {'type': 'sql'}
+
+
+class SQLiteTaskStore(TaskStore):
+    """One WAL-mode SQLite file, shared by every thread and process that opens it."""
+
+    def __init__(self, path: str = 'data/async_tasks.db', **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        if path != ':memory:':
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.init_schema()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=30000")
+        return conn
+
+    @contextmanager
+    def _transaction(self, write: bool = True):
+        conn = self._conn()
+        cur = conn.cursor()
+        # Writers take the lock up front so two claimers never both read the same queued row
+        cur.execute("BEGIN IMMEDIATE" if write else "BEGIN")
+        try:
+            yield cur
+        except BaseException:
+            cur.execute("ROLLBACK")
+            raise
+        else:
+            cur.execute("COMMIT")
+        finally:
+            cur.close()
+
+    def describe(self) -> Dict:
+        return {'type': 'sqlite', 'path': self.path}
+
+
+class PostgresTaskStore(TaskStore):
+    """PostgreSQL via psycopg2 or psycopg 3; claims skip rows locked by other workers."""
+
+    placeholder = '%s'
+    lock_clause = ' FOR UPDATE SKIP LOCKED'
+
+    def __init__(self, dsn: str, **kwargs):
+        super().__init__(**kwargs)
+        self.dsn = dsn
+        try:
+            import psycopg2 as driver
+        except ImportError:
+            import psycopg as driver
+        self._driver = driver
+        self.init_schema()
+
+    def _connect(self):
+        return self._driver.connect(self.dsn)
+
+    @contextmanager
+    def _transaction(self, write: bool = True):
+        conn = self._conn()
+        cur = conn.cursor()
+        try:
+            yield cur
+        except BaseException:
+            conn.rollback()
+            raise
+        else:
+            conn.commit()
+        finally:
+            cur.close()
+
+    def describe(self) -> Dict:
+        return {'type': 'postgresql'}
+
+
+def create_task_store(store_type: str = 'sqlite', path: str = 'data/async_tasks.db', dsn: str = '',
+                      **kwargs) -> TaskStore:
+    if store_type in ('postgresql', 'postgres'):
+        if not dsn:
+            raise ValueError("async.store.dsn is required for a postgresql task store")
+        return PostgresTaskStore(dsn, **kwargs)
+    if store_type != 'sqlite':
+        raise ValueError(f"Unknown async task store type: {store_type}")
+    return SQLiteTaskStore(path, **kwargs)
+
+
+def worker_identity() -> str:
+    """Lease owner prefix: host and pid, so a lease names the process holding it."""
+    import socket
+    return f"{socket.gethostname()}:{os.getpid()}"
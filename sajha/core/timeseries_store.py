@@ -0,0 +1,529 @@
+"""
+SAJHA MCP Server v5.3.0 — Incremental Time-Series Store
+Copyright All rights Reserved 2025-2030, Ashutosh Sinha
+
+Local store for the macro and central-bank series behind the FRED, World
+Bank, IMF, ECB, Bank of Canada and other central-bank tools. Before this,
+every tool-cache miss downloaded a series' full observation history again,
+although new data only ever appears at the tail.
+
+Series are keyed by (provider, series id, frequency) and kept in the
+"timeseries" schema of the shared DuckDB engine (sajha.core.duckdb_engine),
+i.e. in a columnar table on disk:
+
+  observations  one row per (series, date): period label as published,
+                value, and the vintage — when that value was first seen
+  series        first/last date, observation count, fetch bookkeeping and
+                the provider's metadata (label, units, ...) as JSON
+  revisions     every value the provider later changed, with the time it
+                was superseded
+
+A request first checks the series row. When the series was refreshed
+within refresh_seconds — or the request ends before the last stored date —
+it is answered locally. Otherwise only the tail is fetched: everything
+from the revision_window-th last stored observation on, so late revisions
+to recent periods are picked up too. Unchanged values keep their vintage,
+changed ones are logged to `revisions`. If the upstream call fails, the
+stored history is served and marked stale.
+
+Date-range, last-N, resample (week/month/quarter/year with
+last/first/mean/sum/min/max) and transform (diff, pct_change, yoy, log)
+requests are answered with SQL over the stored rows.
+
+Tools opt in with the @stored_series decorator on a
+_fetch_series(series..., start_date, end_date, recent_periods) method, or
+call TimeSeriesStore.series() with an upstream callable.
+
+Config (config/application.yml):
+  timeseries:
+    store:
+      enabled: true
+      schema: timeseries
+      refresh_seconds: 21600      # Serve locally for this long after a fetch
+      revision_window: 3          # Stored observations re-fetched with each delta
+"""
+import functools
+import inspect
+import json
+import logging
+import re
+import threading
+import time
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+RESAMPLE_PERIODS = {
+    'W': 'week', 'week': 'week', 'weekly': 'week',
+    'M': 'month', 'month': 'month', 'monthly': 'month',
+    'Q': 'quarter', 'quarter': 'quarter', 'quarterly': 'quarter',
+    'A': 'year', 'Y': 'year', 'year': 'year', 'annual': 'year',
+}
+RESAMPLE_METHODS = {
+    'last': 'arg_max(value, date)', 'first': 'arg_min(value, date)', 'mean': 'AVG(value)',
+    'sum': 'SUM(value)', 'min': 'MIN(value)', 'max': 'MAX(value)',
+}
+TRANSFORMS = ('diff', 'pct_change', 'yoy', 'log')
+
+# Input-schema properties for tools that expose the store's local queries
+SERIES_QUERY_PROPERTIES = {
+    "resample": {
+        "type": "string",
+        "enum": ["week", "month", "quarter", "year"],
+        "description": "Aggregate observations to this period"
+    },
+    "resample_method": {
+        "type": "string",
+        "enum": list(RESAMPLE_METHODS),
+        "default": "last",
+        "description": "How observations within a resampled period are combined"
+    },
+    "transform": {
+        "type": "string",
+        "enum": list(TRANSFORMS),
+        "description": "diff (change), pct_change (% vs previous observation), "
+                       "yoy (% vs a year earlier) or log"
+    }
+}
+
+# Labels of the resampled periods
+_PERIOD_LABELS = {
+    'week': "strftime(date, '%Y-%m-%d')",
+    'month': "strftime(date, '%Y-%m')",
+    'quarter': "strftime(date, '%Y') || '-Q' || quarter(date)",
+    'year': "strftime(date, '%Y')",
+}
+
+_PERIOD_RE = re.compile(
+    r'^(\d{4})(?:[-/]?(?:(\d{2})(?:[-/](\d{2}))?|Q([1-4])|S([12])|W(\d{2})|M(\d{2})))?$', re.IGNORECASE)
+
+_DDL = (
+    """CREATE TABLE IF NOT EXISTS observations (
+        provider VARCHAR, series_id VARCHAR, frequency VARCHAR, date DATE,
+        period VARCHAR, value DOUBLE, vintage TIMESTAMP,
+        PRIMARY KEY (provider, series_id, frequency, date))""",
+    """CREATE TABLE IF NOT EXISTS series (
+        provider VARCHAR, series_id VARCHAR, frequency VARCHAR,
+        first_date DATE, last_date DATE, observations INTEGER,
+        first_fetched TIMESTAMP, last_fetched TIMESTAMP, last_changed TIMESTAMP,
+        fetches INTEGER, last_delta INTEGER, revisions INTEGER, metadata VARCHAR,
+        PRIMARY KEY (provider, series_id, frequency))""",
+    """CREATE TABLE IF NOT EXISTS revisions (
+        provider VARCHAR, series_id VARCHAR, frequency VARCHAR, date DATE,
+        old_value DOUBLE, new_value DOUBLE, old_vintage TIMESTAMP, superseded_at TIMESTAMP)""",
+)
+
+
+def period_to_date(label: Any) -> Optional[date]:
+    """First day of a published period: 2024, 2024-03, 2024-03-15, 2024-Q1, 2024-S2, 2024-W05, 2024M03."""
+    if label is None:
+        return None
+    if isinstance(label, datetime):
+        return label.date()
+    if isinstance(label, date):
+        return label
+    text = str(label).strip()
+    m = _PERIOD_RE.match(text)
+    if not m:
+        try:
+            return datetime.fromisoformat(text[:10]).date()
+        except ValueError:
+            return None
+    year, month, day, quarter, semester, week, imf_month = m.groups()
+    year = int(year)
+    if month:
+        return date(year, int(month), int(day) if day else 1)
+    if quarter:
+        return date(year, 3 * int(quarter) - 2, 1)
+    if semester:
+        return date(year, 1 if semester == '1' else 7, 1)
+    if week:
+        return date.fromisocalendar(year, max(1, int(week)), 1)
+    if imf_month:
+        return date(year, int(imf_month), 1)
+    return date(year, 1, 1)
+
+
+def _as_float(value: Any) -> Optional[float]:
+    if value is None or value == '' or value == '.':
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class TimeSeriesStore:
+    """Incremental, locally queryable store of provider time series."""
+
+    def __init__(self, engine=None, schema: str = 'timeseries', refresh_seconds: float = 21600,
+                 revision_window: int = 3, enabled: bool = True):
+        self._engine = engine
+        self.schema = schema
+        self.refresh_seconds = float(refresh_seconds or 0)
+        self.revision_window = max(1, int(revision_window or 1))
+        self.enabled = enabled
+        self._ready = False
+        self._lock = threading.Lock()
+        self._series_locks: Dict[Tuple[str, str, str], threading.Lock] = {}
+        self._stats = {'local': 0, 'full_loads': 0, 'deltas': 0, 'stale': 0,
+                       'observations_fetched': 0, 'revisions': 0}
+
+    # ── Storage ─────────────────────────────────────────────────────────────
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            from sajha.core.duckdb_engine import get_duckdb_engine
+            self._engine = get_duckdb_engine()
+        return self._engine
+
+    def _cursor(self):
+        cur = self.engine.cursor(self.schema)
+        if not self._ready:
+            with self._lock:
+                if not self._ready:
+                    for ddl in _DDL:
+                        cur.execute(ddl)
+                    self._ready = True
+        return cur
+
+    def _series_lock(self, key: Tuple[str, str, str]) -> threading.Lock:
+        with self._lock:
+            lock = self._series_locks.get(key)
+            if lock is None:
+                lock = self._series_locks[key] = threading.Lock()
+            return lock
+
+    def info(self, provider: str, series_id: str, frequency: str = 'native') -> Optional[Dict[str, Any]]:
+        """Bookkeeping row for a series (None when it was never stored)."""
+        cur = self._cursor()
+        row = cur.execute(
+            "SELECT first_date, last_date, observations, first_fetched, last_fetched, last_changed, "
+            "fetches, last_delta, revisions, metadata FROM series "
+            "WHERE provider = ? AND series_id = ? AND frequency = ?",
+            [provider, series_id, frequency]).fetchone()
+        if row is None:
+            return None
+        names = ('first_date', 'last_date', 'observations', 'first_fetched', 'last_fetched',
+                 'last_changed', 'fetches', 'last_delta', 'revisions', 'metadata')
+        info = dict(zip(names, row))
+        info['metadata'] = json.loads(info['metadata'] or '{}')
+        return info
+
+    def _since(self, cur, key: Tuple[str, str, str]) -> Optional[Tuple[date, str]]:
+        """(date, period label) of the oldest observation the next delta re-fetches."""
+        row = cur.execute(
+            "SELECT date, period FROM observations WHERE provider = ? AND series_id = ? AND frequency = ? "
+            "ORDER BY date DESC LIMIT 1 OFFSET ?", list(key) + [self.revision_window - 1]).fetchone()
+        if row is None:
+            row = cur.execute(
+                "SELECT MIN(date), arg_min(period, date) FROM observations "
+                "WHERE provider = ? AND series_id = ? AND frequency = ?", list(key)).fetchone()
+        return (row[0], row[1]) if row and row[0] is not None else None
+
+    def _merge(self, cur, key: Tuple[str, str, str], observations: List[Dict[str, Any]],
+               since: Optional[date], metadata: Dict[str, Any], now: datetime,
+               info: Optional[Dict[str, Any]]) -> int:
+        """Write fetched observations (dates >= since) and the series row; returns revision count."""
+        fetched: Dict[date, Tuple[str, Optional[float]]] = {}
+        for obs in observations:
+            d = period_to_date(obs.get('date'))
+            if d is None or (since is not None and d < since):
+                continue
+            fetched[d] = (str(obs.get('date')), _as_float(obs.get('value')))
+
+        existing = {}
+        if since is not None:
+            existing = {r[0]: (r[1], r[2]) for r in cur.execute(
+                "SELECT date, value, vintage FROM observations "
+                "WHERE provider = ? AND series_id = ? AND frequency = ? AND date >= ?",
+                list(key) + [since]).fetchall()}
+
+        dates, periods, values, vintages, revised = [], [], [], [], []
+        for d in sorted(fetched):
+            period, value = fetched[d]
+            vintage = now
+            if d in existing:
+                old_value, old_vintage = existing[d]
+                if old_value == value:
+                    vintage = old_vintage
+                else:
+                    revised.append((d, old_value, value, old_vintage))
+            dates.append(d)
+            periods.append(period)
+            values.append(value)
+            vintages.append(vintage)
+        # Stored dates the delta did not return are kept: an empty (or short) but
+        # successful response must not erase history, so only returned dates change.
+        changed = bool(revised) or any(v == now for v in vintages)
+
+        cur.execute("BEGIN TRANSACTION")
+        try:
+            if dates and existing:
+                cur.execute("DELETE FROM observations WHERE provider = ? AND series_id = ? "
+                            "AND frequency = ? AND date IN (SELECT UNNEST(?::DATE[]))",
+                            list(key) + [[d for d in dates if d in existing]])
+            if dates:
+                cur.execute(
+                    "INSERT INTO observations SELECT ?, ?, ?, UNNEST(?::DATE[]), UNNEST(?::VARCHAR[]), "
+                    "UNNEST(?::DOUBLE[]), UNNEST(?::TIMESTAMP[])",
+                    list(key) + [dates, periods, values, vintages])
+            for d, old_value, new_value, old_vintage in revised:
+                cur.execute("INSERT INTO revisions VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                            list(key) + [d, old_value, new_value, old_vintage, now])
+            first_date, last_date, count = cur.execute(
+                "SELECT MIN(date), MAX(date), COUNT(*) FROM observations "
+                "WHERE provider = ? AND series_id = ? AND frequency = ?", list(key)).fetchone()
+            cur.execute("DELETE FROM series WHERE provider = ? AND series_id = ? AND frequency = ?",
+                        list(key))
+            cur.execute(
+                "INSERT INTO series VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                list(key) + [
+                    first_date, last_date, count,
+                    info['first_fetched'] if info else now, now,
+                    now if changed or not info else info['last_changed'],
+                    (info['fetches'] if info else 0) + 1,
+                    len(fetched),
+                    (info['revisions'] if info else 0) + len(revised),
+                    json.dumps(metadata, default=str),
+                ])
+            cur.execute("COMMIT")
+        except Exception:
+            cur.execute("ROLLBACK")
+            raise
+        return len(revised)
+
+    # ── Public API ──────────────────────────────────────────────────────────
+
+    def series(self, provider: str, series_id: str, frequency: str,
+               upstream: Callable[[Optional[str]], Dict[str, Any]],
+               start: Any = None, end: Any = None, last: Optional[int] = None,
+               resample: Optional[str] = None, how: str = 'last',
+               transform: Optional[str] = None) -> Dict[str, Any]:
+        """Observations of a series, fetching only what the store does not have yet.
+
+        upstream(since) returns {'observations': [{'date', 'value'}], ...metadata}
+        for every period from `since` (a period label as the provider
+        publishes it) on — or the full history when since is None. It may
+        raise; with stored history the error is logged and the history is
+        served as stale.
+
+        Returns {'observations': [{'date', 'value'}], 'metadata': {...},
+        'store': {...}}; 'date' is the provider's period label (or the
+        resampled period's label).
+        """
+        key = (provider, str(series_id), frequency or 'native')
+        start_date, end_date = period_to_date(start), period_to_date(end)
+        started = time.monotonic()
+        fetched, stale, revisions, error = None, False, 0, None
+
+        with self._series_lock(key):
+            cur = self._cursor()
+            info = self.info(*key)
+            now = datetime.now()
+            fresh = info is not None and self.refresh_seconds > 0 and \
+                (now - info['last_fetched']).total_seconds() < self.refresh_seconds
+            covered = info is not None and end_date is not None and info['last_date'] is not None \
+                and end_date < info['last_date']
+            if info is None or not (fresh or covered):
+                since = self._since(cur, key) if info is not None else None
+                try:
+                    response = upstream(since[1] if since else None) or {}
+                    if response.get('error') and not response.get('observations'):
+                        raise ValueError(response['error'])
+                except Exception as e:
+                    if info is None:
+                        raise
+                    logger.warning(f"Time-series refresh failed for {'/'.join(key)}; serving stored "
+                                   f"history: {e}")
+                    stale, error = True, str(e)
+                else:
+                    observations = response.get('observations') or []
+                    metadata = {k: v for k, v in response.items()
+                                if k not in ('observations', 'observation_count')}
+                    if info is not None:
+                        metadata = dict(info['metadata'], **metadata)
+                    revisions = self._merge(cur, key, observations, since[0] if since else None,
+                                            metadata, now, info)
+                    fetched = len(observations)
+                    info = self.info(*key)
+            with self._lock:
+                if fetched is None:
+                    self._stats['stale' if stale else 'local'] += 1
+                else:
+                    self._stats['deltas' if info['fetches'] > 1 else 'full_loads'] += 1
+                    self._stats['observations_fetched'] += fetched
+                    self._stats['revisions'] += revisions
+
+            observations = self.query(key, start_date, end_date, last, resample, how, transform)
+
+        store = {
+            'source': 'store' if fetched is None else 'upstream' if info['fetches'] == 1 else 'store+delta',
+            'fetched_observations': fetched or 0,
+            'revised_observations': revisions,
+            'stored_observations': info['observations'],
+            'first_date': info['first_date'].isoformat() if info['first_date'] else None,
+            'last_date': info['last_date'].isoformat() if info['last_date'] else None,
+            'last_fetched': info['last_fetched'].isoformat(timespec='seconds'),
+            'last_changed': info['last_changed'].isoformat(timespec='seconds'),
+            'total_revisions': info['revisions'],
+            'elapsed_ms': round((time.monotonic() - started) * 1000, 2),
+        }
+        if stale:
+            store.update(stale=True, error=error)
+        return {'observations': observations, 'metadata': info['metadata'], 'store': store}
+
+    def query(self, key: Tuple[str, str, str], start: Optional[date] = None, end: Optional[date] = None,
+              last: Optional[int] = None, resample: Optional[str] = None, how: str = 'last',
+              transform: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Stored observations of a series — optionally resampled and transformed."""
+        sql = ("SELECT date, period, value FROM observations "
+               "WHERE provider = ? AND series_id = ? AND frequency = ?")
+        if resample:
+            period = RESAMPLE_PERIODS.get(resample) or RESAMPLE_PERIODS.get(str(resample).lower())
+            if period is None:
+                raise ValueError(f"Unknown resample period '{resample}' "
+                                 f"(expected one of week, month, quarter, year)")
+            if how not in RESAMPLE_METHODS:
+                raise ValueError(f"Unknown resample method '{how}' (expected one of {list(RESAMPLE_METHODS)})")
+            sql = (f"SELECT date, {_PERIOD_LABELS[period]} AS period, value FROM ("
+                   f"SELECT CAST(date_trunc('{period}', date) AS DATE) AS date, "
+                   f"{RESAMPLE_METHODS[how]} AS value FROM ({sql}) GROUP BY 1)")
+        if transform:
+            if transform not in TRANSFORMS:
+                raise ValueError(f"Unknown transform '{transform}' (expected one of {list(TRANSFORMS)})")
+            if transform == 'yoy':
+                sql = (f"WITH s AS ({sql}) SELECT s.date, s.period, "
+                       f"(s.value / NULLIF(p.value, 0) - 1) * 100 AS value FROM s "
+                       f"ASOF LEFT JOIN s p ON p.date <= s.date - INTERVAL 1 YEAR")
+            else:
+                expr = {
+                    'diff': "value - LAG(value) OVER (ORDER BY date)",
+                    'pct_change': "(value / NULLIF(LAG(value) OVER (ORDER BY date), 0) - 1) * 100",
+                    'log': "CASE WHEN value > 0 THEN LN(value) END",
+                }[transform]
+                sql = f"SELECT date, period, {expr} AS value FROM ({sql})"
+
+        sql = f"SELECT date, period, value FROM ({sql}) WHERE TRUE"
+        params: List[Any] = list(key)
+        if start is not None:
+            sql += " AND date >= ?"
+            params.append(start)
+        if end is not None:
+            sql += " AND date <= ?"
+            params.append(end)
+        if last:
+            sql = f"SELECT * FROM ({sql} ORDER BY date DESC LIMIT {int(last)}) ORDER BY date"
+        else:
+            sql += " ORDER BY date"
+        rows = self._cursor().execute(sql, params).fetchall()
+        return [{'date': period if period is not None else d.isoformat(),
+                 'value': round(value, 6) if transform and value is not None else value}
+                for d, period, value in rows]
+
+    def revisions(self, provider: str, series_id: str, frequency: str = 'native') -> List[Dict[str, Any]]:
+        """Values the provider revised after they were first stored, newest first."""
+        rows = self._cursor().execute(
+            "SELECT date, old_value, new_value, old_vintage, superseded_at FROM revisions "
+            "WHERE provider = ? AND series_id = ? AND frequency = ? ORDER BY superseded_at DESC, date",
+            [provider, series_id, frequency]).fetchall()
+        return [{'date': d.isoformat(), 'old_value': old, 'new_value': new,
+                 'old_vintage': ov.isoformat(timespec='seconds') if ov else None,
+                 'superseded_at': sa.isoformat(timespec='seconds')}
+                for d, old, new, ov, sa in rows]
+
+    def drop(self, provider: str, series_id: str, frequency: str = 'native'):
+        """Forget a series; the next request reloads its full history."""
+        cur = self._cursor()
+        for table in ('observations', 'series', 'revisions'):
+            cur.execute(f"DELETE FROM {table} WHERE provider = ? AND series_id = ? AND frequency = ?",
+                        [provider, series_id, frequency])
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats, enabled=self.enabled, schema=self.schema,
+                         refresh_seconds=self.refresh_seconds, revision_window=self.revision_window)
+        if self._ready:
+            stats['series'], stats['observations'] = self._cursor().execute(
+                "SELECT COUNT(*), COALESCE(SUM(observations), 0) FROM series").fetchone()
+        return stats
+
+
+def stored_series(provider: str, key_args: int = 1,
+                  frequency: Optional[Callable[..., str]] = None):
+    """Serve a tool's _fetch_series(<key...>, start_date, end_date, recent_periods) from the store.
+
+    The decorated method is called as the upstream: with start_date set to
+    the first period the store needs (None for the full history) and no
+    end_date / recent_periods, so it must return every observation from
+    start_date on. Its response keys other than 'observations' are kept
+    as series metadata and returned alongside the stored observations.
+
+    recent_periods applies when neither start_date nor end_date is given.
+    Callers may also pass resample=, how= and transform= (see
+    TimeSeriesStore.query). frequency(*key) names the frequency the key
+    is stored under (default 'native').
+    """
+    def decorator(fetch):
+        signature = inspect.signature(fetch)
+
+        @functools.wraps(fetch)
+        def wrapper(self, *args, resample: Optional[str] = None, how: str = 'last',
+                    transform: Optional[str] = None, **kwargs):
+            store = get_timeseries_store()
+            if not store.enabled:
+                return fetch(self, *args, **kwargs)
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            values = list(bound.arguments.values())[1:]
+            series_key = values[:key_args]
+            start_date = bound.arguments.get('start_date')
+            end_date = bound.arguments.get('end_date')
+            recent = bound.arguments.get('recent_periods')
+
+            def upstream(since):
+                return fetch(self, *series_key, start_date=since, end_date=None, recent_periods=None)
+
+            result = store.series(
+                provider, '/'.join(str(k) for k in series_key),
+                frequency(*series_key) if frequency else 'native', upstream,
+                start=start_date, end=end_date,
+                last=recent if recent and not start_date and not end_date else None,
+                resample=resample, how=how, transform=transform)
+            response = dict(result['metadata'])
+            response.update(observation_count=len(result['observations']),
+                            observations=result['observations'], store=result['store'])
+            if resample:
+                response.update(resample=resample, resample_method=how)
+            if transform:
+                response['transform'] = transform
+            return response
+        return wrapper
+    return decorator
+
+
+# Module singleton
+_store: Optional[TimeSeriesStore] = None
+_store_lock = threading.Lock()
+
+
+def get_timeseries_store() -> TimeSeriesStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                enabled, schema, refresh_seconds, revision_window = True, 'timeseries', 21600, 3
+                try:
+                    from sajha.core.config import get_settings
+                    s = get_settings()
+                    enabled = getattr(s, 'timeseries_store_enabled', enabled)
+                    schema = getattr(s, 'timeseries_store_schema', schema)
+                    refresh_seconds = getattr(s, 'timeseries_store_refresh_seconds', refresh_seconds)
+                    revision_window = getattr(s, 'timeseries_store_revision_window', revision_window)
+                except Exception:
+                    pass
+                _store = TimeSeriesStore(schema=schema, refresh_seconds=refresh_seconds,
+                                         revision_window=revision_window, enabled=enabled)
+    return _store
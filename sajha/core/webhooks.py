@@ -6,28 +6,147 @@ Sends POST notifications to registered callback URLs when:
 - Composite tool execution completes
 - Long-running MCP task completes/fails
 - Tool health status changes (circuit breaker opens/closes)
+
+Delivery pipeline (thread count is fixed, independent of event volume):
+
+  notify() ─► event bus ─► fan-out ─► per-endpoint queue ─► worker pool
+                                            ▲                   │ failure
+                                            └── retry scheduler ◄┘
+                                                (delay queue)   │ out of attempts
+                                                                ▼
+                                                     dead-letter file (JSONL)
+
+Each endpoint is serviced by at most one worker at a time, so a slow or
+failing subscriber cannot occupy the whole pool. Retries wait in a delay
+queue instead of sleeping on a worker; while one waits, its endpoint is
+held and the retry goes back in at the head of the endpoint's queue, so
+every subscriber receives events in the order they were sent.
+
+Config (config/application.yml):
+  webhooks:
+    workers: 4
+    max_retries: 3
+    timeout: 10
+    backoff_seconds: 2
+    max_pending_per_endpoint: 1000
+    dead_letter_file: data/webhooks/dead_letter.jsonl
 """
+import heapq
+import itertools
 import json
 import logging
+import random
 import threading
 import time
 import urllib.request
 import urllib.error
-from typing import Any, Callable, Dict, List, Optional
+import uuid
+from collections import deque
+from pathlib import Path
+from typing import Callable, Deque, Dict, List, Optional, Set, Tuple
 
 logger = logging.getLogger(__name__)
 
+WEBHOOK_TOPIC = 'webhook'
+
+
+class _Delivery:
+    """One payload on its way to one callback URL."""
+    __slots__ = ('delivery_id', 'event_type', 'url', 'body', 'attempts', 'last_error', 'created_at')
+
+    def __init__(self, event_type: str, url: str, body: bytes, delivery_id: str = None,
+                 attempts: int = 0, created_at: float = None):
+        self.delivery_id = delivery_id or str(uuid.uuid4())
+        self.event_type = event_type
+        self.url = url
+        self.body = body
+        self.attempts = attempts
+        self.last_error = ''
+        self.created_at = created_at or time.time()
+
+
+class _RetryScheduler:
+    """Delay queue: a heap of (due_time, delivery) served by one thread."""
+
+    def __init__(self, on_due: Callable[[_Delivery], None]):
+        self._on_due = on_due
+        self._heap: List[Tuple[float, int, _Delivery]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+    def schedule(self, delay: float, delivery: _Delivery):
+        with self._cond:
+            heapq.heappush(self._heap, (time.monotonic() + delay, next(self._seq), delivery))
+            self._cond.notify()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='webhook-retry', daemon=True)
+                self._thread.start()
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._heap)
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    if self._heap:
+                        wait = self._heap[0][0] - time.monotonic()
+                        if wait <= 0:
+                            break
+                        self._cond.wait(wait)
+                    else:
+                        self._cond.wait()
+                if self._stopped:
+                    return
+                _, _, delivery = heapq.heappop(self._heap)
+            self._on_due(delivery)
+
 
 class WebhookManager:
     """Manages webhook subscriptions and delivery."""
 
-    def __init__(self, max_retries: int = 3, timeout: int = 10):
+    def __init__(self, max_retries: int = 3, timeout: int = 10, workers: int = 4,
+                 backoff_seconds: float = 2.0, max_pending_per_endpoint: int = 1000,
+                 dead_letter_file: str = 'data/webhooks/dead_letter.jsonl', bus=None):
         self._subscriptions: Dict[str, List[str]] = {}  # event_type → [callback_urls]
-        self._max_retries = max_retries
+        self._max_retries = max(1, max_retries)
         self._timeout = timeout
+        self._backoff = backoff_seconds
+        self._max_pending = max(1, max_pending_per_endpoint)
         self._lock = threading.Lock()
         self._delivery_log: List[Dict] = []
 
+        # Per-endpoint queues; _ready holds endpoints waiting for a worker and
+        # _scheduled tracks endpoints that are queued or being serviced
+        self._endpoint_queues: Dict[str, Deque[_Delivery]] = {}
+        self._scheduled: Set[str] = set()
+        self._ready: Deque[str] = deque()
+        self._active: Set[str] = set()       # endpoints a worker is attempting right now
+        self._held: Set[str] = set()         # endpoints whose head delivery is waiting to retry
+        self._work = threading.Condition(self._lock)
+        self._in_flight = 0
+        self._workers_count = max(1, workers)
+        self._workers: List[threading.Thread] = []
+        self._retry = _RetryScheduler(self._resume)
+
+        self._dead_letter_path = Path(dead_letter_file)
+        self._dead_letter_lock = threading.Lock()
+        self._dead_lettered = 0
+
+        if bus is None:
+            from sajha.core.event_bus import get_event_bus
+            bus = get_event_bus()
+        self._bus = bus
+        self._bus.register(WEBHOOK_TOPIC, self._fan_out)
+
     def subscribe(self, event_type: str, callback_url: str):
         """Register a callback URL for an event type."""
         with self._lock:
@@ -46,65 +165,240 @@ class WebhookManager:
                 ]
 
     def notify(self, event_type: str, payload: Dict):
-        """Send notification to all subscribers (async, non-blocking)."""
+        """Send notification to all subscribers (queued, never blocks the caller)."""
         with self._lock:
-            urls = list(self._subscriptions.get(event_type, []))
-        if not urls:
-            return
-        # Fire-and-forget in background threads
-        for url in urls:
-            t = threading.Thread(target=self._deliver, args=(event_type, url, payload), daemon=True)
+            if not self._subscriptions.get(event_type):
+                return
+        self._bus.publish(WEBHOOK_TOPIC, (event_type, payload, time.time()))
+
+    # ── Pipeline ────────────────────────────────────────────────────────────
+
+    def _fan_out(self, events: List[Tuple[str, Dict, float]]):
+        """Event bus handler: one delivery per (event, subscriber)."""
+        for event_type, payload, timestamp in events:
+            with self._lock:
+                urls = list(self._subscriptions.get(event_type, []))
+            if not urls:
+                continue
+            body = json.dumps({
+                'event': event_type,
+                'timestamp': timestamp,
+                'data': payload,
+            }, default=str).encode('utf-8')
+            for url in urls:
+                self._enqueue(_Delivery(event_type, url, body))
+
+    def _enqueue(self, delivery: _Delivery):
+        with self._work:
+            q = self._endpoint_queues.setdefault(delivery.url, deque())
+            if len(q) >= self._max_pending:
+                overflow = True
+            else:
+                overflow = False
+                q.append(delivery)
+                if delivery.url not in self._scheduled:
+                    self._scheduled.add(delivery.url)
+                    self._ready.append(delivery.url)
+                    self._work.notify()
+                self._ensure_workers()
+        if overflow:
+            delivery.last_error = f'endpoint queue full ({self._max_pending} pending)'
+            self._dead_letter(delivery)
+
+    def _resume(self, delivery: _Delivery):
+        """Retry due: put the delivery back at the head of its endpoint's queue and release the endpoint."""
+        with self._work:
+            self._held.discard(delivery.url)
+            self._endpoint_queues.setdefault(delivery.url, deque()).appendleft(delivery)
+            self._scheduled.add(delivery.url)
+            if delivery.url not in self._active:     # else the worker still finishing re-queues it
+                self._ready.append(delivery.url)
+                self._work.notify()
+            self._ensure_workers()
+
+    def _ensure_workers(self):
+        # Called with self._lock held
+        self._workers = [t for t in self._workers if t.is_alive()]
+        while len(self._workers) < self._workers_count:
+            t = threading.Thread(target=self._worker, name=f'webhook-worker-{len(self._workers)}',
+                                 daemon=True)
             t.start()
+            self._workers.append(t)
+
+    def _worker(self):
+        while True:
+            with self._work:
+                while not self._ready:
+                    self._work.wait()
+                url = self._ready.popleft()
+                q = self._endpoint_queues.get(url)
+                delivery = q.popleft() if q else None
+                self._in_flight += 1
+                self._active.add(url)
+            try:
+                if delivery is not None:
+                    self._attempt(delivery)
+            except Exception as e:
+                logger.error(f"Webhook worker error: {e}", exc_info=True)
+            finally:
+                with self._work:
+                    self._in_flight -= 1
+                    self._active.discard(url)
+                    q = self._endpoint_queues.get(url)
+                    if url in self._held:
+                        pass                    # stays scheduled, with its queue, until _resume()
+                    elif q:
+                        # Round-robin: go to the back of the line behind other endpoints
+                        self._ready.append(url)
+                        self._work.notify()
+                    else:
+                        self._scheduled.discard(url)
+                        self._endpoint_queues.pop(url, None)
+                    self._work.notify_all()
 
-    def _deliver(self, event_type: str, url: str, payload: Dict):
-        """Deliver webhook with retries."""
-        body = json.dumps({
-            'event': event_type,
-            'timestamp': time.time(),
-            'data': payload,
-        }).encode('utf-8')
+    def _attempt(self, delivery: _Delivery):
+        delivery.attempts += 1
         headers = {
             'Content-Type': 'application/json',
             'User-Agent': 'sajha-webhook/5.3.0',
-            'X-Sajha-Event': event_type,
+            'X-Sajha-Event': delivery.event_type,
+            'X-Sajha-Delivery': delivery.delivery_id,
+        }
+        status = 0
+        try:
+            req = urllib.request.Request(delivery.url, data=delivery.body, headers=headers, method='POST')
+            with urllib.request.urlopen(req, timeout=self._timeout) as resp:
+                status = resp.status
+            if 200 <= status < 300:
+                logger.info(f"Webhook delivered: {delivery.event_type} → {delivery.url} (HTTP {status})")
+                self._record_delivery(delivery.event_type, delivery.url, True, status)
+                return
+            delivery.last_error = f'HTTP {status}'
+        except urllib.error.HTTPError as e:
+            status = e.code
+            delivery.last_error = f'HTTP {e.code}'
+        except Exception as e:
+            delivery.last_error = str(e)
+
+        if delivery.attempts < self._max_retries:
+            delay = self._backoff * (2 ** (delivery.attempts - 1)) * random.uniform(0.5, 1.5)
+            logger.warning(f"Webhook delivery attempt {delivery.attempts}/{self._max_retries} failed: "
+                           f"{delivery.url} — {delivery.last_error}; retrying in {delay:.1f}s")
+            with self._work:
+                self._held.add(delivery.url)     # later events for this endpoint wait behind the retry
+            self._retry.schedule(delay, delivery)
+            return
+
+        self._record_delivery(delivery.event_type, delivery.url, False, status)
+        logger.error(f"Webhook delivery failed after {self._max_retries} attempts: {delivery.url}")
+        self._dead_letter(delivery)
+
+    # ── Dead letters ────────────────────────────────────────────────────────
+
+    def _dead_letter(self, delivery: _Delivery):
+        record = {
+            'delivery_id': delivery.delivery_id,
+            'event': delivery.event_type,
+            'url': delivery.url,
+            'attempts': delivery.attempts,
+            'last_error': delivery.last_error,
+            'created_at': delivery.created_at,
+            'failed_at': time.time(),
+            'body': delivery.body.decode('utf-8'),
         }
-        for attempt in range(1, self._max_retries + 1):
+        try:
+            with self._dead_letter_lock:
+                self._dead_letter_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self._dead_letter_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record) + '\n')
+                self._dead_lettered += 1
+        except Exception as e:
+            logger.error(f"Webhook dead-letter write failed for {delivery.url}: {e}", exc_info=True)
+
+    def list_dead_letters(self, limit: int = 100) -> List[Dict]:
+        """Most recent dead-lettered deliveries (payload body omitted)."""
+        with self._dead_letter_lock:
+            if not self._dead_letter_path.exists():
+                return []
+            lines = self._dead_letter_path.read_text(encoding='utf-8').splitlines()
+        records = []
+        for line in lines[-limit:]:
             try:
-                req = urllib.request.Request(url, data=body, headers=headers, method='POST')
-                with urllib.request.urlopen(req, timeout=self._timeout) as resp:
-                    status = resp.status
-                    if 200 <= status < 300:
-                        logger.info(f"Webhook delivered: {event_type} → {url} (HTTP {status})")
-                        self._record_delivery(event_type, url, True, status)
-                        return
-            except Exception as e:
-                logger.warning(f"Webhook delivery attempt {attempt}/{self._max_retries} failed: {url} — {e}", exc_info=True)
-                if attempt < self._max_retries:
-                    time.sleep(2 ** attempt)  # Exponential backoff
-        self._record_delivery(event_type, url, False, 0)
-        logger.error(f"Webhook delivery failed after {self._max_retries} attempts: {url}")
+                record = json.loads(line)
+                record.pop('body', None)
+                records.append(record)
+            except json.JSONDecodeError:
+                continue
+        return records
+
+    def redeliver_dead_letters(self) -> int:
+        """Re-queue every dead-lettered delivery with a fresh attempt budget."""
+        with self._dead_letter_lock:
+            if not self._dead_letter_path.exists():
+                return 0
+            lines = self._dead_letter_path.read_text(encoding='utf-8').splitlines()
+            self._dead_letter_path.unlink()
+        count = 0
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            self._enqueue(_Delivery(record['event'], record['url'], record['body'].encode('utf-8'),
+                                    delivery_id=record.get('delivery_id'),
+                                    created_at=record.get('created_at')))
+            count += 1
+        return count
+
+    # ── Introspection ───────────────────────────────────────────────────────
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait until queued deliveries have been attempted (retries excluded). For tests."""
+        deadline = time.monotonic() + timeout
+        if not self._bus.flush(timeout):
+            return False
+        with self._work:
+            while self._ready or self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._work.wait(remaining)
+        return True
 
     def _record_delivery(self, event_type: str, url: str, success: bool, status: int):
-        self._delivery_log.append({
-            'event': event_type, 'url': url, 'success': success,
-            'status': status, 'timestamp': time.time(),
-        })
-        if len(self._delivery_log) > 1000:
-            self._delivery_log = self._delivery_log[-500:]
+        with self._lock:
+            self._delivery_log.append({
+                'event': event_type, 'url': url, 'success': success,
+                'status': status, 'timestamp': time.time(),
+            })
+            if len(self._delivery_log) > 1000:
+                self._delivery_log = self._delivery_log[-500:]
 
     def list_subscriptions(self) -> Dict:
         with self._lock:
             return dict(self._subscriptions)
 
     def delivery_stats(self) -> Dict:
-        total = len(self._delivery_log)
-        success = sum(1 for d in self._delivery_log if d['success'])
+        with self._lock:
+            log = list(self._delivery_log)
+            pending = sum(len(q) for q in self._endpoint_queues.values())
+            in_flight = self._in_flight
+            workers = len(self._workers)
+            held = len(self._held)
+        total = len(log)
+        success = sum(1 for d in log if d['success'])
         return {
             'total_deliveries': total,
             'successful': success,
             'failed': total - success,
             'success_rate': round(success / max(total, 1) * 100, 1),
-            'recent': self._delivery_log[-10:],
+            'pending': pending,
+            'in_flight': in_flight,
+            'awaiting_retry': self._retry.pending(),
+            'held_endpoints': held,
+            'dead_lettered': self._dead_lettered,
+            'workers': workers,
+            'recent': log[-10:],
         }
 
 
@@ -123,5 +417,19 @@ _webhook_mgr: Optional[WebhookManager] = None
 def get_webhook_manager() -> WebhookManager:
     global _webhook_mgr
     if _webhook_mgr is None:
-        _webhook_mgr = WebhookManager()
+        kwargs = {}
+        try:
+            from sajha.core.config import get_settings
+            s = get_settings()
+            kwargs = dict(
+                max_retries=getattr(s, 'webhooks_max_retries', 3),
+                timeout=getattr(s, 'webhooks_timeout', 10),
+                workers=getattr(s, 'webhooks_workers', 4),
+                backoff_seconds=getattr(s, 'webhooks_backoff_seconds', 2.0),
+                max_pending_per_endpoint=getattr(s, 'webhooks_max_pending_per_endpoint', 1000),
+                dead_letter_file=getattr(s, 'webhooks_dead_letter_file', 'data/webhooks/dead_letter.jsonl'),
+            )
+        except Exception:
+            pass
+        _webhook_mgr = WebhookManager(**kwargs)
     return _webhook_mgr
@@ -682,12 +682,14 @@ class CompositeToolDAO:
     def create(self, name: str, master_tool: str, arrangement: str = 'sibling',
                description: str = '', master_output_key: str = 'master',
                record_path: str = '', created_by: str = '',
-               steps: list = None) -> CompositeToolRecord:
+               steps: list = None, failure_budget: Optional[int] = None,
+               memoize: bool = True) -> CompositeToolRecord:
         import json
         rec = CompositeToolRecord(
             id=_uuid(), name=name, description=description,
             arrangement=arrangement, master_tool=master_tool,
             master_output_key=master_output_key, record_path=record_path,
+            failure_budget=failure_budget, memoize=memoize,
             enabled=True, created_by=created_by,
         )
         if steps:
@@ -744,6 +746,7 @@ class CompositeToolDAO:
             'id': rec.id, 'name': rec.name, 'description': rec.description,
             'arrangement': rec.arrangement, 'master_tool': rec.master_tool,
             'master_output_key': rec.master_output_key, 'record_path': rec.record_path,
+            'failure_budget': rec.failure_budget, 'memoize': rec.memoize is not False,
             'enabled': rec.enabled, 'created_by': rec.created_by,
             'steps': [{
                 'tool_name': s.tool_name, 'output_key': s.output_key,
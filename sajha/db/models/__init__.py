@@ -329,6 +329,8 @@ class CompositeToolRecord(Base):
     master_tool     = Column(String(255), nullable=False)
     master_output_key = Column(String(100), default='master')
     record_path     = Column(String(255))  # for parent_child: path to array in master output
+    failure_budget  = Column(Integer)      # NULL: composite.fanout.failure_budget; negative: no budget
+    memoize         = Column(Boolean, default=True, nullable=False)  # run identical sub-calls once
     enabled         = Column(Boolean, default=True, nullable=False)
     created_by      = Column(String(100))
     created_at      = Column(DateTime, default=datetime.utcnow)
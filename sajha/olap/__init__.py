@@ -23,8 +23,12 @@ Components:
 - StatsEngine: Statistical computations
 - CohortEngine: Cohort and retention analysis
 - SampleDataGenerator: Create demo datasets
+- ColumnarResult: Column-major query results (records, columns, Arrow IPC)
+- OLAPQueryCache: Compiled-SQL and result cache shared by the engines
 """
 
+from sajha.olap.columnar import ColumnarResult, fetch_columnar, RESULT_FORMATS
+from sajha.olap.query_cache import OLAPQueryCache, get_olap_query_cache
 from sajha.olap.semantic_layer import SemanticLayer
 from sajha.olap.pivot_engine import PivotEngine, PivotSpec
 from sajha.olap.rollup_engine import RollupEngine, RollupSpec
@@ -44,7 +48,9 @@ __all__ = [
     'StatsEngine', 'StatsSpec', 'HistogramSpec',
     'CohortEngine', 'CohortSpec', 'RetentionSpec',
     'SampleDataGenerator', 'generate_sample_data_to_files',
-    'OLAPQueryBuilder'
+    'OLAPQueryBuilder',
+    'ColumnarResult', 'fetch_columnar', 'RESULT_FORMATS',
+    'OLAPQueryCache', 'get_olap_query_cache'
 ]
 
 __version__ = "2.9.8"
@@ -10,6 +10,9 @@ import logging
 from typing import Dict, Any, List, Optional
 from dataclasses import dataclass, field
 
+from sajha.olap.columnar import fetch_columnar
+from sajha.olap.query_cache import cached_plan, cached_result
+
 logger = logging.getLogger(__name__)
 
 
@@ -92,17 +95,20 @@ class CohortEngine:
         "day": "DATE_DIFF('day', {start}, {end})"
     }
     
-    def __init__(self, semantic_layer, connection=None):
+    def __init__(self, semantic_layer, connection=None, cache=None):
         """
         Initialize the cohort engine.
         
         Args:
             semantic_layer: SemanticLayer instance
             connection: Optional DuckDB connection
+            cache: Optional OLAPQueryCache for compiled SQL and results
         """
         self.semantic = semantic_layer
         self.conn = connection
+        self.cache = cache
     
+    @cached_plan
     def build_cohort_analysis(self, spec: CohortSpec) -> str:
         """
         Build SQL for cohort analysis.
@@ -194,6 +200,7 @@ ORDER BY ca.cohort_period, ca.period_number
         
         return sql
     
+    @cached_plan
     def build_retention_analysis(self, spec: RetentionSpec) -> str:
         """
         Build SQL for retention analysis.
@@ -285,6 +292,7 @@ ORDER BY rc.cohort_period, rc.period_number
         
         return sql
     
+    @cached_plan
     def build_cohort_pivot(self, spec: CohortSpec) -> str:
         """
         Build pivoted cohort table with periods as columns.
@@ -441,12 +449,14 @@ ORDER BY cd.cohort_period, cd.period_number
             safe = '_' + safe
         return safe
     
-    def execute_cohort_analysis(self, spec: CohortSpec) -> Dict[str, Any]:
+    @cached_result("build_cohort_pivot")
+    def execute_cohort_analysis(self, spec: CohortSpec, result_format: str = "records") -> Dict[str, Any]:
         """
         Execute cohort analysis and return formatted results.
         
         Args:
             spec: CohortSpec with query specifications
+            result_format: "records", "columns" or "arrow" (see sajha.olap.columnar)
             
         Returns:
             Dictionary with cohort analysis data
@@ -457,24 +467,11 @@ ORDER BY cd.cohort_period, cd.period_number
         sql = self.build_cohort_pivot(spec)
         
         try:
-            result = self.conn.execute(sql).fetchall()
-            columns = [desc[0] for desc in self.conn.description]
-            
-            # Convert to list of dicts
-            data = []
-            for row in result:
-                row_dict = {}
-                for i, col in enumerate(columns):
-                    val = row[i]
-                    if hasattr(val, 'isoformat'):
-                        val = val.isoformat()
-                    row_dict[col] = val
-                data.append(row_dict)
+            result = fetch_columnar(self.conn, sql)
             
             return {
                 "success": True,
-                "data": data,
-                "columns": columns,
+                **result.payload(result_format),
                 "cohort_dimension": spec.cohort_dimension,
                 "time_dimension": spec.time_dimension,
                 "periods": spec.periods,
@@ -490,12 +487,14 @@ ORDER BY cd.cohort_period, cd.period_number
                 "sql": sql
             }
     
-    def execute_retention_analysis(self, spec: RetentionSpec) -> Dict[str, Any]:
+    @cached_result("build_retention_analysis")
+    def execute_retention_analysis(self, spec: RetentionSpec, result_format: str = "records") -> Dict[str, Any]:
         """
         Execute retention analysis and return formatted results.
         
         Args:
             spec: RetentionSpec with query specifications
+            result_format: "records", "columns" or "arrow" (see sajha.olap.columnar)
             
         Returns:
             Dictionary with retention analysis data
@@ -506,39 +505,24 @@ ORDER BY cd.cohort_period, cd.period_number
         sql = self.build_retention_analysis(spec)
         
         try:
-            result = self.conn.execute(sql).fetchall()
-            columns = [desc[0] for desc in self.conn.description]
-            
-            # Convert to list of dicts
-            data = []
-            for row in result:
-                row_dict = {}
-                for i, col in enumerate(columns):
-                    val = row[i]
-                    if hasattr(val, 'isoformat'):
-                        val = val.isoformat()
-                    row_dict[col] = val
-                data.append(row_dict)
+            result = fetch_columnar(self.conn, sql)
             
-            # Calculate average retention by period
-            retention_by_period = {}
-            for row in data:
-                period = row.get('period_number')
-                pct = row.get('retention_pct')
-                if period is not None and pct is not None:
-                    if period not in retention_by_period:
-                        retention_by_period[period] = []
-                    retention_by_period[period].append(pct)
-            
-            avg_retention = {
-                period: round(sum(pcts) / len(pcts), 2) 
-                for period, pcts in retention_by_period.items()
-            }
+            # Average retention by period, aggregated over the fetched result
+            avg_retention = {}
+            if result.row_count:
+                by_period = result.summarize(self.conn, """
+SELECT period_number, ROUND(AVG(retention_pct), 2) AS avg_retention
+FROM result
+WHERE period_number IS NOT NULL AND retention_pct IS NOT NULL
+GROUP BY period_number
+ORDER BY period_number
+""")
+                avg_retention = dict(zip(by_period.column("period_number"),
+                                         by_period.column("avg_retention")))
             
             return {
                 "success": True,
-                "data": data,
-                "columns": columns,
+                **result.payload(result_format),
                 "average_retention_by_period": avg_retention,
                 "cohort_dimension": spec.cohort_dimension,
                 "time_grain": spec.time_grain,
@@ -554,6 +538,7 @@ ORDER BY cd.cohort_period, cd.period_number
                 "sql": sql
             }
     
+    @cached_result("build_cohort_analysis")
     def get_cohort_summary(self, spec: CohortSpec) -> Dict[str, Any]:
         """
         Get summary statistics for cohort analysis.
@@ -577,18 +562,15 @@ SELECT
     MIN(cohort_period) AS first_cohort,
     MAX(cohort_period) AS last_cohort,
     AVG(cohort_size) AS avg_cohort_size,
-    AVG(CASE WHEN period_number = 0 THEN retention_pct END) AS avg_period_0_retention,
-    AVG(CASE WHEN period_number = 1 THEN retention_pct END) AS avg_period_1_retention,
-    AVG(CASE WHEN period_number = 3 THEN retention_pct END) AS avg_period_3_retention,
-    AVG(CASE WHEN period_number = 6 THEN retention_pct END) AS avg_period_6_retention,
-    AVG(CASE WHEN period_number = 12 THEN retention_pct END) AS avg_period_12_retention
+    AVG(retention_pct) FILTER (WHERE period_number = 0) AS avg_period_0_retention,
+    AVG(retention_pct) FILTER (WHERE period_number = 1) AS avg_period_1_retention,
+    AVG(retention_pct) FILTER (WHERE period_number = 3) AS avg_period_3_retention,
+    AVG(retention_pct) FILTER (WHERE period_number = 6) AS avg_period_6_retention,
+    AVG(retention_pct) FILTER (WHERE period_number = 12) AS avg_period_12_retention
 FROM cohort_data
 """
             
-            result = self.conn.execute(summary_sql).fetchone()
-            columns = [desc[0] for desc in self.conn.description]
-            
-            summary = dict(zip(columns, result))
+            summary = fetch_columnar(self.conn, summary_sql).records()[0]
             
             return {
                 "success": True,
@@ -0,0 +1,207 @@
+"""
+SAJHA MCP Server - Columnar Result Path
+Version: 2.9.8
+
+Shared result handling for the OLAP engines. Query results are fetched
+from DuckDB as Arrow record batches and kept column-major; nothing walks
+the result cell by cell in Python.
+
+- records   list of row dicts (the historical shape), built with one
+            zip() over whole columns
+- columns   {"column": [values...]} — no per-row dicts at all
+- arrow     base64 Arrow IPC stream, written straight from the buffers
+
+Follow-up summaries (totals, per-period averages) run as SQL over the
+fetched Arrow table — a zero-copy scan — instead of looping over dicts.
+
+pyarrow is optional: without it results are fetched with fetchall() and
+transposed into columns, summaries re-run the query as a CTE, and the
+'arrow' format is unavailable.
+"""
+
+import base64
+import json
+import logging
+from datetime import date, datetime, time as dt_time
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow as pa
+    HAS_PYARROW = True
+except ImportError:
+    pa = None
+    HAS_PYARROW = False
+
+RESULT_FORMATS = ("records", "columns", "arrow")
+
+# Rows per Arrow record batch pulled from DuckDB
+BATCH_ROWS = 1_000_000
+
+# Input-schema property shared by every engine-backed OLAP tool
+RESULT_FORMAT_PROPERTY = {
+    "type": "string",
+    "enum": list(RESULT_FORMATS),
+    "default": "records",
+    "description": "Result encoding: 'records' (list of row objects), 'columns' "
+                   "(column name -> value list) or 'arrow' (base64 Arrow IPC stream)"
+}
+
+
+def _is_temporal(arrow_type) -> bool:
+    return (pa.types.is_timestamp(arrow_type) or pa.types.is_date(arrow_type)
+            or pa.types.is_time(arrow_type))
+
+
+def _json_value(value):
+    if isinstance(value, (datetime, date, dt_time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+class ColumnarResult:
+    """A query result held column-major (Arrow table, or plain column lists)."""
+
+    def __init__(self, columns: List[str], table=None, column_data: Optional[List[list]] = None,
+                 sql: Optional[str] = None):
+        self.columns = list(columns)
+        self.table = table
+        self._column_data = column_data
+        self._py_columns: Dict[str, list] = {}
+        self.sql = sql
+
+    @property
+    def row_count(self) -> int:
+        if self.table is not None:
+            return self.table.num_rows
+        return len(self._column_data[0]) if self._column_data else 0
+
+    def column(self, name: str) -> list:
+        """Python values of one column (dates/timestamps as ISO strings)."""
+        if name not in self._py_columns:
+            index = self.columns.index(name)
+            if self.table is not None:
+                arrow_col = self.table.column(index)
+                values = arrow_col.to_pylist()
+                if _is_temporal(arrow_col.type):
+                    values = [v.isoformat() if v is not None else None for v in values]
+            else:
+                values = self._column_data[index]
+                if any(hasattr(v, 'isoformat') for v in values):
+                    values = [v.isoformat() if hasattr(v, 'isoformat') else v for v in values]
+            self._py_columns[name] = values
+        return self._py_columns[name]
+
+    def records(self, exclude: Iterable[str] = ()) -> List[Dict[str, Any]]:
+        """Row dicts, assembled from whole columns in one pass."""
+        skip = set(exclude)
+        names = [c for c in self.columns if c not in skip]
+        if not names:
+            return [{} for _ in range(self.row_count)]
+        return [dict(zip(names, values)) for values in zip(*(self.column(c) for c in names))]
+
+    def to_columns(self, exclude: Iterable[str] = ()) -> Dict[str, list]:
+        skip = set(exclude)
+        return {c: self.column(c) for c in self.columns if c not in skip}
+
+    def to_arrow_ipc(self, exclude: Iterable[str] = ()) -> bytes:
+        """Arrow IPC stream bytes for the result, written from the column buffers."""
+        if self.table is None:
+            raise RuntimeError("The 'arrow' result format requires pyarrow")
+        table = self.table
+        skip = [c for c in exclude if c in self.columns]
+        if skip:
+            table = table.drop_columns(skip)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+    def to_json(self, exclude: Iterable[str] = ()) -> str:
+        """Column-major JSON document, encoded column by column."""
+        cols = self.to_columns(exclude)
+        return json.dumps({"columns": list(cols), "data": cols}, default=_json_value)
+
+    def payload(self, result_format: str = "records", exclude: Iterable[str] = ()) -> Dict[str, Any]:
+        """The data/columns/row_count part of an engine response in the requested format."""
+        exclude = list(exclude)
+        columns = [c for c in self.columns if c not in exclude]
+        if result_format == "columns":
+            data = self.to_columns(exclude)
+        elif result_format == "arrow":
+            data = base64.b64encode(self.to_arrow_ipc(exclude)).decode("ascii")
+        elif result_format == "records":
+            data = self.records(exclude)
+        else:
+            raise ValueError(f"Unknown result_format '{result_format}' (expected one of {RESULT_FORMATS})")
+        return {
+            "data": data,
+            "columns": columns,
+            "row_count": self.row_count,
+            "result_format": result_format
+        }
+
+    def summarize(self, conn, sql: str) -> "ColumnarResult":
+        """Run SQL over this result, exposed as the table `result`.
+
+        With pyarrow the query scans the Arrow buffers in place; without it
+        the original query is re-run as a CTE.
+        """
+        if self.table is not None:
+            relation = conn.from_arrow(self.table)
+            return _from_relation(relation.query("result", sql), sql)
+        if self.sql is None:
+            raise RuntimeError("Cannot summarize a result without its source query")
+        return fetch_columnar(conn, f"WITH result AS ({self.sql})\n{sql}")
+
+
+def _arrow_reader(cursor):
+    # to_arrow_reader() replaced fetch_record_batch() in DuckDB 1.4
+    if hasattr(cursor, 'to_arrow_reader'):
+        return cursor.to_arrow_reader(BATCH_ROWS)
+    return cursor.fetch_record_batch(BATCH_ROWS)
+
+
+def _from_relation(relation, sql: Optional[str] = None) -> ColumnarResult:
+    if HAS_PYARROW:
+        reader = _arrow_reader(relation)
+        table = pa.Table.from_batches(list(reader), schema=reader.schema)
+        return ColumnarResult(table.column_names, table=table, sql=sql)
+    rows = relation.fetchall()
+    columns = list(relation.columns)
+    return ColumnarResult(columns, column_data=[list(c) for c in zip(*rows)] if rows
+                          else [[] for _ in columns], sql=sql)
+
+
+def fetch_columnar(conn, sql: str, params: Optional[list] = None) -> ColumnarResult:
+    """Execute sql and fetch the result column-major (Arrow record batches when available)."""
+    cursor = conn.execute(sql, params) if params is not None else conn.execute(sql)
+    if HAS_PYARROW:
+        reader = _arrow_reader(cursor)
+        table = pa.Table.from_batches(list(reader), schema=reader.schema)
+        return ColumnarResult(table.column_names, table=table, sql=sql)
+    columns = [desc[0] for desc in cursor.description]
+    rows = cursor.fetchall()
+    column_data = [list(c) for c in zip(*rows)] if rows else [[] for _ in columns]
+    return ColumnarResult(columns, column_data=column_data, sql=sql)
+
+
+def label_total_rows(records: List[Dict[str, Any]], grouping: List[int],
+                     dim_columns: List[str], label: str = "TOTAL") -> List[Dict[str, Any]]:
+    """Replace rolled-up dimension values with a label, using GROUPING() bitmasks.
+
+    grouping[i] is the GROUPING(dim_1, ..., dim_n) value of records[i]; bit
+    (n-1-k) is set when dim_columns[k] was aggregated away in that row.
+    Only subtotal/total rows are touched.
+    """
+    n = len(dim_columns)
+    for row, mask in zip(records, grouping):
+        if mask:
+            for k, col in enumerate(dim_columns):
+                if mask & (1 << (n - 1 - k)):
+                    row[col] = label
+    return records
@@ -10,8 +10,14 @@ import logging
 from typing import Dict, Any, List, Optional
 from dataclasses import dataclass, field
 
+from sajha.olap.columnar import fetch_columnar, label_total_rows
+from sajha.olap.query_cache import cached_plan, cached_result
+
 logger = logging.getLogger(__name__)
 
+# GROUPING() bitmask column on total/subtotal queries (0 = detail row)
+GROUPING_COLUMN = "_grouping_id"
+
 
 @dataclass
 class PivotSpec:
@@ -50,17 +56,20 @@ class PivotEngine:
     to conditional aggregation for more complex scenarios.
     """
     
-    def __init__(self, semantic_layer, connection=None):
+    def __init__(self, semantic_layer, connection=None, cache=None):
         """
         Initialize the pivot engine.
         
         Args:
             semantic_layer: SemanticLayer instance
             connection: Optional DuckDB connection
+            cache: Optional OLAPQueryCache for compiled SQL and results
         """
         self.semantic = semantic_layer
         self.conn = connection
+        self.cache = cache
     
+    @cached_plan
     def build_pivot_query(self, spec: PivotSpec) -> str:
         """
         Build SQL for a pivot table.
@@ -88,10 +97,6 @@ class PivotEngine:
             # Simple aggregation without pivot
             sql = self._build_simple_aggregation(base_sql, dataset, spec)
         
-        # Add totals using ROLLUP if requested
-        if spec.include_subtotals and spec.rows:
-            sql = self._wrap_with_rollup(sql, spec)
-        
         return sql
     
     def _build_base_query(self, dataset, filters: List[Dict]) -> str:
@@ -144,8 +149,8 @@ class PivotEngine:
         """
         Build a pivot query using conditional aggregation.
         
-        This approach first gets distinct values for the pivot column,
-        then creates CASE WHEN expressions for each value.
+        Produces one row per (row dimensions, pivot value) cell. Grand totals
+        and subtotals come from GROUPING SETS / ROLLUP in the same statement.
         """
         # Resolve row and column dimensions
         row_cols = [self.semantic.resolve_dimension(r, dataset) for r in spec.rows]
@@ -154,60 +159,29 @@ class PivotEngine:
         pivot_col = self.semantic.resolve_dimension(spec.columns[0], dataset)
         pivot_alias = self._safe_alias(spec.columns[0])
         
-        # Build measure expressions
-        measure_exprs = []
-        for val in spec.values:
-            measure_name = val.get("measure")
-            agg = val.get("aggregation", "SUM")
-            measure = self.semantic.get_measure(measure_name)
-            
-            if measure:
-                # Extract the column from the measure expression
-                # For simple measures like SUM(amount), extract 'amount'
-                expr = measure.expression
-            else:
-                expr = f"{agg}({measure_name})"
-            
-            measure_exprs.append({
-                "name": measure_name,
-                "expression": expr,
-                "aggregation": agg
-            })
-        
-        # Build the pivot query using a CTE approach
-        sql = f"""
-WITH base_data AS (
-    {base_sql}
-),
-pivot_values AS (
-    SELECT DISTINCT {pivot_col} AS pivot_val
-    FROM base_data
-    WHERE {pivot_col} IS NOT NULL
-    ORDER BY pivot_val
-),
-aggregated AS (
-    SELECT 
-        {', '.join(f'{col} AS {alias}' for col, alias in zip(row_cols, row_aliases))},
-        {pivot_col} AS {pivot_alias},
-        {', '.join(m['expression'] + ' AS ' + self._safe_alias(m['name']) for m in measure_exprs)}
-    FROM base_data
-    GROUP BY {', '.join(row_cols)}, {pivot_col}
-)
-SELECT 
-    {', '.join(row_aliases)},
-    {pivot_alias},
-    {', '.join(self._safe_alias(m['name']) for m in measure_exprs)}
-FROM aggregated
-ORDER BY {', '.join(row_aliases)}, {pivot_alias}
-"""
-        
-        return sql
+        return self._build_grouped_query(
+            base_sql, spec,
+            group_cols=row_cols + [pivot_col],
+            group_aliases=row_aliases + [pivot_alias],
+            measure_exprs=self._measure_expressions(spec),
+            default_order=row_aliases + [pivot_alias]
+        )
     
     def _build_simple_aggregation(self, base_sql: str, dataset, spec: PivotSpec) -> str:
         """Build a simple aggregation query without pivot columns."""
         row_cols = [self.semantic.resolve_dimension(r, dataset) for r in spec.rows]
         row_aliases = [self._safe_alias(r) for r in spec.rows]
         
+        return self._build_grouped_query(
+            base_sql, spec,
+            group_cols=row_cols,
+            group_aliases=row_aliases,
+            measure_exprs=self._measure_expressions(spec),
+            default_order=row_aliases
+        )
+    
+    def _measure_expressions(self, spec: PivotSpec) -> List[str]:
+        """SELECT-list expressions for the requested measures."""
         measure_exprs = []
         for val in spec.values:
             measure_name = val.get("measure")
@@ -220,37 +194,87 @@ ORDER BY {', '.join(row_aliases)}, {pivot_alias}
                 expr = f"{agg}({measure_name})"
             
             measure_exprs.append(f"{expr} AS {self._safe_alias(measure_name)}")
+        return measure_exprs
+    
+    def _build_grouped_query(self, base_sql: str, spec: PivotSpec, group_cols: List[str],
+                             group_aliases: List[str], measure_exprs: List[str],
+                             default_order: List[str]) -> str:
+        """
+        Aggregate base_sql by group_cols, with totals computed by DuckDB.
+        
+        include_totals adds a grand-total row (GROUPING SETS (..., ())) and
+        include_subtotals adds a subtotal per level (ROLLUP). Measures on
+        those rows are the measure expression over all underlying rows — an
+        AVG total is the true average, not an average of averages. Such rows
+        carry a non-zero GROUPING() bitmask in the _grouping_id column and
+        sort after the rows they summarize. LIMIT applies to detail rows.
+        """
+        select_dims = [f"{col} AS {alias}" for col, alias in zip(group_cols, group_aliases)]
+        select_list = ",\n    ".join(select_dims + measure_exprs)
         
-        sql = f"""
+        if spec.sort:
+            detail_order = [f"{self._safe_alias(s.get('column'))} {s.get('direction', 'ASC')}"
+                            for s in spec.sort]
+        else:
+            detail_order = list(default_order)
+        limit_clause = f"LIMIT {int(spec.limit)}" if spec.limit else ""
+        
+        rolled_up = bool(group_cols) and (spec.include_subtotals or spec.include_totals)
+        if not rolled_up:
+            group_clause = f"GROUP BY {', '.join(group_cols)}" if group_cols else ""
+            order_clause = f"ORDER BY {', '.join(detail_order)}" if detail_order else ""
+            return f"""
 SELECT 
-    {', '.join(f'{col} AS {alias}' for col, alias in zip(row_cols, row_aliases))},
-    {', '.join(measure_exprs)}
+    {select_list}
 FROM ({base_sql}) AS base
-GROUP BY {', '.join(row_cols)}
+{group_clause}
+{order_clause}
+{limit_clause}
 """
         
-        # Add sorting
-        if spec.sort:
-            sort_parts = []
-            for s in spec.sort:
-                col = s.get("column")
-                direction = s.get("direction", "ASC")
-                sort_parts.append(f"{self._safe_alias(col)} {direction}")
-            sql += f"ORDER BY {', '.join(sort_parts)}\n"
+        if spec.include_subtotals:
+            group_clause = f"GROUP BY ROLLUP ({', '.join(group_cols)})"
+            # Each group's detail rows, then its subtotal; grand total last
+            n = len(group_aliases)
+            final_order = []
+            for k, alias in enumerate(group_aliases):
+                final_order += [f"({GROUPING_COLUMN} >> {n - 1 - k}) & 1", alias]
         else:
-            sql += f"ORDER BY {', '.join(row_aliases)}\n"
+            group_clause = f"GROUP BY GROUPING SETS (({', '.join(group_cols)}), ())"
+            final_order = [GROUPING_COLUMN] + detail_order
         
-        # Add limit
-        if spec.limit:
-            sql += f"LIMIT {spec.limit}\n"
+        grouped_select = ",\n        ".join(
+            select_dims + measure_exprs + [f"GROUPING({', '.join(group_cols)}) AS {GROUPING_COLUMN}"])
+        aggregated = f"""
+    SELECT 
+        {grouped_select}
+    FROM ({base_sql}) AS base
+    {group_clause}"""
         
-        return sql
-    
-    def _wrap_with_rollup(self, sql: str, spec: PivotSpec) -> str:
-        """Wrap query with ROLLUP for subtotals."""
-        # This is a simplified version - full implementation would
-        # restructure the GROUP BY clause
-        return sql
+        if not limit_clause:
+            return f"""
+WITH aggregated AS ({aggregated}
+)
+SELECT * FROM aggregated
+ORDER BY {', '.join(final_order)}
+"""
+        
+        return f"""
+WITH aggregated AS ({aggregated}
+),
+detail AS (
+    SELECT * FROM aggregated
+    WHERE {GROUPING_COLUMN} = 0
+    ORDER BY {', '.join(detail_order)}
+    {limit_clause}
+)
+SELECT * FROM (
+    SELECT * FROM detail
+    UNION ALL
+    SELECT * FROM aggregated WHERE {GROUPING_COLUMN} <> 0
+) AS combined
+ORDER BY {', '.join(final_order)}
+"""
     
     def _safe_alias(self, name: str) -> str:
         """Convert a name to a safe SQL alias."""
@@ -259,12 +283,14 @@ GROUP BY {', '.join(row_cols)}
             safe = '_' + safe
         return safe
     
-    def execute_pivot(self, spec: PivotSpec) -> Dict[str, Any]:
+    @cached_result("build_pivot_query")
+    def execute_pivot(self, spec: PivotSpec, result_format: str = "records") -> Dict[str, Any]:
         """
         Execute a pivot table query and return formatted results.
         
         Args:
             spec: PivotSpec with query specifications
+            result_format: "records", "columns" or "arrow" (see sajha.olap.columnar)
             
         Returns:
             Dictionary with data, columns, and metadata
@@ -275,32 +301,19 @@ GROUP BY {', '.join(row_cols)}
         sql = self.build_pivot_query(spec)
         
         try:
-            result = self.conn.execute(sql).fetchall()
-            columns = [desc[0] for desc in self.conn.description]
+            result = fetch_columnar(self.conn, sql)
             
-            # Convert to list of dicts
-            data = []
-            for row in result:
-                row_dict = {}
-                for i, col in enumerate(columns):
-                    val = row[i]
-                    # Handle special types
-                    if hasattr(val, 'isoformat'):
-                        val = val.isoformat()
-                    row_dict[col] = val
-                data.append(row_dict)
-            
-            # Add grand totals if requested
-            if spec.include_totals and data:
-                totals = self._calculate_totals(data, spec)
-                if totals:
-                    data.append(totals)
+            if GROUPING_COLUMN in result.columns and result_format == "records":
+                # Total/subtotal rows are labelled "TOTAL" on the rolled-up dimensions
+                dim_aliases = [self._safe_alias(d) for d in spec.rows + spec.columns[:1]]
+                payload = result.payload("records", exclude=[GROUPING_COLUMN])
+                label_total_rows(payload["data"], result.column(GROUPING_COLUMN), dim_aliases)
+            else:
+                payload = result.payload(result_format)
             
             return {
                 "success": True,
-                "data": data,
-                "columns": columns,
-                "row_count": len(data),
+                **payload,
                 "row_dimensions": spec.rows,
                 "column_dimensions": spec.columns,
                 "measures": [v.get("measure") for v in spec.values],
@@ -315,41 +328,6 @@ GROUP BY {', '.join(row_cols)}
                 "sql": sql
             }
     
-    def _calculate_totals(self, data: List[Dict], spec: PivotSpec) -> Dict[str, Any]:
-        """Calculate grand totals for the pivot table."""
-        if not data or not spec.values:
-            return None
-        
-        totals = {}
-        
-        # Set row dimension values to "Total"
-        for row in spec.rows:
-            totals[self._safe_alias(row)] = "TOTAL"
-        
-        # Calculate totals for measures
-        for val in spec.values:
-            measure_name = self._safe_alias(val.get("measure"))
-            agg = val.get("aggregation", "SUM").upper()
-            
-            values = [row.get(measure_name) for row in data 
-                     if row.get(measure_name) is not None]
-            
-            if values:
-                if agg == "SUM":
-                    totals[measure_name] = sum(values)
-                elif agg == "AVG":
-                    totals[measure_name] = sum(values) / len(values)
-                elif agg == "COUNT":
-                    totals[measure_name] = sum(values)
-                elif agg == "MIN":
-                    totals[measure_name] = min(values)
-                elif agg == "MAX":
-                    totals[measure_name] = max(values)
-                else:
-                    totals[measure_name] = sum(values)
-        
-        return totals
-    
     def get_pivot_column_values(self, spec: PivotSpec) -> List[Any]:
         """
         Get distinct values for the pivot column.
@@ -374,8 +352,7 @@ ORDER BY pivot_val
 """
         
         try:
-            result = self.conn.execute(sql).fetchall()
-            return [row[0] for row in result]
+            return fetch_columnar(self.conn, sql).column("pivot_val")
         except Exception as e:
             logger.error(f"Error getting pivot values: {e}", exc_info=True)
             return []
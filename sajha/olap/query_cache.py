@@ -0,0 +1,260 @@
+"""
+SAJHA MCP Server - OLAP Query Plan and Result Cache
+Version: 2.9.8
+
+Two-level cache in front of the OLAP engines.
+
+- plan    normalized spec → compiled SQL, keyed by the semantic-layer
+          config version (mtime/size of datasets/measures/dimensions.json)
+- result  compiled SQL (+ result_format) → engine response, keyed by a
+          fingerprint (mtime/size) of every file the dataset reads
+
+Editing a semantic-layer JSON file reloads the layer and misses every
+plan compiled from the old version; touching a source file misses every
+result read from it. Tables living only inside DuckDB cannot be
+fingerprinted — callers that rewrite them call invalidate_results().
+
+Both levels are LRUs bounded by an estimate of the bytes they hold. A hit
+costs a few stat() calls and dict lookups; DuckDB is not touched.
+
+Engines opt in with two decorators: @cached_plan on build_* methods and
+@cached_result on execute_* methods. Both are no-ops while the engine's
+`cache` attribute is None.
+
+Config (config/application.yml):
+  olap:
+    cache:
+      enabled: true
+      plan_max_mb: 16
+      result_max_mb: 256
+      max_entry_mb: 32
+"""
+
+import copy
+import functools
+import glob
+import json
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, is_dataclass
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Quoted file paths inside source expressions, e.g. read_csv_auto('data/x.csv')
+_FILE_RE = re.compile(
+    r"'([^']+\.(?:csv|tsv|txt|parquet|json|jsonl|ndjson)(?:\.gz|\.zst)?)'", re.IGNORECASE)
+
+
+def _estimate_bytes(value: Any) -> int:
+    """Rough in-memory size of a response — strings by length, scalars 16 bytes."""
+    if value is None:
+        return 8
+    if isinstance(value, (str, bytes)):
+        return 49 + len(value)
+    if isinstance(value, (list, tuple)):
+        return 56 + sum(_estimate_bytes(v) for v in value)
+    if isinstance(value, dict):
+        return 64 + sum(_estimate_bytes(k) + _estimate_bytes(v) for k, v in value.items())
+    return 16
+
+
+def _spec_key(spec: Any) -> str:
+    data = asdict(spec) if is_dataclass(spec) else spec
+    return json.dumps(data, sort_keys=True, default=str)
+
+
+class _ByteLRU:
+    """OrderedDict LRU evicting least recently used entries past max_bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key: Hashable, value: Any, size: int):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.bytes -= old[1]
+        self._entries[key] = (value, size)
+        self.bytes += size
+        while self.bytes > self.max_bytes and self._entries:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.bytes -= evicted
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class OLAPQueryCache:
+    """Compiled-SQL and result cache shared by the OLAP engines."""
+
+    def __init__(self, plan_max_mb: float = 16, result_max_mb: float = 256,
+                 max_entry_mb: float = 32, enabled: bool = True):
+        self.enabled = enabled
+        self.max_entry_bytes = int(max_entry_mb * 1024 * 1024)
+        self._plans = _ByteLRU(int(plan_max_mb * 1024 * 1024))
+        self._results = _ByteLRU(int(result_max_mb * 1024 * 1024))
+        self._lock = threading.Lock()
+        self._epoch = 0
+        self._stats = {'plan_hits': 0, 'plan_misses': 0, 'result_hits': 0,
+                       'result_misses': 0, 'skipped_oversize': 0}
+
+    # ── Plan level ──────────────────────────────────────────────────────────
+
+    def plan(self, semantic, kind: str, spec: Any, build: Callable[[], str]) -> str:
+        """Compiled SQL for spec, building it only on a miss."""
+        if semantic.reload_if_changed():
+            logger.info(f"Semantic layer config changed — reloaded {semantic.config_path}")
+        key = (kind, semantic.config_path, semantic.version, _spec_key(spec))
+        with self._lock:
+            sql = self._plans.get(key)
+            if sql is not None:
+                self._stats['plan_hits'] += 1
+                return sql
+            self._stats['plan_misses'] += 1
+        sql = build()
+        with self._lock:
+            self._plans.put(key, sql, _estimate_bytes(key) + _estimate_bytes(sql))
+        return sql
+
+    # ── Result level ────────────────────────────────────────────────────────
+
+    def source_fingerprint(self, semantic, dataset_name: str) -> tuple:
+        """(path, mtime_ns, size) of every file the dataset reads, plus the table epoch."""
+        dataset = semantic.get_dataset(dataset_name)
+        expressions = []
+        if dataset is not None:
+            expressions = [dataset.source_table] + [j.table for j in dataset.joins]
+        fingerprint = [self._epoch]
+        for expr in expressions:
+            for pattern in _FILE_RE.findall(expr or ''):
+                paths = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+                for path in paths:
+                    try:
+                        st = os.stat(path)
+                        fingerprint.append((path, st.st_mtime_ns, st.st_size))
+                    except OSError:
+                        fingerprint.append((path, None, None))
+        return tuple(fingerprint)
+
+    def get_result(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            response = self._results.get(key)
+            if response is None:
+                self._stats['result_misses'] += 1
+                return None
+            self._stats['result_hits'] += 1
+        # Callers may add keys or edit rows; every hit gets its own copy of the payload
+        return copy.deepcopy(response)
+
+    def put_result(self, key: Hashable, response: Dict[str, Any]):
+        size = _estimate_bytes(response)
+        if size > self.max_entry_bytes:
+            with self._lock:
+                self._stats['skipped_oversize'] += 1
+            return
+        snapshot = copy.deepcopy(response)           # later edits by the caller must not reach the cache
+        with self._lock:
+            self._results.put(key, snapshot, size)
+
+    def invalidate_results(self):
+        """Drop every cached result (DuckDB-resident tables were rewritten)."""
+        with self._lock:
+            self._epoch += 1
+            self._results.clear()
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._plans.clear()
+            self._results.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(
+                self._stats,
+                enabled=self.enabled,
+                plans=len(self._plans), plan_bytes=self._plans.bytes,
+                plan_max_bytes=self._plans.max_bytes, plan_evictions=self._plans.evictions,
+                results=len(self._results), result_bytes=self._results.bytes,
+                result_max_bytes=self._results.max_bytes, result_evictions=self._results.evictions,
+            )
+
+
+def cached_plan(build):
+    """Memoize an engine's build_*(spec) -> SQL method through engine.cache."""
+    @functools.wraps(build)
+    def wrapper(self, spec):
+        cache = getattr(self, 'cache', None)
+        if cache is None or not cache.enabled:
+            return build(self, spec)
+        return cache.plan(self.semantic, build.__qualname__, spec, lambda: build(self, spec))
+    return wrapper
+
+
+def cached_result(build_name: str):
+    """Memoize an engine's execute_*(spec, ...) response through engine.cache.
+
+    build_name is the engine method that compiles the SQL the execute
+    method runs; only successful responses are stored.
+    """
+    def decorator(execute):
+        @functools.wraps(execute)
+        def wrapper(self, spec, *args, **kwargs):
+            cache = getattr(self, 'cache', None)
+            if cache is None or not cache.enabled or not self.conn:
+                return execute(self, spec, *args, **kwargs)
+            sql = getattr(self, build_name)(spec)
+            key = (execute.__qualname__, id(self.conn), sql, args, tuple(sorted(kwargs.items())),
+                   cache.source_fingerprint(self.semantic, spec.dataset))
+            response = cache.get_result(key)
+            if response is not None:
+                return response
+            response = execute(self, spec, *args, **kwargs)
+            if response.get('success'):
+                cache.put_result(key, response)
+            return response
+        return wrapper
+    return decorator
+
+
+# Module-level singleton
+_query_cache: Optional[OLAPQueryCache] = None
+_query_cache_lock = threading.Lock()
+
+
+def get_olap_query_cache() -> OLAPQueryCache:
+    global _query_cache
+    if _query_cache is None:
+        with _query_cache_lock:
+            if _query_cache is None:
+                enabled, plan_max_mb, result_max_mb, max_entry_mb = True, 16, 256, 32
+                try:
+                    from sajha.core.config import get_settings
+                    s = get_settings()
+                    enabled = getattr(s, 'olap_cache_enabled', enabled)
+                    plan_max_mb = getattr(s, 'olap_cache_plan_max_mb', plan_max_mb)
+                    result_max_mb = getattr(s, 'olap_cache_result_max_mb', result_max_mb)
+                    max_entry_mb = getattr(s, 'olap_cache_max_entry_mb', max_entry_mb)
+                except Exception:
+                    pass
+                _query_cache = OLAPQueryCache(plan_max_mb=plan_max_mb, result_max_mb=result_max_mb,
+                                              max_entry_mb=max_entry_mb, enabled=enabled)
+    return _query_cache
@@ -9,6 +9,9 @@ import logging
 from typing import Dict, Any, List, Optional
 from dataclasses import dataclass, field
 
+from sajha.olap.columnar import ColumnarResult, fetch_columnar
+from sajha.olap.query_cache import cached_plan, cached_result
+
 logger = logging.getLogger(__name__)
 
 
@@ -49,17 +52,20 @@ class RollupEngine:
     GROUPING SETS allows custom grouping combinations.
     """
     
-    def __init__(self, semantic_layer, connection=None):
+    def __init__(self, semantic_layer, connection=None, cache=None):
         """
         Initialize the rollup engine.
         
         Args:
             semantic_layer: SemanticLayer instance
             connection: Optional DuckDB connection
+            cache: Optional OLAPQueryCache for compiled SQL and results
         """
         self.semantic = semantic_layer
         self.conn = connection
+        self.cache = cache
     
+    @cached_plan
     def build_rollup_query(self, spec: RollupSpec) -> str:
         """
         Build SQL with ROLLUP/CUBE for hierarchical summaries.
@@ -105,10 +111,11 @@ class RollupEngine:
             grouping_indicators = ",\n    " + ",\n    ".join(grouping_funcs)
         
         # Build the query
+        dim_selects = ', '.join(f"COALESCE(CAST({col} AS VARCHAR), '[TOTAL]') AS {alias}"
+                                for col, alias in zip(dim_cols, dim_aliases))
         sql = f"""
 SELECT 
-    {', '.join(f'COALESCE(CAST({col} AS VARCHAR), \'[TOTAL]\') AS {alias}' 
-               for col, alias in zip(dim_cols, dim_aliases))},
+    {dim_selects},
     {', '.join(measure_exprs)}{grouping_indicators}
 FROM ({base_sql}) AS base
 GROUP BY {grouping}
@@ -205,12 +212,14 @@ GROUP BY {grouping}
             safe = '_' + safe
         return safe
     
-    def execute_rollup(self, spec: RollupSpec) -> Dict[str, Any]:
+    @cached_result("build_rollup_query")
+    def execute_rollup(self, spec: RollupSpec, result_format: str = "records") -> Dict[str, Any]:
         """
         Execute a rollup/cube query and return formatted results.
         
         Args:
             spec: RollupSpec with query specifications
+            result_format: "records", "columns" or "arrow" (see sajha.olap.columnar)
             
         Returns:
             Dictionary with data, columns, and metadata
@@ -221,28 +230,14 @@ GROUP BY {grouping}
         sql = self.build_rollup_query(spec)
         
         try:
-            result = self.conn.execute(sql).fetchall()
-            columns = [desc[0] for desc in self.conn.description]
-            
-            # Convert to list of dicts
-            data = []
-            for row in result:
-                row_dict = {}
-                for i, col in enumerate(columns):
-                    val = row[i]
-                    if hasattr(val, 'isoformat'):
-                        val = val.isoformat()
-                    row_dict[col] = val
-                data.append(row_dict)
+            result = fetch_columnar(self.conn, sql)
             
             # Identify hierarchy levels
-            hierarchy_info = self._analyze_hierarchy(data, spec)
+            hierarchy_info = self._analyze_hierarchy(result, spec)
             
             return {
                 "success": True,
-                "data": data,
-                "columns": columns,
-                "row_count": len(data),
+                **result.payload(result_format),
                 "dimensions": spec.dimensions,
                 "measures": [m.get("measure") for m in spec.measures],
                 "operation": spec.operation,
@@ -258,27 +253,32 @@ GROUP BY {grouping}
                 "sql": sql
             }
     
-    def _analyze_hierarchy(self, data: List[Dict], spec: RollupSpec) -> Dict[str, Any]:
-        """Analyze the hierarchy levels in the result."""
-        if not data or not spec.include_grouping_id:
+    def _analyze_hierarchy(self, result: ColumnarResult, spec: RollupSpec) -> Dict[str, Any]:
+        """Count result rows per hierarchy level (number of rolled-up dimensions)."""
+        if not result.row_count or not spec.include_grouping_id:
             return {}
         
-        levels = {}
         total_indicator_cols = [f"is_{self._safe_alias(d)}_total" for d in spec.dimensions]
+        total_indicator_cols = [c for c in total_indicator_cols if c in result.columns]
+        if not total_indicator_cols:
+            return {}
         
-        for row in data:
-            # Calculate hierarchy level based on grouping indicators
-            level = sum(row.get(col, 0) for col in total_indicator_cols if col in row)
-            level_key = f"level_{level}"
-            
-            if level_key not in levels:
-                levels[level_key] = {
-                    "depth": level,
-                    "is_subtotal": level > 0,
-                    "is_grand_total": level == len(spec.dimensions),
-                    "count": 0
-                }
-            levels[level_key]["count"] += 1
+        depth_expr = " + ".join(f'"{c}"' for c in total_indicator_cols)
+        levels_sql = f"""
+SELECT {depth_expr} AS depth, COUNT(*) AS count
+FROM result
+GROUP BY depth
+ORDER BY depth
+"""
+        levels = {}
+        for row in result.summarize(self.conn, levels_sql).records():
+            level = int(row["depth"])
+            levels[f"level_{level}"] = {
+                "depth": level,
+                "is_subtotal": level > 0,
+                "is_grand_total": level == len(spec.dimensions),
+                "count": row["count"]
+            }
         
         return levels
     
@@ -10,12 +10,15 @@ without SQL knowledge.
 import json
 import os
 import logging
+import threading
 from typing import Dict, Any, List, Optional
 from pathlib import Path
 from dataclasses import dataclass, field
 
 logger = logging.getLogger(__name__)
 
+CONFIG_FILES = ("datasets.json", "measures.json", "dimensions.json")
+
 
 @dataclass
 class Measure:
@@ -146,6 +149,8 @@ class SemanticLayer:
         self.datasets: Dict[str, Dataset] = {}
         self.measures: Dict[str, Measure] = {}
         self.dimensions: Dict[str, Dimension] = {}
+        self._reload_lock = threading.Lock()
+        self.version = self.config_version()
         self._load_configuration()
     
     def _default_config_path(self) -> str:
@@ -153,30 +158,66 @@ class SemanticLayer:
         base_path = Path(__file__).parent.parent.parent / "config" / "olap"
         return str(base_path)
     
+    def config_version(self) -> tuple:
+        """(mtime_ns, size) of each configuration file; changes whenever one is rewritten."""
+        version = []
+        for name in CONFIG_FILES:
+            try:
+                st = os.stat(os.path.join(self.config_path, name))
+                version.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                version.append(None)
+        return tuple(version)
+    
+    def reload(self):
+        """
+        Re-read the configuration files. New dicts are built off to the side and
+        swapped in together, so concurrent readers see the old config or the new
+        one, never a half-loaded layer.
+        """
+        with self._reload_lock:
+            self._reload_locked()
+
+    def _reload_locked(self):
+        version = self.config_version()
+        self._load_configuration()
+        self.version = version
+
+    def reload_if_changed(self) -> bool:
+        """Reload if any config file changed since it was loaded (one thread reloads; others keep reading)."""
+        if self.config_version() == self.version:
+            return False
+        with self._reload_lock:
+            if self.config_version() == self.version:
+                return False                    # another request thread already reloaded
+            self._reload_locked()
+        return True
+    
     def _load_configuration(self):
         """Load all OLAP configurations from files."""
         config_dir = Path(self.config_path)
         
         # Load datasets
         datasets_file = config_dir / "datasets.json"
-        if datasets_file.exists():
-            self._load_datasets(datasets_file)
+        datasets = self._load_datasets(datasets_file) if datasets_file.exists() else {}
         
         # Load measures
         measures_file = config_dir / "measures.json"
-        if measures_file.exists():
-            self._load_measures(measures_file)
+        measures = self._load_measures(measures_file) if measures_file.exists() else {}
         
         # Load dimensions
         dimensions_file = config_dir / "dimensions.json"
-        if dimensions_file.exists():
-            self._load_dimensions(dimensions_file)
+        dimensions = self._load_dimensions(dimensions_file) if dimensions_file.exists() else {}
+        
+        # Swap in fully built dicts — never clear-and-refill the live ones
+        self.datasets, self.measures, self.dimensions = datasets, measures, dimensions
         
         logger.info(f"Loaded semantic layer: {len(self.datasets)} datasets, "
                    f"{len(self.measures)} measures, {len(self.dimensions)} dimensions")
     
-    def _load_datasets(self, file_path: Path):
+    def _load_datasets(self, file_path: Path) -> Dict[str, Dataset]:
         """Load dataset definitions from JSON file."""
+        datasets = {}
         try:
             with open(file_path, 'r') as f:
                 data = json.load(f)
@@ -203,13 +244,15 @@ class SemanticLayer:
                     default_time_dimension=config.get("default_time_dimension"),
                     row_level_security=config.get("row_level_security")
                 )
-                self.datasets[name] = dataset
+                datasets[name] = dataset
                 
         except Exception as e:
             logger.error(f"Error loading datasets: {e}", exc_info=True)
+        return datasets
     
-    def _load_measures(self, file_path: Path):
+    def _load_measures(self, file_path: Path) -> Dict[str, Measure]:
         """Load measure definitions from JSON file."""
+        measures = {}
         try:
             with open(file_path, 'r') as f:
                 data = json.load(f)
@@ -222,13 +265,15 @@ class SemanticLayer:
                     description=config.get("description", ""),
                     requires_window=config.get("requires_window", False)
                 )
-                self.measures[name] = measure
+                measures[name] = measure
                 
         except Exception as e:
             logger.error(f"Error loading measures: {e}", exc_info=True)
+        return measures
     
-    def _load_dimensions(self, file_path: Path):
+    def _load_dimensions(self, file_path: Path) -> Dict[str, Dimension]:
         """Load dimension definitions from JSON file."""
+        dimensions = {}
         try:
             with open(file_path, 'r') as f:
                 data = json.load(f)
@@ -253,10 +298,11 @@ class SemanticLayer:
                     hierarchies=hierarchies,
                     description=config.get("description", "")
                 )
-                self.dimensions[name] = dimension
+                dimensions[name] = dimension
                 
         except Exception as e:
             logger.error(f"Error loading dimensions: {e}", exc_info=True)
+        return dimensions
     
     def get_dataset(self, name: str) -> Optional[Dataset]:
         """Get a dataset by name."""
@@ -10,6 +10,9 @@ import logging
 from typing import Dict, Any, List, Optional
 from dataclasses import dataclass, field
 
+from sajha.olap.columnar import fetch_columnar
+from sajha.olap.query_cache import cached_plan, cached_result
+
 logger = logging.getLogger(__name__)
 
 
@@ -68,17 +71,20 @@ class StatsEngine:
     - Outlier detection
     """
     
-    def __init__(self, semantic_layer, connection=None):
+    def __init__(self, semantic_layer, connection=None, cache=None):
         """
         Initialize the statistics engine.
         
         Args:
             semantic_layer: SemanticLayer instance
             connection: Optional DuckDB connection
+            cache: Optional OLAPQueryCache for compiled SQL and results
         """
         self.semantic = semantic_layer
         self.conn = connection
+        self.cache = cache
     
+    @cached_plan
     def build_summary_statistics(self, spec: StatsSpec) -> str:
         """
         Build comprehensive summary statistics query.
@@ -96,43 +102,56 @@ class StatsEngine:
         # Build base query
         base_sql = self._build_base_query(dataset, spec.filters)
         
-        # Build stats functions for each measure
-        stats_functions = []
+        # Aggregates are computed in an inner query; every quantile a measure
+        # needs (percentiles, median, IQR) comes from a single QUANTILE_CONT
+        # list aggregate — one sort per measure — unpacked by the outer select.
+        aggregates = []
+        outputs = []
         for measure in spec.measures:
             col = self._resolve_measure_column(measure, dataset)
             alias = self._safe_alias(measure)
             
+            def stat(expr: str, name: str):
+                aggregates.append(f"{expr} AS {alias}_{name}")
+                outputs.append(f"{alias}_{name}")
+            
+            quantiles = []
+            if "percentiles" in spec.statistics:
+                quantiles.extend(spec.percentiles)
+            if "distribution" in spec.statistics:
+                quantiles.extend([0.25, 0.5, 0.75])
+            quantiles = sorted(set(float(q) for q in quantiles))
+            quantile_col = f"{alias}__quantiles"
+            if quantiles:
+                aggregates.append(
+                    f"QUANTILE_CONT({col}, [{', '.join(repr(q) for q in quantiles)}]) AS {quantile_col}")
+            
+            def quantile(q: float) -> str:
+                return f"{quantile_col}[{quantiles.index(float(q)) + 1}]"
+            
             if "summary" in spec.statistics:
-                stats_functions.extend([
-                    f"COUNT({col}) AS {alias}_count",
-                    f"COUNT(DISTINCT {col}) AS {alias}_distinct",
-                    f"SUM({col}) AS {alias}_sum",
-                    f"AVG({col}) AS {alias}_mean",
-                    f"MIN({col}) AS {alias}_min",
-                    f"MAX({col}) AS {alias}_max",
-                    f"STDDEV_SAMP({col}) AS {alias}_stddev",
-                    f"VAR_SAMP({col}) AS {alias}_variance"
-                ])
+                stat(f"COUNT({col})", "count")
+                stat(f"COUNT(DISTINCT {col})", "distinct")
+                stat(f"SUM({col})", "sum")
+                stat(f"AVG({col})", "mean")
+                stat(f"MIN({col})", "min")
+                stat(f"MAX({col})", "max")
+                stat(f"STDDEV_SAMP({col})", "stddev")
+                stat(f"VAR_SAMP({col})", "variance")
             
             if "percentiles" in spec.statistics:
                 for p in spec.percentiles:
-                    p_name = f"p{int(p*100)}"
-                    stats_functions.append(
-                        f"PERCENTILE_CONT({p}) WITHIN GROUP (ORDER BY {col}) AS {alias}_{p_name}"
-                    )
+                    outputs.append(f"{quantile(p)} AS {alias}_p{int(p*100)}")
             
             if "distribution" in spec.statistics:
-                stats_functions.extend([
-                    f"MEDIAN({col}) AS {alias}_median",
-                    f"MODE({col}) AS {alias}_mode",
-                    # DuckDB supports these aggregate functions
-                    f"(PERCENTILE_CONT(0.75) WITHIN GROUP (ORDER BY {col}) - "
-                    f"PERCENTILE_CONT(0.25) WITHIN GROUP (ORDER BY {col})) AS {alias}_iqr"
-                ])
+                outputs.append(f"{quantile(0.5)} AS {alias}_median")
+                stat(f"MODE({col})", "mode")
+                outputs.append(f"({quantile(0.75)} - {quantile(0.25)}) AS {alias}_iqr")
         
         # Build group by clause
         group_clause = ""
         select_cols = ""
+        group_aliases = []
         
         if spec.group_by:
             group_cols = []
@@ -140,19 +159,25 @@ class StatsEngine:
                 col = self.semantic.resolve_dimension(g, dataset)
                 alias = self._safe_alias(g)
                 group_cols.append(f"{col} AS {alias}")
+                group_aliases.append(alias)
             select_cols = ", ".join(group_cols) + ", "
             group_clause = f"GROUP BY {', '.join([self.semantic.resolve_dimension(g, dataset) for g in spec.group_by])}"
         
         sql = f"""
 SELECT 
-    {select_cols}
-    {', '.join(stats_functions)}
-FROM ({base_sql}) AS base
-{group_clause}
+    {', '.join(group_aliases + outputs)}
+FROM (
+    SELECT 
+        {select_cols}
+        {', '.join(aggregates)}
+    FROM ({base_sql}) AS base
+    {group_clause}
+) AS stats
 """
         
         return sql
     
+    @cached_plan
     def build_correlation_matrix(self, spec: StatsSpec) -> str:
         """
         Build correlation matrix between measures.
@@ -189,6 +214,7 @@ FROM ({base_sql}) AS base
 """
         return sql
     
+    @cached_plan
     def build_histogram(self, spec: HistogramSpec) -> str:
         """
         Build histogram data for a measure.
@@ -380,12 +406,14 @@ FROM ({base_sql}) AS base
             safe = '_' + safe
         return safe
     
-    def execute_statistics(self, spec: StatsSpec) -> Dict[str, Any]:
+    @cached_result("build_summary_statistics")
+    def execute_statistics(self, spec: StatsSpec, result_format: str = "records") -> Dict[str, Any]:
         """
         Execute statistics query and return formatted results.
         
         Args:
             spec: StatsSpec with query specifications
+            result_format: "records", "columns" or "arrow" (see sajha.olap.columnar)
             
         Returns:
             Dictionary with statistics data
@@ -396,24 +424,11 @@ FROM ({base_sql}) AS base
         sql = self.build_summary_statistics(spec)
         
         try:
-            result = self.conn.execute(sql).fetchall()
-            columns = [desc[0] for desc in self.conn.description]
-            
-            # Convert to list of dicts
-            data = []
-            for row in result:
-                row_dict = {}
-                for i, col in enumerate(columns):
-                    val = row[i]
-                    if hasattr(val, 'isoformat'):
-                        val = val.isoformat()
-                    row_dict[col] = val
-                data.append(row_dict)
+            result = fetch_columnar(self.conn, sql)
             
             return {
                 "success": True,
-                "data": data,
-                "columns": columns,
+                **result.payload(result_format),
                 "measures": spec.measures,
                 "statistics_types": spec.statistics,
                 "grouped_by": spec.group_by,
@@ -428,12 +443,14 @@ FROM ({base_sql}) AS base
                 "sql": sql
             }
     
-    def execute_histogram(self, spec: HistogramSpec) -> Dict[str, Any]:
+    @cached_result("build_histogram")
+    def execute_histogram(self, spec: HistogramSpec, result_format: str = "records") -> Dict[str, Any]:
         """
         Execute histogram query and return formatted results.
         
         Args:
             spec: HistogramSpec with histogram specifications
+            result_format: "records", "columns" or "arrow" (see sajha.olap.columnar)
             
         Returns:
             Dictionary with histogram data
@@ -444,20 +461,11 @@ FROM ({base_sql}) AS base
         sql = self.build_histogram(spec)
         
         try:
-            result = self.conn.execute(sql).fetchall()
-            columns = [desc[0] for desc in self.conn.description]
-            
-            data = []
-            for row in result:
-                row_dict = {}
-                for i, col in enumerate(columns):
-                    row_dict[col] = row[i]
-                data.append(row_dict)
+            result = fetch_columnar(self.conn, sql)
             
             return {
                 "success": True,
-                "data": data,
-                "columns": columns,
+                **result.payload(result_format),
                 "measure": spec.measure,
                 "bins": spec.bins,
                 "sql": sql
@@ -471,6 +479,7 @@ FROM ({base_sql}) AS base
                 "sql": sql
             }
     
+    @cached_result("build_correlation_matrix")
     def execute_correlation(self, spec: StatsSpec) -> Dict[str, Any]:
         """
         Execute correlation matrix query and return formatted results.
@@ -487,15 +496,10 @@ FROM ({base_sql}) AS base
         sql = self.build_correlation_matrix(spec)
         
         try:
-            result = self.conn.execute(sql).fetchone()
-            columns = [desc[0] for desc in self.conn.description]
+            result = fetch_columnar(self.conn, sql)
             
-            # Build correlation matrix
-            matrix = {}
-            for i, col in enumerate(columns):
-                # Parse column name like "corr_revenue_quantity"
-                parts = col.split("_")[1:]  # Remove "corr_" prefix
-                matrix[col] = result[i]
+            # Single row: one corr_<a>_<b> column per measure pair
+            matrix = result.records()[0] if result.row_count else {}
             
             return {
                 "success": True,
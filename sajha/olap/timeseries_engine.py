@@ -10,6 +10,9 @@ import logging
 from typing import Dict, Any, List, Optional
 from dataclasses import dataclass, field
 
+from sajha.olap.columnar import ColumnarResult, fetch_columnar
+from sajha.olap.query_cache import cached_plan, cached_result
+
 logger = logging.getLogger(__name__)
 
 
@@ -88,17 +91,20 @@ class TimeSeriesEngine:
         "mtd": None                       # Month to Date (special handling)
     }
     
-    def __init__(self, semantic_layer, connection=None):
+    def __init__(self, semantic_layer, connection=None, cache=None):
         """
         Initialize the time series engine.
         
         Args:
             semantic_layer: SemanticLayer instance
             connection: Optional DuckDB connection
+            cache: Optional OLAPQueryCache for compiled SQL and results
         """
         self.semantic = semantic_layer
         self.conn = connection
+        self.cache = cache
     
+    @cached_plan
     def build_time_series_query(self, spec: TimeSeriesSpec) -> str:
         """
         Build SQL for time series analysis.
@@ -244,11 +250,11 @@ ORDER BY time_period
         
         sql = f"""
 WITH date_spine AS (
-    SELECT generate_series(
+    SELECT CAST(UNNEST(generate_series(
         (SELECT MIN({grain_expr}) FROM ({base_sql}) AS b),
         (SELECT MAX({grain_expr}) FROM ({base_sql}) AS b),
         {interval}
-    )::DATE AS time_period
+    )) AS DATE) AS time_period
 ),
 aggregated AS (
     SELECT 
@@ -318,12 +324,14 @@ ORDER BY c.time_period
             safe = '_' + safe
         return safe
     
-    def execute_time_series(self, spec: TimeSeriesSpec) -> Dict[str, Any]:
+    @cached_result("build_time_series_query")
+    def execute_time_series(self, spec: TimeSeriesSpec, result_format: str = "records") -> Dict[str, Any]:
         """
         Execute a time series query and return formatted results.
         
         Args:
             spec: TimeSeriesSpec with query specifications
+            result_format: "records", "columns" or "arrow" (see sajha.olap.columnar)
             
         Returns:
             Dictionary with data, columns, and metadata
@@ -334,28 +342,14 @@ ORDER BY c.time_period
         sql = self.build_time_series_query(spec)
         
         try:
-            result = self.conn.execute(sql).fetchall()
-            columns = [desc[0] for desc in self.conn.description]
-            
-            # Convert to list of dicts
-            data = []
-            for row in result:
-                row_dict = {}
-                for i, col in enumerate(columns):
-                    val = row[i]
-                    if hasattr(val, 'isoformat'):
-                        val = val.isoformat()
-                    row_dict[col] = val
-                data.append(row_dict)
+            result = fetch_columnar(self.conn, sql)
             
             # Calculate summary statistics
-            summary = self._calculate_summary(data, spec.measures)
+            summary = self._calculate_summary(result, spec.measures)
             
             return {
                 "success": True,
-                "data": data,
-                "columns": columns,
-                "row_count": len(data),
+                **result.payload(result_format),
                 "time_dimension": spec.time_dimension,
                 "time_grain": spec.time_grain,
                 "measures": spec.measures,
@@ -373,26 +367,42 @@ ORDER BY c.time_period
                 "sql": sql
             }
     
-    def _calculate_summary(self, data: List[Dict], measures: List[str]) -> Dict[str, Any]:
-        """Calculate summary statistics for the time series."""
-        if not data:
+    def _calculate_summary(self, result: ColumnarResult, measures: List[str]) -> Dict[str, Any]:
+        """Calculate summary statistics for the time series in one aggregate query."""
+        if not result.row_count:
+            return {}
+        
+        cols = [(m, self._safe_alias(m)) for m in measures if self._safe_alias(m) in result.columns]
+        if not cols:
             return {}
         
+        order_col = "time_period" if "time_period" in result.columns else None
+        aggregates = []
+        for _, col in cols:
+            non_null = f"FILTER (WHERE {col} IS NOT NULL)"
+            if order_col:
+                first = f"arg_min({col}, {order_col}) {non_null}"
+                last = f"arg_max({col}, {order_col}) {non_null}"
+            else:
+                first = last = "NULL"
+            aggregates += [
+                f"MIN({col}) AS {col}__min",
+                f"MAX({col}) AS {col}__max",
+                f"SUM({col}) AS {col}__sum",
+                f"AVG({col}) AS {col}__avg",
+                f"COUNT({col}) AS {col}__count",
+                f"{first} AS {col}__first",
+                f"{last} AS {col}__last",
+                f"CASE WHEN COUNT({col}) > 1 THEN {last} - {first} ELSE 0 END AS {col}__total_change"
+            ]
+        row = result.summarize(self.conn, f"SELECT {', '.join(aggregates)} FROM result").records()[0]
+        
         summary = {}
-        for measure in measures:
-            col = self._safe_alias(measure)
-            values = [row.get(col) for row in data if row.get(col) is not None]
-            
-            if values:
+        for measure, col in cols:
+            if row[f"{col}__count"]:
                 summary[measure] = {
-                    "min": min(values),
-                    "max": max(values),
-                    "sum": sum(values),
-                    "avg": sum(values) / len(values),
-                    "count": len(values),
-                    "first": values[0],
-                    "last": values[-1],
-                    "total_change": values[-1] - values[0] if len(values) > 1 else 0
+                    stat: row[f"{col}__{stat}"]
+                    for stat in ("min", "max", "sum", "avg", "count", "first", "last", "total_change")
                 }
         
         return summary
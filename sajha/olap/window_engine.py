@@ -10,6 +10,9 @@ import logging
 from typing import Dict, Any, List, Optional
 from dataclasses import dataclass, field
 
+from sajha.olap.columnar import fetch_columnar
+from sajha.olap.query_cache import cached_plan, cached_result
+
 logger = logging.getLogger(__name__)
 
 
@@ -103,17 +106,20 @@ class WindowEngine:
         "difference_from_average": "{measure} - AVG({measure}) OVER ({partition})"
     }
     
-    def __init__(self, semantic_layer, connection=None):
+    def __init__(self, semantic_layer, connection=None, cache=None):
         """
         Initialize the window engine.
         
         Args:
             semantic_layer: SemanticLayer instance
             connection: Optional DuckDB connection
+            cache: Optional OLAPQueryCache for compiled SQL and results
         """
         self.semantic = semantic_layer
         self.conn = connection
+        self.cache = cache
     
+    @cached_plan
     def build_window_query(self, spec: WindowSpec) -> str:
         """
         Build SQL with window functions.
@@ -279,12 +285,14 @@ FROM aggregated
             safe = '_' + safe
         return safe
     
-    def execute_window(self, spec: WindowSpec) -> Dict[str, Any]:
+    @cached_result("build_window_query")
+    def execute_window(self, spec: WindowSpec, result_format: str = "records") -> Dict[str, Any]:
         """
         Execute a window function query and return formatted results.
         
         Args:
             spec: WindowSpec with query specifications
+            result_format: "records", "columns" or "arrow" (see sajha.olap.columnar)
             
         Returns:
             Dictionary with data, columns, and metadata
@@ -295,19 +303,7 @@ FROM aggregated
         sql = self.build_window_query(spec)
         
         try:
-            result = self.conn.execute(sql).fetchall()
-            columns = [desc[0] for desc in self.conn.description]
-            
-            # Convert to list of dicts
-            data = []
-            for row in result:
-                row_dict = {}
-                for i, col in enumerate(columns):
-                    val = row[i]
-                    if hasattr(val, 'isoformat'):
-                        val = val.isoformat()
-                    row_dict[col] = val
-                data.append(row_dict)
+            result = fetch_columnar(self.conn, sql)
             
             # Identify which columns are window calculations
             window_cols = []
@@ -320,9 +316,7 @@ FROM aggregated
             
             return {
                 "success": True,
-                "data": data,
-                "columns": columns,
-                "row_count": len(data),
+                **result.payload(result_format),
                 "base_dimensions": spec.base_dimensions,
                 "base_measures": spec.base_measures,
                 "window_columns": window_cols,
@@ -311,7 +311,13 @@ async def api_rebuild_index(auth: AuthContext = Depends(require_admin)):
 
 @router.post('/api/ai/complete')
 async def api_complete(request: Request, auth: AuthContext = Depends(require_auth)):
-    """Send a completion request through the LLM gateway."""
+    """Send a completion request through the LLM gateway.
+
+    With "stream": true (or Accept: text/event-stream) the reply is an SSE
+    stream of `token` events ({"text"}) followed by one `done` event with the
+    timing metrics (ttft_ms, duration_ms, chunks, ...) or an `error` event.
+    Disconnecting stops the upstream generation.
+    """
     gw = _get_gateway()
     if not gw:
         return JSONResponse({'error': 'Gateway not initialized'}, status_code=503)
@@ -320,16 +326,36 @@ async def api_complete(request: Request, auth: AuthContext = Depends(require_aut
     if not prompt:
         return JSONResponse({'error': 'prompt is required'}, status_code=400)
 
+    params = dict(
+        prompt=prompt,
+        user_id=auth.user_id,
+        provider=data.get('provider', ''),
+        model=data.get('model', ''),
+        system=data.get('system', ''),
+        temperature=float(data['temperature']) if data.get('temperature') is not None else None,
+        max_tokens=int(data.get('max_tokens', 0)),
+    )
+
+    if data.get('stream') or 'text/event-stream' in request.headers.get('accept', ''):
+        from sse_starlette.sse import EventSourceResponse
+
+        async def event_generator():
+            metrics = {}
+            stream = gw.astream(**params, metrics=metrics)
+            try:
+                async for chunk in stream:
+                    yield {'event': 'token', 'data': json.dumps({'text': chunk})}
+                yield {'event': 'done', 'data': json.dumps(metrics)}
+            except Exception as e:
+                logger.warning(f"Streamed completion failed: {e}", exc_info=True)
+                yield {'event': 'error', 'data': json.dumps({'error': str(e), **metrics})}
+            finally:
+                await stream.aclose()
+
+        return EventSourceResponse(event_generator())
+
     try:
-        resp = gw.complete(
-            prompt=prompt,
-            user_id=auth.user_id,
-            provider=data.get('provider', ''),
-            model=data.get('model', ''),
-            system=data.get('system', ''),
-            temperature=float(data.get('temperature', 0)),
-            max_tokens=int(data.get('max_tokens', 0)),
-        )
+        resp = await gw.acomplete(**params)
         return JSONResponse({
             'content': resp.content,
             'model': resp.model,
@@ -48,7 +48,7 @@ async def mcp_endpoint(request: Request, db: Session = Depends(get_db)):
             'error': {'code': -32700, 'message': 'Parse error'},
         }, status_code=400)
 
-    response = mcp_handler.handle_request(request_data, session_data)
+    response = await mcp_handler.ahandle_request(request_data, session_data)
     return JSONResponse(response)
 
 
@@ -81,7 +81,9 @@ async def api_tool_execute(
     usage_dao = ToolUsageDAO(db)
     start = time.time()
     try:
-        result = tool.execute_with_tracking(arguments)
+        from sajha.core.duckdb_guard import tenant_scope
+        with tenant_scope(auth.user_id):
+            result = tool.execute_with_tracking(arguments)
         duration_ms = int((time.time() - start) * 1000)
 
         # Log to DB
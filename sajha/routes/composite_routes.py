@@ -60,6 +60,8 @@ async def api_create(request: Request, auth: AuthContext = Depends(require_admin
         description=data.get('description', ''),
         master_output_key=data.get('master_output_key', 'master'),
         record_path=data.get('record_path', ''),
+        failure_budget=data.get('failure_budget'),
+        memoize=data.get('memoize', True),
         created_by=auth.user_id,
         steps=data.get('steps', []),
     )
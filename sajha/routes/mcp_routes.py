@@ -120,7 +120,7 @@ async def mcp_message(request: Request, db: Session = Depends(get_db)):
             'error': {'code': -32700, 'message': 'Parse error'},
         }, status_code=400)
 
-    response = mcp_handler.handle_request(body, session_data)
+    response = await mcp_handler.ahandle_request(body, session_data)
 
     # If a notification should go to the SSE stream
     if session_id and session_id in _sse_sessions:
@@ -306,6 +306,21 @@ async def webhook_unsubscribe(request: Request, auth: AuthContext = Depends(requ
     return {'unsubscribed': True}
 
 
+@router.get('/api/webhooks/dead-letters')
+async def webhook_dead_letters(request: Request, auth: AuthContext = Depends(require_admin)):
+    """List deliveries that exhausted their retries. Params: limit."""
+    from sajha.core.webhooks import get_webhook_manager
+    limit = int(request.query_params.get('limit', 100))
+    return {'dead_letters': get_webhook_manager().list_dead_letters(min(limit, 1000))}
+
+
+@router.post('/api/webhooks/dead-letters/redeliver')
+async def webhook_redeliver(auth: AuthContext = Depends(require_admin)):
+    """Re-queue every dead-lettered delivery."""
+    from sajha.core.webhooks import get_webhook_manager
+    return {'requeued': get_webhook_manager().redeliver_dead_letters()}
+
+
 @router.get('/api/audit')
 async def audit_log(request: Request, auth: AuthContext = Depends(require_admin)):
     """Query audit log. Params: action, user_id, from, to, limit."""
@@ -374,7 +389,7 @@ async def execute_tool_async(tool_name: str, request: Request, auth: AuthContext
             'poll_url': f'/api/async/tasks/{task.task_id}',
         }
     except queue_mod.Full:
-        return JSONResponse({'error': 'Queue full — try again later', 'queue_size': executor._queue.maxsize}, status_code=503)
+        return JSONResponse({'error': 'Queue full — try again later', 'queue_size': executor.queue_size}, status_code=503)
     except Exception as e:
         logger.error(f"Async submit error: {e}", exc_info=True)
         return JSONResponse({'error': str(e)}, status_code=500)
@@ -382,12 +397,14 @@ async def execute_tool_async(tool_name: str, request: Request, auth: AuthContext
 
 @router.get('/api/async/tasks')
 async def list_async_tasks(request: Request, auth: AuthContext = Depends(require_auth)):
-    """List async tasks. Optional filter: ?status=queued|running|completed|failed"""
+    """List async tasks, newest first. Optional filter: ?status=queued|running|completed|failed
+    Paginate with ?cursor=<next_cursor from the previous page>."""
     from sajha.core.async_executor import get_async_executor
     status = request.query_params.get('status')
     limit = int(request.query_params.get('limit', 100))
     executor = get_async_executor()
-    return {'tasks': executor.list_tasks(status=status, limit=limit), 'stats': executor.stats()}
+    tasks, next_cursor = executor.list_page(status=status, limit=limit, cursor=request.query_params.get('cursor'))
+    return {'tasks': tasks, 'next_cursor': next_cursor, 'stats': executor.stats()}
 
 
 @router.get('/api/async/tasks/{task_id}')
@@ -179,7 +179,7 @@ async def mcp_websocket(ws: WebSocket):
                 session.initialized = True
 
             # Handle via the same MCPHandler used by HTTP POST and SSE
-            response = mcp_handler.handle_request(data, session.session_data)
+            response = await mcp_handler.ahandle_request(data, session.session_data)
 
             # Send response (skip for notifications — requests without 'id')
             if 'id' in data:
@@ -16,6 +16,8 @@ from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass, field
 
+from sajha.core.db.pooled_query import compile_query_template
+
 logger = logging.getLogger(__name__)
 
 
@@ -37,7 +39,7 @@ class DBQueryToolDefinition:
     description: str
     db_type: str  # duckdb, sqlite, postgresql, mysql
     connection_string: str  # Connection string or file path
-    query_template: str  # SQL query with {{param}} placeholders
+    query_template: str  # SQL query with {{param}} placeholders (bound, never spliced)
     parameters: List[DBQueryParameter]
     category: str = "Database"
     tags: List[str] = field(default_factory=list)
@@ -45,6 +47,9 @@ class DBQueryToolDefinition:
     timeout: int = 30
     max_rows: int = 1000
     version: str = "2.9.8"
+    pool_name: str = ""  # Named pool in DBConnectionPoolManager (default: derived from connection)
+    pool_size: int = 10  # Max pooled connections for this pool
+    fetch_size: int = 500  # Rows pulled per cursor round trip
 
 
 class DBQueryToolGenerator:
@@ -131,6 +136,18 @@ class DBQueryToolGenerator:
         for placeholder in placeholders:
             if placeholder not in param_names:
                 errors.append(f"Query placeholder '{{{{{placeholder}}}}}' has no matching parameter definition")
+
+        # Every placeholder must be bindable
+        if definition.query_template:
+            try:
+                compile_query_template(definition.query_template)
+            except ValueError as e:
+                errors.append(str(e))
+
+        if definition.pool_size < 1:
+            errors.append("Pool size must be at least 1")
+        if definition.fetch_size < 1:
+            errors.append("Fetch size must be at least 1")
         
         return (len(errors) == 0, errors)
     
@@ -212,6 +229,7 @@ class DBQueryToolGenerator:
                     "items": {"type": "string"}
                 },
                 "row_count": {"type": "integer", "description": "Number of rows returned"},
+                "truncated": {"type": "boolean", "description": "Whether more rows matched than max_rows"},
                 "query_time_ms": {"type": "number", "description": "Query execution time in milliseconds"},
                 "db_type": {"type": "string", "description": "Database type used"}
             },
@@ -228,12 +246,6 @@ class DBQueryToolGenerator:
         # Generate parameter validation code
         param_validation_code = self._generate_param_validation_code(definition)
         
-        # Generate database-specific connection code
-        connection_code = self._generate_connection_code(definition)
-        
-        # Generate query execution code
-        query_execution_code = self._generate_query_execution_code(definition)
-        
         # Escape literature for docstring
         literature_escaped = definition.literature.replace('"""', '\\"\\"\\"') if definition.literature else ""
         
@@ -248,11 +260,11 @@ Auto-generated tool for database query.
 Database Type: {definition.db_type}
 """
 
-import re
 import time
 import logging
 from typing import Dict, Any, List, Optional
 from sajha.tools.base_mcp_tool import BaseMCPTool
+from sajha.core.db.pooled_query import PooledQueryExecutor
 
 logger = logging.getLogger(__name__)
 
@@ -273,12 +285,24 @@ class {class_name}(BaseMCPTool):
         """Initialize the DB Query tool."""
         super().__init__(config or {{}})
         self._name = "{definition.name}"
-        self._description = """{definition.description}"""
+        self._description = {definition.description!r}
         self._db_type = "{definition.db_type}"
-        self._connection_string = """{definition.connection_string}"""
+        self._connection_string = {definition.connection_string!r}
         self._timeout = {definition.timeout}
         self._max_rows = {definition.max_rows}
-        self._query_template = """{definition.query_template}"""
+        self._query_template = {definition.query_template!r}
+        
+        # Template is compiled once; connections come from a shared named pool
+        self._executor = PooledQueryExecutor(
+            db_type=self._db_type,
+            connection_string=self._connection_string,
+            query_template=self._query_template,
+            pool_name={(definition.pool_name or None)!r},
+            max_rows=self._max_rows,
+            fetch_size={definition.fetch_size},
+            timeout=self._timeout,
+            pool_size={definition.pool_size}
+        )
         
         logger.info(f"Initialized DB Query tool: {{self._name}}")
     
@@ -314,14 +338,9 @@ class {class_name}(BaseMCPTool):
             # Validate parameters
 {self._indent(param_validation_code, 12)}
             
-            # Build query with parameter substitution (safely)
-            query = self._build_query(arguments)
-            
-            # Get database connection
-{self._indent(connection_code, 12)}
-            
-            # Execute query
-{self._indent(query_execution_code, 12)}
+            # Parameters are passed as bind values, never spliced into SQL
+            result = self._executor.execute(arguments)
+            rows = result["rows"]
             
             # Calculate execution time
             query_time_ms = (time.time() - start_time) * 1000
@@ -329,8 +348,9 @@ class {class_name}(BaseMCPTool):
             return {{
                 "success": True,
                 "data": rows,
-                "columns": columns,
+                "columns": result["columns"],
                 "row_count": len(rows),
+                "truncated": result["truncated"],
                 "query_time_ms": round(query_time_ms, 2),
                 "db_type": self._db_type
             }}
@@ -346,38 +366,18 @@ class {class_name}(BaseMCPTool):
                 "success": False,
                 "error": f"Query execution error: {{str(e)}}"
             }}
-    
-    def _build_query(self, arguments: Dict) -> str:
-        """Build the SQL query with safe parameter substitution."""
-        query = self._query_template
-        
-        # Replace placeholders with parameter values
-        for key, value in arguments.items():
-            placeholder = f"{{{{{{key}}}}}}"
-            if placeholder in query:
-                # Escape string values to prevent SQL injection
-                if isinstance(value, str):
-                    # Simple escaping - replace single quotes with doubled quotes
-                    safe_value = value.replace("'", "''")
-                    query = query.replace(placeholder, f"'{{safe_value}}'")
-                elif isinstance(value, bool):
-                    query = query.replace(placeholder, "TRUE" if value else "FALSE")
-                elif value is None:
-                    query = query.replace(placeholder, "NULL")
-                else:
-                    query = query.replace(placeholder, str(value))
-        
-        return query
 '''
         
         return code
     
     def _generate_param_validation_code(self, definition: DBQueryToolDefinition) -> str:
         """Generate parameter validation code."""
-        lines = []
+        lines = ['arguments = dict(arguments)']
         
         for param in definition.parameters:
-            if param.required and param.default is None:
+            if param.default is not None:
+                lines.append(f'arguments.setdefault("{param.name}", {param.default!r})')
+            elif param.required:
                 lines.append(f'if "{param.name}" not in arguments or arguments["{param.name}"] is None:')
                 lines.append(f'    raise ValueError("Required parameter \'{param.name}\' is missing")')
             
@@ -399,79 +399,8 @@ class {class_name}(BaseMCPTool):
                 lines.append(f'    if arguments["{param.name}"] not in {param.enum}:')
                 lines.append(f'        raise ValueError(f"Parameter \'{param.name}\' must be one of: {param.enum}")')
         
-        if not lines:
-            return "pass  # No required parameters"
-        
         return '\n'.join(lines)
     
-    def _generate_connection_code(self, definition: DBQueryToolDefinition) -> str:
-        """Generate database connection code based on db_type."""
-        
-        if definition.db_type == 'duckdb':
-            return '''import duckdb
-conn = duckdb.connect(self._connection_string if self._connection_string != ':memory:' else ':memory:')'''
-        
-        elif definition.db_type == 'sqlite':
-            return '''import sqlite3
-conn = sqlite3.connect(self._connection_string)
-conn.row_factory = sqlite3.Row'''
-        
-        elif definition.db_type == 'postgresql':
-            return '''import psycopg2
-import psycopg2.extras
-conn = psycopg2.connect(self._connection_string)'''
-        
-        elif definition.db_type == 'mysql':
-            return '''import pymysql
-import pymysql.cursors
-# Parse connection string: host=localhost;database=mydb;user=root;password=secret
-conn_params = dict(item.split('=') for item in self._connection_string.split(';') if '=' in item)
-conn = pymysql.connect(
-    host=conn_params.get('host', 'localhost'),
-    database=conn_params.get('database', ''),
-    user=conn_params.get('user', ''),
-    password=conn_params.get('password', ''),
-    cursorclass=pymysql.cursors.DictCursor
-)'''
-        
-        else:
-            return '''raise ValueError(f"Unsupported database type: {self._db_type}")'''
-    
-    def _generate_query_execution_code(self, definition: DBQueryToolDefinition) -> str:
-        """Generate query execution code based on db_type."""
-        
-        if definition.db_type == 'duckdb':
-            return f'''cursor = conn.execute(query)
-columns = [desc[0] for desc in cursor.description]
-rows = [dict(zip(columns, row)) for row in cursor.fetchmany({definition.max_rows})]
-conn.close()'''
-        
-        elif definition.db_type == 'sqlite':
-            return f'''cursor = conn.execute(query)
-columns = [desc[0] for desc in cursor.description]
-rows = [dict(row) for row in cursor.fetchmany({definition.max_rows})]
-conn.close()'''
-        
-        elif definition.db_type == 'postgresql':
-            return f'''cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-cursor.execute(query)
-columns = [desc[0] for desc in cursor.description]
-rows = cursor.fetchmany({definition.max_rows})
-rows = [dict(row) for row in rows]
-cursor.close()
-conn.close()'''
-        
-        elif definition.db_type == 'mysql':
-            return f'''cursor = conn.cursor()
-cursor.execute(query)
-columns = [desc[0] for desc in cursor.description] if cursor.description else []
-rows = cursor.fetchmany({definition.max_rows})
-cursor.close()
-conn.close()'''
-        
-        else:
-            return '''raise ValueError(f"Unsupported database type: {self._db_type}")'''
-    
     def _to_class_name(self, tool_name: str) -> str:
         """Convert tool_name to ClassName."""
         return ''.join(word.capitalize() for word in tool_name.split('_'))
@@ -16,6 +16,8 @@ from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass, field
 
+from sajha.tools.rest_client import PAGINATION_MODES
+
 logger = logging.getLogger(__name__)
 
 
@@ -42,6 +44,11 @@ class RESTToolDefinition:
     csv_has_header: bool = True
     csv_skip_rows: int = 0  # Number of rows to skip before header/data
     version: str = "2.9.8"
+    max_retries: int = 2  # Retries for connection errors and 429/5xx (idempotent methods)
+    retry_backoff: float = 0.5  # Base seconds for jittered exponential backoff
+    max_concurrency: int = 8  # In-flight requests allowed against this endpoint
+    cache_ttl: int = 0  # Seconds to cache successful GET results (0 = off)
+    pagination: Optional[Dict[str, Any]] = None  # See sajha.tools.rest_client.RestClient
 
 
 class RESTToolGenerator:
@@ -87,6 +94,26 @@ class RESTToolGenerator:
             if not definition.request_schema:
                 errors.append("Request schema is required for POST/PUT/PATCH methods")
         
+        # Validate client policy
+        if definition.max_retries < 0:
+            errors.append("Max retries cannot be negative")
+        if definition.max_concurrency < 1:
+            errors.append("Max concurrency must be at least 1")
+        if definition.cache_ttl < 0:
+            errors.append("Cache TTL cannot be negative")
+        elif definition.cache_ttl > 0 and definition.method != 'GET':
+            errors.append("Response caching is only supported for GET endpoints")
+        
+        # Validate pagination
+        if definition.pagination:
+            mode = definition.pagination.get('mode', 'page')
+            if mode not in PAGINATION_MODES:
+                errors.append(f"Invalid pagination mode. Must be one of: {', '.join(PAGINATION_MODES)}")
+            if definition.method != 'GET':
+                errors.append("Pagination is only supported for GET endpoints")
+            if definition.response_format != 'json':
+                errors.append("Pagination requires the json response format")
+        
         return (len(errors) == 0, errors)
     
     def generate_json_config(self, definition: RESTToolDefinition) -> str:
@@ -114,6 +141,10 @@ class RESTToolGenerator:
             }
         }
         
+        # Whole-result caching is handled by the tool cache (sajha.core.cache)
+        if definition.cache_ttl > 0:
+            config["cache_ttl"] = definition.cache_ttl
+        
         return json.dumps(config, indent=2)
     
     def generate_python_implementation(self, definition: RESTToolDefinition) -> str:
@@ -134,6 +165,9 @@ class RESTToolGenerator:
         # Generate response parsing code based on format
         response_parse_code = self._generate_response_parse_code(definition)
         
+        # Generate paginated fetch code (empty unless pagination is declared)
+        pagination_code = self._generate_pagination_code(definition)
+        
         # Generate output schema based on response format
         output_schema = self._build_output_schema(definition)
         
@@ -156,6 +190,7 @@ import requests
 from typing import Dict, Any, Optional, List
 from sajha.tools.base_mcp_tool import BaseMCPTool
 from sajha.tools.http_utils import safe_json_response, safe_decode_response, ENCODINGS_DEFAULT
+from sajha.tools.rest_client import RestClient, RetryPolicy
 
 logger = logging.getLogger(__name__)
 
@@ -191,6 +226,16 @@ class {class_name}(BaseMCPTool):
         # Custom headers
 {self._indent(headers_code, 8)}
         
+        # Shared keep-alive session, retry policy and endpoint concurrency cap
+        self._client = RestClient(
+            endpoint=self._endpoint,
+            method=self._method,
+            timeout=self._timeout,
+            retry=RetryPolicy(max_retries={definition.max_retries}, backoff_base={definition.retry_backoff}),
+            max_concurrency={definition.max_concurrency},
+            pagination={definition.pagination!r}
+        )
+        
         logger.info(f"Initialized REST tool: {{self._name}}")
     
     @property
@@ -229,12 +274,12 @@ class {class_name}(BaseMCPTool):
             # Build request body for POST/PUT/PATCH
 {self._indent(body_code, 12)}
             
+{self._indent(pagination_code, 12)}
             # Make the request
             logger.info(f"Calling REST endpoint: {{self._method}} {{url}}")
             
-            response = requests.request(
-                method=self._method,
-                url=url,
+            response = self._client.request(
+                url,
                 headers=headers,
                 json=body if self._method in ['POST', 'PUT', 'PATCH'] and body else None,
                 params=arguments if self._method == 'GET' else None,
@@ -331,7 +376,7 @@ class {class_name}(BaseMCPTool):
         path_params = re.findall(r'\\{{(\\w+)\\}}', url)
         for param in path_params:
             if param in arguments:
-                url = url.replace(f'{{{{{param}}}}}', str(arguments[param]))
+                url = url.replace(f'{{{{{{param}}}}}}', str(arguments[param]))
         
         return url
     
@@ -425,6 +470,31 @@ class {class_name}(BaseMCPTool):
         else:
             return 'body = None'
     
+    def _generate_pagination_code(self, definition: RESTToolDefinition) -> str:
+        """Generate the paginated fetch branch for tools that declare pagination."""
+        if not definition.pagination:
+            return ''
+        return '''# Walk the paginated endpoint (pages fetched concurrently where possible)
+logger.info(f"Fetching pages from REST endpoint: {self._method} {url}")
+pages = self._client.fetch_pages(
+    url,
+    params=arguments,
+    parse=lambda r: safe_json_response(r, ENCODINGS_DEFAULT),
+    headers=headers,
+    auth=self._auth if hasattr(self, '_auth') and self._auth else None
+)
+return {
+    "success": True,
+    "status_code": 200,
+    "format": "json",
+    "data": pages["items"],
+    "pages_fetched": pages["pages_fetched"],
+    "truncated": pages["truncated"],
+    "endpoint": url,
+    "method": self._method
+}
+'''
+    
     def _generate_response_parse_code(self, definition: RESTToolDefinition) -> str:
         """Generate response parsing code based on response format."""
         if definition.response_format == 'csv':
@@ -530,6 +600,20 @@ return {
                 "type": "integer",
                 "description": "Length of text content"
             }
+        elif definition.pagination:
+            base_schema["properties"]["data"] = {
+                "type": "array",
+                "description": "Items gathered from every fetched page",
+                "items": {"type": "object", "additionalProperties": True}
+            }
+            base_schema["properties"]["pages_fetched"] = {
+                "type": "integer",
+                "description": "Number of pages requested"
+            }
+            base_schema["properties"]["truncated"] = {
+                "type": "boolean",
+                "description": "Whether more pages remained past max_pages"
+            }
         else:  # json or xml
             # Use user-provided schema or default
             if definition.response_schema and definition.response_schema.get('properties'):
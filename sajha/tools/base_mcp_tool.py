@@ -13,6 +13,10 @@ class BaseMCPTool(ABC):
     """
     Abstract base class for all MCP tools
     """
+
+    # Bumped by invalidate_schemas(); frozen schemas and the MCP listing are cached per version
+    _schema_version = 0
+    _frozen_schemas = None
     
     def __init__(self, config: Optional[Dict] = None):
         """
@@ -180,7 +184,10 @@ class BaseMCPTool(ABC):
             # Cache the result (only if tool has cache_ttl in its config)
             from sajha.core.cache import get_tool_ttl
             tool_ttl = get_tool_ttl(self.name, self.config if hasattr(self, 'config') else None)
-            if tool_ttl > 0:
+            # Tools that report errors as {"success": False, ...} must not
+            # have those failures served from cache for the whole TTL
+            failed = isinstance(result, dict) and result.get('success') is False
+            if tool_ttl > 0 and not failed:
                 cache.put(self.name, arguments, result, ttl=tool_ttl)
 
             # Record for replay
@@ -233,18 +240,53 @@ class BaseMCPTool(ABC):
             "average_execution_time": avg_execution_time
         }
     
+    @property
+    def schema_version(self) -> int:
+        """Changes whenever this tool's schemas may have changed."""
+        return self._schema_version
+
+    def invalidate_schemas(self):
+        """Drop cached frozen schemas after the tool's schema or description changed."""
+        self._schema_version += 1
+        self._frozen_schemas = None
+
+    def _frozen(self, kind: str, build):
+        cache = self._frozen_schemas
+        if cache is None or cache.get('_version') != self._schema_version:
+            cache = self._frozen_schemas = {'_version': self._schema_version}
+        if kind not in cache:
+            cache[kind] = build()
+        return cache[kind]
+
+    def frozen_input_schema(self) -> Dict:
+        """Interned, read-only input schema, shared with composites built on this tool."""
+        from sajha.core.schema_intern import intern_schema
+        return self._frozen('input', lambda: intern_schema(self.input_schema or {}))
+
+    def frozen_output_schema(self) -> Optional[Dict]:
+        """Interned, read-only output schema (None when the tool declares none)."""
+        from sajha.core.schema_intern import intern_schema
+        return self._frozen('output', lambda: intern_schema(self.output_schema))
+
     def to_mcp_format(self) -> Dict:
         """
-        Convert tool to MCP format for tools/list response
+        Convert tool to MCP format for tools/list response.
+        Built once per schema version and returned read-only.
         
         Returns:
             MCP formatted tool dictionary
         """
-        return {
-            "name": self.name,
-            "description": self.description,
-            "inputSchema": self.input_schema
-        }
+        from sajha.core.schema_intern import FrozenDict
+        input_schema = self.frozen_input_schema()          # also starts a fresh cache on a new version
+        cached = self._frozen_schemas.get('mcp')
+        if (cached is None or cached['name'] != self.name or cached['description'] != self.description
+                or cached['inputSchema'] is not input_schema):
+            cached = self._frozen_schemas['mcp'] = FrozenDict(
+                name=self.name,
+                description=self.description,
+                inputSchema=input_schema,
+            )
+        return cached
     
     def load_from_config(self, config_path: str):
         """
@@ -262,6 +304,7 @@ class BaseMCPTool(ABC):
                 self._enabled = self.config.get('enabled', True)
                 self._input_schema = self.config.get('inputSchema', {})
                 self._metadata = self.config.get('metadata', {})
+                self.invalidate_schemas()
                 self.logger.info(f"Tool configuration loaded: {self.name}")
         except Exception as e:
             self.logger.error(f"Error loading tool configuration: {e}", exc_info=True)
@@ -4,7 +4,9 @@ Copyright All rights Reserved 2025-2030, Ashutosh Sinha
 
 A composite tool orchestrates multiple MCP tools in one call.
 Definitions are purely declarative (stored in DB), and input/output
-schemas are built dynamically at boot/reload time.
+schemas are derived on first use from the children's interned schemas
+(sajha/core/schema_intern.py) — shared, not copied — and re-derived only
+when a child's schema version changes.
 
 Two arrangement patterns:
 
@@ -15,13 +17,26 @@ Two arrangement patterns:
   PARENT_CHILD (fan-out): Master runs first, then child runs once per record.
     portfolio_dive = duckdb_query → for each row: fmp_profile(row.ticker)
     Output: {positions: [...], profiles: [{record: {...}, profile: {...}}]}
+
+Steps may read each other's output through their lens ("$.steps.<output_key>.<path>",
+the master included). The definition is compiled into a dependency DAG at build
+time: a step starts as soon as the steps it reads are done, so independent steps
+overlap and a call takes as long as its longest chain. Identical sub-calls
+(same tool, same arguments) run once per execution; a definition with
+`memoize` false (a composite_tools column) turns that off.
+_composition.timing reports per-node offsets and the critical path.
+
+Sub-calls run on the shared fan-out scheduler (sajha/core/fanout.py): one pool,
+global and per-provider limits, and an optional failure budget (the definition's
+failure_budget column, else composite.fanout.failure_budget; a negative value from
+either means no budget).
 """
 
 import json
-import copy
 import logging
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import time
+from functools import partial
 from typing import Any, Dict, List, Optional
 
 from sajha.tools.base_mcp_tool import BaseMCPTool
@@ -74,8 +89,7 @@ class CompositeTool(BaseMCPTool):
     def __init__(self, definition: Dict, tools_registry):
         self._definition = definition
         self._registry = tools_registry
-        self._input_schema = None
-        self._output_schema = None
+        self._sources = None
         config = {
             'name': definition['name'],
             'description': definition.get('description', ''),
@@ -85,50 +99,103 @@ class CompositeTool(BaseMCPTool):
             },
         }
         super().__init__(config)
-        self._build_schemas()
+        self._dag = self._compile_dag()
 
-    def _build_schemas(self):
-        """Dynamically build input and output schemas from component tools."""
+    def _compile_dag(self):
+        """Step dependencies from the lenses; raises ValueError on unknown keys or cycles."""
+        from sajha.core.composition import CompositeDAG
         d = self._definition
-        master_name = d['master_tool']
-        master_tool = self._registry.get_tool(master_name)
-
-        # ── Input schema: start with master's schema ─────────
-        if master_tool and hasattr(master_tool, 'get_input_schema'):
-            self._input_schema = copy.deepcopy(master_tool.get_input_schema())
-        else:
-            self._input_schema = {'type': 'object', 'properties': {}, 'required': []}
+        master_key = d.get('master_output_key', 'master')
+        if d.get('arrangement') == 'parent_child':
+            return CompositeDAG.compile(d.get('steps', []), resolved=(master_key,))
+        return CompositeDAG.compile(d.get('steps', []), master_key=master_key)
+
+    # ── Schemas ─────────────────────────────────────────────
+    # Composed lazily from the children's interned schemas and cached per
+    # version: the composite's version moves whenever a child is replaced or
+    # bumps its own, so hot-reloading a child re-derives only what depends on it.
+
+    def _schema_sources(self) -> tuple:
+        names = [self._definition['master_tool']] + [s['tool_name'] for s in self._definition.get('steps', [])]
+        tools = [self._registry.get_tool(name) for name in names]
+        return tuple((tool, getattr(tool, 'schema_version', 0) if tool else None) for tool in tools)
+
+    def _refresh_sources(self):
+        sources = self._schema_sources()
+        known = self._sources
+        if known is None or len(known) != len(sources) or any(
+                a is not b or va != vb for (a, va), (b, vb) in zip(known, sources)):
+            self._sources = sources
+            self.invalidate_schemas()
+
+    @property
+    def schema_version(self) -> int:
+        self._refresh_sources()
+        return self._schema_version
+
+    def frozen_input_schema(self) -> Dict:
+        self._refresh_sources()
+        return self._frozen('input', self._compose_input_schema)
+
+    def frozen_output_schema(self) -> Dict:
+        self._refresh_sources()
+        return self._frozen('output', self._compose_output_schema)
+
+    @staticmethod
+    def _child_schema(tool, kind: str):
+        """A child's interned schema; plain tools without the frozen accessors are interned here."""
+        from sajha.core.schema_intern import intern_schema
+        if not tool:
+            return None
+        frozen = getattr(tool, f'frozen_{kind}_schema', None)
+        if frozen:
+            return frozen()
+        getter = getattr(tool, f'get_{kind}_schema', None)
+        return intern_schema(getter()) if getter else None
+
+    def _compose_input_schema(self) -> Dict:
+        """Master's input schema plus any extra "$input.x" params the steps read."""
+        from sajha.core.schema_intern import intern_schema
+        d = self._definition
+        master_schema = self._child_schema(self._registry.get_tool(d['master_tool']), 'input')
+        base = master_schema if master_schema is not None else {'type': 'object', 'properties': {}, 'required': []}
 
-        # Add optional params from sibling steps that need extra inputs
+        extra = {}
         for step in d.get('steps', []):
             mapping = step.get('param_mapping') or {}
             for target, source in mapping.items():
                 if isinstance(source, str) and source.startswith('$input.'):
                     field = source[7:]
-                    if field not in self._input_schema.get('properties', {}):
-                        self._input_schema.setdefault('properties', {})[field] = {
+                    if field not in base.get('properties', {}) and field not in extra:
+                        extra[field] = {
                             'type': 'string',
                             'description': f'Parameter for {step["tool_name"]}',
                         }
+        if not extra:
+            return intern_schema(base)              # the master's own schema object, shared
+        return intern_schema({**base, 'properties': {**base.get('properties', {}), **extra}})
 
-        # ── Output schema: built from arrangement ────────────
+    def _compose_output_schema(self) -> Dict:
+        """Master output under master_output_key plus each step's output, by arrangement."""
+        from sajha.core.schema_intern import intern_schema
+        d = self._definition
         output_props = {}
         master_key = d.get('master_output_key', 'master')
-
+        master_tool = self._registry.get_tool(d['master_tool'])
         if master_tool and hasattr(master_tool, 'get_output_schema'):
-            output_props[master_key] = copy.deepcopy(master_tool.get_output_schema())
+            output_props[master_key] = self._child_schema(master_tool, 'output')
         else:
             output_props[master_key] = {'type': 'object'}
 
-        if d.get('arrangement') == 'parent_child':
-            children_items = {}
-            for step in d.get('steps', []):
-                child_tool = self._registry.get_tool(step['tool_name'])
-                child_schema = {'type': 'object'}
-                if child_tool and hasattr(child_tool, 'get_output_schema'):
-                    child_schema = copy.deepcopy(child_tool.get_output_schema())
-                children_items[step['output_key']] = child_schema
+        step_props = {}
+        for step in d.get('steps', []):
+            tool = self._registry.get_tool(step['tool_name'])
+            if tool and hasattr(tool, 'get_output_schema'):
+                step_props[step['output_key']] = self._child_schema(tool, 'output')
+            else:
+                step_props[step['output_key']] = {'type': 'object'}
 
+        if d.get('arrangement') == 'parent_child':
             output_props['children'] = {
                 'type': 'array',
                 'description': 'One entry per record from master tool',
@@ -136,51 +203,56 @@ class CompositeTool(BaseMCPTool):
                     'type': 'object',
                     'properties': {
                         '_record': {'type': 'object', 'description': 'Parent record'},
-                        **children_items,
+                        **step_props,
                     },
                 },
             }
         else:  # sibling
-            for step in d.get('steps', []):
-                sibling_tool = self._registry.get_tool(step['tool_name'])
-                if sibling_tool and hasattr(sibling_tool, 'get_output_schema'):
-                    output_props[step['output_key']] = copy.deepcopy(sibling_tool.get_output_schema())
-                else:
-                    output_props[step['output_key']] = {'type': 'object'}
+            output_props.update(step_props)
 
-        self._output_schema = {
+        return intern_schema({
             'type': 'object',
             'properties': output_props,
-        }
+        })
 
     def get_input_schema(self) -> Dict:
-        return self._input_schema
+        return self.frozen_input_schema()
 
     def get_output_schema(self) -> Dict:
-        return self._output_schema
+        return self.frozen_output_schema()
 
     def execute(self, arguments: Dict) -> Dict:
         """
         Execute the composite tool with Kleisli composition semantics.
-        Returns result dict with _composition metadata (confidence, entropy, trace).
+        Returns result dict with _composition metadata (confidence, entropy, trace, timing).
         """
-        from sajha.core.composition import (
-            StepResult, PipelineResult, ParamLens, EntropyGuard,
-            execute_step, get_tool_confidence,
-        )
+        from sajha.core.composition import PipelineResult, EntropyGuard, StepMemo
 
         d = self._definition
         arrangement = d.get('arrangement', 'sibling')
         max_entropy = d.get('entropy_threshold', 3.0)
         guard = EntropyGuard(max_entropy_bits=max_entropy)
 
-        # ── Execute master tool (wrapped in StepResult) ──
         master_name = d['master_tool']
         master_tool = self._registry.get_tool(master_name)
         if not master_tool:
             return PipelineResult(error=f'Master tool not found: {master_name}').to_dict()
 
-        master_result = execute_step(master_tool, arguments, master_name)
+        master_key = d.get('master_output_key', 'master')
+        steps = d.get('steps', [])
+        memo = StepMemo() if d.get('memoize', True) else None
+        clock = _NodeClock()
+
+        # ── Execute master and steps based on arrangement ──
+        if arrangement == 'parent_child':
+            master_result = clock.time(master_key, self._call, memo, master_tool, arguments, master_name)
+            output, step_results = {}, []
+            if master_result.is_success and steps:
+                output, step_results = self._execute_parent_child_composed(
+                    arguments, master_result.value, steps, d, memo, clock)
+        else:
+            master_result, output, step_results = self._execute_sibling_composed(
+                arguments, master_tool, steps, memo, clock)
         guard.record_step(master_name, master_result.confidence)
 
         if not master_result.is_success:
@@ -192,36 +264,24 @@ class CompositeTool(BaseMCPTool):
                 step_results=[master_result],
             ).to_dict()
 
-        master_key = d.get('master_output_key', 'master')
-        output = {master_key: master_result.value}
+        # Steps at the same depth of the DAG are parallel (weakest link); deeper
+        # levels — and, for parent-child, each record — compound on top.
+        groups: Dict[Any, List] = {}
+        for group, sr in step_results:
+            groups.setdefault(group, []).append(sr)
+        for group in sorted(groups):
+            guard.begin_parallel()
+            for sr in groups[group]:
+                guard.record_step(sr.step_name, sr.confidence)
+            guard.end_parallel()
+
+        output = {master_key: master_result.value, **output}
         all_step_results = [master_result]
         all_traces = list(master_result.trace)
         total_duration = master_result.duration_ms
-
-        steps = d.get('steps', [])
-        if not steps:
-            pr = PipelineResult(
-                value=output, trace=all_traces, duration_ms=total_duration,
-                confidence=guard.cumulative_confidence,
-                entropy_bits=guard.cumulative_entropy,
-                step_results=all_step_results, guard_passed=True,
-            )
-            return pr.to_dict()
-
-        # ── Execute steps based on arrangement ──
-        if arrangement == 'parent_child':
-            child_output = self._execute_parent_child_composed(
-                arguments, master_result.value, steps, d, guard)
-            output.update(child_output)
-        else:
-            # Sibling = parallel: use weakest-link confidence model
-            guard.begin_parallel()
-            sibling_output, sibling_results = self._execute_sibling_composed(
-                arguments, steps, guard)
-            guard.end_parallel()
-            output.update(sibling_output)
-            all_step_results.extend(sibling_results)
-            for sr in sibling_results:
+        if arrangement != 'parent_child':
+            for _, sr in step_results:
+                all_step_results.append(sr)
                 all_traces.extend(sr.trace)
                 total_duration += sr.duration_ms
 
@@ -237,73 +297,206 @@ class CompositeTool(BaseMCPTool):
             step_results=all_step_results,
             guard_passed=guard_status['passed'],
             guard_message=guard_status.get('message', ''),
+            timing=clock.report(self._dag, memo),
         )
         return pr.to_dict()
 
-    def _execute_sibling_composed(self, master_input: Dict, steps: List[Dict],
-                                    guard) -> tuple:
-        """Run sibling steps in parallel with composition tracking."""
-        from sajha.core.composition import execute_step, ParamLens
+    @staticmethod
+    def _call(memo, tool, arguments: Dict, step_name: str):
+        from sajha.core.composition import execute_step
+        if memo is not None:
+            return memo.execute(tool, arguments, step_name)
+        return execute_step(tool, arguments, step_name)
+
+    def _execute_sibling_composed(self, master_input: Dict, master_tool, steps: List[Dict],
+                                  memo, clock) -> tuple:
+        """
+        Run the master and the sibling steps as one dependency graph: a node
+        starts as soon as every step its lens reads ("$.steps.<key>") is done,
+        so independent steps overlap and the call takes as long as the longest chain.
+        Returns (master_result, {output_key: value}, [(level, StepResult)]).
+        """
+        from sajha.core.composition import ParamLens, StepResult
+        from sajha.core.fanout import get_fanout_scheduler, tool_provider
 
-        result = {}
-        step_results = []
+        d = self._definition
+        master_name, master_key = d['master_tool'], d.get('master_output_key', 'master')
+        by_key = {step['output_key']: step for step in steps}
 
-        def _run_step(step):
-            tool = self._registry.get_tool(step['tool_name'])
+        def _run_master(deps):
+            return clock.time(master_key, self._call, memo, master_tool, master_input, master_name)
+
+        def _run_step(step, tool, deps):
             if not tool:
-                from sajha.core.composition import StepResult
-                return step['output_key'], StepResult.fail(
-                    f'Tool not found: {step["tool_name"]}', step['tool_name'])
+                return StepResult.fail(f'Tool not found: {step["tool_name"]}', step['tool_name'])
             lens = ParamLens.from_step_definition(step)
-            params = lens.view(master_input, master_input=master_input)
+            outputs = {key: sr.value for key, sr in deps.items()}
+            params = lens.view(master_input, master_input=master_input, steps=outputs)
             merged = {**master_input, **params}
-            return step['output_key'], execute_step(tool, merged, step['tool_name'])
-
-        with ThreadPoolExecutor(max_workers=min(len(steps), 8)) as pool:
-            futures = {pool.submit(_run_step, s): s for s in steps}
-            for future in as_completed(futures):
-                key, sr = future.result()
-                result[key] = sr.value if sr.is_success else {'error': sr.error}
-                step_results.append(sr)
-                guard.record_step(sr.step_name, sr.confidence)
-
-        return result, step_results
+            return clock.time(step['output_key'], self._call, memo, tool, merged, step['tool_name'])
+
+        nodes, names = {}, {master_key: master_name}
+        for key, deps in self._dag.deps.items():
+            if key == master_key:
+                nodes[key] = (tool_provider(master_tool, master_name), deps, _run_master)
+                continue
+            step = by_key[key]
+            tool = self._registry.get_tool(step['tool_name'])
+            names[key] = step['tool_name']
+            nodes[key] = (tool_provider(tool, step['tool_name']), deps, partial(_run_step, step, tool))
+
+        results = {}
+        for key, outcome in get_fanout_scheduler().run_graph(nodes, is_failure=lambda sr: not sr.is_success):
+            results[key] = self._as_step_result(outcome, names[key])
+
+        result, step_results = {}, []
+        for key in self._dag.deps:                    # topological, stable across runs
+            if key == master_key:
+                continue
+            sr = results[key]
+            result[key] = sr.value if sr.is_success else {'error': sr.error}
+            step_results.append((self._dag.levels[key], sr))
+        return results[master_key], result, step_results
 
     def _execute_parent_child_composed(self, master_input: Dict, master_result: Dict,
-                                        steps: List[Dict], definition: Dict, guard) -> Dict:
-        """Fan-out with composition tracking."""
-        from sajha.core.composition import execute_step, ParamLens
+                                       steps: List[Dict], definition: Dict, memo, clock) -> tuple:
+        """
+        Fan-out with composition tracking. Every record's child steps are one
+        graph on the shared scheduler; within a record a step may read an
+        earlier one ("$.steps.<key>") and the master output ("$.steps.<master_key>").
+        Returns ({'children': [...]}, [((record, level), StepResult)]).
+        """
+        from sajha.core.composition import ParamLens, StepResult
+        from sajha.core.fanout import FanOutSkipped, get_fanout_scheduler, tool_provider
 
         record_path = definition.get('record_path', '')
         records = _resolve_path(master_result, record_path)
         if not isinstance(records, list):
             records = [records] if records else []
+        master_key = definition.get('master_output_key', 'master')
 
-        children = []
-
-        def _run_child(record, step):
-            tool = self._registry.get_tool(step['tool_name'])
+        def _run_child(index, record, step, tool, lens, deps):
             if not tool:
-                from sajha.core.composition import StepResult
-                return step['output_key'], StepResult.fail(
-                    f'Tool not found: {step["tool_name"]}', step['tool_name'])
-            lens = ParamLens.from_step_definition(step)
-            params = lens.view({}, master_input=master_input, record=record)
-            return step['output_key'], execute_step(tool, params, step['tool_name'])
-
-        with ThreadPoolExecutor(max_workers=min(len(records) * len(steps), 16)) as pool:
-            for record in records:
-                entry = {'_record': record}
-                guard.begin_parallel()
-                futures = {pool.submit(_run_child, record, s): s for s in steps}
-                for future in as_completed(futures):
-                    key, sr = future.result()
-                    entry[key] = sr.value if sr.is_success else {'error': sr.error}
-                    guard.record_step(sr.step_name, sr.confidence)
-                guard.end_parallel()
-                children.append(entry)
-
-        return {'children': children}
+                return StepResult.fail(f'Tool not found: {step["tool_name"]}', step['tool_name'])
+            outputs = {master_key: master_result, **{key: sr.value for (_, key), sr in deps.items()}}
+            params = lens.view({}, master_input=master_input, record=record, steps=outputs)
+            return clock.time((index, step['output_key']), self._call, memo, tool, params, step['tool_name'])
+
+        by_key = {step['output_key']: step for step in steps}
+        tools = {key: self._registry.get_tool(step['tool_name']) for key, step in by_key.items()}
+        lenses = {key: ParamLens.from_step_definition(step) for key, step in by_key.items()}
+        nodes = {}
+        for index, record in enumerate(records):
+            for key, deps in self._dag.deps.items():
+                step = by_key[key]
+                nodes[(index, key)] = (
+                    tool_provider(tools[key], step['tool_name']),
+                    [(index, dep) for dep in deps],
+                    partial(_run_child, index, record, step, tools[key], lenses[key]),
+                )
+        budget = self._failure_budget(definition)
+
+        outcomes = {}
+        for node, outcome in get_fanout_scheduler().run_graph(
+                nodes, is_failure=lambda sr: not sr.is_success, failure_budget=budget):
+            outcomes[node] = outcome
+
+        children, step_results, skipped, aborted = [], [], 0, False
+        for index, record in enumerate(records):
+            entry = {'_record': record}
+            for step in steps:
+                key = step['output_key']
+                outcome = outcomes[(index, key)]
+                sr = self._as_step_result(outcome, step['tool_name'])
+                entry[key] = sr.value if sr.is_success else {'error': sr.error}
+                if isinstance(outcome, FanOutSkipped):
+                    skipped += 1            # never ran: no confidence to record
+                    aborted = aborted or outcome.dependency is None
+                else:
+                    step_results.append(((index, self._dag.levels[key]), sr))
+            children.append(entry)
+
+        output = {'children': children}
+        if skipped:
+            output['fanout'] = {'aborted': aborted, 'failure_budget': budget, 'skipped_calls': skipped}
+        return output, step_results
+
+    @staticmethod
+    def _as_step_result(outcome, tool_name: str):
+        from sajha.core.composition import StepResult
+        from sajha.core.fanout import FanOutSkipped
+        if isinstance(outcome, StepResult):
+            return outcome
+        if isinstance(outcome, FanOutSkipped):
+            return StepResult.fail(f'skipped: {outcome}', tool_name)
+        return StepResult.fail(str(outcome), tool_name)
+
+    @staticmethod
+    def _failure_budget(definition: Dict) -> Optional[int]:
+        """The definition's failure_budget, else the configured default; negative (or unset) means none."""
+        budget = definition.get('failure_budget')
+        if budget is None:
+            try:
+                from sajha.core.config import get_settings
+                budget = getattr(get_settings(), 'composite_fanout_failure_budget', -1)
+            except Exception:
+                budget = -1
+        return None if budget is None or int(budget) < 0 else int(budget)
+
+
+class _NodeClock:
+    """Start/end offsets of every node in one execution, for the critical-path report."""
+
+    def __init__(self):
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+        self.nodes: Dict[Any, Dict[str, float]] = {}
+
+    def time(self, node, fn, *args):
+        start = (time.monotonic() - self._started) * 1000
+        try:
+            return fn(*args)
+        finally:
+            end = (time.monotonic() - self._started) * 1000
+            with self._lock:
+                self.nodes[node] = {'start_ms': start, 'end_ms': end}
+
+    def report(self, dag, memo) -> Dict:
+        """
+        Sibling: one entry per step. Parent-child: one entry per step key
+        (calls, slowest, total) — the critical path names the record, e.g. 'profile[7]'.
+        """
+        order = {key: i for i, key in enumerate([dag.master_key, *dag.deps])}
+        flat = sorted((n for n in self.nodes if not isinstance(n, tuple)), key=lambda n: order.get(n, -1))
+        per_record = [n for n in self.nodes if isinstance(n, tuple)]     # (record index, output_key)
+
+        def deps_of(node):
+            if isinstance(node, tuple):
+                index, key = node
+                return [(index, dep) for dep in dag.deps.get(key, [])] or flat
+            return dag.deps.get(node, [])
+
+        path = dag.critical_path(self.nodes, deps_of)
+        label = lambda n: f'{n[1]}[{n[0]}]' if isinstance(n, tuple) else n
+        nodes = {}
+        for node in flat:
+            t = self.nodes[node]
+            nodes[node] = {'start_ms': round(t['start_ms'], 1), 'end_ms': round(t['end_ms'], 1),
+                           'duration_ms': round(t['end_ms'] - t['start_ms'], 1), 'critical': node in path}
+        for index, key in per_record:
+            t = self.nodes[(index, key)]
+            agg = nodes.setdefault(key, {'calls': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+            duration = t['end_ms'] - t['start_ms']
+            agg['calls'] += 1
+            agg['total_ms'] = round(agg['total_ms'] + duration, 1)
+            agg['max_ms'] = round(max(agg['max_ms'], duration), 1)
+        return {
+            'wall_ms': round(max((t['end_ms'] for t in self.nodes.values()), default=0.0), 1),
+            'critical_path': [label(n) for n in path],
+            'critical_path_ms': round(self.nodes[path[-1]]['end_ms'] - self.nodes[path[0]]['start_ms'], 1) if path else 0.0,
+            'nodes': nodes,
+            'memo_hits': memo.hits if memo is not None else 0,
+        }
 
 
 class CompositeToolEngine:
@@ -339,6 +532,8 @@ class CompositeToolEngine:
                 'master_tool': rec.master_tool,
                 'master_output_key': rec.master_output_key or 'master',
                 'record_path': rec.record_path or '',
+                'failure_budget': rec.failure_budget,
+                'memoize': rec.memoize is not False,
                 'steps': [],
             }
 
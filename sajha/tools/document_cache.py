@@ -0,0 +1,533 @@
+"""
+SAJHA MCP Server v5.3.0 — Parsed Document Cache for MS Office Tools
+Copyright All rights Reserved 2025-2030, Ashutosh Sinha
+
+Shared, process-wide cache of parsed Word and Excel documents so repeat
+calls from the msdoc_* tools do not re-open and re-parse the same file.
+
+Entries are keyed by the resolved file path and validated against a
+(mtime_ns, size) fingerprint on every lookup — a modified file is
+transparently re-parsed. The cache is an LRU bounded both by entry count
+and by an estimate of the bytes held in parsed structures.
+
+Word documents are parsed in full once (paragraphs, tables, core
+properties). Excel workbooks are loaded lazily:
+  - sheet names + workbook properties on first touch (read_only open)
+  - each sheet's rows only when that sheet is requested, and only up to
+    the largest row count requested so far (prefix extension); the sheet's
+    reader stays open between extensions, so extending resumes where the
+    last read stopped instead of re-parsing the file. An open reader is
+    charged to the entry's size (a fully loaded workbook heavily) and
+    closed when the sheet is complete or the entry leaves the cache
+  - files larger than streaming_threshold_mb are always read through
+    openpyxl's read_only streaming mode
+
+Search uses an optional per-document inverted index (token → positions).
+The index narrows candidates; every candidate is still verified with the
+original case-insensitive substring test, so results are identical to a
+linear scan.
+
+All settings driven by config/application.yml:
+  msdoc.cache.enabled: true
+  msdoc.cache.max_documents: 64
+  msdoc.cache.max_mb: 256
+  msdoc.cache.streaming_threshold_mb: 10
+  msdoc.cache.search_index: true
+"""
+import bisect
+import logging
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# What an open sheet reader costs the byte budget: openpyxl holds a fully loaded
+# workbook in roughly 50x its file size; a read_only reader keeps a file handle
+# and its buffers.
+_LOADED_WORKBOOK_FACTOR = 50
+_STREAMING_READER_BYTES = 64 * 1024
+
+
+def _fingerprint(path: Path) -> Tuple[int, int]:
+    st = path.stat()
+    return st.st_mtime_ns, st.st_size
+
+
+def _estimate_bytes(value: Any) -> int:
+    """Rough size of parsed content — strings by length, everything else 16 bytes."""
+    if value is None:
+        return 8
+    if isinstance(value, str):
+        return 49 + len(value)
+    if isinstance(value, (list, tuple)):
+        return 56 + sum(_estimate_bytes(v) for v in value)
+    if isinstance(value, dict):
+        return 64 + sum(_estimate_bytes(k) + _estimate_bytes(v) for k, v in value.items())
+    return 16
+
+
+class InvertedIndex:
+    """
+    Token → sorted positions map over a sequence of text units.
+
+    A position is whatever the caller passes in (paragraph index, (row, col)
+    tuple, ...). Lookups return candidate positions for a case-insensitive
+    substring query; callers verify candidates against the raw text.
+
+    The vocabulary is searched through a dict, sorted prefix / suffix ranges
+    and a trigram map, so a lookup never walks every indexed token.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, List[Any]] = {}
+        self._grams: Dict[str, Set[str]] = {}     # trigram → tokens containing it
+        self._by_prefix: Optional[List[str]] = None
+        self._by_suffix: Optional[List[str]] = None   # reversed tokens, sorted
+
+    def add(self, position: Any, text: str):
+        for token in set(_TOKEN_RE.findall(text.lower())):
+            positions = self._postings.get(token)
+            if positions is None:
+                positions = self._postings[token] = []
+                for g in range(len(token) - 2):
+                    self._grams.setdefault(token[g:g + 3], set()).add(token)
+                self._by_prefix = self._by_suffix = None
+            positions.append(position)
+
+    @property
+    def size_bytes(self) -> int:
+        return (sum(49 + len(t) + 8 * len(p) for t, p in self._postings.items())
+                + sum(52 + 8 * len(tokens) for tokens in self._grams.values()))
+
+    @staticmethod
+    def _range(ordered: List[str], prefix: str) -> List[str]:
+        start = bisect.bisect_left(ordered, prefix)
+        return ordered[start:bisect.bisect_left(ordered, prefix + '\U0010ffff', start)]
+
+    def _tokens_containing(self, tt: str, fixed_start: bool, fixed_end: bool) -> Iterable[str]:
+        """Vocabulary tokens tt can lie in; fixed_start / fixed_end: the term has a non-word character there."""
+        if fixed_start and fixed_end:    # non-word characters on both sides within the term: the whole token
+            return [tt] if tt in self._postings else []
+        if fixed_end:                    # term may start mid-word: the token ends with tt
+            if self._by_suffix is None:
+                self._by_suffix = sorted(t[::-1] for t in self._postings)
+            return [t[::-1] for t in self._range(self._by_suffix, tt[::-1])]
+        if fixed_start:                  # term may end mid-word: the token starts with tt
+            if self._by_prefix is None:
+                self._by_prefix = sorted(self._postings)
+            return self._range(self._by_prefix, tt)
+        if len(tt) < 3:                  # anywhere inside a token, too short for a trigram
+            return [t for t in self._postings if tt in t]
+        tokens: Optional[Set[str]] = None
+        for g in range(len(tt) - 2):
+            found = self._grams.get(tt[g:g + 3], set())
+            tokens = found if tokens is None else tokens & found
+            if not tokens:
+                return []
+        return [t for t in tokens if tt in t]
+
+    def candidates(self, term: str) -> Optional[Set[Any]]:
+        """
+        Positions that may contain `term` as a substring, or None if the
+        index cannot narrow the search (term has no word characters).
+
+        Each word-token of the term lies inside an indexed token of a matching
+        unit: as a whole token when the term has non-word characters on both
+        sides of it, as a suffix / prefix when it is the term's first / last
+        token, and anywhere when it is the whole term. Each term token selects
+        the union of those tokens' postings; the result is the intersection.
+        """
+        term = term.lower()
+        spans = [(m.start(), m.end(), m.group()) for m in _TOKEN_RE.finditer(term)]
+        if not spans:
+            return None
+        result: Optional[Set[Any]] = None
+        # Longest first — the most selective token shrinks the set early
+        for start, end, tt in sorted(spans, key=lambda s: len(s[2]), reverse=True):
+            matched: Set[Any] = set()
+            for token in self._tokens_containing(tt, fixed_start=start > 0, fixed_end=end < len(term)):
+                matched.update(self._postings[token])
+            result = matched if result is None else (result & matched)
+            if not result:
+                return set()
+        return result
+
+
+class WordDocumentEntry:
+    """Fully parsed .docx — paragraphs, tables, core properties."""
+
+    def __init__(self, path: Path, build_index: bool):
+        from docx import Document
+
+        doc = Document(str(path))
+        self.filename = path.name
+        self.paragraphs: List[str] = [p.text for p in doc.paragraphs if p.text.strip()]
+        self.tables: List[List[List[str]]] = [
+            [[cell.text for cell in row.cells] for row in table.rows]
+            for table in doc.tables
+        ]
+        core = doc.core_properties
+        self.metadata = {
+            'author': core.author or '',
+            'title': core.title or '',
+            'subject': core.subject or '',
+            'created': str(core.created) if core.created else '',
+            'modified': str(core.modified) if core.modified else '',
+        }
+        self._index: Optional[InvertedIndex] = None
+        if build_index:
+            self._index = InvertedIndex()
+            for i, text in enumerate(self.paragraphs):
+                self._index.add(i, text)
+        self.size_bytes = (_estimate_bytes(self.paragraphs) + _estimate_bytes(self.tables)
+                           + _estimate_bytes(self.metadata)
+                           + (self._index.size_bytes if self._index else 0))
+
+    def to_dict(self) -> Dict:
+        return {
+            'filename': self.filename,
+            'paragraphs': list(self.paragraphs),
+            'paragraph_count': len(self.paragraphs),
+            'tables': [[list(r) for r in t] for t in self.tables],
+            'table_count': len(self.tables),
+        }
+
+    def search(self, term: str) -> List[Dict]:
+        """Case-insensitive substring search over paragraphs."""
+        term = term.lower()
+        candidates: Iterable[int] = range(len(self.paragraphs))
+        if self._index is not None:
+            narrowed = self._index.candidates(term)
+            if narrowed is not None:
+                candidates = sorted(narrowed)
+        return [
+            {'paragraph_index': i, 'text': self.paragraphs[i]}
+            for i in candidates if term in self.paragraphs[i].lower()
+        ]
+
+
+class _SheetData:
+    """Rows loaded so far for one (sheet, data_only) view."""
+
+    def __init__(self, title: str):
+        self.title = title
+        self.rows: List[list] = []
+        self.formulas: List[List[Dict]] = []   # per loaded row, formulas views only
+        self.complete = False          # True once the sheet end was reached
+        self.index: Optional[InvertedIndex] = None
+        self.indexed_rows = 0
+        self.cursor: Optional[Tuple[Any, Iterator]] = None   # (open workbook, row iterator) until complete
+        self.cursor_bytes = 0          # charged to the entry while the cursor is open
+
+    def close_cursor(self) -> int:
+        """Close the open reader; returns the bytes it was charged."""
+        released, self.cursor_bytes = self.cursor_bytes, 0
+        if self.cursor is not None:
+            wb, self.cursor = self.cursor[0], None
+            wb.close()
+        return released
+
+
+class ExcelWorkbookEntry:
+    """
+    Lazily-loaded workbook. Opening is cheap (read_only, sheet names and
+    properties only); rows are read per sheet on demand.
+    """
+
+    def __init__(self, path: Path, streaming: bool, build_index: bool):
+        from openpyxl import load_workbook
+
+        self.path = path
+        self.filename = path.name
+        self.streaming = streaming
+        self._build_index = build_index
+        self._lock = threading.Lock()
+        wb = load_workbook(str(path), read_only=True)
+        try:
+            self.sheet_names: List[str] = list(wb.sheetnames)
+            self.active_index: int = wb.index(wb.active) if wb.active is not None else 0
+            props = wb.properties
+            self.metadata = {
+                'creator': props.creator or '',
+                'title': props.title or '',
+                'subject': props.subject or '',
+                'created': str(props.created) if props.created else '',
+                'modified': str(props.modified) if props.modified else '',
+            }
+        finally:
+            wb.close()
+        self._sheets: Dict[Tuple[str, bool], _SheetData] = {}
+        self.size_bytes = _estimate_bytes(self.sheet_names) + _estimate_bytes(self.metadata)
+
+    def resolve_sheet(self, sheet_name: Optional[str] = None,
+                      sheet_index: Optional[int] = None) -> str:
+        if sheet_name:
+            if sheet_name not in self.sheet_names:
+                raise KeyError(f"Worksheet {sheet_name} does not exist.")
+            return sheet_name
+        if sheet_index is not None:
+            return self.sheet_names[sheet_index]
+        return self.sheet_names[self.active_index]
+
+    def read_rows(self, title: str, max_rows: int, include_formulas: bool = False) -> _SheetData:
+        """Ensure at least max_rows rows of `title` are loaded and return them."""
+        key = (title, include_formulas)
+        with self._lock:
+            sheet = self._sheets.get(key)
+            if sheet is None:
+                sheet = self._sheets[key] = _SheetData(title)
+            if not sheet.complete and len(sheet.rows) < max_rows:
+                self.size_bytes += self._load_rows(sheet, max_rows, include_formulas)
+            return sheet
+
+    def _load_rows(self, sheet: _SheetData, max_rows: int, include_formulas: bool) -> int:
+        """Read rows up to max_rows from the sheet's open reader; returns the change in bytes held."""
+        from openpyxl import load_workbook
+
+        charged = 0
+        if sheet.cursor is None:
+            # Formulas need cell coordinates, which only the full (non-streaming)
+            # reader exposes reliably for every cell type.
+            read_only = self.streaming and not include_formulas
+            wb = load_workbook(str(self.path), read_only=read_only, data_only=not include_formulas)
+            try:
+                sheet.cursor = (wb, wb[sheet.title].iter_rows(min_row=len(sheet.rows) + 1))
+            except Exception:
+                wb.close()
+                raise
+            charged = sheet.cursor_bytes = (_STREAMING_READER_BYTES if read_only else
+                                            _LOADED_WORKBOOK_FACTOR * self.path.stat().st_size)
+        rows = sheet.cursor[1]
+        new_rows: List[list] = []
+        new_formulas: List[List[Dict]] = []
+        want = max_rows - len(sheet.rows)
+        try:
+            while len(new_rows) < want:
+                row = next(rows, None)
+                if row is None:
+                    sheet.complete = True
+                    break
+                new_rows.append([getattr(c, 'value', None) for c in row])
+                if include_formulas:
+                    new_formulas.append([
+                        {'cell': c.coordinate, 'formula': c.value}
+                        for c in row
+                        if isinstance(getattr(c, 'value', None), str) and c.value.startswith('=')
+                    ])
+        except Exception:
+            self.size_bytes -= sheet.close_cursor() - charged
+            raise
+        if sheet.complete:
+            charged -= sheet.close_cursor()
+        sheet.rows.extend(new_rows)
+        sheet.formulas.extend(new_formulas)
+        return charged + _estimate_bytes(new_rows) + _estimate_bytes(new_formulas)
+
+    def close(self):
+        """Release the readers of partially loaded sheets. Loaded rows stay usable."""
+        with self._lock:
+            for sheet in self._sheets.values():
+                self.size_bytes -= sheet.close_cursor()
+
+    def search(self, title: str, term: str, max_rows: int) -> List[Dict]:
+        """Case-insensitive substring search over the first max_rows rows."""
+        sheet = self.read_rows(title, max_rows)
+        term = term.lower()
+        rows = sheet.rows[:max_rows]
+        candidates: Optional[Iterable[Tuple[int, int]]] = None
+        if self._build_index:
+            with self._lock:
+                if sheet.index is None:
+                    sheet.index = InvertedIndex()
+                if sheet.indexed_rows < len(sheet.rows):
+                    before = sheet.index.size_bytes
+                    for r in range(sheet.indexed_rows, len(sheet.rows)):
+                        for c, cell in enumerate(sheet.rows[r]):
+                            if cell:
+                                sheet.index.add((r, c), str(cell))
+                    sheet.indexed_rows = len(sheet.rows)
+                    self.size_bytes += sheet.index.size_bytes - before
+                narrowed = sheet.index.candidates(term)
+            if narrowed is not None:
+                candidates = sorted(p for p in narrowed if p[0] < max_rows)
+        if candidates is None:
+            candidates = ((r, c) for r, row in enumerate(rows) for c in range(len(row)))
+        matches = []
+        for r, c in candidates:
+            cell = rows[r][c]
+            if cell and term in str(cell).lower():
+                matches.append({'row_index': r, 'column_index': c, 'value': str(cell)})
+        return matches
+
+    def read_range(self, title: str, cell_range: str) -> List[list]:
+        """Return the values inside an A1-style range, e.g. 'B2:D20'."""
+        from openpyxl.utils.cell import range_boundaries
+
+        min_col, min_row, max_col, max_row = range_boundaries(cell_range)
+        if None in (min_col, min_row, max_col, max_row):
+            raise ValueError(f"Range must have explicit row and column bounds: {cell_range}")
+        sheet = self.read_rows(title, max_row)
+        return [
+            [row[c] if c < len(row) else None for c in range(min_col - 1, max_col)]
+            for row in sheet.rows[min_row - 1:max_row]
+        ]
+
+
+def _close(entry: Any):
+    # Open sheet readers hold the file; a caller still using the entry just reopens one
+    close = getattr(entry, 'close', None)
+    if close is not None:
+        close()
+
+
+class DocumentCache:
+    """
+    LRU cache of parsed documents bounded by entry count and estimated bytes.
+
+    Thread-safe: the cache lock guards the LRU map only; parsing happens
+    outside it so one slow workbook never blocks lookups of other files.
+    """
+
+    def __init__(self, max_documents: int = 64, max_bytes: int = 256 * 1024 * 1024,
+                 streaming_threshold_bytes: int = 10 * 1024 * 1024,
+                 search_index: bool = True, enabled: bool = True):
+        self._max_documents = max(1, max_documents)
+        self._max_bytes = max_bytes
+        self._streaming_threshold = streaming_threshold_bytes
+        self._search_index = search_index
+        self._enabled = enabled
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[Tuple[int, int], Any]]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    # ── Lookups ──────────────────────────────────────────────
+
+    def get_word(self, path: Path) -> WordDocumentEntry:
+        return self._get(path, lambda: WordDocumentEntry(path, self._search_index))
+
+    def get_workbook(self, path: Path) -> ExcelWorkbookEntry:
+        def _load():
+            streaming = path.stat().st_size >= self._streaming_threshold
+            return ExcelWorkbookEntry(path, streaming, self._search_index)
+        return self._get(path, _load)
+
+    def enforce_limits(self):
+        """Re-apply the byte budget after an entry grew through lazy loading."""
+        with self._lock:
+            evicted = self._evict()
+        for entry in evicted:
+            _close(entry)
+
+    def _get(self, path: Path, loader):
+        key = str(path.resolve())
+        fp = _fingerprint(path)
+        if not self._enabled:
+            return loader()
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is not None and hit[0] == fp:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return hit[1]
+            if hit is not None:
+                del self._entries[key]
+            self._misses += 1
+        if hit is not None:
+            _close(hit[1])
+        entry = loader()
+        with self._lock:
+            self._entries[key] = (fp, entry)
+            self._entries.move_to_end(key)
+            evicted = self._evict()
+        for old in evicted:
+            _close(old)
+        return entry
+
+    # ── Eviction ─────────────────────────────────────────────
+
+    def _size_bytes(self) -> int:
+        # Entries grow as sheets load lazily, so sizes are summed on demand
+        # (at most max_documents entries) rather than tracked incrementally.
+        return sum(entry.size_bytes for _, entry in self._entries.values())
+
+    def _evict(self) -> List[Any]:
+        """Drop LRU entries over budget; returns them so the caller closes them outside the lock."""
+        evicted = []
+        total = self._size_bytes()
+        # Always keep the most recent entry, even if it alone exceeds the budget
+        while len(self._entries) > 1 and (
+                len(self._entries) > self._max_documents or total > self._max_bytes):
+            _, (_, entry) = self._entries.popitem(last=False)
+            total -= entry.size_bytes
+            self._evictions += 1
+            evicted.append(entry)
+        return evicted
+
+    def invalidate(self, path: Optional[Path] = None):
+        with self._lock:
+            if path is None:
+                dropped = [entry for _, entry in self._entries.values()]
+                self._entries.clear()
+            else:
+                hit = self._entries.pop(str(Path(path).resolve()), None)
+                dropped = [hit[1]] if hit else []
+        for entry in dropped:
+            _close(entry)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                'enabled': self._enabled,
+                'documents': len(self._entries),
+                'max_documents': self._max_documents,
+                'size_bytes': self._size_bytes(),
+                'max_bytes': self._max_bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'hit_rate': round(self._hits / max(total, 1) * 100, 1),
+                'search_index': self._search_index,
+            }
+
+
+# Module-level singleton
+_document_cache: Optional[DocumentCache] = None
+_singleton_lock = threading.Lock()
+
+
+def get_document_cache() -> DocumentCache:
+    global _document_cache
+    if _document_cache is None:
+        with _singleton_lock:
+            if _document_cache is None:
+                enabled = True
+                max_documents = 64
+                max_mb = 256
+                streaming_mb = 10
+                search_index = True
+                try:
+                    from sajha.core.config import get_settings
+                    s = get_settings()
+                    enabled = getattr(s, 'msdoc_cache_enabled', True)
+                    max_documents = getattr(s, 'msdoc_cache_max_documents', 64)
+                    max_mb = getattr(s, 'msdoc_cache_max_mb', 256)
+                    streaming_mb = getattr(s, 'msdoc_cache_streaming_threshold_mb', 10)
+                    search_index = getattr(s, 'msdoc_cache_search_index', True)
+                except Exception:
+                    pass
+                _document_cache = DocumentCache(
+                    max_documents=max_documents,
+                    max_bytes=max_mb * 1024 * 1024,
+                    streaming_threshold_bytes=streaming_mb * 1024 * 1024,
+                    search_index=search_index,
+                    enabled=enabled,
+                )
+    return _document_cache
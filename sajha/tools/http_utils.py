@@ -89,14 +89,18 @@ def safe_decode_response(
     Read and safely decode an HTTP response.
     
     Handles gzip/deflate decompression and multi-encoding decoding.
+    Also accepts a requests.Response, whose body is already read and
+    decompressed.
     
     Args:
-        response: HTTPResponse object
+        response: HTTPResponse (or requests.Response) object
         encodings: List of encodings to try
         
     Returns:
         Decoded response body as string
     """
+    if not hasattr(response, 'read') and hasattr(response, 'content'):
+        return safe_decode(response.content, encodings)
     raw_data = response.read()
     raw_data = decompress_response(raw_data, response)
     return safe_decode(raw_data, encodings)
@@ -10,6 +10,7 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime
 from sajha.tools.base_mcp_tool import BaseMCPTool
 from sajha.tools.http_utils import safe_json_response, ENCODINGS_EUROPEAN
+from sajha.core.timeseries_store import SERIES_QUERY_PROPERTIES, stored_series
 
 
 class BankOfCanadaBaseTool(BaseMCPTool):
@@ -50,6 +51,7 @@ class BankOfCanadaBaseTool(BaseMCPTool):
             'gdp': 'V65201210',
         }
     
+    @stored_series('boc')
     def _fetch_series(
         self,
         series_name: str,
@@ -168,7 +170,8 @@ class BoCGetSeriesTool(BankOfCanadaBaseTool):
                     "minimum": 1,
                     "maximum": 100,
                     "default": 10
-                }
+                },
+                **SERIES_QUERY_PROPERTIES
             },
             "oneOf": [
                 {"required": ["series_name"]},
@@ -239,7 +242,10 @@ class BoCGetSeriesTool(BankOfCanadaBaseTool):
         end_date = arguments.get('end_date')
         recent_periods = arguments.get('recent_periods', 10)
         
-        return self._fetch_series(series_name, start_date, end_date, recent_periods)
+        return self._fetch_series(series_name, start_date, end_date, recent_periods,
+                                  resample=arguments.get('resample'),
+                                  how=arguments.get('resample_method', 'last'),
+                                  transform=arguments.get('transform'))
 
 
 class BoCGetExchangeRateTool(BankOfCanadaBaseTool):
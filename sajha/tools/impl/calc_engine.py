@@ -0,0 +1,418 @@
+"""
+Copyright All rights Reserved 2025-2030, Ashutosh Sinha, Email: ajsinha@gmail.com
+Vectorized Financial Calculation Engine — numpy kernels behind the calc_* tools
+
+Every kernel takes arrays of parameters (one element per parameter set) and
+evaluates them in fixed-size chunks so memory stays bounded regardless of
+batch size. Ragged inputs (cash-flow schedules, return series) are padded
+per chunk, never for the whole batch.
+
+Root finding (IRR, YTM) runs a vectorized Newton iteration first; elements
+that fail to converge fall back to scalar Brent on a bracket, then to the
+legacy bisection so every element gets an answer.
+
+Monte Carlo uses a seeded numpy Generator, optional antithetic variates, and
+simulates paths chunk by chunk — only terminal values and per-path minima
+are retained.
+
+numpy is required; scipy is used for the normal CDF when installed.
+"""
+
+import math
+import logging
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 65536              # parameter sets per chunk
+MAX_CHUNK_ELEMENTS = 4_000_000          # padded cells per chunk for ragged inputs (~32 MB float64)
+MAX_BATCH_SIZE = 1_000_000
+MAX_MC_PATHS = 5_000_000
+MAX_MC_STEPS = 2520
+
+
+def _np():
+    try:
+        import numpy as np
+    except ImportError:
+        raise ValueError("numpy library not installed. Install with: pip install numpy")
+    return np
+
+
+def _norm_cdf_fn():
+    try:
+        from scipy.special import ndtr
+        return ndtr
+    except ImportError:
+        np = _np()
+        erf = np.frompyfunc(math.erf, 1, 1)
+        sqrt2 = math.sqrt(2.0)
+        return lambda x: (1.0 + erf(np.asarray(x) / sqrt2).astype(np.float64)) / 2.0
+
+
+_norm_cdf: Optional[Callable] = None
+
+
+def norm_cdf(x):
+    """Standard normal CDF over an array."""
+    global _norm_cdf
+    if _norm_cdf is None:
+        _norm_cdf = _norm_cdf_fn()
+    return _norm_cdf(x)
+
+
+def iter_chunks(n: int, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[slice]:
+    for start in range(0, n, chunk_size):
+        yield slice(start, min(start + chunk_size, n))
+
+
+def _ragged_chunks(lengths: Sequence[int], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[slice]:
+    """Chunk ragged rows so rows * max_len stays under MAX_CHUNK_ELEMENTS."""
+    n = len(lengths)
+    start = 0
+    while start < n:
+        end, width = start, 0
+        while end < n and end - start < chunk_size:
+            w = max(width, lengths[end])
+            if end > start and (end - start + 1) * w > MAX_CHUNK_ELEMENTS:
+                break
+            width = w
+            end += 1
+        yield slice(start, end)
+        start = end
+
+
+def pad_rows(rows: Sequence[Sequence[float]], fill: float = 0.0):
+    """Stack ragged rows into a (n, max_len) float64 matrix plus their lengths."""
+    np = _np()
+    lengths = np.fromiter((len(r) for r in rows), dtype=np.int64, count=len(rows))
+    width = int(lengths.max()) if len(rows) else 0
+    out = np.full((len(rows), width), fill, dtype=np.float64)
+    for i, r in enumerate(rows):
+        out[i, :len(r)] = r
+    return out, lengths
+
+
+# ── Time value of money ─────────────────────────────────────────
+
+def npv(rates, cash_flows: Sequence[Sequence[float]]):
+    """NPV for each (rate, cash-flow schedule) pair. Rates are decimals."""
+    np = _np()
+    rates = np.asarray(rates, dtype=np.float64)
+    out = np.empty(len(cash_flows), dtype=np.float64)
+    for sl in _ragged_chunks([len(c) for c in cash_flows]):
+        cfs, _ = pad_rows(cash_flows[sl])
+        t = np.arange(cfs.shape[1], dtype=np.float64)
+        disc = (1.0 + rates[sl, None]) ** -t
+        out[sl] = np.einsum('ij,ij->i', cfs, disc)
+    return out
+
+
+def _irr_npv_scalar(cfs: Sequence[float], r: float) -> float:
+    return sum(cf / (1 + r) ** i for i, cf in enumerate(cfs))
+
+
+def _brent(f: Callable[[float], float], a: float, b: float,
+           tol: float = 1e-12, max_iter: int = 200) -> Optional[float]:
+    """Brent's method on [a, b]; None if f(a), f(b) do not bracket a root."""
+    fa, fb = f(a), f(b)
+    if fa == 0:
+        return a
+    if fb == 0:
+        return b
+    if fa * fb > 0:
+        return None
+    if abs(fa) < abs(fb):
+        a, b, fa, fb = b, a, fb, fa
+    c, fc, d, mflag = a, fa, a, True
+    for _ in range(max_iter):
+        if fa != fc and fb != fc:
+            s = (a * fb * fc / ((fa - fb) * (fa - fc))
+                 + b * fa * fc / ((fb - fa) * (fb - fc))
+                 + c * fa * fb / ((fc - fa) * (fc - fb)))
+        else:
+            s = b - fb * (b - a) / (fb - fa)
+        lo, hi = sorted(((3 * a + b) / 4, b))
+        if (not lo <= s <= hi
+                or (mflag and abs(s - b) >= abs(b - c) / 2)
+                or (not mflag and abs(s - b) >= abs(c - d) / 2)
+                or (mflag and abs(b - c) < tol)
+                or (not mflag and abs(c - d) < tol)):
+            s = (a + b) / 2
+            mflag = True
+        else:
+            mflag = False
+        fs = f(s)
+        d, c, fc = c, b, fb
+        if fa * fs < 0:
+            b, fb = s, fs
+        else:
+            a, fa = s, fs
+        if abs(fa) < abs(fb):
+            a, b, fa, fb = b, a, fb, fa
+        if fb == 0 or abs(b - a) < tol:
+            return b
+    return b
+
+
+def _bisect(f: Callable[[float], float], lo: float, hi: float, tol: float = 0.01) -> float:
+    """Legacy IRR bisection — always returns a value, converged or not."""
+    mid = (lo + hi) / 2
+    for _ in range(200):
+        mid = (lo + hi) / 2
+        v = f(mid)
+        if abs(v) < tol:
+            break
+        if v > 0:
+            lo = mid
+        else:
+            hi = mid
+    return mid
+
+
+def irr(cash_flows: Sequence[Sequence[float]], guess: float = 0.1,
+        tol: float = 1e-10, max_iter: int = 50) -> Tuple[List[float], List[str]]:
+    """
+    IRR for each cash-flow schedule. Returns (rates, methods) where method is
+    'newton', 'brent' or 'bisection' per element.
+    """
+    np = _np()
+    n = len(cash_flows)
+    rates = np.full(n, np.nan)
+    methods = ['newton'] * n
+    for sl in _ragged_chunks([len(c) for c in cash_flows]):
+        cfs, _ = pad_rows(cash_flows[sl])
+        t = np.arange(cfs.shape[1], dtype=np.float64)
+        r = np.full(cfs.shape[0], guess)
+        done = np.zeros(cfs.shape[0], dtype=bool)
+        with np.errstate(all='ignore'):
+            for _ in range(max_iter):
+                base = 1.0 + r[:, None]
+                disc = base ** -t
+                f = np.einsum('ij,ij->i', cfs, disc)
+                fp = np.einsum('ij,ij->i', cfs, -t * disc / base)
+                step = f / fp
+                r_new = np.where(done, r, r - step)
+                done |= np.abs(r_new - r) < tol
+                r = r_new
+                if done.all():
+                    break
+        ok = done & np.isfinite(r) & (r > -1.0)
+        rates[sl] = np.where(ok, r, np.nan)
+    for i in np.flatnonzero(np.isnan(rates)):
+        cfs_i = cash_flows[i]
+        f = lambda x, c=cfs_i: _irr_npv_scalar(c, x)
+        root = _brent(f, -0.9999, 10.0)
+        if root is not None:
+            rates[i], methods[i] = root, 'brent'
+        else:
+            rates[i], methods[i] = _bisect(f, -0.5, 5.0), 'bisection'
+    return rates.tolist(), methods
+
+
+# ── Fixed income ────────────────────────────────────────────────
+
+def bond_price(face, coupon_rate, yield_rate, years, freq: int = 2):
+    """Price of a fixed-coupon bond (closed-form annuity). Rates are decimals."""
+    np = _np()
+    face = np.asarray(face, dtype=np.float64)
+    c = np.asarray(coupon_rate, dtype=np.float64) * face / freq
+    y = np.asarray(yield_rate, dtype=np.float64) / freq
+    periods = np.asarray(years, dtype=np.float64) * freq
+    with np.errstate(divide='ignore', invalid='ignore'):
+        disc = (1.0 + y) ** -periods
+        annuity = np.where(y == 0, periods, (1.0 - disc) / y)
+    return c * annuity + face * disc
+
+
+def _bond_price_scalar(face, c, y, n, freq=2):
+    coupon = face * c / freq
+    return sum(coupon / (1 + y / freq) ** i for i in range(1, int(n * freq) + 1)) + face / (1 + y / freq) ** (n * freq)
+
+
+def bond_ytm(price, face, coupon_rate, years, freq: int = 2,
+             tol: float = 1e-12, max_iter: int = 50) -> Tuple[List[float], List[str]]:
+    """Yield to maturity for each bond. Rates are decimals."""
+    np = _np()
+    price = np.asarray(price, dtype=np.float64)
+    face = np.asarray(face, dtype=np.float64)
+    coupon_rate = np.asarray(coupon_rate, dtype=np.float64)
+    years = np.asarray(years, dtype=np.float64)
+    n = len(price)
+    out = np.full(n, np.nan)
+    methods = ['newton'] * n
+    h = 1e-7
+    for sl in iter_chunks(n):
+        y = np.where(coupon_rate[sl] > 0, coupon_rate[sl], 0.05)
+        done = np.zeros(len(y), dtype=bool)
+        with np.errstate(all='ignore'):
+            for _ in range(max_iter):
+                f = bond_price(face[sl], coupon_rate[sl], y, years[sl], freq) - price[sl]
+                fp = (bond_price(face[sl], coupon_rate[sl], y + h, years[sl], freq)
+                      - bond_price(face[sl], coupon_rate[sl], y - h, years[sl], freq)) / (2 * h)
+                y_new = np.where(done, y, y - f / fp)
+                done |= np.abs(y_new - y) < tol
+                y = y_new
+                if done.all():
+                    break
+        ok = done & np.isfinite(y) & (y > -freq)
+        out[sl] = np.where(ok, y, np.nan)
+    for i in np.flatnonzero(np.isnan(out)):
+        f = lambda x, i=i: _bond_price_scalar(face[i], coupon_rate[i], x, years[i], freq) - price[i]
+        root = _brent(f, -0.99, 10.0)
+        if root is not None:
+            out[i], methods[i] = root, 'brent'
+        else:
+            out[i], methods[i] = _bisect(f, -0.5, 5.0, tol=1e-8), 'bisection'
+    return out.tolist(), methods
+
+
+# ── Options ─────────────────────────────────────────────────────
+
+def black_scholes(S, K, T, r, sigma) -> Dict[str, "object"]:
+    """European call/put prices and d1/d2. Rates and vol are decimals."""
+    np = _np()
+    S, K, T, r, sigma = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(v, dtype=np.float64)) for v in (S, K, T, r, sigma)))
+    n = S.shape[0]
+    call = np.empty(n)
+    put = np.empty(n)
+    d1 = np.empty(n)
+    d2 = np.empty(n)
+    for sl in iter_chunks(n):
+        vol_t = sigma[sl] * np.sqrt(T[sl])
+        a = (np.log(S[sl] / K[sl]) + (r[sl] + sigma[sl] ** 2 / 2) * T[sl]) / vol_t
+        b = a - vol_t
+        kd = K[sl] * np.exp(-r[sl] * T[sl])
+        na, nb = norm_cdf(a), norm_cdf(b)
+        call[sl] = S[sl] * na - kd * nb
+        put[sl] = kd * (1.0 - nb) - S[sl] * (1.0 - na)
+        d1[sl], d2[sl] = a, b
+    return {'call_price': call, 'put_price': put, 'd1': d1, 'd2': d2}
+
+
+# ── Risk / performance statistics ───────────────────────────────
+
+def ratio(excess_num, denom):
+    """(a) / b elementwise with 0 where b <= 0 — Sharpe and Sortino."""
+    np = _np()
+    excess_num = np.asarray(excess_num, dtype=np.float64)
+    denom = np.asarray(denom, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denom > 0, excess_num / denom, 0.0)
+
+
+def max_drawdown(series: Sequence[Sequence[float]]):
+    """Maximum peak-to-trough drawdown (decimal) of each value series."""
+    np = _np()
+    out = np.empty(len(series))
+    for sl in _ragged_chunks([len(s) for s in series]):
+        vals, _ = pad_rows(series[sl], fill=np.nan)
+        peak = np.fmax.accumulate(vals, axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dd = (peak - vals) / peak
+        # Padding cells are NaN; a drawdown never goes below zero
+        out[sl] = np.where(np.isnan(dd), 0.0, dd).max(axis=1, initial=0.0)
+    return out
+
+
+def _paired_moments(xs: Sequence[Sequence[float]], ys: Sequence[Sequence[float]]):
+    """Population covariance and variances for each (x, y) pair truncated to min length."""
+    np = _np()
+    n_items = len(xs)
+    cov = np.empty(n_items)
+    var_x = np.empty(n_items)
+    var_y = np.empty(n_items)
+    counts = np.empty(n_items, dtype=np.int64)
+    lengths = [min(len(x), len(y)) for x, y in zip(xs, ys)]
+    for sl in _ragged_chunks(lengths):
+        rows = range(sl.start, sl.stop)
+        x, _ = pad_rows([xs[i][:lengths[i]] for i in rows])
+        y, _ = pad_rows([ys[i][:lengths[i]] for i in rows])
+        n = np.asarray(lengths[sl], dtype=np.float64)
+        mask = np.arange(x.shape[1])[None, :] < n[:, None]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mx = x.sum(axis=1) / n
+            my = y.sum(axis=1) / n
+            dx = np.where(mask, x - mx[:, None], 0.0)
+            dy = np.where(mask, y - my[:, None], 0.0)
+            cov[sl] = np.einsum('ij,ij->i', dx, dy) / n
+            var_x[sl] = np.einsum('ij,ij->i', dx, dx) / n
+            var_y[sl] = np.einsum('ij,ij->i', dy, dy) / n
+        counts[sl] = n
+    return cov, var_x, var_y, counts
+
+
+def beta(stock_returns, market_returns):
+    np = _np()
+    cov, _, var_m, counts = _paired_moments(stock_returns, market_returns)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(var_m > 0, cov / var_m, 1.0), counts
+
+
+def correlation(xs, ys):
+    np = _np()
+    cov, var_x, var_y, counts = _paired_moments(xs, ys)
+    denom = np.sqrt(var_x) * np.sqrt(var_y)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denom > 0, cov / denom, 0.0), counts
+
+
+# ── Monte Carlo ─────────────────────────────────────────────────
+
+def monte_carlo_gbm(initial_value: float, mu: float, sigma: float, time_years: float,
+                    steps: int = 252, num_paths: int = 10000, seed: Optional[int] = None,
+                    antithetic: bool = True, confidence_levels: Sequence[float] = (0.95, 0.99),
+                    chunk_paths: int = 16384) -> Dict:
+    """
+    Simulate geometric Brownian motion and report terminal-value statistics,
+    VaR / CVaR of the P&L at each confidence level and the average worst
+    drawdown along the path. mu and sigma are annualised decimals.
+    """
+    np = _np()
+    if num_paths < 2 or num_paths > MAX_MC_PATHS:
+        raise ValueError(f"num_paths must be between 2 and {MAX_MC_PATHS}")
+    if steps < 1 or steps > MAX_MC_STEPS:
+        raise ValueError(f"steps must be between 1 and {MAX_MC_STEPS}")
+    rng = np.random.default_rng(seed)
+    dt = time_years / steps
+    drift = (mu - sigma ** 2 / 2) * dt
+    vol = sigma * math.sqrt(dt)
+    # Keep each chunk's step matrix around MAX_CHUNK_ELEMENTS cells
+    chunk_paths = max(2, min(chunk_paths, MAX_CHUNK_ELEMENTS // steps))
+    if antithetic:
+        chunk_paths -= chunk_paths % 2
+    terminal = np.empty(num_paths)
+    drawdown = np.empty(num_paths)
+    for sl in iter_chunks(num_paths, chunk_paths):
+        m = sl.stop - sl.start
+        if antithetic:
+            half = (m + 1) // 2
+            z = rng.standard_normal((half, steps))
+            z = np.concatenate([z, -z])[:m]
+        else:
+            z = rng.standard_normal((m, steps))
+        log_paths = np.cumsum(drift + vol * z, axis=1)
+        terminal[sl] = initial_value * np.exp(log_paths[:, -1])
+        running_peak = np.maximum(np.maximum.accumulate(log_paths, axis=1), 0.0)
+        drawdown[sl] = 1.0 - np.exp((log_paths - running_peak).min(axis=1))
+    pnl = terminal - initial_value
+    var: Dict[str, float] = {}
+    cvar: Dict[str, float] = {}
+    for cl in confidence_levels:
+        q = np.quantile(pnl, 1.0 - cl)
+        key = f"{cl * 100:g}"
+        var[key] = float(-q)
+        tail = pnl[pnl <= q]
+        cvar[key] = float(-tail.mean()) if tail.size else float(-q)
+    pct = np.percentile(terminal, [5, 25, 50, 75, 95])
+    return {
+        'mean_terminal_value': float(terminal.mean()),
+        'std_terminal_value': float(terminal.std(ddof=1)),
+        'percentiles': {k: float(v) for k, v in zip(('p5', 'p25', 'p50', 'p75', 'p95'), pct)},
+        'var': var,
+        'cvar': cvar,
+        'probability_of_loss': float((pnl < 0).mean()),
+        'expected_max_drawdown': float(drawdown.mean()),
+        'standard_error': float(terminal.std(ddof=1) / math.sqrt(num_paths)),
+    }
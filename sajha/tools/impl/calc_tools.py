@@ -4,11 +4,20 @@ Financial Calculator MCP Tools — Pure Python, No API keys required
 
 Compound interest, NPV, IRR, bond pricing, options (Black-Scholes),
 WACC, loan amortization, Sharpe/Sortino ratios, Monte Carlo, DCF, etc.
+
+Batch mode: NPV, IRR, bond price/YTM, Black-Scholes, Sharpe, Sortino, beta,
+max drawdown and correlation accept "batch": [{...}, ...] — an array of
+parameter sets evaluated in one vectorized pass (see calc_engine). Top-level
+arguments are shared defaults for every item, so a strike grid is just
+{"stock_price": 100, ..., "batch": [{"strike": 90}, {"strike": 95}, ...]}.
+"batch_format": "columns" returns one array per output field instead of
+one object per item.
 """
 
 import math, logging
 from typing import Dict, Any, List
 from sajha.tools.base_mcp_tool import BaseMCPTool
+from sajha.tools.impl import calc_engine
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +27,43 @@ class CalcBaseTool(BaseMCPTool):
     def get_input_schema(self): return self._input_schema
     def get_output_schema(self): return self._output_schema
 
+    def validate_arguments(self, arguments: Dict[str, Any]) -> bool:
+        """Scalar calls need the schema's required fields; a batch needs them in every merged item instead."""
+        if 'batch' not in arguments:
+            return super().validate_arguments(arguments)
+        required = self.input_schema.get('required', [])
+        for i, item in enumerate(self._batch_items(arguments)):
+            for param in required:
+                if param not in item:
+                    raise ValueError(f"Missing required parameter: batch[{i}].{param}")
+        return True
+
+    def _batch_items(self, a) -> List[Dict]:
+        """Batch parameter sets with top-level arguments merged in as shared defaults."""
+        items = a['batch']
+        if not isinstance(items, list) or not items:
+            raise ValueError("batch must be a non-empty array of parameter objects")
+        if len(items) > calc_engine.MAX_BATCH_SIZE:
+            raise ValueError(f"batch too large: {len(items)} items (max {calc_engine.MAX_BATCH_SIZE})")
+        shared = {k: v for k, v in a.items() if k not in ('batch', 'batch_format')}
+        return [{**shared, **item} for item in items] if shared else items
+
+    @staticmethod
+    def _column(items, key, scale=1.0, default=None):
+        if default is None:
+            return [it[key] / scale for it in items]
+        return [it.get(key, default) / scale for it in items]
+
+    @staticmethod
+    def _batch_result(a, columns: Dict[str, Any]) -> Dict:
+        """Shape vectorized output columns as records (default) or columns."""
+        cols = {k: v.tolist() if hasattr(v, 'tolist') else list(v) for k, v in columns.items()}
+        count = len(next(iter(cols.values())))
+        if a.get('batch_format') == 'columns':
+            return {"count": count, "columns": cols}
+        keys = list(cols)
+        return {"count": count, "results": [dict(zip(keys, row)) for row in zip(*cols.values())]}
+
 class CalcCompoundInterestTool(CalcBaseTool):
     def execute(self, a):
         P, r, n, t = a['principal'], a['rate']/100, a.get('compounds_per_year',12), a['years']
@@ -38,6 +84,12 @@ class CalcFutureValueTool(CalcBaseTool):
 
 class CalcNPVTool(CalcBaseTool):
     def execute(self, a):
+        if 'batch' in a:
+            items = self._batch_items(a)
+            values = calc_engine.npv(self._column(items, 'discount_rate', 100),
+                                     [it['cash_flows'] for it in items])
+            return self._batch_result(a, {"discount_rate": [it['discount_rate'] for it in items],
+                                          "npv": values.round(2)})
         rate = a['discount_rate']/100
         cfs = a['cash_flows']  # list: [initial_investment(negative), cf1, cf2, ...]
         npv = sum(cf / (1+rate)**i for i, cf in enumerate(cfs))
@@ -45,15 +97,13 @@ class CalcNPVTool(CalcBaseTool):
 
 class CalcIRRTool(CalcBaseTool):
     def execute(self, a):
+        if 'batch' in a:
+            items = self._batch_items(a)
+            rates, methods = calc_engine.irr([it['cash_flows'] for it in items])
+            return self._batch_result(a, {"irr": [round(r*100, 4) for r in rates], "method": methods})
         cfs = a['cash_flows']
-        lo, hi = -0.5, 5.0
-        for _ in range(200):
-            mid = (lo+hi)/2
-            npv = sum(cf/(1+mid)**i for i, cf in enumerate(cfs))
-            if abs(npv) < 0.01: break
-            if npv > 0: lo = mid
-            else: hi = mid
-        return {"cash_flows": cfs, "irr": round(mid*100, 4)}
+        rates, methods = calc_engine.irr([cfs])
+        return {"cash_flows": cfs, "irr": round(rates[0]*100, 4), "method": methods[0]}
 
 class CalcLoanAmortizationTool(CalcBaseTool):
     def execute(self, a):
@@ -65,13 +115,45 @@ class CalcLoanAmortizationTool(CalcBaseTool):
 
 class CalcBondPriceTool(CalcBaseTool):
     def execute(self, a):
+        if 'batch' in a:
+            items = self._batch_items(a)
+            prices = calc_engine.bond_price(self._column(items, 'face_value'),
+                                            self._column(items, 'coupon_rate', 100),
+                                            self._column(items, 'yield_rate', 100),
+                                            self._column(items, 'years'))
+            return self._batch_result(a, {"face_value": self._column(items, 'face_value'),
+                                          "coupon_rate": self._column(items, 'coupon_rate'),
+                                          "yield": self._column(items, 'yield_rate'),
+                                          "price": prices.round(2)})
         fv, c, y, n = a['face_value'], a['coupon_rate']/100, a['yield_rate']/100, a['years']
         coupon = fv * c / 2
         price = sum(coupon/(1+y/2)**i for i in range(1, n*2+1)) + fv/(1+y/2)**(n*2)
         return {"face_value": fv, "coupon_rate": a['coupon_rate'], "yield": a['yield_rate'], "price": round(price,2)}
 
+class CalcBondYTMTool(CalcBaseTool):
+    def execute(self, a):
+        items = self._batch_items(a) if 'batch' in a else [a]
+        ytm, methods = calc_engine.bond_ytm(self._column(items, 'price'),
+                                            self._column(items, 'face_value'),
+                                            self._column(items, 'coupon_rate', 100),
+                                            self._column(items, 'years'))
+        ytm = [round(y*100, 4) for y in ytm]
+        if 'batch' in a:
+            return self._batch_result(a, {"price": self._column(items, 'price'), "ytm": ytm, "method": methods})
+        return {"price": a['price'], "face_value": a['face_value'], "coupon_rate": a['coupon_rate'],
+                "years": a['years'], "ytm": ytm[0], "method": methods[0]}
+
 class CalcBlackScholesTool(CalcBaseTool):
     def execute(self, a):
+        if 'batch' in a:
+            items = self._batch_items(a)
+            res = calc_engine.black_scholes(self._column(items, 'stock_price'),
+                                            self._column(items, 'strike'),
+                                            self._column(items, 'time_years'),
+                                            self._column(items, 'risk_free_rate', 100),
+                                            self._column(items, 'volatility', 100))
+            return self._batch_result(a, {"strike": self._column(items, 'strike'),
+                                          **{k: v.round(4) for k, v in res.items()}})
         S, K, T, r, sigma = a['stock_price'], a['strike'], a['time_years'], a['risk_free_rate']/100, a['volatility']/100
         d1 = (math.log(S/K) + (r + sigma**2/2)*T) / (sigma*math.sqrt(T))
         d2 = d1 - sigma*math.sqrt(T)
@@ -91,12 +173,22 @@ class CalcWACCTool(CalcBaseTool):
 
 class CalcSharpeRatioTool(CalcBaseTool):
     def execute(self, a):
+        if 'batch' in a:
+            items = self._batch_items(a)
+            excess = [it['portfolio_return']/100 - it['risk_free_rate']/100 for it in items]
+            values = calc_engine.ratio(excess, self._column(items, 'volatility', 100))
+            return self._batch_result(a, {"sharpe_ratio": values.round(4)})
         ret, rf, vol = a['portfolio_return']/100, a['risk_free_rate']/100, a['volatility']/100
         sharpe = (ret - rf) / vol if vol > 0 else 0
         return {"sharpe_ratio": round(sharpe, 4)}
 
 class CalcSortinoRatioTool(CalcBaseTool):
     def execute(self, a):
+        if 'batch' in a:
+            items = self._batch_items(a)
+            excess = [it['portfolio_return']/100 - it['risk_free_rate']/100 for it in items]
+            values = calc_engine.ratio(excess, self._column(items, 'downside_deviation', 100))
+            return self._batch_result(a, {"sortino_ratio": values.round(4)})
         ret, rf, dv = a['portfolio_return']/100, a['risk_free_rate']/100, a['downside_deviation']/100
         sortino = (ret - rf) / dv if dv > 0 else 0
         return {"sortino_ratio": round(sortino, 4)}
@@ -132,6 +224,10 @@ class CalcRetirementTool(CalcBaseTool):
 
 class CalcMaxDrawdownTool(CalcBaseTool):
     def execute(self, a):
+        if 'batch' in a:
+            items = self._batch_items(a)
+            dd = calc_engine.max_drawdown([it['portfolio_values'] for it in items])
+            return self._batch_result(a, {"max_drawdown": (dd*100).round(4)})
         values = a['portfolio_values']
         peak = values[0]
         max_dd = 0
@@ -143,6 +239,11 @@ class CalcMaxDrawdownTool(CalcBaseTool):
 
 class CalcCorrelationTool(CalcBaseTool):
     def execute(self, a):
+        if 'batch' in a:
+            items = self._batch_items(a)
+            corr, counts = calc_engine.correlation([it['series_x'] for it in items],
+                                                   [it['series_y'] for it in items])
+            return self._batch_result(a, {"correlation": corr.round(6), "data_points": counts})
         x, y = a['series_x'], a['series_y']
         n = min(len(x), len(y))
         x, y = x[:n], y[:n]
@@ -155,6 +256,11 @@ class CalcCorrelationTool(CalcBaseTool):
 
 class CalcBetaTool(CalcBaseTool):
     def execute(self, a):
+        if 'batch' in a:
+            items = self._batch_items(a)
+            betas, counts = calc_engine.beta([it['stock_returns'] for it in items],
+                                             [it['market_returns'] for it in items])
+            return self._batch_result(a, {"beta": betas.round(4), "data_points": counts})
         stock, market = a['stock_returns'], a['market_returns']
         n = min(len(stock), len(market))
         stock, market = stock[:n], market[:n]
@@ -164,6 +270,32 @@ class CalcBetaTool(CalcBaseTool):
         beta = cov / var_m if var_m > 0 else 1
         return {"beta": round(beta, 4), "data_points": n}
 
+class CalcMonteCarloTool(CalcBaseTool):
+    def execute(self, a):
+        confidence = a.get('confidence_levels', [95, 99])
+        result = calc_engine.monte_carlo_gbm(
+            initial_value=a['initial_value'],
+            mu=a['expected_return']/100,
+            sigma=a['volatility']/100,
+            time_years=a['time_years'],
+            steps=a.get('steps', 252),
+            num_paths=a.get('num_paths', 10000),
+            seed=a.get('seed'),
+            antithetic=a.get('antithetic', True),
+            confidence_levels=[c/100 for c in confidence],
+        )
+        r2 = lambda v: round(v, 2)
+        return {"initial_value": a['initial_value'], "num_paths": a.get('num_paths', 10000),
+                "steps": a.get('steps', 252), "seed": a.get('seed'), "antithetic": a.get('antithetic', True),
+                "mean_terminal_value": r2(result['mean_terminal_value']),
+                "std_terminal_value": r2(result['std_terminal_value']),
+                "standard_error": round(result['standard_error'], 4),
+                "percentiles": {k: r2(v) for k, v in result['percentiles'].items()},
+                "var": {k: r2(v) for k, v in result['var'].items()},
+                "cvar": {k: r2(v) for k, v in result['cvar'].items()},
+                "probability_of_loss": round(result['probability_of_loss']*100, 4),
+                "expected_max_drawdown": round(result['expected_max_drawdown']*100, 4)}
+
 class CalcCurrencyConverterTool(CalcBaseTool):
     def execute(self, a):
         import urllib.request, json
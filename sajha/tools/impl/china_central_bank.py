@@ -13,6 +13,7 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 from sajha.tools.base_mcp_tool import BaseMCPTool
 from sajha.tools.http_utils import safe_json_response, ENCODINGS_DEFAULT
+from sajha.core.timeseries_store import stored_series
 
 
 class PeoplesBankOfChinaBaseTool(BaseMCPTool):
@@ -122,6 +123,7 @@ class PeoplesBankOfChinaBaseTool(BaseMCPTool):
             "Get a free API key at https://fred.stlouisfed.org/docs/api/api_key.html"
         )
     
+    @stored_series('pboc')
     def _fetch_series(
         self,
         series_id: str,
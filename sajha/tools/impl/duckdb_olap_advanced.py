@@ -7,14 +7,19 @@ window functions, time series analysis, statistical calculations,
 cohort analysis, and sample data generation.
 """
 
+import asyncio
 import json
 import logging
 import os
-import duckdb
-from typing import Dict, Any, List, Optional
+import threading
+from typing import Callable, Dict, Any, List, Optional
 from pathlib import Path
 
 from sajha.tools.base_mcp_tool import BaseMCPTool
+from sajha.core.duckdb_engine import DEFAULT_CSV_OPTIONS, get_duckdb_engine
+from sajha.core.duckdb_guard import QueryRejected, get_query_guard, tenant_of
+from sajha.olap.columnar import RESULT_FORMAT_PROPERTY
+from sajha.olap.query_cache import get_olap_query_cache
 from sajha.olap.semantic_layer import SemanticLayer
 from sajha.olap.pivot_engine import PivotEngine, PivotSpec
 from sajha.olap.rollup_engine import RollupEngine, RollupSpec
@@ -26,6 +31,54 @@ from sajha.olap.sample_data_generator import SampleDataGenerator
 
 logger = logging.getLogger(__name__)
 
+# Tools whose engine results can be returned as records, columns or Arrow IPC
+COLUMNAR_RESULT_TOOLS = {
+    "olap_pivot_table", "olap_hierarchical_summary", "olap_time_series",
+    "olap_window_analysis", "olap_statistics", "olap_histogram",
+    "olap_cohort_analysis", "olap_retention_analysis"
+}
+
+
+def _setting(name: str, default):
+    try:
+        from sajha.core.config import get_settings
+        return getattr(get_settings(), name, default)
+    except Exception:
+        return default
+
+
+class OLAPCall:
+    """One OLAP tool run: the cursor executing it and why it was stopped, if it was."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cursor = None
+        self.stopped: Optional[str] = None  # "timeout" | "cancelled"
+    
+    def bind(self, cursor) -> bool:
+        """Attach the worker thread's cursor; False if the run was stopped before it started."""
+        with self._lock:
+            self._cursor = cursor
+            return self.stopped is None
+    
+    def unbind(self):
+        with self._lock:
+            self._cursor = None
+    
+    def stop(self, reason: str):
+        """Interrupt the running query (callable from any thread)."""
+        with self._lock:
+            if self.stopped is None:
+                self.stopped = reason
+            if self._cursor is not None:
+                self._cursor.interrupt()
+    
+    def result(self, timeout: Optional[float]) -> Dict[str, Any]:
+        if self.stopped == "timeout":
+            return {"success": False, "timed_out": True,
+                    "error": f"OLAP query exceeded its {timeout:g}s deadline and was interrupted"}
+        return {"success": False, "cancelled": True, "error": "OLAP query was cancelled"}
+
 
 class DuckDBOLAPAdvancedTool(BaseMCPTool):
     """
@@ -63,39 +116,32 @@ class DuckDBOLAPAdvancedTool(BaseMCPTool):
         super().__init__(self.config)
         
         self.semantic = SemanticLayer(self.config_path)
-        self.conn = None
-        self._init_connection()
         
-        # Initialize engines
-        self.pivot_engine = PivotEngine(self.semantic, self.conn)
-        self.rollup_engine = RollupEngine(self.semantic, self.conn)
-        self.window_engine = WindowEngine(self.semantic, self.conn)
-        self.timeseries_engine = TimeSeriesEngine(self.semantic, self.conn)
-        self.stats_engine = StatsEngine(self.semantic, self.conn)
-        self.cohort_engine = CohortEngine(self.semantic, self.conn)
+        # Tables live in one schema of the shared DuckDB engine; every request
+        # thread runs on its own cursor, so concurrent calls never share one
+        self.engine = get_duckdb_engine()
+        self.catalog_schema = self.config.get('catalog_schema') or _setting('olap_schema', 'olap')
+        self.conn = self.engine.connection(self.catalog_schema)
+        self.query_timeout = float(self.config.get('timeout_seconds')
+                                   or _setting('olap_query_timeout_seconds', 120))
+        
+        # Initialize engines (compiled SQL and results shared through the OLAP query cache)
+        self.query_cache = get_olap_query_cache()
+        self.pivot_engine = PivotEngine(self.semantic, self.conn, self.query_cache)
+        self.rollup_engine = RollupEngine(self.semantic, self.conn, self.query_cache)
+        self.window_engine = WindowEngine(self.semantic, self.conn, self.query_cache)
+        self.timeseries_engine = TimeSeriesEngine(self.semantic, self.conn, self.query_cache)
+        self.stats_engine = StatsEngine(self.semantic, self.conn, self.query_cache)
+        self.cohort_engine = CohortEngine(self.semantic, self.conn, self.query_cache)
         self.sample_generator = SampleDataGenerator(self.conn)
     
     def _default_config_path(self) -> str:
         """Get default config path."""
         return str(Path(__file__).parent.parent.parent / "config" / "olap")
     
-    def _init_connection(self):
-        """Initialize DuckDB connection."""
-        try:
-            # Connect to in-memory database or configured database
-            db_path = Path(self.config_path).parent / "data" / "olap.duckdb"
-            if db_path.exists():
-                self.conn = duckdb.connect(str(db_path))
-            else:
-                self.conn = duckdb.connect(":memory:")
-            logger.info("DuckDB OLAP connection initialized")
-        except Exception as e:
-            logger.error(f"Failed to initialize DuckDB: {e}", exc_info=True)
-            self.conn = duckdb.connect(":memory:")
-    
     def get_tools(self) -> List[Dict[str, Any]]:
         """Return list of available OLAP tools."""
-        return [
+        tools = [
             # Dataset Discovery
             {
                 "name": "olap_list_datasets",
@@ -596,19 +642,15 @@ class DuckDBOLAPAdvancedTool(BaseMCPTool):
                 }
             }
         ]
-    
-    async def call_tool(self, name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
-        """
-        Route tool calls to appropriate handlers.
         
-        Args:
-            name: Tool name
-            arguments: Tool arguments
-            
-        Returns:
-            Tool result
-        """
-        handlers = {
+        for tool in tools:
+            if tool["name"] in COLUMNAR_RESULT_TOOLS:
+                tool["inputSchema"]["properties"]["result_format"] = dict(RESULT_FORMAT_PROPERTY)
+        
+        return tools
+    
+    def _handlers(self) -> Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]]:
+        return {
             "olap_list_datasets": self._list_datasets,
             "olap_describe_dataset": self._describe_dataset,
             "olap_pivot_table": self._pivot_table,
@@ -624,18 +666,65 @@ class DuckDBOLAPAdvancedTool(BaseMCPTool):
             "olap_retention_analysis": self._retention_analysis,
             "olap_generate_sample_data": self._generate_sample_data
         }
+    
+    def run_tool(self, name: str, arguments: Dict[str, Any], timeout: Optional[float] = None,
+                 call: Optional[OLAPCall] = None) -> Dict[str, Any]:
+        """
+        Run one OLAP tool synchronously on the calling thread.
         
-        handler = handlers.get(name)
+        Args:
+            name: Tool name
+            arguments: Tool arguments
+            timeout: Seconds before the running DuckDB query is interrupted (None/0 = no deadline)
+            call: Handle another thread can use to cancel this run (see call_tool)
+            
+        Returns:
+            Tool result
+        """
+        handler = self._handlers().get(name)
         if not handler:
             return {"error": f"Unknown tool: {name}"}
         
+        call = call or OLAPCall()
+        if not call.bind(self.conn.current()):
+            return call.result(timeout)
+        
+        timer = None
+        if timeout and timeout > 0:
+            timer = threading.Timer(timeout, call.stop, args=("timeout",))
+            timer.daemon = True
+            timer.start()
         try:
-            return await handler(arguments)
+            result = handler(arguments)
         except Exception as e:
-            logger.error(f"Error in {name}: {e}", exc_info=True)
-            return {"error": str(e)}
+            if not call.stopped:
+                logger.error(f"Error in {name}: {e}", exc_info=True)
+            result = {"error": str(e)}
+        finally:
+            if timer:
+                timer.cancel()
+            call.unbind()
+        
+        if call.stopped and isinstance(result, dict) and (result.get("success") is False or "error" in result):
+            return call.result(timeout)
+        return result
     
-    async def _list_datasets(self, args: Dict[str, Any]) -> Dict[str, Any]:
+    async def call_tool(self, name: str, arguments: Dict[str, Any],
+                        timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Async wrapper: runs run_tool() on a worker thread.
+        
+        Cancelling the awaiting task (e.g. asyncio.wait_for expiring)
+        interrupts the DuckDB query instead of leaving it running.
+        """
+        call = OLAPCall()
+        try:
+            return await asyncio.to_thread(self.run_tool, name, arguments, timeout, call)
+        except asyncio.CancelledError:
+            call.stop("cancelled")
+            raise
+    
+    def _list_datasets(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """List all available datasets."""
         include_schema = args.get("include_schema", False)
         datasets = self.semantic.list_datasets(include_schema)
@@ -645,7 +734,7 @@ class DuckDBOLAPAdvancedTool(BaseMCPTool):
             "count": len(datasets)
         }
     
-    async def _describe_dataset(self, args: Dict[str, Any]) -> Dict[str, Any]:
+    def _describe_dataset(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Describe a specific dataset."""
         dataset_name = args.get("dataset")
         description = self.semantic.describe_dataset(dataset_name)
@@ -658,7 +747,7 @@ class DuckDBOLAPAdvancedTool(BaseMCPTool):
             "dataset": description
         }
     
-    async def _pivot_table(self, args: Dict[str, Any]) -> Dict[str, Any]:
+    def _pivot_table(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Execute pivot table query."""
         spec = PivotSpec(
             dataset=args['dataset'],
@@ -671,10 +760,10 @@ class DuckDBOLAPAdvancedTool(BaseMCPTool):
             limit=args.get('limit')
         )
         
-        result = self.pivot_engine.execute_pivot(spec)
+        result = self.pivot_engine.execute_pivot(spec, args.get('result_format', 'records'))
         return result
     
-    async def _hierarchical_summary(self, args: Dict[str, Any]) -> Dict[str, Any]:
+    def _hierarchical_summary(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Execute hierarchical summary (rollup/cube)."""
         spec = RollupSpec(
             dataset=args['dataset'],
@@ -684,10 +773,10 @@ class DuckDBOLAPAdvancedTool(BaseMCPTool):
             filters=args.get('filters', [])
         )
         
-        result = self.rollup_engine.execute_rollup(spec)
+        result = self.rollup_engine.execute_rollup(spec, args.get('result_format', 'records'))
         return result
     
-    async def _time_series(self, args: Dict[str, Any]) -> Dict[str, Any]:
+    def _time_series(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Execute time series analysis."""
         spec = TimeSeriesSpec(
             dataset=args['dataset'],
@@ -701,10 +790,10 @@ class DuckDBOLAPAdvancedTool(BaseMCPTool):
             filters=args.get('filters', [])
         )
         
-        result = self.timeseries_engine.execute_time_series(spec)
+        result = self.timeseries_engine.execute_time_series(spec, args.get('result_format', 'records'))
         return result
     
-    async def _window_analysis(self, args: Dict[str, Any]) -> Dict[str, Any]:
+    def _window_analysis(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Execute window function analysis."""
         calculations = []
         for calc in args.get('calculations', []):
@@ -727,10 +816,10 @@ class DuckDBOLAPAdvancedTool(BaseMCPTool):
             filters=args.get('filters', [])
         )
         
-        result = self.window_engine.execute_window(spec)
+        result = self.window_engine.execute_window(spec, args.get('result_format', 'records'))
         return result
     
-    async def _statistics(self, args: Dict[str, Any]) -> Dict[str, Any]:
+    def _statistics(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Execute statistical analysis."""
         spec = StatsSpec(
             dataset=args['dataset'],
@@ -740,10 +829,10 @@ class DuckDBOLAPAdvancedTool(BaseMCPTool):
             filters=args.get('filters', [])
         )
         
-        result = self.stats_engine.execute_statistics(spec)
+        result = self.stats_engine.execute_statistics(spec, args.get('result_format', 'records'))
         return result
     
-    async def _histogram(self, args: Dict[str, Any]) -> Dict[str, Any]:
+    def _histogram(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Generate histogram."""
         spec = HistogramSpec(
             dataset=args['dataset'],
@@ -752,10 +841,10 @@ class DuckDBOLAPAdvancedTool(BaseMCPTool):
             filters=args.get('filters', [])
         )
         
-        result = self.stats_engine.execute_histogram(spec)
+        result = self.stats_engine.execute_histogram(spec, args.get('result_format', 'records'))
         return result
     
-    async def _top_n(self, args: Dict[str, Any]) -> Dict[str, Any]:
+    def _top_n(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Execute top N analysis."""
         dataset = self.semantic.get_dataset(args['dataset'])
         if not dataset:
@@ -844,7 +933,7 @@ LIMIT {n}
         except Exception as e:
             return {"success": False, "error": str(e), "sql": sql}
     
-    async def _contribution(self, args: Dict[str, Any]) -> Dict[str, Any]:
+    def _contribution(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Execute contribution/Pareto analysis."""
         dataset = self.semantic.get_dataset(args['dataset'])
         if not dataset:
@@ -915,7 +1004,7 @@ ORDER BY {self._safe_alias(measure)} DESC
         except Exception as e:
             return {"success": False, "error": str(e), "sql": sql}
     
-    async def _correlation(self, args: Dict[str, Any]) -> Dict[str, Any]:
+    def _correlation(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Execute correlation analysis."""
         spec = StatsSpec(
             dataset=args['dataset'],
@@ -926,7 +1015,7 @@ ORDER BY {self._safe_alias(measure)} DESC
         result = self.stats_engine.execute_correlation(spec)
         return result
     
-    async def _cohort_analysis(self, args: Dict[str, Any]) -> Dict[str, Any]:
+    def _cohort_analysis(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Execute cohort analysis."""
         spec = CohortSpec(
             dataset=args['dataset'],
@@ -941,7 +1030,7 @@ ORDER BY {self._safe_alias(measure)} DESC
             show_percentages=args.get('show_percentages', True)
         )
         
-        result = self.cohort_engine.execute_cohort_analysis(spec)
+        result = self.cohort_engine.execute_cohort_analysis(spec, args.get('result_format', 'records'))
         
         # Add summary if successful
         if result.get('success'):
@@ -951,7 +1040,7 @@ ORDER BY {self._safe_alias(measure)} DESC
         
         return result
     
-    async def _retention_analysis(self, args: Dict[str, Any]) -> Dict[str, Any]:
+    def _retention_analysis(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Execute retention analysis."""
         spec = RetentionSpec(
             dataset=args['dataset'],
@@ -963,10 +1052,10 @@ ORDER BY {self._safe_alias(measure)} DESC
             filters=args.get('filters', [])
         )
         
-        result = self.cohort_engine.execute_retention_analysis(spec)
+        result = self.cohort_engine.execute_retention_analysis(spec, args.get('result_format', 'records'))
         return result
     
-    async def _generate_sample_data(self, args: Dict[str, Any]) -> Dict[str, Any]:
+    def _generate_sample_data(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Generate sample OLAP data for demonstrations."""
         num_customers = args.get('num_customers', 500)
         num_orders = args.get('num_orders', 5000)
@@ -985,6 +1074,9 @@ ORDER BY {self._safe_alias(measure)} DESC
         if not result['success']:
             return result
         
+        # Sample tables were rewritten inside DuckDB; file fingerprints cannot see that
+        self.query_cache.invalidate_results()
+        
         # Get table statistics
         stats = self.sample_generator.get_table_statistics()
         result['table_statistics'] = stats
@@ -1014,8 +1106,8 @@ ORDER BY {self._safe_alias(measure)} DESC
             with open(config_dir / "dimensions.json", "w") as f:
                 json.dump({"dimensions": config["dimensions"]}, f, indent=2)
             
-            # Reload semantic layer
-            self.semantic = SemanticLayer(self.config_path)
+            # Reload semantic layer in place so the engines see the new config
+            self.semantic.reload()
             
             result['config_files_saved'] = True
         
@@ -1062,12 +1154,16 @@ ORDER BY {self._safe_alias(measure)} DESC
     
     def execute(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Execute tool - routes to call_tool for async handling.
-        This is a synchronous wrapper for the async call_tool method.
+        Execute tool synchronously on the calling (worker) thread.
+        
+        The tool is registered once per olap_* name; _tool_name overrides it.
+        Queries are interrupted after timeout_seconds (tool config) or
+        olap.query_timeout_seconds.
         """
-        import asyncio
-        tool_name = arguments.get('_tool_name', 'olap_list_datasets')
-        return asyncio.get_event_loop().run_until_complete(self.call_tool(tool_name, arguments))
+        tool_name = arguments.get('_tool_name') or self.name
+        if tool_name not in self._handlers():
+            tool_name = 'olap_list_datasets'
+        return self.run_tool(tool_name, arguments, self.query_timeout)
     
     def get_input_schema(self) -> Dict:
         """Get combined input schema for all OLAP tools."""
@@ -1136,14 +1232,19 @@ class CustomerOLAPTool(BaseMCPTool):
         """Initialize the Customer OLAP tool."""
         super().__init__(config)
         self.config = config or {}
-        self.conn = None
+        self.engine = None
         self._init_connection()
     
+    @property
+    def conn(self):
+        """Calling thread's cursor on the shared DuckDB engine."""
+        return self.engine.cursor()
+    
     def _init_connection(self):
-        """Initialize DuckDB connection."""
+        """Attach to the shared DuckDB engine."""
         try:
-            self.conn = duckdb.connect(":memory:")
-            logger.info("CustomerOLAPTool: DuckDB connection initialized")
+            self.engine = get_duckdb_engine()
+            logger.info("CustomerOLAPTool: attached to shared DuckDB engine")
         except Exception as e:
             logger.error(f"Failed to initialize DuckDB: {e}", exc_info=True)
             raise
@@ -1168,12 +1269,17 @@ class CustomerOLAPTool(BaseMCPTool):
     def _get_base_query(self) -> str:
         """Get the base FROM/JOIN clause for customer OLAP queries."""
         base_path = self._get_data_path()
+        sort_keys = self.config.get('materialize_sort_keys', {})
+        # Columnar copies of the CSVs when materialization is enabled
+        customers, orders, products = (
+            self.engine.source_for(os.path.join(base_path, f"{table}.csv"), sort_keys=sort_keys.get(table))
+            for table in ('customers', 'orders', 'products'))
         
         return f"""
-        FROM read_csv_auto('{base_path}/customers.csv') AS customers
-        LEFT JOIN read_csv_auto('{base_path}/orders.csv') AS orders
+        FROM {customers} AS customers
+        LEFT JOIN {orders} AS orders
             ON customers.customer_id = orders.customer_id
-        LEFT JOIN read_csv_auto('{base_path}/products.csv') AS products
+        LEFT JOIN {products} AS products
             ON orders.product_name = products.product_name
         """
     
@@ -1411,10 +1517,15 @@ class DuckDBSQLTool(BaseMCPTool):
         """Initialize the SQL tool."""
         super().__init__(config)
         self.config = config or {}
-        self.conn = None
+        self.engine = None
         self.data_dir = self._get_data_path()
         self._init_connection()
     
+    @property
+    def conn(self):
+        """Calling thread's cursor on the shared DuckDB engine."""
+        return self.engine.cursor()
+    
     def _get_data_path(self) -> str:
         """Get the data directory path from config or dynamically."""
         # Try to get from config first (supports ${variable} substitution)
@@ -1433,19 +1544,20 @@ class DuckDBSQLTool(BaseMCPTool):
         return os.path.join(project_root, 'data', 'duckdb')
     
     def _init_connection(self):
-        """Initialize DuckDB connection and create views for CSV files."""
+        """Attach to the shared DuckDB engine and register views for the CSV files."""
         try:
-            self.conn = duckdb.connect(":memory:")
+            self.engine = get_duckdb_engine()
+            sort_keys = self.config.get('materialize_sort_keys', {})
             
-            # Create views for each CSV file
+            # Views over the columnar copies (shared with the duckdb_* tools)
             csv_files = ['customers', 'orders', 'products']
             for table_name in csv_files:
-                file_path = f"{self.data_dir}/{table_name}.csv"
-                create_view = f"""
-                    CREATE OR REPLACE VIEW {table_name} AS 
-                    SELECT * FROM read_csv_auto('{file_path}')
-                """
-                self.conn.execute(create_view)
+                file_path = os.path.join(self.data_dir, f"{table_name}.csv")
+                if not os.path.exists(file_path):
+                    logger.warning(f"DuckDBSQLTool: data file not found: {file_path}")
+                    continue
+                self.engine.register_view(table_name, file_path, 'csv', options=DEFAULT_CSV_OPTIONS,
+                                          sort_keys=sort_keys.get(table_name))
             
             logger.info(f"DuckDBSQLTool: Initialized with tables from {self.data_dir}")
         except Exception as e:
@@ -1487,18 +1599,13 @@ class DuckDBSQLTool(BaseMCPTool):
                     "error": f"Only SELECT/WITH/EXPLAIN queries are permitted. Got: {first_keyword}"
                 }
             
-            # Add LIMIT if not present
-            if 'LIMIT' not in sql_upper:
-                sql = f"{sql.rstrip(';')} LIMIT {limit}"
-            
-            # Execute query
-            result = self.conn.execute(sql)
-            
-            # Get column names
-            columns = [desc[0] for desc in result.description]
+            # Cap the result, cost the plan, take a slot and run with a deadline
+            def fetch(result):
+                return [desc[0] for desc in result.description], result.fetchall()
             
-            # Fetch all rows
-            rows = result.fetchall()
+            (columns, rows), resources = get_query_guard().run(
+                self.conn, sql, fetch, limit=limit, tenant=tenant_of())
+            sql = resources.pop('sql')
             
             # Convert to list of dicts
             data = []
@@ -1521,9 +1628,18 @@ class DuckDBSQLTool(BaseMCPTool):
                 "row_count": len(data),
                 "sql": sql,
                 "execution_time_ms": round(execution_time, 2),
+                "resources": resources,
                 "tables_available": ["customers", "orders", "products"]
             }
             
+        except QueryRejected as e:
+            logger.warning(f"DuckDBSQLTool query rejected ({e.reason}): {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "rejected": e.reason,
+                "sql": arguments.get('sql', '')
+            }
         except Exception as e:
             logger.error(f"DuckDBSQLTool execution error: {e}", exc_info=True)
             return {
@@ -1560,7 +1676,17 @@ class DuckDBSQLTool(BaseMCPTool):
                 "data": {"type": "array"},
                 "row_count": {"type": "integer"},
                 "sql": {"type": "string"},
-                "execution_time_ms": {"type": "number"}
+                "execution_time_ms": {"type": "number"},
+                "resources": {
+                    "type": "object",
+                    "description": "Plan estimate, slot wait, elapsed time and (when profiled) "
+                                   "peak memory, spilled bytes, CPU time and rows scanned"
+                },
+                "rejected": {
+                    "type": "string",
+                    "description": "Why the query guard refused or stopped the query: "
+                                   "over_budget, busy or timeout"
+                }
             }
         }
 
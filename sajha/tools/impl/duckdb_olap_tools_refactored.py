@@ -7,8 +7,6 @@ With Auto-Refresh Support
 import os
 import json
 import time
-import threading
-import atexit
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 from sajha.tools.base_mcp_tool import BaseMCPTool
@@ -18,12 +16,22 @@ try:
 except ImportError:
     raise ImportError("DuckDB is required. Install with: pip install duckdb --break-system-packages")
 
+from sajha.core.duckdb_engine import DEFAULT_CSV_OPTIONS, get_duckdb_engine, scan_directory
+from sajha.core.duckdb_guard import get_query_guard, tenant_of
+
 
 class DuckDbBaseTool(BaseMCPTool):
     """
-    Base class for DuckDB tools with shared functionality
+    Base class for DuckDB tools with shared functionality.
+
+    All instances share the process-wide engine (sajha.core.duckdb_engine):
+    one database, one view catalog and one directory watcher, however many
+    DuckDB tools are registered. Each tool only holds a per-thread cursor.
     """
 
+    # read_csv_auto options used for CSV/TSV views
+    CSV_OPTIONS = DEFAULT_CSV_OPTIONS
+
     def __init__(self, config: Dict = None):
         """Initialize DuckDB base tool"""
         super().__init__(config)
@@ -31,40 +39,33 @@ class DuckDbBaseTool(BaseMCPTool):
         # Data directory for CSV, Parquet, JSON files
         self.data_directory = self.config.get('data_directory', '/home/claude/sajha/sajhamcpserver/data/duckdb')
 
-        # Auto-refresh configuration
+        # Auto-refresh configuration (the engine's single watcher honours the shortest interval)
         self.auto_refresh_enabled = self.config.get('auto_refresh_enabled', True)
         self.auto_refresh_interval = self.config.get('auto_refresh_interval', 600)  # Default: 10 minutes (600 seconds)
 
-        # Ensure data directory exists
-        os.makedirs(self.data_directory, exist_ok=True)
+        # Schema the data directory's views live in
+        self.catalog_schema = self.config.get('catalog_schema', 'main')
 
-        # Initialize DuckDB connection
-        self.db_path = os.path.join(self.data_directory, 'duckdb_analytics.db')
-        self.conn = None
+        # Columns each CSV's columnar copy is sorted by: {"orders": ["order_date"]}
+        self.materialize_sort_keys = self.config.get('materialize_sort_keys', {})
 
-        # Track file states for change detection
-        self._file_states = {}  # {filename: {'mtime': timestamp, 'size': bytes, 'view_name': str}}
+        # Ensure data directory exists
+        os.makedirs(self.data_directory, exist_ok=True)
 
-        # Auto-refresh thread control
-        self._refresh_thread = None
-        self._stop_refresh = threading.Event()
+        self.engine = get_duckdb_engine()
+        self.db_path = self.engine.database
 
         # Initialize views from data files
         self._initialize_views_from_files()
 
-        # Start auto-refresh thread if enabled
-        if self.auto_refresh_enabled:
-            self._start_auto_refresh()
-            # Register cleanup on exit
-            atexit.register(self._stop_auto_refresh)
+    @property
+    def conn(self):
+        """Calling thread's cursor on the shared engine"""
+        return self.engine.cursor(self.catalog_schema)
 
     def _get_connection(self):
-        """Get or create DuckDB connection"""
-        if self.conn is None:
-            self.conn = duckdb.connect(self.db_path)
-            # Enable automatic CSV/Parquet detection
-            self.conn.execute("SET enable_object_cache=true")
-        return self.conn
+        """Get the calling thread's cursor on the shared DuckDB engine"""
+        return self.engine.cursor(self.catalog_schema)
 
     def _execute_query(self, query: str) -> duckdb.DuckDBPyRelation:
         """
@@ -94,208 +95,38 @@ class DuckDbBaseTool(BaseMCPTool):
 
     def _scan_data_files(self, file_type: str = 'all') -> List[Dict]:
         """Scan data directory for supported file types"""
-        supported_extensions = {
-            'csv': ['.csv'],
-            'parquet': ['.parquet', '.pq'],
-            'json': ['.json', '.jsonl'],
-            'tsv': ['.tsv']
-        }
-
-        if file_type != 'all':
-            extensions = supported_extensions.get(file_type, [])
-        else:
-            extensions = [ext for exts in supported_extensions.values() for ext in exts]
-
-        files = []
-
-        if os.path.exists(self.data_directory):
-            for filename in os.listdir(self.data_directory):
-                if filename.startswith('.') or filename.endswith('.db'):
-                    continue
-
-                file_ext = os.path.splitext(filename)[1].lower()
-                if file_ext in extensions:
-                    file_path = os.path.join(self.data_directory, filename)
-
-                    # Determine file type
-                    if file_ext in ['.csv']:
-                        ftype = 'csv'
-                    elif file_ext in ['.parquet', '.pq']:
-                        ftype = 'parquet'
-                    elif file_ext in ['.json', '.jsonl']:
-                        ftype = 'json'
-                    elif file_ext in ['.tsv']:
-                        ftype = 'tsv'
-                    else:
-                        continue
-
-                    file_info = {
-                        'filename': filename,
-                        'file_type': ftype,
-                        'file_path': file_path
-                    }
-
-                    try:
-                        stat = os.stat(file_path)
-                        file_info['file_size_bytes'] = stat.st_size
-                        file_info['file_size_human'] = self._format_file_size(stat.st_size)
-                        file_info['modified_date'] = datetime.fromtimestamp(stat.st_mtime).isoformat()
-                    except Exception as e:
-                        logger.error(f"Unexpected error: {e}", exc_info=True)
-                        pass
-
-                    files.append(file_info)
-
+        files = scan_directory(self.data_directory, file_type)
+        for file_info in files:
+            try:
+                stat = os.stat(file_info['file_path'])
+                file_info['file_size_bytes'] = stat.st_size
+                file_info['file_size_human'] = self._format_file_size(stat.st_size)
+                file_info['modified_date'] = datetime.fromtimestamp(stat.st_mtime).isoformat()
+            except OSError as e:
+                self.logger.warning(f"Could not stat {file_info['file_path']}: {e}")
         return files
 
     def _initialize_views_from_files(self):
         """
-        Initialize views from all data files in the data directory.
-        Creates a view for each CSV, Parquet, JSON, and TSV file found.
+        Register the data directory with the shared engine.
+        Creates a view for each CSV, Parquet, JSON, and TSV file found; a
+        directory another tool already registered is not scanned again.
         """
         try:
-            # Get connection
-            conn = self._get_connection()
-
-            # Scan for all data files
-            files = self._scan_data_files()
-
-            if not files:
-                self.logger.info(f"No data files found in {self.data_directory}")
-                return
-
-            self.logger.info(f"Found {len(files)} data files in {self.data_directory}")
-
-            # Create views for each file
-            for file_info in files:
-                try:
-                    filename = file_info['filename']
-                    file_path = file_info['file_path']
-                    file_type = file_info['file_type']
-
-                    # Generate view name from filename (remove extension and sanitize)
-                    view_name = os.path.splitext(filename)[0]
-                    # Replace special characters with underscores
-                    view_name = ''.join(c if c.isalnum() or c == '_' else '_' for c in view_name)
-
-                    # Drop existing view if it exists
-                    try:
-                        conn.execute(f"DROP VIEW IF EXISTS {view_name}")
-                    except Exception as e:
-                        logger.error(f"Unexpected error: {e}", exc_info=True)
-                        pass
-
-                    # Create view based on file type
-                    if file_type == 'csv':
-                        # DuckDB can read CSV files directly
-                        create_view_sql = f"""
-                            CREATE VIEW {view_name} AS 
-                            SELECT * FROM read_csv_auto('{file_path}', 
-                                header=true, 
-                                auto_detect=true,
-                                sample_size=-1
-                            )
-                        """
-                    elif file_type == 'parquet':
-                        # DuckDB can read Parquet files directly
-                        create_view_sql = f"""
-                            CREATE VIEW {view_name} AS 
-                            SELECT * FROM read_parquet('{file_path}')
-                        """
-                    elif file_type == 'json':
-                        # DuckDB can read JSON files directly
-                        create_view_sql = f"""
-                            CREATE VIEW {view_name} AS 
-                            SELECT * FROM read_json_auto('{file_path}')
-                        """
-                    elif file_type == 'tsv':
-                        # Read TSV as CSV with tab delimiter
-                        create_view_sql = f"""
-                            CREATE VIEW {view_name} AS 
-                            SELECT * FROM read_csv_auto('{file_path}', 
-                                header=true,
-                                delim='\\t',
-                                auto_detect=true,
-                                sample_size=-1
-                            )
-                        """
-                    else:
-                        self.logger.warning(f"Unsupported file type '{file_type}' for {filename}")
-                        continue
-
-                    # Execute the CREATE VIEW statement
-                    conn.execute(create_view_sql)
-
-                    # Track file state for change detection
-                    try:
-                        stat = os.stat(file_path)
-                        self._file_states[filename] = {
-                            'mtime': stat.st_mtime,
-                            'size': stat.st_size,
-                            'view_name': view_name,
-                            'file_type': file_type,
-                            'file_path': file_path
-                        }
-                    except Exception as e:
-                        logger.error(f"Unexpected error: {e}", exc_info=True)
-                        pass
-
-                    # Get row count for verification
-                    try:
-                        row_count = conn.execute(f"SELECT COUNT(*) FROM {view_name}").fetchone()[0]
-                        self.logger.info(f"✓ Created view '{view_name}' from {filename} ({row_count:,} rows)")
-                    except Exception as e:
-                        self.logger.info(f"✓ Created view '{view_name}' from {filename}")
-
-                except Exception as e:
-                    self.logger.error(f"Failed to create view for {filename}: {e}", exc_info=True)
-                    continue
-
-            # Log summary
-            views_result = conn.execute("SELECT COUNT(*) FROM information_schema.tables WHERE table_type = 'VIEW'").fetchone()
-            total_views = views_result[0] if views_result else 0
-            self.logger.info(f"Initialization complete: {total_views} views available")
-
+            changes = self.engine.register_directory(
+                self.data_directory,
+                schema=self.catalog_schema,
+                csv_options=self.CSV_OPTIONS,
+                interval=self.auto_refresh_interval,
+                watch=self.auto_refresh_enabled,
+                sort_keys=self.materialize_sort_keys,
+            )
+            if changes['added']:
+                self.logger.info(f"Created {len(changes['added'])} views from {self.data_directory}")
         except Exception as e:
             self.logger.error(f"Failed to initialize views from files: {e}", exc_info=True)
             # Don't raise - allow the tool to continue even if initialization fails
 
-    def _start_auto_refresh(self):
-        """Start the auto-refresh background thread"""
-        if self._refresh_thread is None or not self._refresh_thread.is_alive():
-            self._stop_refresh.clear()
-            self._refresh_thread = threading.Thread(
-                target=self._auto_refresh_worker,
-                daemon=True,
-                name="DuckDB-AutoRefresh"
-            )
-            self._refresh_thread.start()
-            self.logger.info(f"Auto-refresh enabled: checking every {self.auto_refresh_interval} seconds")
-
-    def _stop_auto_refresh(self):
-        """Stop the auto-refresh background thread"""
-        if self._refresh_thread and self._refresh_thread.is_alive():
-            self._stop_refresh.set()
-            self._refresh_thread.join(timeout=5)
-            self.logger.info("Auto-refresh stopped")
-
-    def _auto_refresh_worker(self):
-        """Background worker that periodically checks for file changes"""
-        while not self._stop_refresh.is_set():
-            try:
-                # Wait for the configured interval (but check every second for stop signal)
-                for _ in range(self.auto_refresh_interval):
-                    if self._stop_refresh.is_set():
-                        return
-                    time.sleep(1)
-
-                # Perform the refresh check
-                self._check_and_sync_views()
-
-            except Exception as e:
-                self.logger.error(f"Auto-refresh error: {e}", exc_info=True)
-                # Continue running despite errors
-
     def _check_and_sync_views(self):
         """
         Check for file changes and sync views accordingly:
@@ -304,161 +135,14 @@ class DuckDbBaseTool(BaseMCPTool):
         - Reload views for modified files
         """
         try:
-            conn = self._get_connection()
-
-            # Scan current files in directory
-            current_files = self._scan_data_files()
-            current_filenames = {f['filename'] for f in current_files}
-            current_file_map = {f['filename']: f for f in current_files}
-
-            # Track what we tracked before
-            tracked_filenames = set(self._file_states.keys())
-
-            changes_made = False
-
-            # 1. Detect and handle DELETED files
-            deleted_files = tracked_filenames - current_filenames
-            for filename in deleted_files:
-                try:
-                    view_name = self._file_states[filename]['view_name']
-                    conn.execute(f"DROP VIEW IF EXISTS {view_name}")
-                    del self._file_states[filename]
-                    self.logger.info(f"🗑️  Removed view '{view_name}' (file deleted: {filename})")
-                    changes_made = True
-                except Exception as e:
-                    self.logger.error(f"Failed to remove view for {filename}: {e}", exc_info=True)
-
-            # 2. Detect and handle NEW files
-            new_files = current_filenames - tracked_filenames
-            for filename in new_files:
-                try:
-                    file_info = current_file_map[filename]
-                    file_path = file_info['file_path']
-                    file_type = file_info['file_type']
-
-                    # Generate view name
-                    view_name = os.path.splitext(filename)[0]
-                    view_name = ''.join(c if c.isalnum() or c == '_' else '_' for c in view_name)
-
-                    # Create view based on file type
-                    if file_type == 'csv':
-                        create_view_sql = f"""
-                            CREATE VIEW {view_name} AS 
-                            SELECT * FROM read_csv_auto('{file_path}', 
-                                header=true, auto_detect=true, sample_size=-1)
-                        """
-                    elif file_type == 'parquet':
-                        create_view_sql = f"""
-                            CREATE VIEW {view_name} AS 
-                            SELECT * FROM read_parquet('{file_path}')
-                        """
-                    elif file_type == 'json':
-                        create_view_sql = f"""
-                            CREATE VIEW {view_name} AS 
-                            SELECT * FROM read_json_auto('{file_path}')
-                        """
-                    elif file_type == 'tsv':
-                        create_view_sql = f"""
-                            CREATE VIEW {view_name} AS 
-                            SELECT * FROM read_csv_auto('{file_path}', 
-                                header=true, delim='\\t', auto_detect=true, sample_size=-1)
-                        """
-                    else:
-                        continue
-
-                    # Create the view
-                    conn.execute(create_view_sql)
-
-                    # Track the new file
-                    stat = os.stat(file_path)
-                    self._file_states[filename] = {
-                        'mtime': stat.st_mtime,
-                        'size': stat.st_size,
-                        'view_name': view_name,
-                        'file_type': file_type,
-                        'file_path': file_path
-                    }
-
-                    self.logger.info(f"➕ Created view '{view_name}' (new file: {filename})")
-                    changes_made = True
-
-                except Exception as e:
-                    self.logger.error(f"Failed to create view for new file {filename}: {e}", exc_info=True)
-
-            # 3. Detect and handle MODIFIED files
-            existing_files = current_filenames & tracked_filenames
-            for filename in existing_files:
-                try:
-                    file_info = current_file_map[filename]
-                    file_path = file_info['file_path']
-
-                    # Check if file was modified
-                    stat = os.stat(file_path)
-                    old_state = self._file_states[filename]
-
-                    if stat.st_mtime != old_state['mtime'] or stat.st_size != old_state['size']:
-                        # File was modified - reload the view
-                        view_name = old_state['view_name']
-                        file_type = old_state['file_type']
-
-                        # Drop and recreate the view
-                        conn.execute(f"DROP VIEW IF EXISTS {view_name}")
-
-                        if file_type == 'csv':
-                            create_view_sql = f"""
-                                CREATE VIEW {view_name} AS 
-                                SELECT * FROM read_csv_auto('{file_path}', 
-                                    header=true, auto_detect=true, sample_size=-1)
-                            """
-                        elif file_type == 'parquet':
-                            create_view_sql = f"""
-                                CREATE VIEW {view_name} AS 
-                                SELECT * FROM read_parquet('{file_path}')
-                            """
-                        elif file_type == 'json':
-                            create_view_sql = f"""
-                                CREATE VIEW {view_name} AS 
-                                SELECT * FROM read_json_auto('{file_path}')
-                            """
-                        elif file_type == 'tsv':
-                            create_view_sql = f"""
-                                CREATE VIEW {view_name} AS 
-                                SELECT * FROM read_csv_auto('{file_path}', 
-                                    header=true, delim='\\t', auto_detect=true, sample_size=-1)
-                            """
-                        else:
-                            continue
-
-                        conn.execute(create_view_sql)
-
-                        # Update tracked state
-                        self._file_states[filename]['mtime'] = stat.st_mtime
-                        self._file_states[filename]['size'] = stat.st_size
-
-                        self.logger.info(f"🔄 Reloaded view '{view_name}' (file modified: {filename})")
-                        changes_made = True
-
-                except Exception as e:
-                    self.logger.error(f"Failed to reload view for modified file {filename}: {e}", exc_info=True)
-
-            # Log summary if changes were made
-            if changes_made:
-                views_result = conn.execute("SELECT COUNT(*) FROM information_schema.tables WHERE table_type = 'VIEW'").fetchone()
-                total_views = views_result[0] if views_result else 0
-                self.logger.info(f"Auto-refresh complete: {total_views} views available")
-
+            return self.engine.sync_directory(self.data_directory)
         except Exception as e:
             self.logger.error(f"Failed to check and sync views: {e}", exc_info=True)
+            return {'added': [], 'removed': [], 'reloaded': []}
 
     def close(self):
-        """Close DuckDB connection and stop auto-refresh"""
-        # Stop auto-refresh thread
-        self._stop_auto_refresh()
-
-        # Close connection
-        if self.conn:
-            self.conn.close()
-            self.conn = None
+        """Release this tool; the shared engine stays open for the other tools"""
+        pass
 
 
 class DuckDbListTablesTool(DuckDbBaseTool):
@@ -495,12 +179,12 @@ class DuckDbListTablesTool(DuckDbBaseTool):
                 SELECT 
                     table_name as name,
                     table_type as type,
-                    'main' as schema
+                    table_schema as schema
                 FROM information_schema.tables
             """
 
             if not include_system:
-                query += " WHERE table_schema = 'main'"
+                query += f" WHERE table_schema = '{self.catalog_schema}'"
 
             result = conn.execute(query).fetchall()
 
@@ -568,7 +252,7 @@ class DuckDbDescribeTableTool(DuckDbBaseTool):
             table_type_query = f"""
                 SELECT table_type 
                 FROM information_schema.tables 
-                WHERE table_name = '{table_name}'
+                WHERE table_name = '{table_name}' AND table_schema = '{self.catalog_schema}'
             """
             table_type_result = conn.execute(table_type_query).fetchone()
             table_type = 'view' if table_type_result and table_type_result[0].lower() == 'view' else 'table'
@@ -653,25 +337,23 @@ class DuckDbQueryTool(DuckDbBaseTool):
         try:
             start_time = time.time()
 
-            # Add LIMIT if not already present
-            if 'LIMIT' not in query_upper:
-                sql_query = f"{sql_query.rstrip(';')} LIMIT {limit}"
-
+            # Cap the result, cost the plan, take a slot and run with a deadline;
+            # raises QueryRejected when the guard refuses or interrupts the query
             conn = self._get_connection()
-            result = conn.execute(sql_query)
-
-            # Get results as DataFrame for easier manipulation
-            df = result.fetchdf()
+            df, resources = get_query_guard().run(
+                conn, sql_query, lambda result: result.fetchdf(), limit=limit,
+                tenant=tenant_of())
 
             execution_time = (time.time() - start_time) * 1000  # Convert to ms
 
             response = {
-                'query': sql_query,
+                'query': resources.pop('sql'),
                 'columns': list(df.columns),
                 'rows': df.to_dict(orient='records'),
                 'row_count': len(df),
                 'execution_time_ms': round(execution_time, 2),
-                'limited': len(df) >= limit
+                'limited': len(df) >= limit,
+                'resources': resources
             }
 
             return response
@@ -715,16 +397,16 @@ class DuckDbRefreshViewsTool(DuckDbBaseTool):
             # Reload external files if requested
             if reload_external:
                 self.logger.info("Reloading external data files...")
-                self._initialize_views_from_files()
+                self._check_and_sync_views()
 
             # Get list of views to refresh
             if view_name:
                 views = [view_name]
             else:
-                views_query = """
+                views_query = f"""
                     SELECT table_name 
                     FROM information_schema.tables 
-                    WHERE table_type = 'VIEW'
+                    WHERE table_type = 'VIEW' AND table_schema = '{self.catalog_schema}'
                 """
                 views = [row[0] for row in conn.execute(views_query).fetchall()]
 
@@ -1013,7 +695,9 @@ class DuckDbListFilesTool(DuckDbBaseTool):
             # Check which files are loaded
             try:
                 conn = self._get_connection()
-                tables_result = conn.execute("SELECT table_name FROM information_schema.tables").fetchall()
+                tables_result = conn.execute(
+                    "SELECT table_name FROM information_schema.tables WHERE table_schema = ?",
+                    [self.catalog_schema]).fetchall()
                 loaded_tables = [row[0] for row in tables_result]
 
                 for file_info in files:
@@ -10,6 +10,7 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 from sajha.tools.base_mcp_tool import BaseMCPTool
 from sajha.tools.http_utils import safe_json_response, ENCODINGS_EUROPEAN
+from sajha.core.timeseries_store import SERIES_QUERY_PROPERTIES, stored_series
 
 
 class EuropeanCentralBankBaseTool(BaseMCPTool):
@@ -146,6 +147,7 @@ class EuropeanCentralBankBaseTool(BaseMCPTool):
             }
         }
     
+    @stored_series('ecb', key_args=2, frequency=lambda flow, key: key.split('.')[0])
     def _fetch_series(
         self,
         flow: str,
@@ -247,7 +249,7 @@ class EuropeanCentralBankBaseTool(BaseMCPTool):
                 
                 # Sort by date and limit to recent_periods if needed
                 formatted_obs.sort(key=lambda x: x['date'])
-                if not (start_date and end_date) and len(formatted_obs) > recent_periods:
+                if recent_periods and not (start_date and end_date) and len(formatted_obs) > recent_periods:
                     formatted_obs = formatted_obs[-recent_periods:]
                 
                 # Get series name/description
@@ -333,7 +335,8 @@ class ECBGetSeriesTool(EuropeanCentralBankBaseTool):
                     "minimum": 1,
                     "maximum": 100,
                     "default": 10
-                }
+                },
+                **SERIES_QUERY_PROPERTIES
             },
             "oneOf": [
                 {"required": ["flow", "key"]},
@@ -407,7 +410,10 @@ class ECBGetSeriesTool(EuropeanCentralBankBaseTool):
         end_date = arguments.get('end_date')
         recent_periods = arguments.get('recent_periods', 10)
         
-        return self._fetch_series(flow, key, start_date, end_date, recent_periods)
+        return self._fetch_series(flow, key, start_date, end_date, recent_periods,
+                                  resample=arguments.get('resample'),
+                                  how=arguments.get('resample_method', 'last'),
+                                  transform=arguments.get('transform'))
 
 
 class ECBGetExchangeRateTool(EuropeanCentralBankBaseTool):
@@ -10,6 +10,7 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime
 from sajha.tools.base_mcp_tool import BaseMCPTool
 from sajha.tools.http_utils import safe_json_response, ENCODINGS_EUROPEAN
+from sajha.core.timeseries_store import stored_series
 
 
 class BanqueDeFranceBaseTool(BaseMCPTool):
@@ -56,6 +57,7 @@ class BanqueDeFranceBaseTool(BaseMCPTool):
             'm3': 'BSI.M.U2.N.A.A20.A.1.U2.2240.Z01.E',  # Eurozone M3
         }
     
+    @stored_series('bdf')
     def _fetch_series_ecb(
         self,
         series_code: str,
@@ -10,6 +10,7 @@ import json, urllib.request, urllib.parse, logging
 from typing import Dict, Any
 from sajha.tools.base_mcp_tool import BaseMCPTool
 from sajha.tools.http_utils import safe_json_response, ENCODINGS_ALL
+from sajha.core.timeseries_store import get_timeseries_store
 
 logger = logging.getLogger(__name__)
 FRED_BASE = "https://api.stlouisfed.org/fred"
@@ -28,10 +29,37 @@ class FREDBaseTool(BaseMCPTool):
                 return safe_json_response(resp, ENCODINGS_ALL)
         except Exception as e:
             return {"error": str(e)}
-    def _series(self, series_id, **extra):
+    def _observations_since(self, series_id, since=None):
+        """Upstream for the time-series store: every observation from `since` on."""
         params = {'series_id': series_id}
-        params.update(extra)
-        return self._fred_get('series/observations', **params)
+        if since:
+            params['observation_start'] = since
+        data = self._fred_get('series/observations', **params)
+        if 'error' in data or 'error_message' in data:
+            raise ValueError(data.get('error') or data.get('error_message'))
+        return {'observations': [{'date': o.get('date'), 'value': o.get('value')}
+                                 for o in data.get('observations', [])],
+                'units': data.get('units')}
+    def _series(self, series_id, limit=None, resample=None, how='last', transform=None, **extra):
+        """Latest `limit` observations, served from the time-series store (only the tail is fetched)."""
+        store = get_timeseries_store()
+        if extra or not store.enabled:
+            params = {'series_id': series_id}
+            if limit:
+                params['limit'] = limit
+            params.update(extra)
+            return self._fred_get('series/observations', **params)
+        try:
+            result = store.series('fred', series_id, 'native',
+                                  lambda since: self._observations_since(series_id, since),
+                                  last=limit, resample=resample, how=how, transform=transform)
+        except Exception as e:
+            return {"error": str(e)}
+        # FRED's own encoding: values as strings, '.' when missing
+        observations = [{'date': o['date'], 'value': '.' if o['value'] is None else str(o['value'])}
+                        for o in result['observations']]
+        return {'units': result['metadata'].get('units'), 'sort_order': 'asc', 'limit': limit,
+                'count': len(observations), 'observations': observations, 'store': result['store']}
     def get_input_schema(self): return self._input_schema
     def get_output_schema(self): return self._output_schema
 
@@ -96,4 +124,7 @@ class FREDOilPriceTool(FREDBaseTool):
     def execute(self, a): return {"series": "DCOILWTICO", "data": self._series('DCOILWTICO', limit=a.get('limit',60))}
 class FREDCustomSeriesTool(FREDBaseTool):
     """Fetch any FRED series by ID — the universal tool for 800,000+ data series."""
-    def execute(self, a): return {"series": a['series_id'], "data": self._series(a['series_id'], limit=a.get('limit',60))}
+    def execute(self, a):
+        return {"series": a['series_id'], "data": self._series(
+            a['series_id'], limit=a.get('limit',60), resample=a.get('resample'),
+            how=a.get('resample_method','last'), transform=a.get('transform'))}
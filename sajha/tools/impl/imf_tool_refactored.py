@@ -10,6 +10,7 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime
 from sajha.tools.base_mcp_tool import BaseMCPTool
 from sajha.tools.http_utils import safe_json_response, ENCODINGS_ALL
+from sajha.core.timeseries_store import get_timeseries_store
 
 
 class IMFBaseTool(BaseMCPTool):
@@ -101,6 +102,46 @@ class IMFBaseTool(BaseMCPTool):
         start_year: Optional[int] = None,
         end_year: Optional[int] = None,
         frequency: str = 'A'
+    ) -> Dict:
+        """Get data from IMF database, through the time-series store"""
+        store = get_timeseries_store()
+        if not store.enabled:
+            return self._fetch_data(database, country_code, indicator_code, start_year, end_year, frequency)
+        
+        def upstream(since):
+            result = self._fetch_data(database, country_code, indicator_code,
+                                      start_year=int(since[:4]) if since else None, frequency=frequency)
+            response = {'observations': [{'date': obs['period'], 'value': obs['value']}
+                                         for obs in result['data'] if obs.get('period')]}
+            if result.get('note'):
+                response['note'] = result['note']
+            return response
+        
+        result = store.series('imf', f"{database}/{country_code}.{indicator_code}", frequency, upstream,
+                              start=str(start_year) if start_year else None,
+                              end=f"{end_year}-12-31" if end_year else None)
+        formatted_data = [{'period': obs['date'], 'value': obs['value']} for obs in result['observations']]
+        response = {
+            'database': database,
+            'country_code': country_code,
+            'indicator_code': indicator_code,
+            'frequency': frequency,
+            'data': formatted_data,
+            'count': len(formatted_data),
+            'store': result['store']
+        }
+        if not formatted_data and result['metadata'].get('note'):
+            response['note'] = result['metadata']['note']
+        return response
+    
+    def _fetch_data(
+        self,
+        database: str,
+        country_code: str,
+        indicator_code: str,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        frequency: str = 'A'
     ) -> Dict:
         """Get data from IMF database"""
         try:
@@ -10,6 +10,7 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime
 from sajha.tools.base_mcp_tool import BaseMCPTool
 from sajha.tools.http_utils import safe_json_response, ENCODINGS_ALL
+from sajha.core.timeseries_store import stored_series
 
 
 class ReserveBankOfIndiaBaseTool(BaseMCPTool):
@@ -56,6 +57,7 @@ class ReserveBankOfIndiaBaseTool(BaseMCPTool):
             'forex_reserves': 'FOREX_RESERVES',
         }
     
+    @stored_series('rbi')
     def _fetch_series(
         self,
         series_code: str,
@@ -13,6 +13,7 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 from sajha.tools.base_mcp_tool import BaseMCPTool
 from sajha.tools.http_utils import safe_json_response, ENCODINGS_DEFAULT
+from sajha.core.timeseries_store import stored_series
 
 
 class BankOfJapanBaseTool(BaseMCPTool):
@@ -107,6 +108,7 @@ class BankOfJapanBaseTool(BaseMCPTool):
             "Get a free API key at https://fred.stlouisfed.org/docs/api/api_key.html"
         )
     
+    @stored_series('boj')
     def _fetch_series(
         self,
         series_id: str,
@@ -8,6 +8,7 @@ import json
 from typing import Dict, Any, List, Optional
 from pathlib import Path
 from sajha.tools.base_mcp_tool import BaseMCPTool
+from sajha.tools.document_cache import get_document_cache
 
 
 class MsDocBaseTool(BaseMCPTool):
@@ -60,87 +61,58 @@ class MsDocBaseTool(BaseMCPTool):
     
     def _read_word_document(self, file_path: Path) -> Dict:
         """Read Word document"""
+        return self._get_word_entry(file_path).to_dict()
+
+    def _get_word_entry(self, file_path: Path):
+        """Get the cached, parsed Word document"""
         try:
-            from docx import Document
-            
-            doc = Document(str(file_path))
-            
-            # Extract text from paragraphs
-            paragraphs = [p.text for p in doc.paragraphs if p.text.strip()]
-            
-            # Extract text from tables
-            tables = []
-            for table in doc.tables:
-                table_data = []
-                for row in table.rows:
-                    row_data = [cell.text for cell in row.cells]
-                    table_data.append(row_data)
-                tables.append(table_data)
-            
-            return {
-                'filename': file_path.name,
-                'paragraphs': paragraphs,
-                'paragraph_count': len(paragraphs),
-                'tables': tables,
-                'table_count': len(tables)
-            }
-            
+            return get_document_cache().get_word(file_path)
         except ImportError:
             raise ValueError("python-docx library not installed. Install with: pip install python-docx")
         except Exception as e:
             raise ValueError(f"Failed to read Word document: {str(e)}")
-    
+
+    def _get_workbook_entry(self, file_path: Path):
+        """Get the cached, lazily-loaded Excel workbook"""
+        try:
+            return get_document_cache().get_workbook(file_path)
+        except ImportError:
+            raise ValueError("openpyxl library not installed. Install with: pip install openpyxl")
+        except Exception as e:
+            raise ValueError(f"Failed to read Excel document: {str(e)}")
+
     def _read_excel_document(self, file_path: Path, sheet_name: Optional[str] = None, 
                             sheet_index: Optional[int] = None, max_rows: int = 100,
-                            include_formulas: bool = False) -> Dict:
+                            include_formulas: bool = False,
+                            cell_range: Optional[str] = None) -> Dict:
         """Read Excel document"""
+        workbook = self._get_workbook_entry(file_path)
         try:
-            from openpyxl import load_workbook
-            
-            wb = load_workbook(str(file_path), data_only=not include_formulas)
-            
-            # Get sheet
-            if sheet_name:
-                sheet = wb[sheet_name]
-            elif sheet_index is not None:
-                sheet = wb.worksheets[sheet_index]
+            title = workbook.resolve_sheet(sheet_name, sheet_index)
+
+            if cell_range:
+                data = workbook.read_range(title, cell_range)[:max_rows]
+                sheet = None
             else:
-                sheet = wb.active
-            
-            # Extract data
-            data = []
-            for i, row in enumerate(sheet.iter_rows(values_only=not include_formulas)):
-                if i >= max_rows:
-                    break
-                data.append(list(row))
-            
+                sheet = workbook.read_rows(title, max_rows, include_formulas)
+                data = [list(row) for row in sheet.rows[:max_rows]]
+            get_document_cache().enforce_limits()
+
             result = {
                 'filename': file_path.name,
-                'sheet_name': sheet.title,
+                'sheet_name': title,
                 'data': data,
                 'row_count': len(data),
                 'column_count': len(data[0]) if data else 0
             }
-            
-            if include_formulas:
-                formulas = []
-                for row in sheet.iter_rows():
-                    row_formulas = []
-                    for cell in row:
-                        if cell.value and isinstance(cell.value, str) and cell.value.startswith('='):
-                            row_formulas.append({
-                                'cell': cell.coordinate,
-                                'formula': cell.value
-                            })
-                    if row_formulas:
-                        formulas.append(row_formulas)
-                result['formulas'] = formulas
-            
-            wb.close()
+            if cell_range:
+                result['range'] = cell_range
+
+            if include_formulas and sheet is not None:
+                result['formulas'] = [f for f in sheet.formulas[:max_rows] if f]
+
             return result
-            
-        except ImportError:
-            raise ValueError("openpyxl library not installed. Install with: pip install openpyxl")
+
         except Exception as e:
             raise ValueError(f"Failed to read Excel document: {str(e)}")
 
@@ -322,6 +294,10 @@ class MsDocReadExcelTool(MsDocBaseTool):
                     "type": "boolean",
                     "description": "Include cell formulas",
                     "default": False
+                },
+                "cell_range": {
+                    "type": "string",
+                    "description": "A1-style range to read, e.g. 'B2:F50' (optional)"
                 }
             },
             "required": ["filename"]
@@ -371,7 +347,8 @@ class MsDocReadExcelTool(MsDocBaseTool):
             arguments.get('sheet_name'),
             arguments.get('sheet_index'),
             arguments.get('max_rows', 100),
-            arguments.get('include_formulas', False)
+            arguments.get('include_formulas', False),
+            arguments.get('cell_range')
         )
 
 
@@ -438,15 +415,7 @@ class MsDocSearchWordTool(MsDocBaseTool):
         if not file_path.exists():
             raise ValueError(f"File not found: {filename}")
         
-        doc_content = self._read_word_document(file_path)
-        
-        matches = []
-        for i, paragraph in enumerate(doc_content['paragraphs']):
-            if search_term in paragraph.lower():
-                matches.append({
-                    'paragraph_index': i,
-                    'text': paragraph
-                })
+        matches = self._get_word_entry(file_path).search(search_term)
         
         return {
             'filename': filename,
@@ -526,25 +495,17 @@ class MsDocSearchExcelTool(MsDocBaseTool):
         if not file_path.exists():
             raise ValueError(f"File not found: {filename}")
         
-        excel_content = self._read_excel_document(
-            file_path,
-            sheet_name=sheet_name,
-            max_rows=10000
-        )
-        
-        matches = []
-        for row_idx, row in enumerate(excel_content['data']):
-            for col_idx, cell in enumerate(row):
-                if cell and search_term in str(cell).lower():
-                    matches.append({
-                        'row_index': row_idx,
-                        'column_index': col_idx,
-                        'value': str(cell)
-                    })
+        workbook = self._get_workbook_entry(file_path)
+        try:
+            title = workbook.resolve_sheet(sheet_name)
+            matches = workbook.search(title, search_term, max_rows=10000)
+            get_document_cache().enforce_limits()
+        except Exception as e:
+            raise ValueError(f"Failed to read Excel document: {str(e)}")
         
         return {
             'filename': filename,
-            'sheet_name': excel_content['sheet_name'],
+            'sheet_name': title,
             'search_term': search_term,
             'matches': matches,
             'match_count': len(matches)
@@ -607,27 +568,10 @@ class MsDocGetWordMetadataTool(MsDocBaseTool):
         if not file_path.exists():
             raise ValueError(f"File not found: {filename}")
         
-        try:
-            from docx import Document
-            
-            doc = Document(str(file_path))
-            core_props = doc.core_properties
-            
-            return {
-                'filename': filename,
-                'metadata': {
-                    'author': core_props.author or '',
-                    'title': core_props.title or '',
-                    'subject': core_props.subject or '',
-                    'created': str(core_props.created) if core_props.created else '',
-                    'modified': str(core_props.modified) if core_props.modified else ''
-                }
-            }
-            
-        except ImportError:
-            raise ValueError("python-docx library not installed")
-        except Exception as e:
-            raise ValueError(f"Failed to get metadata: {str(e)}")
+        return {
+            'filename': filename,
+            'metadata': dict(self._get_word_entry(file_path).metadata)
+        }
 
 
 class MsDocGetExcelMetadataTool(MsDocBaseTool):
@@ -686,31 +630,10 @@ class MsDocGetExcelMetadataTool(MsDocBaseTool):
         if not file_path.exists():
             raise ValueError(f"File not found: {filename}")
         
-        try:
-            from openpyxl import load_workbook
-            
-            wb = load_workbook(str(file_path))
-            props = wb.properties
-            
-            metadata = {
-                'creator': props.creator or '',
-                'title': props.title or '',
-                'subject': props.subject or '',
-                'created': str(props.created) if props.created else '',
-                'modified': str(props.modified) if props.modified else ''
-            }
-            
-            wb.close()
-            
-            return {
-                'filename': filename,
-                'metadata': metadata
-            }
-            
-        except ImportError:
-            raise ValueError("openpyxl library not installed")
-        except Exception as e:
-            raise ValueError(f"Failed to get metadata: {str(e)}")
+        return {
+            'filename': filename,
+            'metadata': dict(self._get_workbook_entry(file_path).metadata)
+        }
 
 
 class MsDocExtractTextTool(MsDocBaseTool):
@@ -764,8 +687,7 @@ class MsDocExtractTextTool(MsDocBaseTool):
         extension = file_path.suffix.lower()
         
         if extension in ['.docx', '.doc']:
-            doc_content = self._read_word_document(file_path)
-            text = '\n'.join(doc_content['paragraphs'])
+            text = '\n'.join(self._get_word_entry(file_path).paragraphs)
         elif extension in ['.xlsx', '.xls', '.xlsm']:
             excel_content = self._read_excel_document(file_path, max_rows=10000)
             text_parts = []
@@ -839,26 +761,16 @@ class MsDocGetExcelSheetsTool(MsDocBaseTool):
         if not file_path.exists():
             raise ValueError(f"File not found: {filename}")
         
-        try:
-            from openpyxl import load_workbook
-            
-            wb = load_workbook(str(file_path), read_only=True)
-            sheets = [
-                {'index': i, 'name': sheet.title}
-                for i, sheet in enumerate(wb.worksheets)
-            ]
-            wb.close()
-            
-            return {
-                'filename': filename,
-                'sheets': sheets,
-                'count': len(sheets)
-            }
-            
-        except ImportError:
-            raise ValueError("openpyxl library not installed")
-        except Exception as e:
-            raise ValueError(f"Failed to get sheets: {str(e)}")
+        sheets = [
+            {'index': i, 'name': name}
+            for i, name in enumerate(self._get_workbook_entry(file_path).sheet_names)
+        ]
+        
+        return {
+            'filename': filename,
+            'sheets': sheets,
+            'count': len(sheets)
+        }
 
 
 class MsDocReadExcelSheetTool(MsDocBaseTool):
@@ -901,6 +813,10 @@ class MsDocReadExcelSheetTool(MsDocBaseTool):
                     "default": 100,
                     "minimum": 1,
                     "maximum": 10000
+                },
+                "cell_range": {
+                    "type": "string",
+                    "description": "A1-style range to read, e.g. 'B2:F50' (optional)"
                 }
             },
             "required": ["filename"],
@@ -941,7 +857,8 @@ class MsDocReadExcelSheetTool(MsDocBaseTool):
             arguments.get('sheet_name'),
             arguments.get('sheet_index'),
             arguments.get('max_rows', 100),
-            False
+            False,
+            arguments.get('cell_range')
         )
 
 
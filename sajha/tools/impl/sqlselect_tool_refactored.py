@@ -4,15 +4,21 @@ SQL Select MCP Tool Implementation - Refactored with Individual Tools
 """
 
 import os
-import duckdb
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 from sajha.tools.base_mcp_tool import BaseMCPTool
+from sajha.core.duckdb_engine import get_duckdb_engine
+from sajha.core.duckdb_guard import QueryRejected, get_query_guard, tenant_of
 
 
 class SqlSelectBaseTool(BaseMCPTool):
     """
-    Base class for SQL Select tools with shared DuckDB functionality
+    Base class for SQL Select tools with shared DuckDB functionality.
+
+    Data sources are registered as views in their own schema on the shared
+    process-wide engine (sajha.core.duckdb_engine), so the six sqlselect
+    tools — and any other instance with the same sources — share one set of
+    views instead of each building a private in-memory database.
     """
     
     def __init__(self, config: Dict = None):
@@ -21,14 +27,19 @@ class SqlSelectBaseTool(BaseMCPTool):
         
         self.data_directory = self.config.get('data_directory', 'data/sqlselect')
         self.data_sources = self.config.get('data_sources', {})
-        self.connection = None
+        self.catalog_schema = self.config.get('catalog_schema', 'sqlselect')
+        self.engine = None
         self._initialize_connection()
+
+    @property
+    def connection(self):
+        """Calling thread's cursor on the shared engine (default schema = this tool's sources)"""
+        return self.engine.cursor(self.catalog_schema)
     
     def _initialize_connection(self):
-        """Initialize DuckDB connection and load data sources"""
+        """Attach to the shared DuckDB engine and register data sources"""
         try:
-            # Create in-memory DuckDB connection
-            self.connection = duckdb.connect(':memory:')
+            self.engine = get_duckdb_engine()
             
             # Ensure data directory exists
             os.makedirs(self.data_directory, exist_ok=True)
@@ -36,14 +47,14 @@ class SqlSelectBaseTool(BaseMCPTool):
             # Register all configured data sources
             self._register_data_sources()
             
-            self.logger.info(f"DuckDB connection initialized for {self.name}")
+            self.logger.info(f"DuckDB engine attached for {self.name}")
             
         except Exception as e:
             self.logger.error(f"Failed to initialize DuckDB connection: {str(e)}", exc_info=True)
             raise Exception(f"Failed to initialize DuckDB connection: {str(e)}")
     
     def _register_data_sources(self):
-        """Register all configured data sources as DuckDB tables/views"""
+        """Register all configured data sources as DuckDB views (no-op if already registered)"""
         for source_name, source_config in self.data_sources.items():
             try:
                 file_path = os.path.join(self.data_directory, source_config['file'])
@@ -53,24 +64,13 @@ class SqlSelectBaseTool(BaseMCPTool):
                     self.logger.warning(f"Data file not found: {file_path}")
                     continue
                 
-                # Create table/view based on file type
-                if file_type == 'csv':
-                    self.connection.execute(
-                        f"CREATE OR REPLACE VIEW {source_name} AS "
-                        f"SELECT * FROM read_csv_auto('{file_path}')"
-                    )
-                elif file_type == 'parquet':
-                    self.connection.execute(
-                        f"CREATE OR REPLACE VIEW {source_name} AS "
-                        f"SELECT * FROM read_parquet('{file_path}')"
-                    )
-                elif file_type == 'json':
-                    self.connection.execute(
-                        f"CREATE OR REPLACE VIEW {source_name} AS "
-                        f"SELECT * FROM read_json_auto('{file_path}')"
-                    )
+                if file_type not in ('csv', 'parquet', 'json'):
+                    self.logger.warning(f"Unsupported data source type '{file_type}' for {source_name}")
+                    continue
                 
-                self.logger.info(f"Registered data source: {source_name} ({file_type})")
+                if self.engine.register_view(source_name, file_path, file_type, schema=self.catalog_schema,
+                                             sort_keys=source_config.get('sort_keys')):
+                    self.logger.info(f"Registered data source: {source_name} ({file_type})")
                     
             except Exception as e:
                 self.logger.error(f"Error registering data source {source_name}: {str(e)}", exc_info=True)
@@ -82,16 +82,6 @@ class SqlSelectBaseTool(BaseMCPTool):
             'error': error_message,
             'timestamp': datetime.now().isoformat()
         }
-    
-    def __del__(self):
-        """Close DuckDB connection on cleanup"""
-        if self.connection:
-            try:
-                self.connection.close()
-                self.logger.info(f"DuckDB connection closed for {self.name}")
-            except Exception as e:
-                logger.error(f"Unexpected error: {e}", exc_info=True)
-                pass
 
 
 class SqlSelectListSourcesTool(SqlSelectBaseTool):
@@ -391,6 +381,14 @@ class SqlSelectExecuteQueryTool(SqlSelectBaseTool):
                     "type": "string",
                     "description": "The executed query"
                 },
+                "resources": {
+                    "type": "object",
+                    "description": "Plan estimate, slot wait, elapsed time and (when profiled) peak memory, spilled bytes, CPU time and rows scanned"
+                },
+                "rejected": {
+                    "type": "string",
+                    "description": "Why the query guard refused or stopped the query: over_budget, busy or timeout"
+                },
                 "timestamp": {
                     "type": "string",
                     "description": "ISO timestamp"
@@ -418,13 +416,14 @@ class SqlSelectExecuteQueryTool(SqlSelectBaseTool):
             if keyword in query_upper:
                 return self._error_response(f"Query contains forbidden keyword: {keyword}")
         
-        # Add LIMIT if not present
-        if 'LIMIT' not in query_upper:
-            query = f"{query.strip().rstrip(';')} LIMIT {limit}"
-        
         try:
-            result = self.connection.execute(query).fetchall()
-            columns = [desc[0] for desc in self.connection.description]
+            # Cap the result, cost the plan, take a slot and run with a deadline
+            def fetch(cursor):
+                return [desc[0] for desc in cursor.description], cursor.fetchall()
+            
+            (columns, result), resources = get_query_guard().run(
+                self.connection, query, fetch, limit=limit, tenant=tenant_of())
+            query = resources.pop('sql')
             
             # Convert results to list of dictionaries
             data = []
@@ -439,9 +438,15 @@ class SqlSelectExecuteQueryTool(SqlSelectBaseTool):
                 'rows': data,
                 'row_count': len(data),
                 'query': query,
+                'resources': resources,
                 'timestamp': datetime.now().isoformat()
             }
             
+        except QueryRejected as e:
+            self.logger.warning(f"Query rejected ({e.reason}): {e}")
+            response = self._error_response(str(e))
+            response['rejected'] = e.reason
+            return response
         except Exception as e:
             self.logger.error(f"Query execution failed: {str(e)}", exc_info=True)
             return self._error_response(f"Query execution failed: {str(e)}")
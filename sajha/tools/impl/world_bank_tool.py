@@ -10,6 +10,7 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime
 from sajha.tools.base_mcp_tool import BaseMCPTool
 from sajha.tools.http_utils import safe_json_response, ENCODINGS_ALL
+from sajha.core.timeseries_store import get_timeseries_store
 
 
 class WorldBankBaseTool(BaseMCPTool):
@@ -82,6 +83,62 @@ class WorldBankBaseTool(BaseMCPTool):
             'roads_paved': 'IS.ROD.PAVE.ZP'
         }
     
+    def _indicator_series(
+        self,
+        country_code: str,
+        indicator_code: str,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        last: Optional[int] = None
+    ) -> Dict:
+        """
+        Annual observations of one indicator for one country, from the
+        time-series store: the first request loads the full history, later
+        ones fetch only the years after the last stored one.
+        
+        Returns:
+            {'country_name', 'indicator_name', 'observations': [{'year', 'value'}], 'store'}
+            with observations in ascending year order, missing values dropped
+        """
+        endpoint = f"country/{country_code}/indicator/{indicator_code}"
+        
+        def upstream(since):
+            params = {'per_page': 1000}
+            if since:
+                params['date'] = f"{since[:4]}:{datetime.now().year}"
+            data = self._make_request(endpoint, params)
+            results = data[1] if len(data) > 1 and data[1] else []
+            return {
+                'country_name': results[0]['country']['value'] if results else '',
+                'indicator_name': results[0]['indicator']['value'] if results else '',
+                'decimal': results[0].get('decimal', 2) if results else 2,
+                'observations': [{'date': item['date'], 'value': item.get('value')} for item in results]
+            }
+        
+        store = get_timeseries_store()
+        if store.enabled:
+            result = store.series('worldbank', f"{country_code}/{indicator_code}", 'A', upstream,
+                                  start=str(start_year) if start_year else None,
+                                  end=str(end_year) if end_year else None, last=last)
+            metadata, observations, store_info = result['metadata'], result['observations'], result['store']
+        else:
+            metadata = upstream(str(start_year) if start_year else None)
+            observations, store_info = metadata.pop('observations'), None
+            observations = sorted((o for o in observations
+                                   if not end_year or int(o['date'][:4]) <= end_year),
+                                  key=lambda o: o['date'])
+            if last:
+                observations = observations[-last:]
+        
+        return {
+            'country_name': metadata.get('country_name', ''),
+            'indicator_name': metadata.get('indicator_name', ''),
+            'decimal': metadata.get('decimal', 2),
+            'observations': [{'year': int(o['date'][:4]), 'value': float(o['value'])}
+                             for o in observations if o['value'] is not None],
+            'store': store_info
+        }
+    
     def _make_request(self, endpoint: str, params: Dict = None) -> List:
         """
         Make API request to World Bank
@@ -425,17 +482,13 @@ class WBGetCountryDataTool(WorldBankBaseTool):
         if not indicator_code:
             raise ValueError("Either 'indicator' or 'indicator_code' must be provided")
         
-        # Build endpoint
-        endpoint = f"country/{country_code}/indicator/{indicator_code}"
-        
-        params = {'per_page': per_page}
-        if start_year and end_year:
-            params['date'] = f"{start_year}:{end_year}"
-        
         try:
-            data = self._make_request(endpoint, params)
+            # Full range when given, otherwise the most recent per_page years
+            series = self._indicator_series(
+                country_code, indicator_code, start_year, end_year,
+                last=None if start_year and end_year else per_page)
             
-            if len(data) < 2 or not data[1]:
+            if not series['observations'] and not series['country_name']:
                 return {
                     'country': {'id': country_code, 'name': ''},
                     'indicator': {'id': indicator_code, 'name': ''},
@@ -444,32 +497,25 @@ class WBGetCountryDataTool(WorldBankBaseTool):
                     'last_updated': datetime.now().isoformat()
                 }
             
-            results = data[1]
-            
-            formatted_data = []
-            for item in results:
-                if item.get('value') is not None:
-                    formatted_data.append({
-                        'year': int(item['date']),
-                        'value': float(item['value']) if item['value'] else None,
-                        'unit': '',
-                        'decimal': item.get('decimal', 2)
-                    })
-            
-            # Sort by year
-            formatted_data.sort(key=lambda x: x['year'])
+            formatted_data = [{
+                'year': obs['year'],
+                'value': obs['value'],
+                'unit': '',
+                'decimal': series['decimal']
+            } for obs in series['observations']]
             
             return {
                 'country': {
                     'id': country_code,
-                    'name': results[0]['country']['value'] if results else ''
+                    'name': series['country_name']
                 },
                 'indicator': {
                     'id': indicator_code,
-                    'name': results[0]['indicator']['value'] if results else ''
+                    'name': series['indicator_name']
                 },
                 'data_points': len(formatted_data),
                 'data': formatted_data,
+                'store': series['store'],
                 'last_updated': datetime.now().isoformat()
             }
             
@@ -854,16 +900,12 @@ class WBCompareCountriesTool(WorldBankBaseTool):
             
             # Fetch data for each country
             for country_code in country_codes:
-                endpoint = f"country/{country_code}/indicator/{indicator_code}"
-                
-                params = {'per_page': 100}
-                if start_year and end_year:
-                    params['date'] = f"{start_year}:{end_year}"
-                
                 try:
-                    data = self._make_request(endpoint, params)
+                    series = self._indicator_series(
+                        country_code, indicator_code, start_year, end_year,
+                        last=None if start_year and end_year else 100)
                     
-                    if len(data) < 2 or not data[1]:
+                    if not series['observations'] and not series['country_name']:
                         countries_data.append({
                             'country': {
                                 'id': country_code,
@@ -878,23 +920,9 @@ class WBCompareCountriesTool(WorldBankBaseTool):
                         })
                         continue
                     
-                    results = data[1]
-                    
                     # Format data points
-                    data_points = []
-                    values = []
-                    for item in results:
-                        if item.get('value') is not None:
-                            year = int(item['date'])
-                            value = float(item['value'])
-                            data_points.append({
-                                'year': year,
-                                'value': value
-                            })
-                            values.append(value)
-                    
-                    # Sort by year
-                    data_points.sort(key=lambda x: x['year'])
+                    data_points = series['observations']
+                    values = [point['value'] for point in data_points]
                     
                     # Calculate statistics
                     latest = data_points[-1] if data_points else None
@@ -905,7 +933,7 @@ class WBCompareCountriesTool(WorldBankBaseTool):
                     countries_data.append({
                         'country': {
                             'id': country_code,
-                            'name': results[0]['country']['value'] if results else country_code
+                            'name': series['country_name'] or country_code
                         },
                         'data': data_points,
                         'latest_value': latest['value'] if latest else None,
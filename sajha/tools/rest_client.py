@@ -0,0 +1,364 @@
+"""
+SAJHA MCP Server v5.3.0 — Shared REST Client for Studio-Generated Tools
+Copyright All rights Reserved 2025-2030, Ashutosh Sinha
+
+Runtime used by the REST tools that MCP Studio generates. Instead of a bare
+requests.request() per call, every tool goes through a RestClient that:
+
+  - takes a keep-alive requests.Session from a process-wide pool keyed by
+    scheme://host:port, so tools hitting the same API share sockets
+  - retries connection errors and 429/5xx responses with full-jitter
+    exponential backoff (Retry-After is honoured), idempotent methods only
+  - caps in-flight requests per endpoint with a shared semaphore
+  - optionally walks paginated endpoints, fetching pages concurrently
+
+Config (config/application.yml):
+  rest:
+    client:
+      max_hosts: 256        # Sessions kept; least recently used is closed
+      pool_maxsize: 16      # Keep-alive connections per host
+      page_workers: 16      # Threads shared by concurrent page fetches
+"""
+
+import logging
+import math
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+PAGINATION_MODES = ('page', 'offset', 'cursor')
+
+
+@dataclass
+class RetryPolicy:
+    """Retry settings for one tool."""
+    max_retries: int = 2
+    backoff_base: float = 0.5
+    backoff_max: float = 10.0
+
+    def delay(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        """Seconds to wait before retry number attempt (0-based)."""
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after and retry_after.strip().isdigit():
+                return min(float(retry_after), self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+
+class SessionPool:
+    """Keep-alive sessions shared by all REST tools, one per origin."""
+
+    def __init__(self, max_hosts: int = 256, pool_maxsize: int = 16):
+        self._max_hosts = max(1, max_hosts)
+        self._pool_maxsize = max(1, pool_maxsize)
+        self._sessions: 'OrderedDict[str, requests.Session]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._evicted = 0
+
+    @staticmethod
+    def origin(url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}".lower()
+
+    def get(self, url: str) -> requests.Session:
+        key = self.origin(url)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is not None:
+                self._sessions.move_to_end(key)
+                return session
+
+            session = requests.Session()
+            # Retries are handled by RestClient so backoff can be jittered
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self._pool_maxsize, max_retries=0)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self._sessions[key] = session
+            self._created += 1
+
+            while len(self._sessions) > self._max_hosts:
+                _, old = self._sessions.popitem(last=False)
+                self._evicted += 1
+                try:
+                    old.close()
+                except Exception as e:
+                    logger.debug(f"Error closing REST session: {e}")
+            return session
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                try:
+                    session.close()
+                except Exception:
+                    pass
+            self._sessions.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'hosts': len(self._sessions),
+                'max_hosts': self._max_hosts,
+                'pool_maxsize': self._pool_maxsize,
+                'sessions_created': self._created,
+                'sessions_evicted': self._evicted,
+            }
+
+
+# ── Shared state ────────────────────────────────────────────────────────────
+
+_session_pool: Optional[SessionPool] = None
+_page_executor: Optional[ThreadPoolExecutor] = None
+_endpoint_limits: Dict[str, threading.BoundedSemaphore] = {}
+_singleton_lock = threading.Lock()
+
+
+def _client_settings() -> Tuple[int, int, int]:
+    max_hosts, pool_maxsize, page_workers = 256, 16, 16
+    try:
+        from sajha.core.config import get_settings
+        s = get_settings()
+        max_hosts = getattr(s, 'rest_client_max_hosts', 256)
+        pool_maxsize = getattr(s, 'rest_client_pool_maxsize', 16)
+        page_workers = getattr(s, 'rest_client_page_workers', 16)
+    except Exception:
+        pass
+    return max_hosts, pool_maxsize, page_workers
+
+
+def get_session_pool() -> SessionPool:
+    global _session_pool
+    if _session_pool is None:
+        with _singleton_lock:
+            if _session_pool is None:
+                max_hosts, pool_maxsize, _ = _client_settings()
+                _session_pool = SessionPool(max_hosts=max_hosts, pool_maxsize=pool_maxsize)
+    return _session_pool
+
+
+def _get_page_executor() -> ThreadPoolExecutor:
+    global _page_executor
+    if _page_executor is None:
+        with _singleton_lock:
+            if _page_executor is None:
+                _, _, page_workers = _client_settings()
+                _page_executor = ThreadPoolExecutor(
+                    max_workers=max(1, page_workers), thread_name_prefix='rest-page')
+    return _page_executor
+
+
+def _endpoint_limit(key: str, limit: int) -> threading.BoundedSemaphore:
+    """Semaphore shared by every tool calling the same method + endpoint."""
+    with _singleton_lock:
+        sem = _endpoint_limits.get(key)
+        if sem is None:
+            sem = threading.BoundedSemaphore(max(1, limit))
+            _endpoint_limits[key] = sem
+        return sem
+
+
+def extract_path(data: Any, path: str) -> Any:
+    """Follow a dotted path ('meta.total', 'data.items') into parsed JSON."""
+    if not path:
+        return data
+    for part in path.split('.'):
+        if isinstance(data, dict):
+            data = data.get(part)
+        elif isinstance(data, list) and part.isdigit() and int(part) < len(data):
+            data = data[int(part)]
+        else:
+            return None
+    return data
+
+
+class RestClient:
+    """
+    HTTP access for one generated REST tool.
+
+    Args:
+        endpoint: Endpoint URL template (path params as {name})
+        method: HTTP method
+        timeout: Per-request timeout in seconds
+        retry: RetryPolicy
+        max_concurrency: In-flight cap shared by all tools on this endpoint
+        pagination: Optional declarative pagination spec, e.g.
+            {"mode": "page", "page_param": "page", "size_param": "per_page",
+             "page_size": 100, "start": 1, "max_pages": 10, "concurrency": 4,
+             "items_path": "data", "total_path": "meta.total"}
+            mode "offset" steps page_param by page_size; mode "cursor" reads
+            next_cursor_path and is fetched sequentially.
+    """
+
+    def __init__(self,
+                 endpoint: str,
+                 method: str = 'GET',
+                 timeout: float = 30,
+                 retry: Optional[RetryPolicy] = None,
+                 max_concurrency: int = 8,
+                 pagination: Optional[Dict[str, Any]] = None):
+        self.endpoint = endpoint
+        self.method = method.upper()
+        self.timeout = timeout
+        self.retry = retry or RetryPolicy()
+        self.pagination = dict(pagination) if pagination else None
+        self._limit = _endpoint_limit(f"{self.method} {endpoint}", max_concurrency)
+
+    # ── Single request ──────────────────────────────────────────────────────
+
+    def request(self, url: str, **kwargs) -> requests.Response:
+        """
+        Send one request through the shared session for url's origin.
+
+        Connection errors, timeouts and 429/5xx responses are retried for
+        idempotent methods. The final response is returned as-is; callers
+        decide whether to raise_for_status().
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        retryable = self.method in IDEMPOTENT_METHODS
+        attempts = self.retry.max_retries + 1 if retryable else 1
+        session = get_session_pool().get(url)
+
+        for attempt in range(attempts):
+            last_attempt = attempt == attempts - 1
+            try:
+                with self._limit:
+                    response = session.request(self.method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if last_attempt:
+                    raise
+                wait = self.retry.delay(attempt)
+                logger.debug(f"Retrying {self.method} {url} in {wait:.2f}s after {type(e).__name__}")
+                time.sleep(wait)
+                continue
+
+            if response.status_code in RETRY_STATUSES and not last_attempt:
+                wait = self.retry.delay(attempt, response)
+                logger.debug(f"Retrying {self.method} {url} in {wait:.2f}s after HTTP {response.status_code}")
+                response.close()
+                time.sleep(wait)
+                continue
+            return response
+
+        raise RuntimeError("unreachable")  # pragma: no cover
+
+    # ── Pagination ──────────────────────────────────────────────────────────
+
+    def fetch_pages(self, url: str, params: Optional[Dict] = None,
+                    parse: Callable[[requests.Response], Any] = None,
+                    **kwargs) -> Dict[str, Any]:
+        """
+        Fetch every page of a paginated endpoint (bounded by max_pages).
+
+        Returns:
+            Dict with 'items' (concatenated), 'pages_fetched' (requests made,
+            empty pages included) and 'truncated'
+        """
+        spec = self.pagination or {}
+        mode = spec.get('mode', 'page')
+        parse = parse or (lambda r: r.json())
+        max_pages = max(1, int(spec.get('max_pages', 10)))
+        page_size = max(1, int(spec.get('page_size', 100)))
+        items_path = spec.get('items_path', '')
+        base_params = dict(params or {})
+        if spec.get('size_param'):
+            base_params[spec['size_param']] = page_size
+
+        def get_page(page_params: Dict) -> Any:
+            response = self.request(url, params=page_params, **kwargs)
+            response.raise_for_status()
+            return parse(response)
+
+        def items_of(body: Any) -> List:
+            found = extract_path(body, items_path)
+            return found if isinstance(found, list) else []
+
+        if mode == 'cursor':
+            return self._fetch_cursor_pages(get_page, items_of, base_params, spec, max_pages)
+
+        param = spec.get('page_param', 'page' if mode == 'page' else 'offset')
+        start = int(spec.get('start', 1 if mode == 'page' else 0))
+        step = 1 if mode == 'page' else page_size
+
+        def params_for(index: int) -> Dict:
+            p = dict(base_params)
+            p[param] = start + index * step
+            return p
+
+        first = get_page(params_for(0))
+        pages = [items_of(first)]
+        fetched = 1                     # every request counts against max_pages, empty pages too
+
+        # A known total lets every remaining page be requested up front
+        known_pages = None
+        if spec.get('total_pages_path'):
+            total_pages = extract_path(first, spec['total_pages_path'])
+            if isinstance(total_pages, (int, float)):
+                known_pages = int(total_pages)
+        elif spec.get('total_path'):
+            total = extract_path(first, spec['total_path'])
+            if isinstance(total, (int, float)):
+                known_pages = math.ceil(total / page_size)
+
+        concurrency = max(1, int(spec.get('concurrency', 4)))
+        executor = _get_page_executor()
+        more = len(pages[0]) >= page_size if known_pages is None else known_pages > 1
+        last_index = max_pages if known_pages is None else min(max_pages, known_pages)
+
+        while more and fetched < last_index:
+            wave = range(fetched, min(last_index, fetched + concurrency))
+            bodies = list(executor.map(lambda i: get_page(params_for(i)), wave))
+            fetched += len(wave)
+            for body in bodies:
+                page_items = items_of(body)
+                if page_items:
+                    pages.append(page_items)
+                if known_pages is None and len(page_items) < page_size:
+                    more = False
+                    break
+
+        if known_pages is not None:
+            truncated = known_pages > max_pages
+        else:
+            truncated = more and fetched >= last_index
+
+        return {
+            'items': [item for page in pages for item in page],
+            'pages_fetched': fetched,
+            'truncated': truncated,
+        }
+
+    def _fetch_cursor_pages(self, get_page, items_of, base_params: Dict,
+                            spec: Dict, max_pages: int) -> Dict[str, Any]:
+        param = spec.get('page_param', 'cursor')
+        cursor_path = spec.get('next_cursor_path', 'next_cursor')
+        items: List = []
+        params = dict(base_params)
+        cursor = None
+        fetched = 0
+        while fetched < max_pages:
+            body = get_page(params)
+            fetched += 1
+            items.extend(items_of(body))
+            cursor = extract_path(body, cursor_path)
+            if not cursor:
+                break
+            params = dict(base_params)
+            params[param] = cursor
+        return {
+            'items': items,
+            'pages_fetched': fetched,
+            'truncated': bool(cursor) and fetched >= max_pages,
+        }
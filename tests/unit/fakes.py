@@ -0,0 +1,34 @@
+"""
+Shared fakes for unit tests that drive composites, the resolver or tools/call against a tool registry.
+"""
+
+import threading
+import time
+
+
+class FakeTool:
+    """Registered-tool stand-in: returns fn(arguments) and records every call."""
+
+    def __init__(self, fn, delay=0.0, provider=None):
+        self.fn, self.delay, self.calls = fn, delay, []
+        self.config = {'metadata': {'provider': provider}} if provider else {}
+        self._lock = threading.Lock()
+
+    def execute(self, arguments):
+        with self._lock:
+            self.calls.append(dict(arguments))
+        time.sleep(self.delay)
+        return self.fn(arguments)
+
+    execute_with_tracking = execute
+
+
+class FakeRegistry:
+    """The slice of ToolsRegistry the callers use: a name → tool map and get_tool()."""
+
+    def __init__(self, tools):
+        self.tools = tools
+
+    def get_tool(self, name):
+        return self.tools.get(name)
+
@@ -0,0 +1,123 @@
+"""
+Tests for sajha.core.async_delivery — timer wheel, pooled webhook delivery with retries, JSONL append and rotation.
+"""
+
+import sys
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+
+def _task(task_id, delivery_type, destination, **config):
+    from sajha.core.async_executor import AsyncTask, AsyncTaskStatus
+    return AsyncTask(task_id=task_id, tool_name='echo', arguments={}, delivery_type=delivery_type,
+                     delivery_destination=destination, delivery_config=config,
+                     status=AsyncTaskStatus.COMPLETED, result={'id': task_id})
+
+
+class _Endpoint:
+    """Local HTTP server; each path answers with the next status in its script (default 200)."""
+
+    def __init__(self, scripts):
+        self.scripts = {k: list(v) for k, v in scripts.items()}
+        self.hits, self.connections = [], set()
+        endpoint = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers['Content-Length']))
+                endpoint.hits.append(self.path)
+                endpoint.connections.add(self.client_address)
+                script = endpoint.scripts.get(self.path, [])
+                status = script.pop(0) if script else 200
+                if status == 'hang':
+                    time.sleep(0.6)
+                    status = 200
+                self.send_response(status)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+class TestTimerWheel:
+
+    def test_fires_in_order_across_revolutions(self):
+        from sajha.core.async_delivery import TimerWheel
+        wheel, fired = TimerWheel(tick_ms=5, slots=4), []
+        start = time.monotonic()
+        for delay in (0.06, 0.005, 0.03):                    # 0.06s is three revolutions of a 20ms wheel
+            wheel.schedule(delay, lambda d=delay: fired.append((d, time.monotonic() - start)))
+        assert wheel.pending() == 3
+        time.sleep(0.2)
+        assert [d for d, _ in fired] == [0.005, 0.03, 0.06]
+        assert all(elapsed >= d for d, elapsed in fired) and wheel.pending() == 0
+        wheel.stop()
+
+
+class TestDeliveryRouter:
+
+    def test_webhook_retries_off_thread_and_reuses_connections(self):
+        from sajha.core.async_delivery import DeliveryRouter
+        endpoint = _Endpoint({'/flaky': [503, 503], '/bad': [400]})
+        results = {}
+        router = DeliveryRouter(retry_base_ms=10, retry_max_ms=20, max_attempts=3,
+                                on_result=lambda task, ok, error: results.__setitem__(task.task_id, (ok, error)))
+        start = time.monotonic()
+        router.submit(_task('t-flaky', 'webhook', endpoint.url + '/flaky'))
+        router.submit(_task('t-bad', 'webhook', endpoint.url + '/bad'))
+        for i in range(5):
+            router.submit(_task(f't-{i}', 'webhook', endpoint.url + '/ok'))
+        assert time.monotonic() - start < 0.05                 # submit never waits on the endpoint
+        assert router.flush(5)
+
+        assert results['t-flaky'] == (True, None) and endpoint.hits.count('/flaky') == 3
+        assert results['t-bad'] == (False, 'HTTP 400') and endpoint.hits.count('/bad') == 1   # 4xx: no retry
+        assert all(results[f't-{i}'][0] for i in range(5))
+        stats = router.stats()
+        assert stats['retries'] == 2 and stats['delivered'] == 6 and stats['failed'] == 1
+        assert stats['http']['reused'] > 0 and len(endpoint.connections) <= 2   # keep-alive, 2 in flight per host
+        router.close()
+
+    def test_hung_destination_does_not_hold_up_others(self, tmp_path):
+        from sajha.core.async_delivery import DeliveryRouter
+        endpoint = _Endpoint({'/hang': ['hang'] * 4})
+        done = {}
+        router = DeliveryRouter(workers=4, file_base_dir=str(tmp_path),
+                                on_result=lambda task, ok, error: done.__setitem__(task.task_id, time.monotonic()))
+        start = time.monotonic()
+        for i in range(4):
+            router.submit(_task(f'h-{i}', 'webhook', endpoint.url + '/hang'))
+        router.submit(_task('f-0', 'file', 'f-0.json'))
+        router.submit(_task('w-0', 'webhook', endpoint.url.replace('127.0.0.1', 'localhost') + '/ok'))
+        assert router.flush(5)
+        assert done['f-0'] - start < 0.5 and done['w-0'] - start < 0.5
+        assert json.loads((tmp_path / 'f-0.json').read_text())['result'] == {'id': 'f-0'}
+        router.close()
+
+    def test_jsonl_destinations_are_buffered_and_rotated(self, tmp_path):
+        from sajha.core.async_delivery import DeliveryRouter
+        results = []
+        router = DeliveryRouter(file_base_dir=str(tmp_path), file_rotate_mb=1500 / (1024 * 1024), file_flush_ms=20,
+                                on_result=lambda task, ok, error: results.append(ok))
+        for i in range(12):
+            router.submit(_task(f't-{i:02d}', 'file', 'results.jsonl'))
+        assert router.flush(5) and results == [True] * 12
+
+        files = sorted(tmp_path.glob('results*.jsonl'))
+        assert len(files) > 1 and all(f.stat().st_size <= 1500 for f in files)
+        ids = sorted(json.loads(line)['task_id'] for f in files for line in f.read_text().splitlines())
+        assert ids == [f't-{i:02d}' for i in range(12)]
+        assert router.stats()['file']['rotations'] == len(files) - 1
+        router.close()
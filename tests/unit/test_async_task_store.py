@@ -0,0 +1,132 @@
+"""
+Tests for sajha.core.task_store and the AsyncExecutor on top of it — leases, crash recovery, pagination, result limits.
+"""
+
+import sys
+import time
+import pytest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+
+def _task(i, created=None):
+    return {'task_id': f't-{i:03d}', 'tool_name': 'echo', 'arguments': {'i': i}, 'delivery_type': 'file',
+            'delivery_destination': f'{i}.json', 'created_at': created if created is not None else 1000.0 + i}
+
+
+class _Echo:
+    def execute_with_tracking(self, arguments):
+        return {'echo': arguments}
+
+
+class TestTaskStore:
+
+    def test_claims_are_exclusive_across_connections_and_expired_leases_recover(self, tmp_path):
+        from sajha.core.task_store import SQLiteTaskStore
+        path = str(tmp_path / 'tasks.db')
+        a, b = SQLiteTaskStore(path, max_attempts=2), SQLiteTaskStore(path, max_attempts=2)
+        assert a.enqueue(_task(1)) and a.enqueue(_task(2))
+        assert not a.enqueue(_task(3), max_queued=2)                 # backpressure
+
+        first, second = a.claim('w1', 60), b.claim('w2', 60)
+        assert (first['task_id'], second['task_id']) == ('t-001', 't-002')
+        assert b.claim('w2', 60) is None
+
+        # w1 "crashes": its lease lapses and w2 re-claims; w1's late write is fenced off
+        b.update('t-001', lease_expires=time.time() - 1)
+        again = b.claim('w2', 60)
+        assert again['task_id'] == 't-001' and again['attempts'] == 2
+        assert not a.finish('t-001', 'w1', 'completed', result={'stale': True})
+        assert b.finish('t-001', 'w2', 'completed', result={'ok': True}, started_at=again['started_at'])
+        assert a.get('t-001')['result'] == {'ok': True}
+
+        # Out of attempts: an expired lease fails the task instead of re-running it
+        b.update('t-002', lease_expires=time.time() - 1, attempts=2)
+        assert a.claim('w1', 60) is None
+        assert a.get('t-002')['status'] == 'failed' and 'Lease expired' in a.get('t-002')['error']
+
+    def test_incomplete_backend_fails_at_construction(self):
+        from sajha.core.task_store import TaskStore
+
+        class NoTransactions(TaskStore):
+            def _connect(self):
+                return None
+
+        with pytest.raises(TypeError, match='_transaction'):
+            NoTransactions()
+
+    def test_keyset_pagination_result_limit_and_purge(self, tmp_path):
+        from sajha.core.task_store import SQLiteTaskStore
+        store = SQLiteTaskStore(str(tmp_path / 'tasks.db'), max_result_bytes=100)
+        for i in range(7):
+            store.enqueue(_task(i, created=1000.0 + i // 2))          # ties on created_at
+        seen, cursor = [], None
+        while True:
+            rows, cursor = store.list(limit=3, cursor=cursor)
+            seen += [r['task_id'] for r in rows]
+            if cursor is None:
+                break
+        assert seen == [f't-{i:03d}' for i in reversed(range(7))]
+        assert [r['task_id'] for r in store.list(status='queued', limit=2)[0]] == ['t-006', 't-005']
+
+        row = store.claim('w', 60)
+        store.finish(row['task_id'], 'w', 'completed', result={'blob': 'x' * 500})
+        stored = store.get(row['task_id'])
+        assert stored['result'] is None and stored['result_truncated'] == 1 and stored['result_bytes'] > 500
+        assert store.purge(older_than=2000.0) == 1 and store.counts() == {'queued': 6}
+
+
+class TestAsyncExecutor:
+
+    def test_tasks_run_from_the_store_and_survive_a_restart(self, tmp_path):
+        from sajha.core.async_executor import AsyncExecutor, AsyncTaskStatus
+        from sajha.core.task_store import SQLiteTaskStore
+        path = str(tmp_path / 'tasks.db')
+        delivery = {'file': {'base_dir': str(tmp_path / 'out')}}
+
+        # Submitted while no worker is running — e.g. before a crash
+        idle = AsyncExecutor(num_workers=0, store=SQLiteTaskStore(path), delivery_config=delivery)
+        task = idle.submit('echo', {'x': 1}, 'file', 'r.json')
+        assert idle.get_task(task.task_id).status == AsyncTaskStatus.QUEUED
+
+        executor = AsyncExecutor(num_workers=2, store=SQLiteTaskStore(path), delivery_config=delivery,
+                                 lease_seconds=5, poll_interval_ms=20, tool_lookup=lambda name: _Echo())
+        executor.start()
+        try:
+            deadline = time.time() + 5
+            while executor.get_task(task.task_id).status != AsyncTaskStatus.DELIVERED and time.time() < deadline:
+                time.sleep(0.02)
+            done = executor.get_task(task.task_id)
+            assert done.status == AsyncTaskStatus.DELIVERED and done.result == {'echo': {'x': 1}}
+            assert (tmp_path / 'out' / 'r.json').exists()
+            assert executor.stats()['by_status'] == {'delivered': 1}
+        finally:
+            executor.stop()
+
+    def test_deliveries_pending_at_a_crash_are_resent_on_start(self, tmp_path):
+        from sajha.core.async_executor import AsyncExecutor, AsyncTaskStatus
+        from sajha.core.task_store import SQLiteTaskStore
+        store = SQLiteTaskStore(str(tmp_path / 'tasks.db'))
+        for i in (1, 2):
+            store.enqueue(_task(i))
+            row = store.claim('dead', 60)
+            store.finish(row['task_id'], 'dead', 'completed', result={'i': i})
+        # The old process handed both to its delivery stage and died; t-002's lease is still live
+        store.update('t-001', delivery_status='pending', lease_owner='dead', lease_expires=time.time() - 1)
+        store.update('t-002', delivery_status='pending', lease_owner='other', lease_expires=time.time() + 60)
+
+        executor = AsyncExecutor(num_workers=1, store=SQLiteTaskStore(str(tmp_path / 'tasks.db')),
+                                 delivery_config={'file': {'base_dir': str(tmp_path / 'out')}},
+                                 lease_seconds=5, poll_interval_ms=20)
+        executor.start()
+        try:
+            deadline = time.time() + 5
+            while executor.get_task('t-001').status != AsyncTaskStatus.DELIVERED and time.time() < deadline:
+                time.sleep(0.02)
+            assert executor.get_task('t-001').delivery_status == 'success'
+            assert (tmp_path / 'out' / '1.json').exists() and not (tmp_path / 'out' / '2.json').exists()
+            assert executor.get_task('t-002').delivery_status == 'pending'
+            assert executor.stats()['deliveries_recovered'] == 1
+        finally:
+            executor.stop()
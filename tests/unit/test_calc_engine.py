@@ -0,0 +1,101 @@
+"""
+Tests for sajha.tools.impl.calc_engine — vectorized calculator kernels.
+"""
+
+import math
+import sys
+import pytest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+np = pytest.importorskip('numpy')
+
+
+class TestKernelsMatchScalar:
+
+    def test_black_scholes_put_call_parity(self):
+        from sajha.tools.impl import calc_engine
+        K = np.linspace(60, 140, 101)
+        res = calc_engine.black_scholes(100.0, K, 0.5, 0.03, 0.25)
+        parity = res['call_price'] - res['put_price'] - (100.0 - K * math.exp(-0.03 * 0.5))
+        assert np.abs(parity).max() < 1e-9
+
+    def test_npv_ragged_batch(self):
+        from sajha.tools.impl import calc_engine
+        flows = [[-100, 60, 60], [-50, 10, 10, 10, 40]]
+        got = calc_engine.npv([0.1, 0.05], flows)
+        for rate, cfs, value in zip([0.1, 0.05], flows, got):
+            assert value == pytest.approx(sum(cf / (1 + rate) ** i for i, cf in enumerate(cfs)))
+
+    def test_irr_newton_and_fallback(self):
+        from sajha.tools.impl import calc_engine
+        rates, methods = calc_engine.irr([[-1000, 300, 400, 500], [-100, -10, -5]])
+        assert rates[0] == pytest.approx(0.0889633947, rel=1e-8)
+        assert methods == ['newton', 'bisection']
+
+    def test_bond_ytm_round_trips_price(self):
+        from sajha.tools.impl import calc_engine
+        y = np.array([0.01, 0.045, 0.09])
+        prices = calc_engine.bond_price([1000] * 3, [0.05] * 3, y, [10, 7, 30])
+        ytm, _ = calc_engine.bond_ytm(prices, [1000] * 3, [0.05] * 3, [10, 7, 30])
+        assert np.allclose(ytm, y, atol=1e-10)
+
+    def test_max_drawdown_and_correlation(self):
+        from sajha.tools.impl import calc_engine
+        dd = calc_engine.max_drawdown([[100, 120, 90, 130, 80], [1, 2, 3]])
+        assert dd[0] == pytest.approx(50 / 130) and dd[1] == 0
+        corr, counts = calc_engine.correlation([[1, 2, 3, 4]], [[2, 4, 6, 8, 99]])
+        assert corr[0] == pytest.approx(1.0) and counts[0] == 4
+
+
+class TestMonteCarlo:
+
+    def test_seeded_runs_are_reproducible(self):
+        from sajha.tools.impl import calc_engine
+        kw = dict(initial_value=100.0, mu=0.05, sigma=0.2, time_years=1.0,
+                  steps=12, num_paths=2000, seed=7)
+        assert calc_engine.monte_carlo_gbm(**kw) == calc_engine.monte_carlo_gbm(**kw)
+
+    def test_terminal_mean_matches_gbm(self):
+        from sajha.tools.impl import calc_engine
+        res = calc_engine.monte_carlo_gbm(100.0, 0.05, 0.2, 1.0, steps=4,
+                                          num_paths=200000, seed=1)
+        assert res['mean_terminal_value'] == pytest.approx(100 * math.exp(0.05), rel=5e-3)
+        assert res['cvar']['99'] >= res['var']['99'] >= res['var']['95'] > 0
+
+
+class TestBatchTool:
+
+    def test_shared_defaults_and_validation(self):
+        from sajha.tools.impl.calc_tools import CalcBlackScholesTool
+        tool = CalcBlackScholesTool({'inputSchema': {'required': ['stock_price', 'strike']}})
+        args = {'stock_price': 100, 'time_years': 1, 'risk_free_rate': 5, 'volatility': 20,
+                'batch': [{'strike': 95}, {'strike': 105}], 'batch_format': 'columns'}
+        assert tool.validate_arguments(args)
+        out = tool.execute(args)
+        assert out['count'] == 2 and out['columns']['strike'] == [95, 105]
+        single = tool.execute({k: v for k, v in args.items() if k not in ('batch', 'batch_format')} | {'strike': 95})
+        assert out['columns']['call_price'][0] == single['call_price']
+        with pytest.raises(ValueError):
+            tool.validate_arguments({'batch': [{'strike': 95}]})
+
+    def test_configs_accept_either_scalar_inputs_or_a_batch(self):
+        import json
+        from sajha.tools.impl.calc_tools import CalcBetaTool
+        configs = Path(__file__).parent.parent.parent / 'config' / 'tools'
+        for path in configs.glob('calc_*.json'):
+            schema = json.loads(path.read_text())['inputSchema']
+            # Flat object schemas: LLM tool APIs reject a top-level anyOf/oneOf in input_schema
+            assert schema['type'] == 'object' and not {'anyOf', 'oneOf', 'allOf'} & set(schema), path.name
+            if 'batch' in schema['properties']:
+                assert schema['required'] and 'batch' not in schema['required'], path.name
+
+        tool = CalcBetaTool(json.loads((configs / 'calc_beta.json').read_text()))
+        series = [0.01, -0.02, 0.015, 0.0]
+        assert tool.validate_arguments({'batch': [{'stock_returns': series, 'market_returns': series}]})
+        assert tool.validate_arguments({'stock_returns': series, 'market_returns': series})
+        with pytest.raises(ValueError, match='market_returns'):
+            tool.validate_arguments({'stock_returns': series})
+        with pytest.raises(ValueError, match=r'batch\[0\]\.market_returns'):
+            tool.validate_arguments({'batch': [{'stock_returns': series}]})
@@ -0,0 +1,104 @@
+"""
+Tests for composite DAG scheduling — lens-derived dependencies, overlap of independent steps, memoized sub-calls, critical path.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from tests.unit.fakes import FakeRegistry, FakeTool
+
+
+def _composite(tools, steps, **definition):
+    from sajha.tools.composite_tool import CompositeTool
+    return CompositeTool({'name': 'research', 'master_tool': 'fmp_profile', 'master_output_key': 'profile',
+                          'steps': steps, **definition}, FakeRegistry(tools))
+
+
+class TestCompositeDAG:
+
+    def test_compile_reads_edges_from_lenses_and_rejects_bad_graphs(self):
+        from sajha.core.composition import CompositeDAG
+        dag = CompositeDAG.compile([
+            {'output_key': 'quote'},
+            {'output_key': 'ratios'},
+            {'output_key': 'dcf', 'param_mapping': {'fcf': '$.steps.ratios.fcf', 'beta': '$.steps.profile.beta'}},
+        ], master_key='profile')
+        assert dag.deps == {'profile': [], 'quote': [], 'ratios': [], 'dcf': ['ratios', 'profile']}
+        assert dag.levels == {'profile': 0, 'quote': 0, 'ratios': 0, 'dcf': 1}
+
+        with pytest.raises(ValueError, match='cycle'):
+            CompositeDAG.compile([{'output_key': 'a', 'param_mapping': {'x': '$.steps.b'}},
+                                  {'output_key': 'b', 'param_mapping': {'x': '$.steps.a'}}])
+        with pytest.raises(ValueError, match='unknown step'):
+            CompositeDAG.compile([{'output_key': 'a', 'param_mapping': {'x': '$.steps.nope.y'}}])
+
+    def test_independent_steps_overlap_and_chains_see_upstream_output(self):
+        from sajha.core.fanout import get_fanout_scheduler
+        tools = {
+            'fmp_profile': FakeTool(lambda a: {'beta': 1.2}, delay=0.1),
+            'fmp_quote': FakeTool(lambda a: {'price': 100}, delay=0.1),
+            'fmp_ratios': FakeTool(lambda a: {'fcf': 50}, delay=0.1),
+            'calc_dcf': FakeTool(lambda a: {'value': a['fcf'] * a['beta']}, delay=0.1),
+        }
+        composite = _composite(tools, [
+            {'tool_name': 'fmp_quote', 'output_key': 'quote'},
+            {'tool_name': 'fmp_ratios', 'output_key': 'ratios'},
+            {'tool_name': 'calc_dcf', 'output_key': 'dcf',
+             'param_mapping': {'fcf': '$.steps.ratios.fcf', 'beta': '$.steps.profile.beta'}},
+        ])
+        get_fanout_scheduler()                                       # settings + pool start-up off the clock
+        start = time.monotonic()
+        result = composite.execute({'symbol': 'AAPL'})
+        elapsed = time.monotonic() - start
+
+        assert result['dcf'] == {'value': 60.0} and result['quote'] == {'price': 100}
+        assert elapsed < 0.3                                         # longest chain is 2 × 0.1s, not 4 × 0.1s
+        timing = result['_composition']['timing']
+        assert timing['critical_path'][-1] == 'dcf' and len(timing['critical_path']) == 2
+        assert timing['nodes']['dcf']['start_ms'] >= timing['nodes']['ratios']['end_ms']
+        assert timing['nodes']['quote']['start_ms'] < timing['nodes']['profile']['end_ms']
+        assert result['_composition']['steps_executed'] == 4
+
+    def test_failed_dependency_skips_dependents_only(self):
+        tools = {
+            'fmp_profile': FakeTool(lambda a: {'beta': 1.2}),
+            'fmp_quote': FakeTool(lambda a: {'price': 100}),
+            'fmp_ratios': FakeTool(lambda a: {'error': 'HTTP 404'}),
+            'calc_dcf': FakeTool(lambda a: {'value': 1}),
+        }
+        composite = _composite(tools, [
+            {'tool_name': 'fmp_quote', 'output_key': 'quote'},
+            {'tool_name': 'fmp_ratios', 'output_key': 'ratios'},
+            {'tool_name': 'calc_dcf', 'output_key': 'dcf', 'param_mapping': {'fcf': '$.steps.ratios.fcf'}},
+        ])
+        result = composite.execute({})
+        assert result['quote'] == {'price': 100} and result['ratios'] == {'error': 'HTTP 404'}
+        assert 'skipped' in result['dcf']['error'] and tools['calc_dcf'].calls == []
+
+    def test_identical_sub_calls_run_once_per_execution(self):
+        tools = {
+            'fmp_profile': FakeTool(lambda a: {'rows': [{'ticker': t} for t in ('AAPL', 'MSFT', 'AAPL', 'AAPL')]}),
+            'fmp_quote': FakeTool(lambda a: {'price': len(a['symbol'])}, delay=0.05),
+            'fred_series': FakeTool(lambda a: {'rate': 5}, delay=0.05),
+        }
+        composite = _composite(tools, [
+            {'tool_name': 'fmp_quote', 'output_key': 'quote', 'param_mapping': {'symbol': '$.ticker'}},
+            {'tool_name': 'fred_series', 'output_key': 'rates', 'static_params': {'series': 'DFF'}},
+        ], arrangement='parent_child', record_path='rows')
+        result = composite.execute({})
+
+        assert [c['quote'] for c in result['children']] == [{'price': 4}] * 4
+        assert sorted(c['symbol'] for c in tools['fmp_quote'].calls) == ['AAPL', 'MSFT']
+        assert len(tools['fred_series'].calls) == 1
+        timing = result['_composition']['timing']
+        assert timing['memo_hits'] == 5 and timing['nodes']['quote']['calls'] == 4
+        assert timing['critical_path'][0] == 'profile'
+
+        # A second execution does not reuse the first one's results
+        composite.execute({})
+        assert len(tools['fred_series'].calls) == 2
@@ -0,0 +1,168 @@
+"""
+Tests for sajha.core.fanout and CompositeTool fan-out — one wave per composite, provider limits, ordering, failure budget.
+"""
+
+import sys
+import time
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from tests.unit.fakes import FakeRegistry, FakeTool
+
+
+class _Gauge:
+    """Counts concurrent calls per key and remembers the peak."""
+
+    def __init__(self):
+        self.lock, self.now, self.peak = threading.Lock(), {}, {}
+
+    def __call__(self, key, seconds, value=None):
+        with self.lock:
+            self.now[key] = self.now.get(key, 0) + 1
+            self.peak[key] = max(self.peak.get(key, 0), self.now[key])
+        time.sleep(seconds)
+        with self.lock:
+            self.now[key] -= 1
+        return value
+
+
+def _composite(tools, steps, **definition):
+    from sajha.tools.composite_tool import CompositeTool
+    return CompositeTool({'name': 'dive', 'master_tool': 'duck_query', 'arrangement': 'parent_child',
+                          'record_path': 'rows', 'steps': steps, **definition}, FakeRegistry(tools))
+
+
+class TestFanOutScheduler:
+
+    def test_results_in_order_under_global_and_provider_limits(self):
+        from sajha.core.fanout import FanOutScheduler
+        scheduler, gauge = FanOutScheduler(max_workers=6, per_provider=4, provider_limits={'edgar': 2}), _Gauge()
+        calls = [(p, lambda i=i, p=p: gauge(p, 0.05, i)) for i in range(8) for p in ('fmp', 'edgar')]
+        start = time.monotonic()
+        outcomes = list(scheduler.run(calls))
+        assert [index for index, _ in outcomes] == list(range(16))
+        assert [value for _, value in outcomes] == [i for i in range(8) for _ in range(2)]
+        assert gauge.peak == {'fmp': 4, 'edgar': 2}
+        assert time.monotonic() - start < 0.05 * 8                 # edgar's 4 waves bound the run
+        assert scheduler.stats()['in_flight'] == 0 and scheduler.stats()['completed'] == 16
+
+    def test_failure_budget_skips_calls_not_started(self):
+        from sajha.core.fanout import FanOutScheduler, FanOutSkipped
+        scheduler = FanOutScheduler(max_workers=2, per_provider=2)
+        ran = []
+
+        def call(i):
+            ran.append(i)
+            if i < 3:
+                raise RuntimeError(f'boom {i}')
+            return i
+
+        outcomes = dict(scheduler.run([('fmp', lambda i=i: call(i)) for i in range(10)], failure_budget=1))
+        assert len(outcomes) == 10 and len(ran) < 10
+        assert all(isinstance(outcomes[i], FanOutSkipped) for i in set(range(10)) - set(ran))
+        assert isinstance(outcomes[0], RuntimeError)
+
+    def test_nested_calls_run_inline_and_count_against_their_provider(self):
+        from sajha.core.fanout import FanOutScheduler
+        scheduler, seen = FanOutScheduler(max_workers=2, per_provider=2), []
+
+        def outer():
+            inner = [('fmp', lambda: seen.append(scheduler.stats()['by_provider']) or threading.current_thread())]
+            return [value for _, value in scheduler.run(inner)]
+
+        (_, threads), = scheduler.run([('composite', outer)])
+        assert threads[0].name.startswith('composite-fanout')      # ran on the outer call's pool thread
+        assert seen == [{'composite': 1, 'fmp': 1}]
+        assert scheduler.stats()['by_provider'] == {} and scheduler.stats()['inline'] == 1
+
+
+class TestCompositeFanOut:
+
+    def test_records_run_as_one_wave_and_stay_in_record_order(self):
+        gauge = _Gauge()
+        tools = {
+            'duck_query': FakeTool(lambda a: {'rows': [{'ticker': f'T{i}'} for i in range(12)]}),
+            'fmp_profile': FakeTool(lambda a: gauge('fmp', 0.1, {'name': a['symbol']})),
+            'fred_series': FakeTool(lambda a: gauge('fred', 0.1, {'rate': 5})),
+        }
+        composite = _composite(tools, [
+            {'tool_name': 'fmp_profile', 'output_key': 'profile', 'param_mapping': {'symbol': '$.ticker'}},
+            {'tool_name': 'fred_series', 'output_key': 'rates', 'param_mapping': {}},
+        ])
+        start = time.monotonic()
+        result = composite.execute({})
+        elapsed = time.monotonic() - start
+        children = result['children']
+        assert [c['profile']['name'] for c in children] == [f'T{i}' for i in range(12)]
+        assert all(c['rates'] == {'rate': 5} for c in children)
+        assert gauge.peak['fmp'] <= 8 and gauge.peak['fred'] <= 8
+        assert elapsed < 0.1 * 5                                     # 2 waves per provider, not 12 sequential
+
+    def test_failure_budget_aborts_fanout_and_nested_composite_runs_inline(self):
+        from sajha.tools.composite_tool import CompositeTool
+        calls = []
+
+        def flaky(a):
+            calls.append(a['symbol'])
+            time.sleep(0.01)
+            return {'error': 'HTTP 429'}
+
+        tools = {
+            'duck_query': FakeTool(lambda a: {'rows': [{'ticker': f'T{i}'} for i in range(40)]}),
+            'fmp_quote': FakeTool(flaky),
+        }
+        composite = _composite(tools, [{'tool_name': 'fmp_quote', 'output_key': 'quote',
+                                        'param_mapping': {'symbol': '$.ticker'}}], failure_budget=2)
+        output = composite.execute({})
+        assert len(output['children']) == 40 and len(calls) < 40
+        assert output['fanout']['aborted'] and output['fanout']['skipped_calls'] == 40 - len(calls)
+
+        # A negative budget in the definition means "no budget", as it does in the settings
+        calls.clear()
+        output = _composite(tools, [{'tool_name': 'fmp_quote', 'output_key': 'quote',
+                                     'param_mapping': {'symbol': '$.ticker'}}], failure_budget=-1).execute({})
+        assert len(calls) == 40 and 'fanout' not in output
+
+        # A composite used as a child step of another composite does not wait on the shared pool
+        tools['inner'] = CompositeTool({'name': 'inner', 'master_tool': 'duck_query', 'arrangement': 'sibling',
+                                        'steps': [{'tool_name': 'fmp_echo', 'output_key': 'echo'}]},
+                                       FakeRegistry(tools))
+        tools['fmp_echo'] = FakeTool(lambda a: {'ok': True})
+        outer = _composite(tools, [{'tool_name': 'inner', 'output_key': 'inner', 'param_mapping': {}}])
+        output = outer.execute({})
+        assert len(output['children']) == 40 and 'fanout' not in output
+
+    def test_fanout_options_load_from_the_db_record(self, tmp_path):
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        from sajha.db.dao import CompositeToolDAO
+        from sajha.db.models import CompositeToolRecord, CompositeToolStepRecord
+        from sajha.tools.composite_tool import CompositeToolEngine
+
+        class Registry(FakeRegistry):
+            def register_tool(self, name, tool):
+                self.tools[name] = tool
+
+        engine = create_engine(f"sqlite:///{tmp_path / 'composite.db'}")
+        CompositeToolRecord.__table__.create(engine)
+        CompositeToolStepRecord.__table__.create(engine)
+        db = sessionmaker(bind=engine)()
+        steps = [{'tool_name': 'fmp_quote', 'output_key': 'quote', 'param_mapping': {'symbol': '$.ticker'}}]
+        CompositeToolDAO(db).create('dive', 'duck_query', arrangement='parent_child', record_path='rows',
+                                    steps=steps, failure_budget=2, memoize=False)
+        CompositeToolDAO(db).create('plain', 'duck_query', arrangement='parent_child', record_path='rows',
+                                    steps=steps)
+
+        tools = {
+            'duck_query': FakeTool(lambda a: {'rows': [{'ticker': f'T{i}'} for i in range(40)]}),
+            'fmp_quote': FakeTool(lambda a: {'error': 'HTTP 429'}, delay=0.01),
+        }
+        composites = CompositeToolEngine(Registry(tools))
+        assert composites.load_from_db(db) == 2
+        assert composites.get_definition('dive')['memoize'] is False
+        assert composites.get_definition('plain')['memoize'] is True
+        assert tools['dive'].execute({})['fanout']['aborted']
+        assert 'fanout' not in tools['plain'].execute({})
+        db.close()
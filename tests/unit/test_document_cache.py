@@ -0,0 +1,135 @@
+"""
+Tests for sajha.tools.document_cache — parsed MS Office document cache.
+"""
+
+import os
+import sys
+import pytest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+openpyxl = pytest.importorskip('openpyxl')
+docx = pytest.importorskip('docx')
+
+
+def _make_workbook(path, rows=50, marker='alpha'):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = 'Data'
+    for i in range(rows):
+        ws.append([f'{marker} {i}', i, f'beta gamma {i % 5}'])
+    wb.create_sheet('Other').append(['Revenue total', 1])
+    wb.save(str(path))
+
+
+def _make_docx(path):
+    doc = docx.Document()
+    for i in range(30):
+        doc.add_paragraph(f'Quarterly financial revenue {i}' if i % 3 == 0 else f'Other text {i}')
+    doc.save(str(path))
+
+
+class TestInvertedIndex:
+
+    def test_candidates_match_linear_scan(self):
+        from sajha.tools.document_cache import InvertedIndex
+        texts = ['Total revenue 2024', 'net income', 'revenue-growth rate', 'cash flow']
+        idx = InvertedIndex()
+        for i, t in enumerate(texts):
+            idx.add(i, t)
+        for term in ['revenue', 'venue gro', 'INCOME', 'flow', 'missing', 'e', 'enue-gr', 'l 2024', ' inc', 'ven']:
+            expected = {i for i, t in enumerate(texts) if term.lower() in t.lower()}
+            found = {i for i in idx.candidates(term) if term.lower() in texts[i].lower()}
+            assert found == expected
+
+    def test_non_word_term_cannot_narrow(self):
+        from sajha.tools.document_cache import InvertedIndex
+        idx = InvertedIndex()
+        idx.add(0, 'a-b')
+        assert idx.candidates('-') is None
+
+
+class TestDocumentCache:
+
+    def test_word_entry_is_reused(self, tmp_path):
+        from sajha.tools.document_cache import DocumentCache
+        path = tmp_path / 'a.docx'
+        _make_docx(path)
+        cache = DocumentCache()
+        first = cache.get_word(path)
+        assert cache.get_word(path) is first
+        assert cache.stats()['hits'] == 1
+        assert len(first.search('financial REV')) == 10
+
+    def test_modified_file_is_reparsed(self, tmp_path):
+        from sajha.tools.document_cache import DocumentCache
+        path = tmp_path / 'a.xlsx'
+        _make_workbook(path, marker='alpha')
+        cache = DocumentCache()
+        wb = cache.get_workbook(path)
+        assert wb.read_rows('Data', 5).rows[0][0] == 'alpha 0'
+        _make_workbook(path, rows=60, marker='omega')
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        wb2 = cache.get_workbook(path)
+        assert wb2 is not wb
+        assert wb2.read_rows('Data', 5).rows[0][0] == 'omega 0'
+
+    def test_lazy_prefix_and_range(self, tmp_path):
+        from sajha.tools.document_cache import DocumentCache
+        path = tmp_path / 'a.xlsx'
+        _make_workbook(path, rows=50)
+        wb = DocumentCache().get_workbook(path)
+        assert len(wb.read_rows('Data', 10).rows) == 10
+        sheet = wb.read_rows('Data', 1000)
+        assert len(sheet.rows) == 50 and sheet.complete
+        assert wb.read_range('Data', 'B2:C3') == [[1, 'beta gamma 1'], [2, 'beta gamma 2']]
+
+    @pytest.mark.parametrize('threshold', [0, 10 * 1024 * 1024])
+    def test_prefix_extension_resumes_the_open_reader(self, tmp_path, monkeypatch, threshold):
+        from sajha.tools.document_cache import DocumentCache
+        path = tmp_path / 'a.xlsx'
+        _make_workbook(path, rows=50)
+        opened = []
+        real = openpyxl.load_workbook
+        monkeypatch.setattr(openpyxl, 'load_workbook', lambda *a, **kw: opened.append(kw) or real(*a, **kw))
+        cache = DocumentCache(streaming_threshold_bytes=threshold)
+        wb = cache.get_workbook(path)
+        for n in (5, 10, 20, 35):
+            assert [r[1] for r in wb.read_rows('Data', n).rows] == list(range(n))
+        assert len(opened) == 2                               # sheet names, then one reader for every extension
+        sheet = wb.read_rows('Data', 1000)
+        assert len(sheet.rows) == 50 and sheet.complete and sheet.cursor is None
+
+        wb.read_rows('Other', 0)                              # nothing requested: no reader opened
+        held = wb.size_bytes
+        partial = wb.read_rows('Data', 3, include_formulas=True)
+        assert partial.cursor is not None
+        charged = wb.size_bytes
+        assert charged - held >= 50 * path.stat().st_size                  # a loaded workbook is charged
+        cache.invalidate(path)                                # dropping the entry releases the reader
+        assert partial.cursor is None and wb.size_bytes == charged - 50 * path.stat().st_size
+        assert len(wb.read_rows('Data', 6, include_formulas=True).rows) == 6   # and a late caller reopens one
+
+    def test_streaming_search_matches_linear_scan(self, tmp_path):
+        from sajha.tools.document_cache import DocumentCache
+        path = tmp_path / 'a.xlsx'
+        _make_workbook(path, rows=50)
+        cache = DocumentCache(streaming_threshold_bytes=0)
+        wb = cache.get_workbook(path)
+        assert wb.streaming
+        matches = wb.search('Data', 'GAMMA 3', max_rows=50)
+        assert [m['row_index'] for m in matches] == [i for i in range(50) if i % 5 == 3]
+
+    def test_lru_eviction_by_count(self, tmp_path):
+        from sajha.tools.document_cache import DocumentCache
+        cache = DocumentCache(max_documents=2)
+        paths = []
+        for n in range(3):
+            p = tmp_path / f'{n}.docx'
+            _make_docx(p)
+            paths.append(p)
+            cache.get_word(p)
+        stats = cache.stats()
+        assert stats['documents'] == 2 and stats['evictions'] == 1
@@ -0,0 +1,108 @@
+"""
+Tests for sajha.core.duckdb_engine — the shared DuckDB engine behind the duckdb_* and sqlselect_* tools.
+"""
+
+import sys
+import threading
+import time
+import pytest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+
+@pytest.fixture
+def engine(tmp_path):
+    from sajha.core.duckdb_engine import DuckDBEngine
+    eng = DuckDBEngine(database=':memory:', memory_limit='256MB', threads=2, watch_interval=1)
+    yield eng
+    eng.close()
+
+
+@pytest.fixture
+def shared_engine(engine, monkeypatch):
+    import sajha.core.duckdb_engine as mod
+    monkeypatch.setattr(mod, '_engine', engine)
+    return engine
+
+
+def _write_csv(path, rows):
+    path.write_text('id,amount\n' + ''.join(f'{i},{i * 10}\n' for i in range(rows)))
+
+
+class TestDuckDBEngine:
+
+    def test_settings_applied_and_cursors_per_thread(self, engine):
+        cur = engine.cursor()
+        assert engine.cursor() is cur
+        assert cur.execute("SELECT current_setting('threads')").fetchone()[0] == 2
+        other = []
+        t = threading.Thread(target=lambda: other.append(engine.cursor()))
+        t.start()
+        t.join()
+        assert other[0] is not cur
+        assert engine.stats()['cursors_opened'] == 2
+
+    def test_register_view_is_idempotent(self, engine, tmp_path):
+        csv = tmp_path / 'sales.csv'
+        _write_csv(csv, 3)
+        assert engine.register_view('sales', str(csv), 'csv', schema='s1')
+        assert not engine.register_view('sales', str(csv), 'csv', schema='s1')
+        assert engine.cursor('s1').execute('SELECT SUM(amount) FROM sales').fetchone()[0] == 30
+        assert engine.stats()['registrations_skipped'] == 1
+
+    def test_single_watcher_syncs_directory(self, engine, tmp_path):
+        _write_csv(tmp_path / 'a.csv', 2)
+        watchers_before = [t for t in threading.enumerate() if t.name == 'duckdb-watcher']
+        engine.register_directory(str(tmp_path), interval=1)
+        engine.register_directory(str(tmp_path), interval=1)
+        assert set(engine.views('main')) == {'main.a'}
+
+        _write_csv(tmp_path / 'b-2.csv', 5)
+        (tmp_path / 'a.csv').unlink()
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline and set(engine.views('main')) != {'main.b_2'}:
+            time.sleep(0.1)
+        assert set(engine.views('main')) == {'main.b_2'}
+        assert engine.cursor().execute('SELECT COUNT(*) FROM b_2').fetchone()[0] == 5
+        watchers = [t for t in threading.enumerate() if t.name == 'duckdb-watcher']
+        assert len(watchers) == len(watchers_before) + 1
+
+    def test_reregistering_with_new_options_rebuilds_views(self, engine, tmp_path):
+        _write_csv(tmp_path / 'a.csv', 2)
+        engine.register_directory(str(tmp_path), watch=False)
+        assert engine.cursor().execute('SELECT COUNT(*) FROM a').fetchone()[0] == 2
+
+        changes = engine.register_directory(str(tmp_path), csv_options='header=false', watch=False)
+        assert changes['reloaded'] == ['a']
+        assert engine.cursor().execute('SELECT COUNT(*) FROM a').fetchone()[0] == 3
+
+        changes = engine.register_directory(str(tmp_path), schema='s2', csv_options='header=false', watch=False)
+        assert changes == {'added': ['a'], 'removed': ['main.a'], 'reloaded': []}
+        assert set(engine.views()) == {'s2.a'}
+        assert engine.cursor('s2').execute('SELECT COUNT(*) FROM a').fetchone()[0] == 3
+
+class TestToolsShareEngine:
+
+    def test_duckdb_tools_share_catalog(self, shared_engine, tmp_path):
+        from sajha.tools.impl.duckdb_olap_tools_refactored import DuckDbListTablesTool, DuckDbDescribeTableTool
+        _write_csv(tmp_path / 'trades.csv', 4)
+        config = {'data_directory': str(tmp_path), 'auto_refresh_interval': 60}
+        tables = DuckDbListTablesTool(config)
+        describe = DuckDbDescribeTableTool(config)
+        assert tables.engine is describe.engine is shared_engine
+        assert [t['name'] for t in tables.execute({})['tables']] == ['trades']
+        assert describe.execute({'table_name': 'trades'})['row_count'] == 4
+        assert shared_engine.stats()['directories'] == 1
+
+    def test_sqlselect_sources_in_own_schema(self, shared_engine, tmp_path):
+        from sajha.tools.impl.sqlselect_tool_refactored import (
+            SqlSelectCountRowsTool, SqlSelectExecuteQueryTool)
+        _write_csv(tmp_path / 'orders.csv', 7)
+        config = {'data_directory': str(tmp_path),
+                  'data_sources': {'orders': {'file': 'orders.csv', 'type': 'csv'}}}
+        count = SqlSelectCountRowsTool(config)
+        SqlSelectExecuteQueryTool(config)
+        assert count.execute({'source_name': 'orders'})['row_count'] == 7
+        assert set(shared_engine.views()) == {'sqlselect.orders'}
+        assert shared_engine.stats()['registrations_skipped'] == 1
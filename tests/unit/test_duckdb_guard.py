@@ -0,0 +1,113 @@
+"""
+Tests for sajha.core.duckdb_guard — plan-estimate admission, tenant slots and deadlines for raw SQL.
+"""
+
+import sys
+import pytest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+
+@pytest.fixture
+def cursor():
+    import duckdb
+    conn = duckdb.connect(':memory:')
+    cur = conn.cursor()
+    cur.execute("CREATE TABLE t AS SELECT range AS i, range % 100 AS g FROM range(100000)")
+    yield cur
+    conn.close()
+
+
+def _rows(result):
+    return result.fetchall()
+
+
+class TestQueryGuard:
+
+    def test_limit_rewrite_caps_queries_with_inner_limit(self, cursor):
+        from sajha.core.duckdb_guard import QueryGuard, limit_query
+        assert limit_query('SHOW TABLES', 10) == 'SHOW TABLES'
+        rows, resources = QueryGuard().run(
+            cursor, 'SELECT * FROM (SELECT i FROM t LIMIT 5000) s -- trailing comment', _rows, limit=3)
+        assert len(rows) == 3
+        assert resources['sql'].endswith('LIMIT 3')
+
+    def test_cross_product_rejected_before_running(self, cursor):
+        from sajha.core.duckdb_guard import QueryGuard, QueryRejected
+        guard = QueryGuard(max_estimated_rows=1_000_000)
+        with pytest.raises(QueryRejected) as exc:
+            guard.run(cursor, 'SELECT COUNT(*) FROM t a, t b', _rows, limit=10)
+        assert exc.value.reason == 'over_budget'
+        assert exc.value.estimate.peak_rows == 100000 * 100000
+        assert 'cross product' in str(exc.value)
+
+        # Streaming into the LIMIT, the same join is cheap
+        rows, resources = guard.run(cursor, 'SELECT a.i, b.i FROM t a, t b', _rows, limit=10)
+        assert len(rows) == 10 and resources['estimated_peak_rows'] <= 100000
+        assert guard.stats()['rejected_over_budget'] == 1
+
+    def test_deadline_interrupts_query(self, cursor):
+        from sajha.core.duckdb_guard import QueryGuard, QueryRejected
+        guard = QueryGuard(max_estimated_rows=0, timeout_seconds=0.2)
+        with pytest.raises(QueryRejected) as exc:
+            guard.run(cursor, 'SELECT COUNT(*) FROM t a, t b, t c', _rows, limit=10)
+        assert exc.value.reason == 'timeout'
+        assert guard.stats()['running'] == {}
+        assert cursor.execute('SELECT COUNT(*) FROM t').fetchone()[0] == 100000
+
+    def test_tenant_slots(self, cursor):
+        from sajha.core.duckdb_guard import QueryGuard, QueryRejected
+        guard = QueryGuard(max_concurrent=2, slots_per_tenant=1, slot_wait_seconds=0)
+        guard.acquire('acme')
+        with pytest.raises(QueryRejected) as exc:
+            guard.run(cursor, 'SELECT 1', _rows, tenant='acme')
+        assert exc.value.reason == 'busy'
+        assert guard.run(cursor, 'SELECT 1', _rows, tenant='globex')[0] == [(1,)]
+
+        guard.acquire('initech')
+        with pytest.raises(QueryRejected):
+            guard.run(cursor, 'SELECT 1', _rows, tenant='globex')
+        guard.release('acme')
+        guard.release('initech')
+        assert guard.stats()['rejected_busy'] == 2
+
+    def test_tenant_is_set_by_the_server_and_follows_fanout(self):
+        from sajha.core.duckdb_guard import tenant_of, tenant_scope
+        from sajha.core.fanout import FanOutScheduler
+        assert tenant_of() == 'default'
+        with tenant_scope('alice'):
+            outcomes = list(FanOutScheduler(max_workers=2, per_provider=2).run([('fmp', tenant_of)] * 3))
+        assert [tenant for _, tenant in outcomes] == ['alice'] * 3
+        assert tenant_of() == 'default'
+
+
+class TestDuckDBSQLTool:
+
+    def test_reports_resources_and_rejections(self, tmp_path, monkeypatch):
+        import sajha.core.duckdb_engine as engine_mod
+        import sajha.core.duckdb_guard as guard_mod
+        from sajha.core.duckdb_engine import DuckDBEngine
+        from sajha.tools.impl.duckdb_olap_advanced import DuckDBSQLTool
+        engine = DuckDBEngine(database=':memory:', temp_directory=str(tmp_path / 'spill'))
+        monkeypatch.setattr(engine_mod, '_engine', engine)
+        monkeypatch.setattr(guard_mod, '_guard', guard_mod.QueryGuard(max_estimated_rows=1_000_000))
+        (tmp_path / 'orders.csv').write_text('id,amount\n' + ''.join(f'{i},{i}\n' for i in range(2000)))
+        tool = DuckDBSQLTool({'data_directory': str(tmp_path)})
+
+        result = tool.execute({'sql': 'SELECT id FROM orders ORDER BY id DESC', 'limit': 5})
+        assert result['success'] and [r['id'] for r in result['data']] == [1999, 1998, 1997, 1996, 1995]
+        resources = result['resources']
+        assert resources['estimated_peak_rows'] > 5 and resources['elapsed_ms'] >= 0
+        assert 'slot_wait_ms' in resources and resources['tenant'] == 'default'
+
+        # The caller's user is the tenant; a client-supplied _tenant_id cannot pick another
+        from sajha.core.duckdb_guard import tenant_scope
+        with tenant_scope('alice'):
+            result = tool.execute({'sql': 'SELECT id FROM orders', 'limit': 1, '_tenant_id': 'spoofed'})
+        assert result['resources']['tenant'] == 'alice'
+
+        result = tool.execute({'sql': 'SELECT COUNT(*) FROM orders a, orders b'})
+        assert not result['success'] and result['rejected'] == 'over_budget'
+        assert engine.stats()['temp_directory'] == str(tmp_path / 'spill')
+        engine.close()
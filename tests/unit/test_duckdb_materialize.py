@@ -0,0 +1,161 @@
+"""
+Tests for sajha.core.duckdb_materialize — columnar copies of CSV sources behind the shared DuckDB engine.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+
+def _write_csv(path, rows, scale=10):
+    # Rows written in reverse so sorting is observable
+    path.write_text('id,amount,region\n' + ''.join(
+        f'{i},{i * scale},{"EU" if i % 2 else "US"}\n' for i in reversed(range(rows))))
+
+
+def _engine(tmp_path, mode='parquet', **kw):
+    from sajha.core.duckdb_engine import DuckDBEngine
+    from sajha.core.duckdb_materialize import ColumnarMaterializer
+    return DuckDBEngine(database=':memory:', materializer=ColumnarMaterializer(
+        str(tmp_path / 'cache'), mode=mode, row_group_size=1024, **kw))
+
+
+class TestColumnarMaterializer:
+
+    def test_view_reads_parquet_copy_and_reuses_it(self, tmp_path):
+        csv = tmp_path / 'trades.csv'
+        _write_csv(csv, 100)
+        engine = _engine(tmp_path)
+        assert engine.register_view('trades', str(csv), 'csv')
+        source = engine.views()['main.trades']['source']
+        assert source.startswith('read_parquet(') and '.columnar' not in source
+        assert engine.cursor().execute('SELECT SUM(amount) FROM trades').fetchone()[0] == 49500
+
+        engine.source_for(str(csv))
+        stats = engine.materializer.stats()
+        assert (stats['built'], stats['reused']) == (1, 1)
+        engine.close()
+
+    def test_touch_keeps_copy_and_edit_rebuilds(self, tmp_path):
+        csv = tmp_path / 'trades.csv'
+        _write_csv(csv, 10)
+        engine = _engine(tmp_path)
+        engine.register_view('trades', str(csv), 'csv')
+
+        st = os.stat(csv)
+        os.utime(csv, ns=(st.st_atime_ns, st.st_mtime_ns + 5_000_000_000))
+        engine.register_view('trades', str(csv), 'csv')
+        assert engine.materializer.stats()['built'] == 1
+        assert engine.materializer.stats()['rehashed'] == 1
+
+        _write_csv(csv, 10, scale=100)
+        os.utime(csv, ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000_000))
+        engine.register_view('trades', str(csv), 'csv')
+        assert engine.materializer.stats()['built'] == 2
+        assert engine.cursor().execute('SELECT MAX(amount) FROM trades').fetchone()[0] == 900
+        engine.close()
+
+    def test_changed_read_options_rebuild(self, tmp_path):
+        import duckdb
+        from sajha.core.duckdb_materialize import ColumnarMaterializer
+        csv = tmp_path / 'codes.csv'
+        csv.write_text('code;name\n7;bond\n')
+        materializer, conn = ColumnarMaterializer(str(tmp_path / 'cache')), duckdb.connect()
+        sniffed = f"read_csv_auto('{csv}')"
+        typed = f"read_csv_auto('{csv}', delim=';', header=true, types={{'code': 'VARCHAR'}})"
+
+        def first_row(raw_source):
+            return conn.execute(f"SELECT * FROM {materializer.materialize(conn, str(csv), raw_source)}").fetchone()
+
+        assert first_row(sniffed) == (7, 'bond')
+        assert first_row(typed) == ('7', 'bond')                   # new options: not the sniffed copy
+        assert first_row(typed) == ('7', 'bond')
+        assert (materializer.stats()['built'], materializer.stats()['reused']) == (2, 1)
+        conn.close()
+
+    def test_sort_keys_give_disjoint_zone_maps(self, tmp_path):
+        csv = tmp_path / 'big.csv'
+        _write_csv(csv, 5000)
+        engine = _engine(tmp_path)
+        engine.register_view('big', str(csv), 'csv', sort_keys=['id'])
+        artifact = next(iter(engine.materializer.entries().values()))['artifact']
+        ranges = engine.cursor().execute(
+            "SELECT CAST(stats_min AS INT), CAST(stats_max AS INT) FROM parquet_metadata(?) "
+            "WHERE path_in_schema = 'id' ORDER BY row_group_id", [artifact]).fetchall()
+        assert len(ranges) > 1
+        assert all(prev[1] < cur[0] for prev, cur in zip(ranges, ranges[1:]))
+        engine.close()
+
+    def test_table_mode_and_eviction_on_delete(self, tmp_path):
+        data = tmp_path / 'data'
+        data.mkdir()
+        _write_csv(data / 'orders.csv', 20)
+        engine = _engine(tmp_path, mode='table')
+        engine.register_directory(str(data), watch=False)
+        assert engine.views()['main.orders']['source'].startswith('"_columnar".')
+        assert engine.cursor().execute('SELECT COUNT(*) FROM orders').fetchone()[0] == 20
+
+        (data / 'orders.csv').unlink()
+        assert engine.sync_directory(str(data))['removed'] == ['orders']
+        assert engine.materializer.entries() == {}
+        assert engine.cursor().execute(
+            "SELECT COUNT(*) FROM information_schema.tables WHERE table_schema = '_columnar'").fetchone()[0] == 0
+        engine.close()
+
+    def test_engine_stays_usable_while_a_large_csv_converts(self, tmp_path):
+        import threading
+        data = tmp_path / 'data'
+        data.mkdir()
+        _write_csv(data / 'big.csv', 50)
+        engine = _engine(tmp_path)
+        (tmp_path / 'small.csv').write_text('x\n1\n')
+        engine.register_view('small', str(tmp_path / 'small.csv'), 'csv')
+
+        started, release, build = threading.Event(), threading.Event(), engine.materializer._build
+
+        def slow_build(*args):
+            started.set()
+            release.wait(5)
+            return build(*args)
+
+        engine.materializer._build = slow_build
+        sync = threading.Thread(target=engine.register_directory, args=(str(data),), kwargs={'watch': False})
+        sync.start()
+        assert started.wait(5)
+        answers = []
+        reader = threading.Thread(target=lambda: answers.append(
+            engine.cursor().execute('SELECT COUNT(*) FROM small').fetchone()[0]))   # a new thread's cursor
+        reader.start()
+        reader.join(2)
+        assert answers == [1] and 'main.big' not in engine.views()
+
+        release.set()
+        sync.join(5)
+        assert engine.cursor().execute('SELECT COUNT(*) FROM big').fetchone()[0] == 50
+        engine.close()
+
+    def test_small_files_queried_in_place(self, tmp_path):
+        csv = tmp_path / 'tiny.csv'
+        _write_csv(csv, 3)
+        engine = _engine(tmp_path, min_size_mb=1)
+        engine.register_view('tiny', str(csv), 'csv')
+        assert engine.views()['main.tiny']['source'].startswith('read_csv_auto(')
+        engine.close()
+
+
+class TestDuckDBSQLTool:
+
+    def test_queries_materialized_views(self, tmp_path, monkeypatch):
+        import sajha.core.duckdb_engine as mod
+        from sajha.tools.impl.duckdb_olap_advanced import DuckDBSQLTool
+        engine = _engine(tmp_path)
+        monkeypatch.setattr(mod, '_engine', engine)
+        for name in ('customers', 'orders', 'products'):
+            _write_csv(tmp_path / f'{name}.csv', 5)
+        tool = DuckDBSQLTool({'data_directory': str(tmp_path)})
+        result = tool.execute({'sql': 'SELECT COUNT(*) AS n FROM orders'})
+        assert result['success'] and result['data'] == [{'n': 5}]
+        assert engine.materializer.stats()['built'] == 3
+        engine.close()
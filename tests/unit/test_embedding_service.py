@@ -0,0 +1,78 @@
+"""
+Tests for sajha.ai.embeddings — content-hash cache, dedup and micro-batching behind LLMGateway.embed.
+"""
+
+import sys
+import threading
+import pytest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+
+def _gateway(tmp_path, **config):
+    from sajha.ai.gateway import LLMGateway, GatewayConfig
+    gw = LLMGateway(GatewayConfig(default_embedding_provider='stub', default_embedding_model='stub-embed',
+                                  embedding_disk_path=str(tmp_path / 'embeddings.sqlite'), **config))
+    provider = gw.register_provider('stub', dimension=32, latency_ms=20)
+    return gw, provider
+
+
+class TestEmbeddingService:
+
+    def test_cache_and_dedup(self, tmp_path):
+        gw, provider = _gateway(tmp_path)
+        calls, texts = provider.embed_calls, provider.embedded_texts
+        first = gw.embed(['fx spot rates', 'equity prices', 'fx spot rates'])
+        assert first.embeddings[0] == first.embeddings[2] and first.dimensions == 32
+        assert provider.embedded_texts - texts == 2
+
+        again = gw.embed(['equity prices', 'bond yields'])
+        assert again.embeddings[0] == first.embeddings[1]
+        assert (provider.embed_calls - calls, provider.embedded_texts - texts) == (2, 3)
+
+        # A new gateway (restart) reads the vectors back from disk
+        restarted, _ = _gateway(tmp_path)
+        # float32 on disk
+        assert restarted.embed(['bond yields']).embeddings[0] == pytest.approx(again.embeddings[1], abs=1e-6)
+        assert provider.embedded_texts - texts == 3
+        assert restarted.get_stats()['embeddings']['cache']['disk_hits'] == 1
+
+    def test_concurrent_requests_are_coalesced(self, tmp_path):
+        gw, provider = _gateway(tmp_path, embedding_batch_wait_ms=50)
+        calls = provider.embed_calls
+        results = {}
+
+        def worker(i):
+            results[i] = gw.embed([f'query {i}', 'shared text']).embeddings
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(20)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(results) == 20
+        assert provider.embed_calls - calls <= 3
+        assert all(r[1] == results[0][1] for r in results.values())
+
+    def test_tool_index_rebuild_hits_cache(self, tmp_path):
+        from sajha.ai.embedders import GatewayEmbedder
+        from sajha.ai.tool_resolver import ToolEmbeddingIndex
+
+        class Tool:
+            def __init__(self, description):
+                self.config = {'description': description}
+
+        class Registry:
+            tools = {'fx_rates': Tool('FX spot rates'), 'equity_quote': Tool('Equity quotes')}
+
+        gw, provider = _gateway(tmp_path)
+        embedder = GatewayEmbedder(gw, model='stub-embed')
+        texts = provider.embedded_texts
+        ToolEmbeddingIndex(persist=False).sync(Registry, embedder)
+        assert provider.embedded_texts - texts == 2
+
+        Registry.tools['fx_rates'] = Tool('FX spot and forward rates')
+        fresh = ToolEmbeddingIndex(persist=False)
+        assert fresh.sync(Registry, embedder)['embedded'] == 2
+        assert provider.embedded_texts - texts == 3      # only the changed description
@@ -0,0 +1,221 @@
+"""
+Tests for the non-blocking audit/webhook pipeline (sajha.core.event_bus, audit, webhooks).
+"""
+
+import json
+import sys
+import threading
+import time
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+
+class TestEventBus:
+
+    def test_events_are_batched_per_topic(self):
+        from sajha.core.event_bus import EventBus
+        bus = EventBus(queue_size=1000, batch_size=50)
+        gate = threading.Event()
+        batches = []
+
+        def handler(events):
+            gate.wait(5)
+            batches.append(list(events))
+
+        bus.register('t', handler)
+        bus.publish('t', -1)
+        time.sleep(0.05)            # consumer is now parked in the first batch
+        for i in range(120):
+            assert bus.publish('t', i)
+        gate.set()
+        assert bus.flush(5)
+        assert sum(len(b) for b in batches) == 121
+        assert max(len(b) for b in batches) == 50
+        bus.stop()
+
+    def test_full_queue_drops_without_blocking(self):
+        from sajha.core.event_bus import EventBus
+        bus = EventBus(queue_size=2, batch_size=1)
+        gate = threading.Event()
+        bus.register('t', lambda events: gate.wait(5))
+        bus.publish('t', 0)
+        time.sleep(0.05)
+        results = [bus.publish('t', i) for i in range(5)]
+        assert results == [True, True, False, False, False]
+        assert bus.stats()['dropped'] == 3
+        gate.set()
+        bus.stop()
+
+
+class TestAuditLogger:
+
+    def test_rows_written_in_one_multi_row_insert(self, monkeypatch, tmp_path):
+        from sqlalchemy import create_engine, event
+        from sqlalchemy.orm import sessionmaker
+        from sajha.db.models import AuditLog
+        import sajha.db.engine as db_engine
+        from sajha.core.event_bus import EventBus
+        from sajha.core.audit import AuditLogger
+
+        engine = create_engine(f"sqlite:///{tmp_path / 'audit.db'}")
+        AuditLog.__table__.create(engine)
+        statements = []
+        event.listen(engine, 'before_cursor_execute',
+                     lambda conn, cursor, stmt, params, ctx, many: statements.append(stmt)
+                     if stmt.startswith('INSERT') else None)
+        monkeypatch.setattr(db_engine, 'get_db_session', sessionmaker(bind=engine))
+
+        bus = EventBus(batch_size=500)
+        gate = threading.Event()
+        audit = AuditLogger(bus=bus, spill_file=str(tmp_path / 'spill.jsonl'))
+        bus.register('hold', lambda events: gate.wait(5))
+        bus.publish('hold', None)
+        time.sleep(0.05)
+        for i in range(100):
+            audit.log('tool_execute', user_id=f'u{i}', resource_type='tool', resource_id='x')
+        gate.set()
+        assert audit.flush(5)
+
+        with engine.connect() as conn:
+            assert conn.exec_driver_sql('SELECT COUNT(*) FROM audit_log').scalar() == 100
+        assert len(statements) <= 2
+        assert audit.stats() == {'written': 100, 'failed': 0, 'spilled': 0}
+        bus.stop()
+
+    def test_failed_batch_is_spilled_and_replayed(self, monkeypatch, tmp_path):
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        from sajha.db.models import AuditLog
+        import sajha.db.engine as db_engine
+        from sajha.core.event_bus import EventBus
+        from sajha.core.audit import AuditLogger
+
+        engine = create_engine(f"sqlite:///{tmp_path / 'audit.db'}")
+        AuditLog.__table__.create(engine)
+        healthy, outage = sessionmaker(bind=engine), {'on': True}
+
+        def session():
+            if outage['on']:
+                raise RuntimeError('database is locked')
+            return healthy()
+
+        monkeypatch.setattr(db_engine, 'get_db_session', session)
+        spill = tmp_path / 'spill.jsonl'
+        bus = EventBus()
+        audit = AuditLogger(bus=bus, spill_file=str(spill))
+        for i in range(5):
+            audit.log('login_success', user_id=f'u{i}')
+        assert audit.flush(5)
+        assert audit.stats() == {'written': 0, 'failed': 5, 'spilled': 5}
+        assert len(spill.read_text().splitlines()) == 5
+
+        outage['on'] = False
+        audit.log('logout', user_id='u9')
+        assert audit.flush(5)
+        with engine.connect() as conn:
+            assert conn.exec_driver_sql('SELECT COUNT(*) FROM audit_log').scalar() == 6
+        assert audit.stats() == {'written': 6, 'failed': 5, 'spilled': 0}
+        assert not spill.exists()
+        bus.stop()
+
+
+class _Hook(BaseHTTPRequestHandler):
+    fail_first = {}
+    received = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        remaining = type(self).fail_first.get(self.path, 0)
+        if self.path == '/dead' or remaining:
+            type(self).fail_first[self.path] = max(0, remaining - 1)
+            self.send_response(500)
+        else:
+            type(self).received.append((self.path, json.loads(body)))
+            self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+
+@pytest.fixture(scope='module')
+def hook_server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), _Hook)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{httpd.server_address[1]}'
+    httpd.shutdown()
+
+
+def _wait_for(predicate, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+class TestWebhookManager:
+
+    def test_burst_uses_fixed_worker_pool(self, hook_server, tmp_path):
+        from sajha.core.event_bus import EventBus
+        from sajha.core.webhooks import WebhookManager
+        _Hook.received.clear()
+        mgr = WebhookManager(workers=3, bus=EventBus(), dead_letter_file=str(tmp_path / 'dl.jsonl'))
+        for n in range(5):
+            mgr.subscribe('tool.completed', f'{hook_server}/sub{n}')
+
+        before = threading.active_count()
+        for i in range(200):
+            mgr.notify('tool.completed', {'i': i})
+        assert mgr.flush(20)
+        assert len(_Hook.received) == 1000
+        assert mgr.delivery_stats()['workers'] == 3
+        sub0 = [p['data']['i'] for path, p in _Hook.received if path == '/sub0']
+        assert sub0 == list(range(200))   # per-endpoint order is preserved
+        # bus thread + 3 workers, plus short-lived HTTP server handler threads
+        assert threading.active_count() - before < 10
+
+    def test_retry_keeps_per_endpoint_order(self, hook_server, tmp_path):
+        from sajha.core.event_bus import EventBus
+        from sajha.core.webhooks import WebhookManager
+        _Hook.received.clear()
+        _Hook.fail_first['/ordered'] = 1
+        mgr = WebhookManager(workers=2, max_retries=3, backoff_seconds=0.05, bus=EventBus(),
+                             dead_letter_file=str(tmp_path / 'dl.jsonl'))
+        mgr.subscribe('tool.completed', f'{hook_server}/ordered')
+        for i in range(10):
+            mgr.notify('tool.completed', {'i': i})
+
+        assert _wait_for(lambda: len(_Hook.received) == 10)
+        assert [p['data']['i'] for _, p in _Hook.received] == list(range(10))   # event 0 retried first
+        assert mgr.delivery_stats()['held_endpoints'] == 0
+
+    def test_retry_then_dead_letter_and_redeliver(self, hook_server, tmp_path):
+        from sajha.core.event_bus import EventBus
+        from sajha.core.webhooks import WebhookManager
+        _Hook.received.clear()
+        _Hook.fail_first['/flaky'] = 1
+        dl = tmp_path / 'dl.jsonl'
+        mgr = WebhookManager(workers=2, max_retries=2, backoff_seconds=0.01, bus=EventBus(),
+                             dead_letter_file=str(dl))
+        mgr.subscribe('task.failed', f'{hook_server}/flaky')
+        mgr.subscribe('task.failed', f'{hook_server}/dead')
+        mgr.notify('task.failed', {'id': 't1'})
+
+        assert _wait_for(lambda: any(p == '/flaky' for p, _ in _Hook.received))
+        assert _wait_for(lambda: mgr.delivery_stats()['dead_lettered'] == 1)
+        dead = mgr.list_dead_letters()
+        assert dead[0]['url'].endswith('/dead') and dead[0]['attempts'] == 2
+
+        # Point the dead-lettered URL somewhere healthy and redeliver
+        record = json.loads(dl.read_text())
+        record['url'] = f'{hook_server}/recovered'
+        dl.write_text(json.dumps(record) + '\n')
+        assert mgr.redeliver_dead_letters() == 1
+        assert _wait_for(lambda: any(p == '/recovered' for p, _ in _Hook.received))
+        assert not dl.exists()
@@ -0,0 +1,101 @@
+"""
+Tests for LLMGateway.acomplete / astream — async completions, token streaming and cancellation.
+"""
+
+import sys
+import time
+import asyncio
+import pytest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+
+def _gateway(latency_ms=10):
+    from sajha.ai.gateway import LLMGateway, GatewayConfig
+    gw = LLMGateway(GatewayConfig(default_provider='stub', default_model='stub-chat'))
+    provider = gw.register_provider('stub', dimension=8, latency_ms=latency_ms)
+    return gw, provider
+
+
+class TestGatewayStreaming:
+
+    def test_stream_reports_ttft_and_caches_result(self):
+        gw, provider = _gateway()
+
+        async def run():
+            metrics = {}
+            chunks = [c async for c in gw.astream('one two three', metrics=metrics, temperature=0.1)]
+            replay = {}
+            cached = [c async for c in gw.astream('one two three', metrics=replay, temperature=0.1)]
+            return chunks, metrics, cached, replay
+
+        chunks, metrics, cached, replay = asyncio.run(run())
+        assert ''.join(chunks) == '[stub:stub-chat] one two three' and len(chunks) == 4
+        assert metrics['outcome'] == 'completed' and metrics['chunks'] == 4
+        assert 0 < metrics['ttft_ms'] <= metrics['duration_ms']
+        assert cached == [''.join(chunks)] and replay['cached']
+        assert gw.get_stats()['streaming']['completed'] == 1
+
+    def test_closing_the_stream_stops_upstream(self):
+        gw, provider = _gateway()
+        before = provider.streamed_chunks
+
+        async def run():
+            stream = gw.astream('a b c d e f g h', use_cache=False)
+            first = await stream.__anext__()
+            await stream.aclose()
+            return first
+
+        assert asyncio.run(run()).startswith('[stub')
+        assert provider.streamed_chunks - before == 1
+        assert gw.get_stats()['streaming']['cancelled'] == 1
+
+    def test_concurrent_streams_do_not_block_the_loop(self):
+        gw, _ = _gateway(latency_ms=50)
+
+        async def one(i):
+            return ''.join([c async for c in gw.astream(f'request {i}', use_cache=False)])
+
+        async def run():
+            return await asyncio.gather(*(one(i) for i in range(40)))
+
+        start = time.perf_counter()
+        results = asyncio.run(run())
+        assert len(set(results)) == 40
+        assert time.perf_counter() - start < 1.5     # 3 chunks x 50 ms each, all in parallel
+
+    def test_sync_only_provider_is_bridged(self):
+        from sajha.ai.providers import LLMProvider
+        from sajha.ai.providers.stub_provider import StubProvider
+
+        class SyncOnly(StubProvider):
+            astream = LLMProvider.astream
+            acomplete = LLMProvider.acomplete
+
+        gw, _ = _gateway()
+        gw._providers['sync'] = SyncOnly(latency_ms=10)
+
+        async def run():
+            chunks = [c async for c in gw.astream('x y', provider='sync', use_cache=False)]
+            response = await gw.acomplete('x y', provider='sync', use_cache=False)
+            return chunks, response
+
+        chunks, response = asyncio.run(run())
+        assert ''.join(chunks) == response.content == '[stub:stub-chat] x y'
+
+    def test_stream_that_raises_on_call_fails_instead_of_hanging(self):
+        from sajha.ai.providers import LLMProvider
+        from sajha.ai.providers.stub_provider import StubProvider
+
+        class NoStreaming(StubProvider):
+            astream = LLMProvider.astream
+
+            def stream(self, *args, **kwargs):
+                raise NotImplementedError('streaming not supported')
+
+        async def run():
+            return [c async for c in NoStreaming().astream([{'role': 'user', 'content': 'x'}], 'stub-chat')]
+
+        with pytest.raises(NotImplementedError, match='streaming not supported'):
+            asyncio.run(asyncio.wait_for(run(), timeout=5))
@@ -0,0 +1,69 @@
+"""
+Tests for sajha.ai.lexical — inverted-index BM25 with top-k pruning and incremental updates.
+"""
+
+import math
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+
+def _exhaustive(items, query, top_k, k1=1.5, b=0.75):
+    """Reference BM25: score every document, sort everything."""
+    from sajha.ai.lexical import tokenize
+    docs = {name: tokenize(text) for name, (text, _) in items.items()}
+    df = {}
+    for toks in docs.values():
+        for term in set(toks):
+            df[term] = df.get(term, 0) + 1
+    n, avgdl = len(docs), sum(len(t) for t in docs.values()) / len(docs)
+    scored = []
+    for name, toks in docs.items():
+        dl, score = len(toks) or 1, 0.0
+        for term in tokenize(query):
+            f = toks.count(term)
+            if f:
+                idf = math.log(1 + (n - df[term] + 0.5) / (df[term] + 0.5))
+                score += idf * f * (k1 + 1) / (f + k1 * (1 - b + b * dl / avgdl))
+        if score > 0:
+            scored.append((name, score))
+    scored.sort(key=lambda x: x[1], reverse=True)
+    return scored[:top_k]
+
+
+class TestBM25Index:
+
+    def test_pruned_top_k_matches_exhaustive_scoring(self):
+        from sajha.ai.lexical import BM25Index
+        rng = random.Random(7)
+        vocab = [f'term{i}' for i in range(300)] + ['market', 'price', 'rate', 'data']
+        items = {f'tool_{i}': (' '.join(rng.choices(vocab, k=rng.randint(3, 40))), {'category': 'x'})
+                 for i in range(2000)}
+        index = BM25Index()
+        assert index.build(items) == 2000
+        for _ in range(25):
+            query = ' '.join(rng.choices(vocab, k=rng.randint(1, 5)))
+            got = [round(c, 9) for _, _, c, _ in index.search(query, top_k=10)]
+            want = [round(s / (s + 5.0), 9) for _, s in _exhaustive(items, query, 10)]
+            assert got == want, query
+
+    def test_incremental_add_remove_and_sync(self):
+        from sajha.ai.lexical import BM25Index
+        index = BM25Index()
+        index.add('fred_series', 'fred economic series observations', {'description': 'FRED'})
+        index.add('ecb_rates', 'ecb interest rate series', {'description': 'ECB'})
+        assert index.search('interest rate')[0][:2] == ('ecb_rates', 'ECB')
+
+        assert index.remove('ecb_rates') and not index.remove('ecb_rates')
+        assert index.search('interest rate') == []
+        assert index.stats()['vocab'] == 4
+
+        items = {'fred_series': ('fred economic series observations', {'description': 'FRED v2'}),
+                 'boc_rates': ('bank of canada policy rate', {'description': 'BoC'})}
+        assert index.sync(items) == {'added': 1, 'removed': 0, 'unchanged': 1, 'total': 2}
+        assert index.search('fred')[0][1] == 'FRED v2'     # metadata refreshed without re-indexing
+        items.pop('fred_series')
+        assert index.sync(items) == {'added': 0, 'removed': 1, 'unchanged': 1, 'total': 1}
+        assert [r[0] for r in index.search('fred rate')] == ['boc_rates']
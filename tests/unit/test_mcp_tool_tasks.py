@@ -0,0 +1,110 @@
+"""
+Tests for task-augmented tools/call — handles returned at once, tasks/get, tasks/result, tasks/cancel, user scoping.
+"""
+
+import sys
+import time
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from tests.unit.fakes import FakeRegistry, FakeTool
+
+
+def _handler(tmp_path, tools, queue_size=100):
+    from sajha.core.mcp_handler import MCPHandler
+    from sajha.core.mcp_2025_11_25 import TaskManager
+    from sajha.core.async_executor import AsyncExecutor
+    from sajha.core.task_store import SQLiteTaskStore
+    registry = FakeRegistry(tools)
+    executor = AsyncExecutor(num_workers=2, queue_size=queue_size, store=SQLiteTaskStore(str(tmp_path / 'tasks.db')),
+                             poll_interval_ms=20, tool_lookup=registry.get_tool)
+    handler = MCPHandler(tools_registry=registry)
+    handler.task_manager = TaskManager(executor=executor, result_wait_seconds=5, poll_interval_ms=20)
+    return handler, executor
+
+
+def _rpc(handler, method, params, user='alice'):
+    response = handler.handle_request({'jsonrpc': '2.0', 'id': 1, 'method': method, 'params': params},
+                                      {'user_id': user} if user else None)
+    if 'error' in response:
+        return response['error']
+    result = response['result']
+    return result['error'] if isinstance(result.get('error'), dict) else result   # tasks/* errors ride in result
+
+
+class TestToolTasks:
+
+    def test_call_returns_a_handle_and_result_is_collected_later(self, tmp_path):
+        release = threading.Event()
+
+        def slow(arguments):
+            release.wait(5)
+            return {'rows': arguments['n']}
+
+        handler, executor = _handler(tmp_path, {'scan': FakeTool(slow), 'echo': FakeTool(lambda a: 'hi')})
+        executor.start()
+        try:
+            start = time.monotonic()
+            created = _rpc(handler, 'tools/call', {'name': 'scan', 'arguments': {'n': 3}, 'task': {'ttl': 60000}})
+            assert time.monotonic() - start < 0.5
+            task_id = created['task']['taskId']
+            assert created['task']['status'] == 'working' and created['task']['pollInterval'] == 20
+
+            assert _rpc(handler, 'tasks/get', {'taskId': task_id})['status'] == 'working'
+            assert 'still working' in _rpc(handler, 'tasks/result', {'taskId': task_id, 'timeout': 0})['message']
+            # Another user cannot see, read or cancel it
+            assert 'not found' in _rpc(handler, 'tasks/get', {'taskId': task_id}, user='bob')['message']
+            assert 'not found' in _rpc(handler, 'tasks/cancel', {'taskId': task_id}, user='bob')['message']
+
+            release.set()
+            result = _rpc(handler, 'tasks/result', {'taskId': task_id})          # waits for completion
+            assert result['content'] == [{'type': 'text', 'text': "{'rows': 3}"}]
+            assert result['_meta']['io.modelcontextprotocol/related-task'] == {'taskId': task_id}
+            assert _rpc(handler, 'tasks/get', {'taskId': task_id})['status'] == 'completed'
+
+            # Same content shape as the synchronous call
+            assert _rpc(handler, 'tools/call', {'name': 'echo', 'arguments': {}})['content'] == \
+                [{'type': 'text', 'text': 'hi'}]
+            listed = _rpc(handler, 'tasks/list', {})
+            assert [t['taskId'] for t in listed['tasks']] == [task_id]
+            assert _rpc(handler, 'tasks/list', {}, user='bob')['tasks'] == []
+        finally:
+            release.set()
+            executor.stop()
+
+    def test_cancel_failure_and_backpressure(self, tmp_path):
+        def boom(arguments):
+            raise RuntimeError('upstream 500')
+
+        handler, executor = _handler(tmp_path, {'boom': FakeTool(boom)}, queue_size=1)
+        # Workers not started: the first task waits in the queue, the second is rejected
+        first = _rpc(handler, 'tools/call', {'name': 'boom', 'arguments': {}, 'task': {}})['task']['taskId']
+        busy = _rpc(handler, 'tools/call', {'name': 'boom', 'arguments': {}, 'task': {}})
+        assert busy['code'] == handler.SERVER_BUSY
+        assert _rpc(handler, 'tasks/cancel', {'taskId': first}) == {'cancelled': True, 'taskId': first}
+        assert 'cancelled' in _rpc(handler, 'tasks/result', {'taskId': first})['message']
+
+        failing = _rpc(handler, 'tools/call', {'name': 'boom', 'arguments': {}, 'task': {}})['task']['taskId']
+        executor.start()
+        try:
+            result = _rpc(handler, 'tasks/result', {'taskId': failing})
+            assert result['isError'] and 'upstream 500' in result['content'][0]['text']
+            assert _rpc(handler, 'tasks/get', {'taskId': failing})['error'] == 'upstream 500'
+        finally:
+            executor.stop()
+
+    def test_anonymous_callers_only_see_anonymous_tasks(self, tmp_path):
+        from sajha.core.task_store import ANY_USER
+        handler, executor = _handler(tmp_path, {'echo': FakeTool(lambda a: 'hi')})
+        owned = _rpc(handler, 'tools/call', {'name': 'echo', 'arguments': {}, 'task': {}})['task']['taskId']
+        anonymous = _rpc(handler, 'tools/call', {'name': 'echo', 'arguments': {}, 'task': {}},
+                         user=None)['task']['taskId']
+
+        assert [t['taskId'] for t in _rpc(handler, 'tasks/list', {}, user=None)['tasks']] == [anonymous]
+        assert 'not found' in _rpc(handler, 'tasks/get', {'taskId': owned}, user=None)['message']
+        assert 'not found' in _rpc(handler, 'tasks/get', {'taskId': anonymous}, user='bob')['message']
+        assert [t['taskId'] for t in _rpc(handler, 'tasks/list', {})['tasks']] == [owned]
+        rows, _ = executor.list_page(user_id=ANY_USER)                      # the admin view spans everyone
+        assert {r['task_id'] for r in rows} == {owned, anonymous}
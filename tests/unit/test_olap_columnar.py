@@ -0,0 +1,125 @@
+"""
+Tests for sajha.olap.columnar — column-major OLAP results and SQL-side totals/summaries.
+"""
+
+import base64
+import json
+import sys
+import pytest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+duckdb = pytest.importorskip('duckdb')
+
+
+@pytest.fixture
+def semantic(tmp_path):
+    from sajha.olap import SemanticLayer
+    (tmp_path / 'datasets.json').write_text(json.dumps({'datasets': {'sales': {
+        'source_table': 'sales', 'dimensions': ['region', 'segment', 'day'],
+        'measures': ['revenue', 'avg_amount'], 'default_time_dimension': 'day'}}}))
+    (tmp_path / 'measures.json').write_text(json.dumps({'measures': {
+        'revenue': {'expression': 'SUM(amount)'}, 'avg_amount': {'expression': 'AVG(amount)'}}}))
+    (tmp_path / 'dimensions.json').write_text(json.dumps({'dimensions': {
+        'region': {'column': 'region'}, 'segment': {'column': 'segment'},
+        'day': {'column': 'day', 'type': 'time'}}}))
+    return SemanticLayer(str(tmp_path))
+
+
+@pytest.fixture
+def conn():
+    c = duckdb.connect()
+    # 60 rows: 3 regions of unequal size per segment, 10 days, amount = 1.5 * id
+    c.execute("""
+        CREATE TABLE sales AS
+        SELECT i AS id, ['EU', 'US', 'APAC'][1 + i % 3] AS region, ['A', 'B'][1 + i % 2] AS segment,
+               DATE '2024-01-01' + CAST(i % 10 AS INTEGER) AS day, i * 1.5 AS amount
+        FROM range(60) t(i)""")
+    yield c
+    c.close()
+
+
+class TestColumnarResult:
+
+    def test_formats_share_one_fetch(self, conn):
+        from sajha.olap.columnar import fetch_columnar
+        result = fetch_columnar(conn, "SELECT region, day, amount FROM sales ORDER BY id LIMIT 2")
+        assert result.records()[0] == {'region': 'EU', 'day': '2024-01-01', 'amount': 0.0}
+        assert result.payload('columns')['data']['region'] == ['EU', 'US']
+        assert result.payload('records', exclude=['day'])['columns'] == ['region', 'amount']
+        with pytest.raises(ValueError):
+            result.payload('csv')
+
+    def test_arrow_ipc_round_trip(self, conn):
+        pa = pytest.importorskip('pyarrow')
+        from sajha.olap.columnar import fetch_columnar
+        payload = fetch_columnar(conn, "SELECT region, amount FROM sales").payload('arrow')
+        table = pa.ipc.open_stream(base64.b64decode(payload['data'])).read_all()
+        assert table.num_rows == payload['row_count'] == 60
+        assert table.column_names == ['region', 'amount']
+
+
+class TestPivotTotals:
+
+    def test_grand_total_is_computed_by_duckdb(self, semantic, conn):
+        from sajha.olap import PivotEngine, PivotSpec
+        result = PivotEngine(semantic, conn).execute_pivot(PivotSpec(
+            dataset='sales', rows=['region'],
+            values=[{'measure': 'revenue'}, {'measure': 'avg_amount'}]))
+        assert result['success'], result.get('error')
+        total = result['data'][-1]
+        assert total['region'] == 'TOTAL'
+        assert total['revenue'] == pytest.approx(2655.0)
+        # True average over all rows, not the average of the per-region averages
+        assert total['avg_amount'] == pytest.approx(44.25)
+        assert '_grouping_id' not in result['columns']
+
+    def test_subtotals_follow_their_group_and_limit_hits_detail_rows(self, semantic, conn):
+        from sajha.olap import PivotEngine, PivotSpec
+        result = PivotEngine(semantic, conn).execute_pivot(PivotSpec(
+            dataset='sales', rows=['region', 'segment'], include_subtotals=True, limit=3,
+            values=[{'measure': 'revenue'}]))
+        rows = [(r['region'], r['segment']) for r in result['data']]
+        assert rows == [('APAC', 'A'), ('APAC', 'B'), ('APAC', 'TOTAL'), ('EU', 'A'),
+                        ('EU', 'TOTAL'), ('US', 'TOTAL'), ('TOTAL', 'TOTAL')]
+
+    def test_columns_format_keeps_grouping_bitmask(self, semantic, conn):
+        from sajha.olap import PivotEngine, PivotSpec
+        result = PivotEngine(semantic, conn).execute_pivot(PivotSpec(
+            dataset='sales', rows=['region'], columns=['segment'], values=[{'measure': 'revenue'}]),
+            result_format='columns')
+        assert result['data']['_grouping_id'] == [0] * 6 + [3]
+        assert result['data']['revenue'][-1] == pytest.approx(2655.0)
+
+
+class TestSummariesInSQL:
+
+    def test_time_series_summary(self, semantic, conn):
+        from sajha.olap import TimeSeriesEngine, TimeSeriesSpec
+        result = TimeSeriesEngine(semantic, conn).execute_time_series(TimeSeriesSpec(
+            dataset='sales', time_dimension='day', time_grain='day', measures=['revenue']))
+        assert result['success'], result.get('error')
+        summary = result['summary']['revenue']
+        assert result['row_count'] == summary['count'] == 10
+        assert (summary['first'], summary['last']) == (225.0, 306.0)
+        assert summary['total_change'] == pytest.approx(81.0)
+        assert summary['sum'] == pytest.approx(2655.0)
+
+    def test_rollup_levels_and_single_pass_quantiles(self, semantic, conn):
+        from sajha.olap import RollupEngine, RollupSpec, StatsEngine, StatsSpec
+        rollup = RollupEngine(semantic, conn).execute_rollup(RollupSpec(
+            dataset='sales', dimensions=['region', 'segment'], measures=[{'measure': 'revenue'}]))
+        assert {k: v['count'] for k, v in rollup['hierarchy_info'].items()} == \
+            {'level_0': 6, 'level_1': 3, 'level_2': 1}
+
+        stats = StatsEngine(semantic, conn)
+        spec = StatsSpec(dataset='sales', measures=['amount'],
+                         statistics=['percentiles', 'distribution'], percentiles=[0.5, 0.9])
+        assert stats.build_summary_statistics(spec).count('QUANTILE_CONT') == 1
+        row = stats.execute_statistics(spec)['data'][0]
+        expected = conn.execute("SELECT quantile_cont(amount, 0.9), quantile_cont(amount, 0.75) - "
+                                "quantile_cont(amount, 0.25) FROM sales").fetchone()
+        assert row['amount_p90'] == pytest.approx(expected[0])
+        assert row['amount_iqr'] == pytest.approx(expected[1])
+        assert row['amount_median'] == row['amount_p50']
@@ -0,0 +1,126 @@
+"""
+Tests for sajha.olap.query_cache — compiled-SQL and result cache in front of the OLAP engines.
+"""
+
+import json
+import os
+import sys
+import pytest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+duckdb = pytest.importorskip('duckdb')
+
+
+def _write_config(config_dir, source_table, revenue='SUM(amount)'):
+    (config_dir / 'datasets.json').write_text(json.dumps({'datasets': {'sales': {
+        'source_table': source_table, 'dimensions': ['region'], 'measures': ['revenue']}}}))
+    (config_dir / 'measures.json').write_text(json.dumps({'measures': {
+        'revenue': {'expression': revenue}}}))
+    (config_dir / 'dimensions.json').write_text(json.dumps({'dimensions': {
+        'region': {'column': 'region'}}}))
+
+
+def _write_csv(path, amount):
+    path.write_text('region,amount\n' + ''.join(f'{r},{amount}\n' for r in ('EU', 'US', 'EU')))
+
+
+@pytest.fixture
+def setup(tmp_path):
+    from sajha.olap import OLAPQueryCache, PivotEngine, SemanticLayer
+    config_dir = tmp_path / 'olap'
+    config_dir.mkdir()
+    csv = tmp_path / 'sales.csv'
+    _write_csv(csv, 10)
+    _write_config(config_dir, f"read_csv_auto('{csv}')")
+    cache = OLAPQueryCache()
+    conn = duckdb.connect()
+    engine = PivotEngine(SemanticLayer(str(config_dir)), conn, cache)
+    yield engine, cache, config_dir, csv
+    conn.close()
+
+
+def _pivot(engine):
+    from sajha.olap import PivotSpec
+    result = engine.execute_pivot(PivotSpec(dataset='sales', rows=['region'],
+                                            values=[{'measure': 'revenue'}]))
+    assert result['success'], result.get('error')
+    return {r['region']: r['revenue'] for r in result['data']}
+
+
+def _bump_mtime(path, seconds):
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + seconds * 1_000_000_000))
+
+
+class TestOLAPQueryCache:
+
+    def test_hit_does_not_touch_duckdb(self, setup):
+        engine, cache, _, _ = setup
+        assert _pivot(engine) == {'EU': 20, 'US': 10, 'TOTAL': 30}
+        # Re-running the query would now fail: file reads are disabled on the connection
+        engine.conn.execute("SET enable_external_access = false")
+        assert _pivot(engine) == {'EU': 20, 'US': 10, 'TOTAL': 30}
+        stats = cache.stats()
+        assert (stats['result_hits'], stats['result_misses']) == (1, 1)
+        assert stats['plan_hits'] >= 1
+
+    def test_source_file_change_invalidates_result(self, setup):
+        engine, cache, _, csv = setup
+        assert _pivot(engine)['TOTAL'] == 30
+        _write_csv(csv, 100)
+        _bump_mtime(csv, 5)
+        assert _pivot(engine)['TOTAL'] == 300
+        assert cache.stats()['result_misses'] == 2
+
+    def test_semantic_config_change_recompiles(self, setup):
+        engine, cache, config_dir, csv = setup
+        assert _pivot(engine)['TOTAL'] == 30
+        _write_config(config_dir, f"read_csv_auto('{csv}')", revenue='SUM(amount) * 2')
+        _bump_mtime(config_dir / 'measures.json', 5)
+        assert _pivot(engine)['TOTAL'] == 60
+        assert cache.stats()['plan_misses'] == 2
+
+    def test_byte_bounded_eviction(self):
+        from sajha.olap.query_cache import OLAPQueryCache
+        cache = OLAPQueryCache(result_max_mb=0.001, max_entry_mb=0.0008)
+        cache.put_result('a', {'success': True, 'data': 'x' * 400})
+        cache.put_result('b', {'success': True, 'data': 'y' * 400})
+        cache.put_result('big', {'success': True, 'data': 'z' * 1000})
+        stats = cache.stats()
+        assert cache.get_result('a') is None and cache.get_result('b') is not None
+        assert stats['result_bytes'] <= stats['result_max_bytes']
+        assert (stats['result_evictions'], stats['skipped_oversize']) == (1, 1)
+
+    def test_cached_rows_are_not_shared_with_callers(self):
+        from sajha.olap.query_cache import OLAPQueryCache
+        cache = OLAPQueryCache()
+        response = {'success': True, 'data': [{'region': 'EU', 'revenue': 20}]}
+        cache.put_result('k', response)
+        response['data'][0]['revenue'] = -1                      # caller edits after storing
+        hit = cache.get_result('k')
+        hit['data'][0]['revenue'] = -2                           # caller edits a hit
+        assert cache.get_result('k')['data'] == [{'region': 'EU', 'revenue': 20}]
+
+    def test_readers_never_see_a_half_loaded_layer(self, tmp_path):
+        import threading
+        from sajha.olap import SemanticLayer
+        _write_config(tmp_path, "read_csv_auto('x.csv')")
+        layer = SemanticLayer(str(tmp_path))
+        stop, seen = threading.Event(), []
+
+        def read():
+            while not stop.is_set():
+                seen.append((len(layer.datasets), len(layer.measures), len(layer.dimensions)))
+
+        readers = [threading.Thread(target=read) for _ in range(3)]
+        for t in readers:
+            t.start()
+        for i in range(30):
+            _bump_mtime(tmp_path / 'measures.json', i + 1)
+            assert layer.reload_if_changed()
+        stop.set()
+        for t in readers:
+            t.join()
+        assert seen and set(seen) == {(1, 1, 1)}
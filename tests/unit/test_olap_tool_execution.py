@@ -0,0 +1,89 @@
+"""
+Tests for DuckDBOLAPAdvancedTool's synchronous core, deadlines and async wrapper.
+"""
+
+import asyncio
+import json
+import sys
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+pytest.importorskip('duckdb')
+
+# 10^10 rows — never finishes inside a test unless interrupted
+_ENDLESS = '(SELECT a.range AS x FROM range(100000) a, range(100000) b)'
+
+
+@pytest.fixture
+def tool_factory(tmp_path, monkeypatch):
+    import sajha.core.duckdb_engine as mod
+    from sajha.core.duckdb_engine import DuckDBEngine
+    from sajha.tools.impl.duckdb_olap_advanced import DuckDBOLAPAdvancedTool
+    engine = DuckDBEngine(database=':memory:')
+    monkeypatch.setattr(mod, '_engine', engine)
+    (tmp_path / 'datasets.json').write_text(json.dumps({'datasets': {
+        'sales': {'source_table': 'sales', 'dimensions': ['region'], 'measures': ['revenue']},
+        'endless': {'source_table': _ENDLESS, 'dimensions': [], 'measures': []}}}))
+    (tmp_path / 'measures.json').write_text(json.dumps({'measures': {'revenue': {'expression': 'SUM(amount)'}}}))
+    (tmp_path / 'dimensions.json').write_text(json.dumps({'dimensions': {'region': {'column': 'region'}}}))
+    engine.execute("CREATE TABLE sales AS SELECT ['EU', 'US'][1 + i % 2] AS region, i AS amount "
+                   "FROM range(100) t(i)", schema='olap')
+
+    def make(**config):
+        return DuckDBOLAPAdvancedTool(dict(config, config_path=str(tmp_path)))
+    yield make
+    engine.close()
+
+
+def _pivot_args(limit):
+    return {'dataset': 'sales', 'rows': ['region'], 'values': [{'measure': 'revenue'}],
+            'include_totals': False, 'limit': limit}
+
+
+class TestOLAPToolExecution:
+
+    def test_execute_runs_inside_a_running_event_loop(self, tool_factory):
+        tool = tool_factory(name='olap_pivot_table')
+
+        async def handler():
+            # Called from async code without awaiting — the old run_until_complete path failed here
+            return tool.execute(_pivot_args(10))
+
+        result = asyncio.run(handler())
+        assert result['success'] and result['data'] == [{'region': 'EU', 'revenue': 2450},
+                                                        {'region': 'US', 'revenue': 2500}]
+
+    def test_concurrent_calls_use_separate_cursors(self, tool_factory):
+        tool = tool_factory()
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(lambda n: tool.run_tool('olap_pivot_table', _pivot_args(n)),
+                                    [1, 2] * 8))
+        assert all(r['success'] for r in results)
+        assert [r['row_count'] for r in results] == [1, 2] * 8
+
+    def test_deadline_interrupts_query(self, tool_factory):
+        tool = tool_factory(name='olap_statistics', timeout_seconds=0.3)
+        started = time.monotonic()
+        result = tool.execute({'dataset': 'endless', 'measures': ['x']})
+        assert result['timed_out'] and not result['success']
+        assert time.monotonic() - started < 10
+        # The thread's cursor is still usable afterwards
+        assert tool.run_tool('olap_pivot_table', _pivot_args(1))['success']
+
+    def test_cancelling_async_call_interrupts_query(self, tool_factory):
+        tool = tool_factory()
+
+        async def caller():
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(
+                    tool.call_tool('olap_statistics', {'dataset': 'endless', 'measures': ['x']}), 0.3)
+            return await tool.call_tool('olap_pivot_table', _pivot_args(2))
+
+        started = time.monotonic()
+        # asyncio.run waits for the worker thread — it returns only if the query was interrupted
+        assert asyncio.run(caller())['success']
+        assert time.monotonic() - started < 10
@@ -0,0 +1,117 @@
+"""
+Tests for sajha.core.db.pooled_query — pooled, bound execution for Studio DB Query tools.
+"""
+
+import sqlite3
+import sys
+import threading
+import pytest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+
+def _make_db(path, rows=50):
+    conn = sqlite3.connect(str(path))
+    conn.execute("CREATE TABLE t (i INTEGER, s TEXT)")
+    conn.executemany("INSERT INTO t VALUES (?, ?)", [(i, f"n'{i}") for i in range(rows)])
+    conn.commit()
+    conn.close()
+
+
+class TestCompileTemplate:
+
+    def test_quoted_and_bare_placeholders_become_binds(self):
+        from sajha.core.db.pooled_query import compile_query_template
+        q = compile_query_template("SELECT * FROM t WHERE d >= '{{start}}' AND n = {{n}} AND m = {{start}}")
+        assert q.names == ('start', 'n', 'start')
+        assert q.render('qmark') == "SELECT * FROM t WHERE d >= ? AND n = ? AND m = ?"
+        assert q.render('numeric') == "SELECT * FROM t WHERE d >= $1 AND n = $2 AND m = $1"
+        assert q.bind({'start': 'a', 'n': 1}, 'numeric') == ['a', 1]
+        assert q.bind({'start': 'a', 'n': 1}, 'qmark') == ['a', 1, 'a']
+
+    def test_format_style_escapes_literal_percent(self):
+        from sajha.core.db.pooled_query import compile_query_template
+        q = compile_query_template("SELECT * FROM t WHERE s LIKE 'a%' || {{p}}")
+        assert q.render('format') == "SELECT * FROM t WHERE s LIKE 'a%%' || %s"
+
+    def test_placeholder_inside_literal_is_rejected(self):
+        from sajha.core.db.pooled_query import compile_query_template
+        with pytest.raises(ValueError):
+            compile_query_template("SELECT * FROM t WHERE s LIKE '%{{p}}%'")
+
+    def test_comments_and_dollar_quotes_do_not_toggle_literals(self):
+        from sajha.core.db.pooled_query import compile_query_template
+        q = compile_query_template("SELECT 1 -- don't {{skip}}\n/* it's /* nested */ */ FROM t "
+                                   "WHERE \"o'k\" = {{a}} AND b = $$it's$$ AND c = $x$ 'q $$ $x$ AND d = '{{d}}'")
+        assert q.names == ('a', 'd')
+        assert q.render('qmark').endswith("= ? AND b = $$it's$$ AND c = $x$ 'q $$ $x$ AND d = ?")
+        assert "-- don't {{skip}}" in q.render('qmark')
+        with pytest.raises(ValueError, match='dollar-quoted'):
+            compile_query_template("SELECT $$%{{p}}%$$")
+
+    def test_connection_strings(self):
+        from sajha.core.db.pooled_query import parse_connection_string, parse_libpq_dsn
+        pg = parse_connection_string('postgresql', 'host=db port=5433 dbname=risk user=u password=p')
+        assert (pg.host, pg.port, pg.database, pg.user) == ('db', 5433, 'risk', 'u')
+
+        # Postgres DSNs reach the driver whole: quoting, options and URL query parameters survive
+        dsn = "host=db dbname=risk password='a b\\'c' options='-c statement_timeout=5000' connect_timeout=3"
+        pg = parse_connection_string('postgresql', dsn)
+        assert pg.to_connection_kwargs() == {'dsn': dsn}
+        assert parse_libpq_dsn(dsn)['password'] == "a b'c" and parse_libpq_dsn(dsn)['connect_timeout'] == '3'
+        url = parse_connection_string('postgresql', 'postgresql://u:p@db:5433/risk?sslmode=require&sslrootcert=ca.pem')
+        assert url.ssl and url.port == 5433 and url.to_connection_kwargs()['dsn'].endswith('sslrootcert=ca.pem')
+        assert url.to_key() != parse_connection_string('postgresql', 'postgresql://u:p@db:5433/risk').to_key()
+        my = parse_connection_string('mysql', 'mysql://u:p%40ss@h:3307/sales')
+        assert (my.host, my.port, my.database, my.password) == ('h', 3307, 'sales', 'p@ss')
+
+
+class TestPooledQueryExecutor:
+
+    def test_values_are_bound_not_spliced(self, tmp_path):
+        from sajha.core.db.pooled_query import PooledQueryExecutor
+        db = tmp_path / 'a.db'
+        _make_db(db)
+        ex = PooledQueryExecutor('sqlite', str(db),
+                                 "SELECT i, s FROM t WHERE i < {{lim}} AND s <> '{{skip}}' ORDER BY i",
+                                 pool_name=f'test_bound_{db}', max_rows=100, fetch_size=3)
+        result = ex.execute({'lim': 5, 'skip': "n'1"})
+        assert [r['i'] for r in result['rows']] == [0, 2, 3, 4]
+        assert len(ex.execute({'lim': 50, 'skip': "x' OR '1'='1"})['rows']) == 50
+
+    def test_max_rows_and_truncation(self, tmp_path):
+        from sajha.core.db.pooled_query import PooledQueryExecutor
+        db = tmp_path / 'a.db'
+        _make_db(db)
+        ex = PooledQueryExecutor('sqlite', str(db), "SELECT i FROM t ORDER BY i",
+                                 pool_name=f'test_trunc_{db}', max_rows=7, fetch_size=2)
+        result = ex.execute({})
+        assert len(result['rows']) == 7 and result['truncated']
+
+    def test_connections_are_reused_across_threads(self, tmp_path):
+        from sajha.core.db.pooled_query import PooledQueryExecutor
+        db = tmp_path / 'a.db'
+        _make_db(db)
+        ex = PooledQueryExecutor('sqlite', str(db), "SELECT COUNT(*) AS n FROM t",
+                                 pool_name=f'test_threads_{db}', pool_size=3)
+        counts = []
+        threads = [threading.Thread(target=lambda: counts.extend(
+            ex.execute({})['rows'][0]['n'] for _ in range(5))) for _ in range(6)]
+        for th in threads:
+            th.start()
+        for th in threads:
+            th.join()
+        assert counts == [50] * 30
+        status = ex._get_pool().get_pool_status()
+        assert status['total_connections'] <= 3
+        assert status['statistics']['connections_borrowed'] == 30
+
+    def test_duckdb_backend(self, tmp_path):
+        pytest.importorskip('duckdb')
+        from sajha.core.db.pooled_query import PooledQueryExecutor
+        ex = PooledQueryExecutor('duckdb', str(tmp_path / 'a.duckdb'),
+                                 "SELECT range AS i FROM range(100) WHERE range >= {{lo}}",
+                                 pool_name=f'test_duck_{tmp_path}', max_rows=10, fetch_size=4)
+        result = ex.execute({'lo': 95})
+        assert [r['i'] for r in result['rows']] == [95, 96, 97, 98, 99]
@@ -0,0 +1,110 @@
+"""
+Tests for sajha.ai.routing — failover, rate-limit cooldown, concurrency spill-over, adaptive timeouts and hedging.
+"""
+
+import sys
+import time
+import asyncio
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+
+class _RateLimited(Exception):
+    status_code = 429
+
+
+def _router(**kw):
+    from sajha.ai.routing import ProviderRouter
+    return ProviderRouter(**dict(dict(min_samples=5, timeout_min_ms=10, timeout_default_ms=2000), **kw))
+
+
+class TestProviderRouter:
+
+    def test_failover_cooldown_and_concurrency_spill(self):
+        router = _router(rate_limit_cooldown_seconds=60, provider_concurrency={'a': 1})
+        calls = []
+
+        def call(target):
+            calls.append(target[0])
+            if target[0] == 'a':
+                raise _RateLimited('429 Too Many Requests')
+            return f'from {target[0]}'
+
+        assert router.run([('a', 'm'), ('b', 'm')], call) == ('from b', ('b', 'm'))
+        # 'a' is cooling down: 'b' goes first and 'a' is not called again
+        assert router.run([('a', 'm'), ('b', 'm')], call)[1] == ('b', 'm')
+        assert calls == ['a', 'b', 'b']
+        stats = router.stats()['providers']
+        assert stats['a']['rate_limited'] == 1 and stats['a']['cooling_down_s'] > 0
+
+        # A provider at its cap spills to the next target instead of queueing
+        fresh = _router(provider_concurrency={'a': 1})
+        assert fresh.limit('a').try_acquire()
+        assert fresh.run([('a', 'm'), ('b', 'm')], lambda t: t[0])[0] == 'b'
+        assert fresh.stats()['providers']['a']['saturated'] == 1
+        fresh.limit('a').release()
+        assert fresh.run([('a', 'm'), ('b', 'm')], lambda t: t[0])[0] == 'a'
+        assert fresh.stats()['providers']['a']['in_flight'] == 0
+
+    def test_adaptive_timeout_abandons_a_stalled_provider(self):
+        router = _router(timeout_multiplier=3.0)
+        for _ in range(10):
+            router._record_success(('slow', 'm'), 0.02)
+        assert abs(router.timeout_for(('slow', 'm')) - 0.06) < 1e-9
+        assert router.timeout_for(('new', 'm')) == 2.0          # default until min_samples
+
+        def call(target):
+            if target[0] == 'slow':
+                time.sleep(1.0)
+            return target[0]
+
+        start = time.monotonic()
+        assert router.run([('slow', 'm'), ('fast', 'm')], call)[0] == 'fast'
+        assert time.monotonic() - start < 0.5
+        assert router.stats()['providers']['slow']['timeouts'] == 1
+
+    def test_async_hedge_wins_and_cancels_the_loser(self):
+        router = _router(hedge_enabled=True, hedge_min_delay_ms=20, timeout_default_ms=0, timeout_adaptive=False)
+        for _ in range(10):
+            router._record_success(('primary', 'm'), 0.01)
+        cancelled = []
+
+        async def call(target):
+            try:
+                await asyncio.sleep(2.0 if target[0] == 'primary' else 0.01)
+                return target[0]
+            except asyncio.CancelledError:
+                cancelled.append(target[0])
+                raise
+
+        async def scenario():
+            start = time.monotonic()
+            result = await router.arun([('primary', 'm'), ('secondary', 'm')], call)
+            await asyncio.sleep(0)
+            return result, time.monotonic() - start
+
+        (result, target), elapsed = asyncio.run(scenario())
+        assert result == 'secondary' and elapsed < 0.5 and cancelled == ['primary']
+        stats = router.stats()['providers']
+        assert stats['secondary']['hedges'] == 1 and stats['secondary']['hedge_wins'] == 1
+        assert stats['primary']['in_flight'] == 0
+
+    def test_gateway_falls_back_through_the_chain(self):
+        from sajha.ai.gateway import LLMGateway, GatewayConfig
+        from sajha.ai.providers.stub_provider import StubProvider
+
+        class _Down(StubProvider):
+            provider_type = 'down'
+
+            def complete(self, *args, **kwargs):
+                raise ConnectionError('upstream unavailable')
+
+        gw = LLMGateway(GatewayConfig(default_provider='down', default_model='down-chat',
+                                      fallback_chain=['stub/stub-chat', 'missing/x']))
+        gw._providers['down'] = _Down()
+        gw.register_provider('stub')
+        response = gw.complete('hello there', use_cache=False)
+        assert response.provider == 'stub' and response.content == '[stub:stub-chat] hello there'
+        assert gw._targets('down', 'down-chat') == [('down', 'down-chat'), ('stub', 'stub-chat')]
+        assert gw.get_stats()['routing']['providers']['down']['errors'] == 1
@@ -0,0 +1,125 @@
+"""
+Tests for the ToolResolver fast path — query-result cache and slot filling before LLM extraction.
+"""
+
+import sys
+import pytest
+from datetime import date
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from tests.unit.fakes import FakeRegistry
+
+_PRICES_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'symbol': {'type': 'string'},
+        'start_date': {'type': 'string', 'format': 'date'},
+        'end_date': {'type': 'string', 'format': 'date'},
+        'interval': {'type': 'string', 'enum': ['1d', '1wk', '1mo']},
+    },
+    'required': ['symbol'],
+}
+
+
+class _Tool:
+    def __init__(self, description, schema):
+        self.config = {'description': description, 'metadata': {'category': 'test'}}
+        self._schema = schema
+
+    def get_input_schema(self):
+        return self._schema
+
+
+class _Embedder:
+    """Two directions: anything about prices, and everything else."""
+    name = 'fake-embedder'
+
+    def __init__(self):
+        self.calls = 0
+
+    def embed(self, texts):
+        self.calls += 1
+        return [[1.0, 0.0] if 'price' in t.lower() else [0.0, 1.0] for t in texts]
+
+
+class _Gateway:
+    def __init__(self):
+        self.calls = 0
+        self.kwargs = {}
+
+    def complete(self, prompt, **kwargs):
+        from sajha.ai.providers import LLMResponse
+        self.calls += 1
+        self.kwargs = kwargs
+        return LLMResponse(content='{"symbol": "AAPL"}', model='m', provider='fake')
+
+
+def _registry():
+    return FakeRegistry({
+        'equity_prices': _Tool('Daily stock price history', _PRICES_SCHEMA),
+        'macro_series': _Tool('Economic time series', {'properties': {'country': {'type': 'string'}}}),
+    })
+
+
+class TestSlotFilling:
+
+    def test_fills_tickers_dates_codes_and_enums_from_the_schema(self):
+        from sajha.ai.slot_filling import fill_slots
+        today = date(2025, 3, 31)
+        assert fill_slots('Prices for $AAPL from 2024-01-02 to 2024-06-30, 1wk bars', _PRICES_SCHEMA, today) == {
+            'symbol': 'AAPL', 'start_date': '2024-01-02', 'end_date': '2024-06-30', 'interval': '1wk'}
+        assert fill_slots("What's the P/E of MSFT over the last 6 months?", _PRICES_SCHEMA, today) == {
+            'symbol': 'MSFT', 'start_date': '2024-09-30', 'end_date': '2025-03-31'}
+        assert fill_slots('EUR/USD spot', {'properties': {'base': {}, 'quote': {}}}) == {'base': 'EUR', 'quote': 'USD'}
+        assert fill_slots('GDP of Germany and FRA in 2023', {'properties': {
+            'countries': {'type': 'array', 'description': 'ISO alpha-3 codes'}, 'year': {'type': 'integer'}}}) == {
+            'countries': ['DEU', 'FRA'], 'year': 2023}
+        assert fill_slots('apple share price', _PRICES_SCHEMA, today) == {}
+
+
+class TestResolverFastPath:
+
+    def test_query_cache_hits_until_the_index_changes(self):
+        from sajha.ai.tool_resolver import ToolResolver
+        registry = _registry()
+        resolver = ToolResolver(None, registry)
+        resolver.refresh_lexical()
+        first = resolver.resolve('stock price history', top_k=2)
+        first[0].confidence = -1.0                       # callers cannot corrupt the cache
+        again = resolver.resolve('  Stock PRICE history? ', top_k=2)
+        assert again[0].tool_name == 'equity_prices' and again[0].confidence > 0
+        assert resolver.stats()['query_cache']['query_hits'] == 1
+
+        registry.tools['equity_quotes'] = _Tool('Real-time stock price quotes', _PRICES_SCHEMA)
+        resolver.refresh_lexical()
+        assert resolver.stats()['query_cache']['size'] == 0
+        assert 'equity_quotes' in [m.tool_name for m in resolver.resolve('stock price history', top_k=3)]
+
+    def test_slot_filling_skips_the_llm_and_repeats_are_free(self):
+        pytest.importorskip('numpy')
+        from sajha.ai.tool_resolver import ToolResolver
+        embedder, gateway = _Embedder(), _Gateway()
+        resolver = ToolResolver(embedder, _registry(), gateway=gateway, persist=False)
+        resolver.build_index()
+
+        embedded = embedder.calls
+        top = resolver.resolve('price history for TSLA since 2024-01-01', top_k=1, extract_params=True)[0]
+        assert top.tool_name == 'equity_prices'
+        assert top.suggested_params == {'symbol': 'TSLA', 'start_date': '2024-01-01'}
+        assert gateway.calls == 0
+
+        # Required symbol not found locally: the LLM fills it, once
+        for _ in range(3):
+            top = resolver.resolve('apple price history', top_k=1, extract_params=True)[0]
+            assert top.suggested_params == {'symbol': 'AAPL'}
+        assert gateway.calls == 1 and embedder.calls - embedded == 2
+        assert gateway.kwargs['semantic'] is False                  # extraction never takes a near-miss answer
+        stats = resolver.stats()['query_cache']
+        assert stats['slot_filled'] == 1 and stats['llm_extractions'] == 1 and stats['query_hits'] == 2
+
+        # Case carries meaning for slot filling: a lower-cased repeat is not served the ticker
+        top = resolver.resolve('price history for tsla since 2024-01-01', top_k=1, extract_params=True)[0]
+        assert top.suggested_params == {'symbol': 'AAPL', 'start_date': '2024-01-01'}
+        assert resolver.stats()['query_cache']['query_hits'] == 2
@@ -0,0 +1,79 @@
+"""
+Tests for sajha.ai.response_cache — O(1) LRU with byte limits, disk persistence and the semantic tier.
+"""
+
+import sys
+import pytest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+
+def _msgs(text):
+    return [{'role': 'user', 'content': text}]
+
+
+def _resp(text):
+    from sajha.ai.providers import LLMResponse
+    return LLMResponse(content=text, model='m', provider='stub')
+
+
+class TestResponseCache:
+
+    def test_lru_evicts_by_count_and_bytes(self):
+        from sajha.ai.response_cache import ResponseCache
+        cache = ResponseCache(max_size=3)
+        for i in range(3):
+            cache.put(_msgs(f'q{i}'), 'm', _resp(f'a{i}'))
+        assert cache.get(_msgs('q0'), 'm').content == 'a0'     # q0 is now most recently used
+        cache.put(_msgs('q3'), 'm', _resp('a3'))
+        assert cache.get(_msgs('q1'), 'm') is None and cache.get(_msgs('q0'), 'm') is not None
+        assert cache.stats()['evictions'] == 1
+
+        small = ResponseCache(max_size=100, max_bytes=2000)
+        small.put(_msgs('big'), 'm', _resp('x' * 5000))         # larger than the whole budget: not cached
+        for i in range(10):
+            small.put(_msgs(f'q{i}'), 'm', _resp('y' * 500))
+        stats = small.stats()
+        assert small.get(_msgs('big'), 'm') is None
+        assert stats['bytes'] <= 2000 and stats['size'] == 2000 // (500 + 256)
+
+    def test_disk_tier_survives_restart_and_honours_ttl(self, tmp_path):
+        from sajha.ai.response_cache import ResponseCache
+        path = str(tmp_path / 'responses.sqlite')
+        ResponseCache(disk_path=path).put(_msgs('hello'), 'm', _resp('world'), system='s', temperature=0)
+
+        warm = ResponseCache(disk_path=path)
+        assert warm.get(_msgs('hello'), 'm', system='s', temperature=0).content == 'world'
+        assert warm.get(_msgs('hello'), 'm', system='other', temperature=0) is None
+        assert warm.stats()['disk_hits'] == 1
+        assert ResponseCache(disk_path=path, ttl=0).get(_msgs('hello'), 'm', system='s', temperature=0) is None
+
+    def test_semantic_tier_through_gateway(self):
+        pytest.importorskip('numpy')
+        from sajha.ai.gateway import LLMGateway, GatewayConfig
+        gw = LLMGateway(GatewayConfig(default_provider='stub', default_model='stub-chat',
+                                      default_embedding_provider='stub', default_embedding_model='stub-embed',
+                                      cache_semantic_enabled=True, cache_semantic_threshold=0.95))
+        stub = gw.register_provider('stub')
+        calls = stub.complete_calls      # provider instances are shared across gateways
+
+        first = gw.complete('price of AAPL today', system='extract', temperature=0)
+        # Same words in another order: a semantic hit, no provider call
+        assert gw.complete('today AAPL price of', system='extract', temperature=0) is first
+        assert stub.complete_calls - calls == 1
+        # Different wording, another system prompt, another model or a non-zero temperature all miss
+        gw.complete('price of MSFT yesterday', system='extract', temperature=0)
+        gw.complete('today AAPL price of', system='summarize', temperature=0)
+        gw.complete('today AAPL price of', system='extract', temperature=0, model='stub-other')
+        gw.complete('today AAPL price of', system='extract', temperature=0.5)
+        assert stub.complete_calls - calls == 5
+        stats = gw.get_stats()['cache']
+        assert stats['semantic_hits'] == 1 and stats['semantic']['indexed'] == 4
+
+        # semantic=False (parameter extraction): exact matches only, and nothing is indexed
+        assert gw.complete('today AAPL price of', system='extract', temperature=0, semantic=False) is not first
+        assert gw.complete('AAPL price of today', system='extract', temperature=0, semantic=False) is not first
+        assert stub.complete_calls - calls == 7
+        assert gw.complete('AAPL price of today', system='extract', temperature=0, semantic=False).content
+        assert stub.complete_calls - calls == 7 and gw.get_stats()['cache']['semantic']['indexed'] == 4
@@ -0,0 +1,156 @@
+"""
+Tests for sajha.tools.rest_client — shared sessions, retries and pagination for Studio REST tools.
+"""
+
+import json
+import sys
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qs
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+ITEMS = list(range(23))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    flaky_left = 0
+    hits = []
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        q = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        type(self).hits.append((parts.path, q, self.client_address[1]))
+        if parts.path == '/flaky':
+            if type(self).flaky_left > 0:
+                type(self).flaky_left -= 1
+                return self._send(503, {'error': 'busy'})
+            return self._send(200, {'ok': True})
+        if parts.path == '/pages':
+            page, size = int(q.get('page', 1)), int(q.get('per_page', 10))
+            chunk = ITEMS[(page - 1) * size:page * size]
+            return self._send(200, {'data': chunk, 'meta': {'total': len(ITEMS)}})
+        if parts.path == '/offset':
+            offset, size = int(q.get('offset', 0)), int(q.get('limit', 10))
+            return self._send(200, ITEMS[offset:offset + size])
+        if parts.path == '/cursor':
+            start = int(q.get('cursor', 0))
+            nxt = start + 10 if start + 10 < len(ITEMS) else None
+            return self._send(200, {'items': ITEMS[start:start + 10], 'next': nxt})
+        if parts.path == '/endless':
+            return self._send(200, {'items': [], 'next': int(q.get('cursor', 0)) + 1, 'pages': 1000})
+        self._send(404, {})
+
+
+@pytest.fixture(scope='module')
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_address[1]}'
+    httpd.shutdown()
+
+
+class TestRestClient:
+
+    def test_sessions_shared_per_origin(self, server):
+        from sajha.tools.rest_client import SessionPool
+        pool = SessionPool(max_hosts=1)
+        assert pool.get(server + '/a') is pool.get(server + '/b?x=1')
+        pool.get('http://other.invalid/')
+        assert pool.stats()['sessions_evicted'] == 1
+
+    def test_keep_alive_reuses_connection(self, server):
+        from sajha.tools.rest_client import RestClient
+        client = RestClient(server + '/flaky')
+        _Handler.hits.clear()
+        for _ in range(3):
+            assert client.request(server + '/flaky').status_code == 200
+        assert len({port for _, _, port in _Handler.hits}) == 1
+
+    def test_retries_5xx_with_backoff(self, server):
+        from sajha.tools.rest_client import RestClient, RetryPolicy
+        _Handler.flaky_left = 2
+        client = RestClient(server + '/flaky', retry=RetryPolicy(max_retries=2, backoff_base=0.01))
+        assert client.request(server + '/flaky').status_code == 200
+        _Handler.flaky_left = 5
+        client = RestClient(server + '/flaky', retry=RetryPolicy(max_retries=1, backoff_base=0.01))
+        assert client.request(server + '/flaky').status_code == 503
+
+    def test_page_mode_with_total(self, server):
+        from sajha.tools.rest_client import RestClient
+        client = RestClient(server + '/pages', pagination={
+            'mode': 'page', 'size_param': 'per_page', 'page_size': 5, 'concurrency': 3,
+            'items_path': 'data', 'total_path': 'meta.total'})
+        result = client.fetch_pages(server + '/pages')
+        assert result['items'] == ITEMS
+        assert result['pages_fetched'] == 5 and not result['truncated']
+
+    def test_offset_mode_stops_on_short_page_or_max_pages(self, server):
+        from sajha.tools.rest_client import RestClient
+        spec = {'mode': 'offset', 'size_param': 'limit', 'page_size': 10, 'concurrency': 2}
+        full = RestClient(server + '/offset', pagination=spec).fetch_pages(server + '/offset')
+        assert full['items'] == ITEMS and not full['truncated']
+        capped = RestClient(server + '/offset', pagination=dict(spec, max_pages=2)).fetch_pages(server + '/offset')
+        assert capped['items'] == ITEMS[:20] and capped['truncated']
+
+    def test_cursor_mode(self, server):
+        from sajha.tools.rest_client import RestClient
+        client = RestClient(server + '/cursor', pagination={
+            'mode': 'cursor', 'items_path': 'items', 'next_cursor_path': 'next'})
+        result = client.fetch_pages(server + '/cursor')
+        assert result['items'] == ITEMS and result['pages_fetched'] == 3
+
+    def test_empty_pages_count_against_max_pages(self, server):
+        from sajha.tools.rest_client import RestClient
+        for spec in ({'mode': 'cursor', 'items_path': 'items', 'next_cursor_path': 'next'},
+                     {'mode': 'page', 'items_path': 'items', 'total_pages_path': 'pages'}):
+            client = RestClient(server + '/endless', pagination=dict(spec, max_pages=5))
+            _Handler.hits.clear()
+            result = client.fetch_pages(server + '/endless')
+            assert result == {'items': [], 'pages_fetched': 5, 'truncated': True}
+            assert len(_Handler.hits) == 5
+
+
+class TestGeneratedRestTool:
+
+    def test_generated_tool_paginates(self, server, tmp_path):
+        import importlib.util
+        from sajha.studio.rest_tool_generator import RESTToolGenerator, RESTToolDefinition
+        definition = RESTToolDefinition(
+            name='paged_items', endpoint=server + '/pages', method='GET', description='Paged items',
+            request_schema={}, response_schema={}, max_retries=1,
+            pagination={'mode': 'page', 'size_param': 'per_page', 'page_size': 10,
+                         'items_path': 'data', 'total_path': 'meta.total'})
+        generator = RESTToolGenerator()
+        assert generator.validate_definition(definition) == (True, [])
+        path = tmp_path / 'rest_paged_items.py'
+        path.write_text(generator.generate_python_implementation(definition))
+        spec = importlib.util.spec_from_file_location('rest_paged_items', path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        result = module.RESTPagedItemsTool({'name': 'paged_items'}).execute({})
+        assert result['success'] and result['data'] == ITEMS and result['pages_fetched'] == 3
+
+    def test_pagination_requires_get(self):
+        from sajha.studio.rest_tool_generator import RESTToolGenerator, RESTToolDefinition
+        definition = RESTToolDefinition(
+            name='bad_tool', endpoint='https://x.example/api', method='POST', description='d',
+            request_schema={'type': 'object'}, response_schema={}, cache_ttl=60,
+            pagination={'mode': 'page'})
+        ok, errors = RESTToolGenerator().validate_definition(definition)
+        assert not ok and len(errors) == 2
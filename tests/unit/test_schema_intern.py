@@ -0,0 +1,103 @@
+"""
+Tests for sajha.core.schema_intern and lazily composed composite schemas — shared structure, read-only nodes, version-keyed caching.
+"""
+
+import sys
+import copy
+import json
+import pickle
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from tests.unit.fakes import FakeRegistry
+
+
+def _tool(name, input_schema, output_schema=None):
+    from sajha.tools.base_mcp_tool import BaseMCPTool
+
+    class _Tool(BaseMCPTool):
+        schema_calls = 0
+
+        def execute(self, arguments):
+            return {}
+
+        def get_input_schema(self):
+            type(self).schema_calls += 1
+            return copy.deepcopy(input_schema)            # a fresh dict per call, like most tools
+
+        def get_output_schema(self):
+            return copy.deepcopy(output_schema)
+
+    return _Tool({'name': name, 'description': f'{name} tool'})
+
+
+SYMBOL = {'type': 'string', 'description': 'Ticker symbol'}
+
+
+class TestInternSchema:
+
+    def test_equal_subtrees_are_one_read_only_object(self):
+        from sajha.core.schema_intern import intern_schema, thaw
+        a = intern_schema({'type': 'object', 'properties': {'symbol': dict(SYMBOL)}, 'required': ['symbol']})
+        b = intern_schema({'type': 'object', 'properties': {'symbol': dict(SYMBOL), 'limit': {'type': 'integer'}}})
+        assert a['properties']['symbol'] is b['properties']['symbol']
+        assert intern_schema(json.loads(json.dumps(a))) is a
+        assert json.loads(json.dumps(b)) == thaw(b)
+
+        with pytest.raises(TypeError):
+            a['properties']['symbol']['type'] = 'number'
+        with pytest.raises(TypeError):
+            a['required'].append('limit')
+        edited = copy.deepcopy(a)                          # deepcopy hands back a plain, editable copy
+        edited['properties']['symbol']['type'] = 'number'
+        assert a['properties']['symbol']['type'] == 'string' and type(edited) is dict
+        assert pickle.loads(pickle.dumps(a)) is a
+
+
+class TestCompositeSchemas:
+
+    def test_composites_share_child_schemas_and_build_lazily(self):
+        from sajha.tools.composite_tool import CompositeTool
+        quote = _tool('fmp_quote', {'type': 'object', 'properties': {'symbol': SYMBOL}, 'required': ['symbol']},
+                      {'type': 'object', 'properties': {'price': {'type': 'number'}}})
+        ratios = _tool('fmp_ratios', {'type': 'object', 'properties': {'symbol': SYMBOL}},
+                       {'type': 'object', 'properties': {'pe': {'type': 'number'}}})
+        registry = FakeRegistry({'fmp_quote': quote, 'fmp_ratios': ratios})
+        composites = [CompositeTool({'name': f'snap_{i}', 'master_tool': 'fmp_quote',
+                                     'steps': [{'tool_name': 'fmp_ratios', 'output_key': 'ratios'}]}, registry)
+                      for i in range(200)]
+        assert type(quote).schema_calls == 0                                # nothing derived at construction
+
+        inputs = {id(c.get_input_schema()) for c in composites}
+        assert inputs == {id(quote.frozen_input_schema())}                  # no extra params: the master's own
+        first = composites[0].get_output_schema()
+        assert first['properties']['ratios'] is ratios.frozen_output_schema()
+        assert all(c.get_output_schema() is first for c in composites)
+        assert type(quote).schema_calls == 1
+
+        listing = composites[0].to_mcp_format()
+        assert composites[0].to_mcp_format() is listing and listing['inputSchema'] is quote.frozen_input_schema()
+
+        # A child reloaded with a new schema: only dependants re-derive, on next use
+        version = composites[0].schema_version
+        registry.tools['fmp_ratios'] = _tool('fmp_ratios', {'type': 'object', 'properties': {}},
+                                             {'type': 'object', 'properties': {'pb': {'type': 'number'}}})
+        assert composites[0].schema_version > version
+        assert 'pb' in composites[0].get_output_schema()['properties']['ratios']['properties']
+        relisted = composites[0].to_mcp_format()                          # input comes from the master alone
+        assert relisted == listing and relisted['inputSchema'] is listing['inputSchema']
+
+    def test_extra_input_params_extend_a_shared_master_schema(self):
+        from sajha.tools.composite_tool import CompositeTool
+        quote = _tool('fmp_quote', {'type': 'object', 'properties': {'symbol': SYMBOL}, 'required': ['symbol']})
+        registry = FakeRegistry({'fmp_quote': quote, 'fred_series': _tool('fred_series', {'type': 'object'})})
+        composite = CompositeTool({'name': 'macro', 'master_tool': 'fmp_quote', 'steps': [
+            {'tool_name': 'fred_series', 'output_key': 'rates', 'param_mapping': {'series_id': '$input.series'}},
+        ]}, registry)
+        schema = composite.get_input_schema()
+        assert list(schema['properties']) == ['symbol', 'series'] and schema['required'] == ['symbol']
+        assert schema['properties']['symbol'] is quote.frozen_input_schema()['properties']['symbol']
+        assert quote.frozen_input_schema()['properties'].keys() == {'symbol'}        # master left untouched
@@ -0,0 +1,116 @@
+"""
+Tests for sajha.core.timeseries_store — delta fetches, revisions and local queries over stored series.
+"""
+
+import sys
+import pytest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+
+@pytest.fixture
+def store(monkeypatch):
+    import sajha.core.timeseries_store as store_mod
+    from sajha.core.duckdb_engine import DuckDBEngine
+    from sajha.core.timeseries_store import TimeSeriesStore
+    engine = DuckDBEngine(database=':memory:')
+    store = TimeSeriesStore(engine=engine, refresh_seconds=0, revision_window=2)
+    monkeypatch.setattr(store_mod, '_store', store)
+    yield store
+    engine.close()
+
+
+class FakeUpstream:
+    """Monthly series 2023-01 .. 2023-<months>, recording the `since` of every call."""
+
+    def __init__(self, months=6):
+        self.values = {f"2023-{m:02d}": float(m) for m in range(1, months + 1)}
+        self.calls = []
+        self.fail = False
+
+    def __call__(self, since):
+        self.calls.append(since)
+        if self.fail:
+            raise ConnectionError('upstream down')
+        return {'label': 'Test series',
+                'observations': [{'date': d, 'value': v} for d, v in sorted(self.values.items())
+                                 if since is None or d >= since]}
+
+
+class TestTimeSeriesStore:
+
+    def test_full_load_then_delta_with_revision(self, store):
+        upstream = FakeUpstream()
+        first = store.series('test', 'S1', 'M', upstream)
+        assert first['store']['source'] == 'upstream'
+        assert [o['date'] for o in first['observations']][-1] == '2023-06'
+        assert first['metadata']['label'] == 'Test series'
+
+        upstream.values['2023-05'] = 55.0   # revised
+        upstream.values['2023-07'] = 7.0    # new period
+        second = store.series('test', 'S1', 'M', upstream, last=3)
+        # Only the revision window (last 2 stored periods) onwards is re-fetched
+        assert upstream.calls == [None, '2023-05']
+        assert second['store']['source'] == 'store+delta'
+        assert second['store']['fetched_observations'] == 3
+        assert second['store']['revised_observations'] == 1
+        assert second['observations'] == [{'date': '2023-05', 'value': 55.0},
+                                           {'date': '2023-06', 'value': 6.0},
+                                           {'date': '2023-07', 'value': 7.0}]
+        assert store.revisions('test', 'S1', 'M')[0]['old_value'] == 5.0
+
+    def test_empty_delta_keeps_the_stored_tail(self, store):
+        upstream = FakeUpstream(months=12)
+        store.series('test', 'S1', 'M', upstream)
+        upstream.values.clear()                                  # a successful response with no observations
+        result = store.series('test', 'S1', 'M', upstream)
+        assert upstream.calls == [None, '2023-11']
+        assert len(result['observations']) == 12 and result['observations'][-1] == {'date': '2023-12', 'value': 12.0}
+        assert result['store']['revised_observations'] == 0
+
+    def test_resample_and_transform_are_local(self, store):
+        upstream = FakeUpstream()
+        store.refresh_seconds = 3600
+        store.series('test', 'S1', 'M', upstream)
+        quarterly = store.series('test', 'S1', 'M', upstream, resample='Q', how='mean')
+        assert [o['value'] for o in quarterly['observations']] == [2.0, 5.0]
+        assert quarterly['store']['source'] == 'store'
+        diffs = store.series('test', 'S1', 'M', upstream, start='2023-03', transform='diff')
+        assert [o['value'] for o in diffs['observations']] == [1.0, 1.0, 1.0, 1.0]
+        assert upstream.calls == [None]
+        with pytest.raises(ValueError):
+            store.series('test', 'S1', 'M', upstream, transform='cube')
+
+    def test_upstream_failure_serves_stale_history(self, store):
+        upstream = FakeUpstream()
+        upstream.fail = True
+        with pytest.raises(ConnectionError):
+            store.series('test', 'S1', 'M', upstream)
+        upstream.fail = False
+        store.series('test', 'S1', 'M', upstream)
+        upstream.fail = True
+        result = store.series('test', 'S1', 'M', upstream)
+        assert result['store']['stale'] and 'upstream down' in result['store']['error']
+        assert len(result['observations']) == 6
+
+
+class TestStoredSeriesDecorator:
+
+    def test_tool_fetch_method_is_served_from_store(self, store):
+        from sajha.core.timeseries_store import stored_series
+        upstream = FakeUpstream()
+
+        class Tool:
+            @stored_series('test')
+            def _fetch_series(self, series_name, start_date=None, end_date=None, recent_periods=None):
+                response = upstream(start_date)
+                response['series_name'] = series_name
+                return response
+
+        result = Tool()._fetch_series('S1', recent_periods=2)
+        assert result['series_name'] == 'S1' and result['observation_count'] == 2
+        assert [o['date'] for o in result['observations']] == ['2023-05', '2023-06']
+        result = Tool()._fetch_series('S1', start_date='2023-02', end_date='2023-03', transform='pct_change')
+        assert result['transform'] == 'pct_change'
+        assert [o['value'] for o in result['observations']] == [100.0, 50.0]
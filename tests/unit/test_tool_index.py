@@ -0,0 +1,154 @@
+"""
+Tests for sajha.ai.tool_resolver.ToolEmbeddingIndex — binary mmap index, incremental rows, int8 and IVF search.
+"""
+
+import sys
+import zlib
+import pytest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+np = pytest.importorskip('numpy')
+
+
+class _Tool:
+    def __init__(self, name):
+        self.config = {'description': f'{name} description', 'metadata': {'category': 'test'}}
+
+
+class _Registry:
+    def __init__(self, names):
+        self.tools = {n: _Tool(n) for n in names}
+
+
+class _Embedder:
+    """Deterministic vectors: tools in the same cluster (name prefix) point the same way."""
+    name = 'fake-embedder'
+    dimension = 32
+
+    def __init__(self):
+        self.embedded = 0
+
+    def vector(self, text):
+        name = text.split(':')[0]
+        center = np.random.default_rng(zlib.crc32(name.split('_')[0].encode())).standard_normal(self.dimension)
+        noise = np.random.default_rng(zlib.crc32(name.encode())).standard_normal(self.dimension)
+        return center + 0.3 * noise
+
+    def embed(self, texts):
+        self.embedded += len(texts)
+        return [self.vector(t).tolist() for t in texts]
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    import sajha.core.storage as storage_mod
+    backend = storage_mod.LocalStorageBackend(str(tmp_path))
+    monkeypatch.setattr(storage_mod, '_storage', backend)
+    return backend
+
+
+@pytest.fixture
+def object_storage(tmp_path, monkeypatch):
+    """An object-store backend over a dict: get_local_path on a missing key raises, as S3/Azure/GCS do."""
+    import sajha.core.storage as storage_mod
+
+    class _MemoryObjectStore(storage_mod._ObjectStorageBackend):
+        def __init__(self):
+            super().__init__(cache_dir=str(tmp_path / 'cache'))
+            self.objects = {}
+
+        def _fetch_bytes(self, key):
+            if key not in self.objects:
+                raise FileNotFoundError(key)
+            return self.objects[key]
+
+        def _store_bytes(self, key, data):
+            self.objects[key] = bytes(data)
+
+        def _object_exists(self, key):
+            return key in self.objects
+
+        def _delete_object(self, key):
+            return self.objects.pop(key, None) is not None
+
+        def _list_keys(self, key_prefix):
+            return [k for k in self.objects if k.startswith(key_prefix)]
+
+        def _object_mtime(self, key):
+            return 0.0
+
+    backend = _MemoryObjectStore()
+    monkeypatch.setattr(storage_mod, '_storage', backend)
+    return backend
+
+
+class TestToolEmbeddingIndex:
+
+    def test_binary_index_reloads_by_mmap_and_updates_rows_in_place(self, storage, tmp_path):
+        from sajha.ai.tool_resolver import ToolEmbeddingIndex
+        embedder = _Embedder()
+        registry = _Registry([f'fx_{i}' for i in range(40)] + [f'rates_{i}' for i in range(40)])
+        index = ToolEmbeddingIndex(dtype='int8')
+        assert index.sync(registry, embedder) == {'embedded': 80, 'removed': 0, 'total': 80}
+        assert (tmp_path / 'data' / 'tool_search_index.npy').exists()
+
+        reloaded = ToolEmbeddingIndex(dtype='int8')
+        assert reloaded.load('fake-embedder')
+        assert isinstance(reloaded._matrix, np.memmap) and reloaded.stats()['indexed_tools'] == 80
+        top = reloaded.search(embedder.vector('rates_3: x'), top_k=1)[0]
+        assert top.tool_name == 'rates_3' and top.confidence == pytest.approx(1.0, abs=0.01)
+
+        # One removal and one addition: the new tool takes the freed row, nothing else is re-embedded
+        freed = reloaded._rows['fx_0']
+        del registry.tools['fx_0']
+        registry.tools['fx_new'] = _Tool('fx_new')
+        embedder.embedded = 0
+        assert reloaded.sync(registry, embedder) == {'embedded': 1, 'removed': 1, 'total': 80}
+        assert embedder.embedded == 1 and reloaded._rows['fx_new'] == freed
+        assert ToolEmbeddingIndex(dtype='int8').load('fake-embedder')
+
+        # A different dtype requantizes from the stored rows without re-embedding
+        as_float = ToolEmbeddingIndex(dtype='float16')
+        assert as_float.load('fake-embedder') and as_float.stats()['dtype'] == 'float16'
+        assert as_float.search(embedder.vector('fx_new: x'), top_k=1)[0].tool_name == 'fx_new'
+
+    def test_dtype_switches_survive_restarts(self, storage):
+        from sajha.ai.tool_resolver import ToolEmbeddingIndex
+        embedder = _Embedder()
+        registry = _Registry([f'fx_{i}' for i in range(20)] + [f'rates_{i}' for i in range(20)])
+        ToolEmbeddingIndex(dtype='float32').sync(registry, embedder)
+
+        for dtype in ('int8', 'int8', 'float32', 'float32', 'int8'):       # switch, restart, switch back
+            index = ToolEmbeddingIndex(dtype=dtype)
+            assert index.load('fake-embedder') and index.stats()['dtype'] == dtype
+            top = index.search(embedder.vector('fx_3: x'), top_k=1)[0]
+            assert top.tool_name == 'fx_3' and top.confidence == pytest.approx(1.0, abs=0.02)
+            embedder.embedded = 0
+            assert index.sync(registry, embedder)['embedded'] == 0 and embedder.embedded == 0
+
+    def test_first_build_on_an_object_store_uploads_the_matrix(self, object_storage, tmp_path):
+        from sajha.ai.tool_resolver import ToolEmbeddingIndex
+        embedder = _Embedder()
+        registry = _Registry([f'fx_{i}' for i in range(10)])
+        assert ToolEmbeddingIndex().sync(registry, embedder)['total'] == 10
+        assert {'data/tool_search_index.npy', 'data/tool_search_index.ids.json'} <= set(object_storage.objects)
+
+        (tmp_path / 'cache' / 'data' / 'tool_search_index.npy').unlink()   # a fresh node: cache is empty
+        reloaded = ToolEmbeddingIndex()
+        assert reloaded.load('fake-embedder') and reloaded.stats()['indexed_tools'] == 10
+
+    def test_ivf_search_matches_exact_on_clustered_catalog(self):
+        from sajha.ai.tool_resolver import ToolEmbeddingIndex
+        embedder = _Embedder()
+        registry = _Registry([f'{prefix}_{i}' for prefix in ('fx', 'rates', 'equity', 'credit', 'macro')
+                              for i in range(60)])
+        exact = ToolEmbeddingIndex(persist=False)
+        ivf = ToolEmbeddingIndex(persist=False, ann='ivf', ann_min_rows=100, nprobe=4)
+        exact.sync(registry, embedder)
+        ivf.sync(registry, embedder)
+        for name in ('fx_7', 'credit_42', 'macro_0'):
+            query = embedder.vector(f'{name}: x')
+            assert [m.tool_name for m in ivf.search(query, 3)] == [m.tool_name for m in exact.search(query, 3)]
+        assert ivf.stats()['ann'] == 'ivf' and exact.stats()['ann'] == 'exact'